@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: authenticated API requests per second with and without auth caches.
+
+Runs a FastAPI app with one protected endpoint in process (httpx ASGI
+transport, no network) and a simulated user lookup with a fixed latency.
+The uncached variant decodes the JWT and loads the user on every request;
+the cached variant uses the token and user LRU caches of Authenticator.
+A pool of tokens is cycled to model many clients. With the default
+concurrency of 1 the result is the inverse of per-request latency; higher
+concurrency hides the lookup latency but not its CPU and connection cost.
+
+Usage:
+    python scripts/bench_auth.py [--requests 5000] [--tokens 100] [--db-ms 1.0] [--concurrency 1]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+
+from src.api.v1.deps import get_current_user_id  # noqa: E402
+from src.core.security import Authenticator, AuthUser, create_access_token  # noqa: E402
+
+SECRET = "benchmark-secret-key-0123456789"
+
+
+def build_authenticator(cached: bool, db_ms: float) -> Authenticator:
+    """Authenticator with a simulated DB user lookup."""
+
+    async def load_user(user_id: int) -> Optional[AuthUser]:
+        if db_ms:
+            await asyncio.sleep(db_ms / 1000)
+        return AuthUser(id=user_id)
+
+    size = 10_000 if cached else 0
+    return Authenticator(SECRET, user_loader=load_user, token_cache_size=size, user_cache_size=size)
+
+
+def build_app(authenticator: Authenticator) -> FastAPI:
+    """App with a single protected endpoint."""
+    app = FastAPI()
+    app.state.authenticator = authenticator
+
+    @app.get("/v1/me")
+    async def me(user_id: int = Depends(get_current_user_id)) -> int:
+        return user_id
+
+    return app
+
+
+async def measure(app: FastAPI, tokens: List[str], requests: int, concurrency: int) -> float:
+    """Send ``requests`` authenticated requests and return requests per second."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        counter = iter(range(requests))
+
+        async def worker() -> None:
+            for index in counter:
+                token = tokens[index % len(tokens)]
+                response = await client.get("/v1/me", headers={"Authorization": f"Bearer {token}"})
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - started)
+
+
+def measure_authenticate(authenticator: Authenticator, tokens: List[str], calls: int) -> float:
+    """Call ``authenticate`` directly and return calls per second."""
+
+    async def run() -> float:
+        started = time.perf_counter()
+        for index in range(calls):
+            await authenticator.authenticate(tokens[index % len(tokens)])
+        return calls / (time.perf_counter() - started)
+
+    return asyncio.run(run())
+
+
+def main() -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--tokens", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--db-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    tokens = [create_access_token(user_id, SECRET) for user_id in range(1, args.tokens + 1)]
+    print(
+        f"{args.requests} requests, {args.tokens} tokens, concurrency {args.concurrency}, "
+        f"user lookup {args.db_ms} ms"
+    )
+    for cached in (False, True):
+        label = "cached  " if cached else "uncached"
+        app = build_app(build_authenticator(cached, args.db_ms))
+        rps = asyncio.run(measure(app, tokens, args.requests, args.concurrency))
+        direct = measure_authenticate(build_authenticator(cached, 0), tokens, args.requests)
+        print(f"{label}: {rps:>9,.0f} req/s   authenticate() only: {direct:>11,.0f} calls/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
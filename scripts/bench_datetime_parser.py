@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Russian datetime parser throughput.
+
+Builds a phrase corpus from the inputs in specs/evals/cases.jsonl: each case
+input is kept as is and also re-rendered with its date expression replaced by
+a set of common relative expressions. Reports cold (empty LRU cache) and warm
+throughput of parse_datetime().
+
+Usage:
+    python scripts/bench_datetime_parser.py [--repeat 20]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.utils.datetime import compile_phrase, parse_datetime  # noqa: E402
+
+EXPRESSIONS = [
+    "вчера",
+    "позавчера",
+    "сегодня утром",
+    "завтра в 9:00",
+    "послезавтра вечером",
+    "через 2 часа",
+    "через полчаса",
+    "3 дня назад",
+    "в следующую среду",
+    "в прошлую пятницу",
+    "на прошлой неделе",
+    "15 марта в 10",
+    "в 7 вечера",
+    "через неделю",
+]
+REPLACEABLE = ["вчера", "сегодня", "завтра"]
+
+
+def build_corpus(cases_path: Path) -> List[str]:
+    """Build the phrase corpus from eval case inputs."""
+    corpus: List[str] = []
+    with cases_path.open(encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            text = json.loads(line)["input"]
+            corpus.append(text)
+            anchor = next((word for word in REPLACEABLE if word in text), None)
+            for expression in EXPRESSIONS:
+                if anchor:
+                    corpus.append(text.replace(anchor, expression))
+                else:
+                    corpus.append(f"{text} {expression}")
+                corpus.append(f"напомни {expression} проверить почту")
+    return corpus
+
+
+def measure(corpus: List[str], repeat: int) -> float:
+    """Parse the corpus ``repeat`` times and return phrases per second."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for phrase in corpus:
+            parse_datetime(phrase, "Europe/Moscow")
+    return len(corpus) * repeat / (time.perf_counter() - started)
+
+
+def main() -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cases", type=Path, default=ROOT / "specs" / "evals" / "cases.jsonl")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.cases)
+    print(f"corpus: {len(corpus)} phrases ({len(set(corpus))} unique)")
+
+    cold = []
+    for _ in range(args.repeat):
+        compile_phrase.cache_clear()
+        cold.append(measure(corpus, 1))
+    print(f"cold (no cache): {sum(cold) / len(cold):>10,.0f} phrases/s")
+
+    compile_phrase.cache_clear()
+    measure(corpus, 1)
+    print(f"warm (cached):   {measure(corpus, args.repeat):>10,.0f} phrases/s")
+    print(f"cache: {compile_phrase.cache_info()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fused single-call enrichment vs separate classify/tag/summarize calls.
+
+Notes are taken from the eval dataset (specs/evals/cases.jsonl) plus the
+note examples of the intent router, cycled up to ``--notes``. By default
+the LLM is simulated with a simple serving model: every call pays a fixed
+overhead, prefill per prompt token and decode per completion token
+(tokens ~ characters / 4), which is where fusing wins: the note is sent
+once and the per-call overhead is paid once. Pass ``--target
+module:factory`` to benchmark a real ``LLMClient`` instead.
+
+Reports latency p50/p95 and tokens per note for the fused pipeline and the
+separate pipeline (sequential and concurrent).
+
+Usage:
+    python scripts/bench_enrichment.py [--notes 60] [--overhead-ms 150] \
+        [--prefill-ms 0.2] [--decode-ms 15] [--target module:factory]
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import statistics
+import sys
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.llm.clients.base import Completion, LLMClient  # noqa: E402
+from src.llm.enrichment import EnrichmentResult, NoteEnricher  # noqa: E402
+from src.llm.intent_router import DEFAULT_EXAMPLES, Intent  # noqa: E402
+
+CASES = ROOT / "specs" / "evals" / "cases.jsonl"
+
+
+class SimulatedLLM:
+    """LLM stand-in with per-call overhead, prefill and decode costs."""
+
+    def __init__(self, overhead_ms: float, prefill_ms: float, decode_ms: float) -> None:
+        self.overhead = overhead_ms / 1000
+        self.prefill = prefill_ms / 1000
+        self.decode = decode_ms / 1000
+
+    async def complete(self, prompt: str, **kwargs: Any) -> Completion:
+        note = prompt.rsplit("Заметка:\n", 1)[-1]
+        answer = {
+            "category": "other",
+            "tags": [word.lower() for word in note.split()[:3]] or ["note"],
+            "summary": note[:200] or "-",
+        }
+        if "json_schema" not in kwargs:
+            name = next(n for n in answer if f'"{n}"' in prompt)
+            answer = {name: answer[name]}
+        text = json.dumps(answer, ensure_ascii=False)
+        prompt_tokens, completion_tokens = len(prompt) // 4, len(text) // 4
+        await asyncio.sleep(
+            self.overhead + prompt_tokens * self.prefill + completion_tokens * self.decode
+        )
+        return Completion(text, "simulated", prompt_tokens, completion_tokens)
+
+
+def load_notes(n: int) -> List[str]:
+    """Eval inputs and note examples, cycled to ``n`` notes."""
+    texts = [json.loads(line)["input"] for line in CASES.read_text().splitlines() if line.strip()]
+    texts.extend(DEFAULT_EXAMPLES[Intent.NOTE])
+    return [texts[i % len(texts)] for i in range(n)]
+
+
+async def run(
+    name: str, notes: List[str], enrich: Callable[[str], Awaitable[EnrichmentResult]]
+) -> None:
+    """Enrich notes one by one and print latency and token stats."""
+    results = [await enrich(note) for note in notes]
+    latencies = sorted(r.latency_ms for r in results)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(
+        f"{name:<22} p50 {statistics.median(latencies):7.1f} ms  p95 {p95:7.1f} ms  "
+        f"calls/note {statistics.mean(r.calls for r in results):4.2f}  "
+        f"tokens/note {statistics.mean(r.tokens for r in results):6.1f}"
+    )
+
+
+def main() -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=60)
+    parser.add_argument("--overhead-ms", type=float, default=150.0)
+    parser.add_argument("--prefill-ms", type=float, default=0.2)
+    parser.add_argument("--decode-ms", type=float, default=15.0)
+    parser.add_argument("--target", help="module:factory returning an LLMClient")
+    args = parser.parse_args()
+
+    client: LLMClient
+    if args.target:
+        module, factory = args.target.split(":")
+        client = getattr(importlib.import_module(module), factory)()
+    else:
+        client = SimulatedLLM(args.overhead_ms, args.prefill_ms, args.decode_ms)
+    enricher = NoteEnricher(client)
+    notes = load_notes(args.notes)
+
+    async def separate_concurrent(text: str) -> EnrichmentResult:
+        return await enricher.enrich_separately(text, concurrent=True)
+
+    async def bench() -> None:
+        await run("fused", notes, enricher.enrich)
+        await run("separate (sequential)", notes, enricher.enrich_separately)
+        await run("separate (concurrent)", notes, separate_concurrent)
+
+    asyncio.run(bench())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark: reminder scheduler with 1M pending reminders.
+
+Measures the cost of the operations the horizon scheduler performs instead
+of a per-tick table poll: loading a horizon window from the store, waking up
+for newly created reminders and firing due reminders from the heap.
+
+Usage:
+    python scripts/bench_reminder_scheduler.py [--count 1000000] [--horizon 300]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.schedulers.reminder_scheduler import (  # noqa: E402
+    InMemoryReminderStore,
+    Reminder,
+    ReminderScheduler,
+)
+
+
+async def run(count: int, horizon: float, shards: int) -> None:
+    """Run the benchmark and print results."""
+    rng = random.Random(42)
+    now = time.time()
+    month = 30 * 24 * 3600.0
+
+    started = time.perf_counter()
+    store = InMemoryReminderStore()
+    store.add_many([Reminder(i, i % 5000, "r", now + rng.random() * month) for i in range(count)])
+    print(f"store load:        {count:>9,} reminders in {time.perf_counter() - started:.2f}s")
+
+    # One refill per horizon per shard replaces horizon/tick polls.
+    delivered = 0
+
+    async def deliver(reminder: Reminder) -> None:
+        nonlocal delivered
+        delivered += 1
+
+    schedulers = [
+        ReminderScheduler(store, deliver, horizon=horizon, shard_index=i, shard_count=shards)
+        for i in range(shards)
+    ]
+    started = time.perf_counter()
+    for scheduler in schedulers:
+        await scheduler._refill(now)
+    window = sum(s.pending_count for s in schedulers)
+    elapsed = time.perf_counter() - started
+    print(f"horizon refill:    {window:>9,} reminders in {elapsed * 1000:.1f}ms ({shards} shards)")
+
+    # notify() cost for reminders created inside the loaded window.
+    scheduler = schedulers[0]
+    notify_count = 100_000
+    created = [
+        Reminder(count + i * shards, 1, "new", now + rng.random() * horizon)
+        for i in range(notify_count)
+    ]
+    store.add_many(created)
+    started = time.perf_counter()
+    for reminder in created:
+        scheduler.notify(reminder)
+    elapsed = time.perf_counter() - started
+    print(f"notify:            {notify_count / elapsed:>9,.0f} ops/s")
+
+    # Fire everything loaded in the first shard's window.
+    fire_count = scheduler.pending_count
+    started = time.perf_counter()
+    scheduler._fire_due(now + horizon)
+    await asyncio.gather(*scheduler._inflight)
+    elapsed = time.perf_counter() - started
+    print(f"fire + deliver:    {fire_count / elapsed:>9,.0f} reminders/s ({delivered:,} delivered)")
+
+
+def main() -> int:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--horizon", type=float, default=300.0)
+    parser.add_argument("--shards", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.count, args.horizon, args.shards))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
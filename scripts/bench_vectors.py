@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory, query latency and recall@10 of quantized vector storage.
+
+Generates clustered, L2-normalized synthetic embeddings (notes of one user
+cluster around topics, like real sentence embeddings do) and compares
+float32, float16 and int8 storage, each with and without full-precision
+re-ranking. Recall@10 is measured against exact float32 search. Memory is
+what the index keeps in RAM per 100k notes; re-ranking indexes also keep
+float32 vectors on disk (memory-mapped).
+
+Usage:
+    python scripts/bench_vectors.py [--notes 100000] [--dim 384] [--queries 200]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Set
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from src.storage.vectors import QuantizationMode, VectorIndex  # noqa: E402
+
+K = 10
+
+
+def synthetic(n: int, dim: int, topics: int, rng: np.random.Generator) -> np.ndarray:
+    """Clustered unit vectors."""
+    centers = rng.standard_normal((topics, dim)).astype(np.float32)
+    labels = rng.integers(0, topics, n)
+    vectors = centers[labels] + 0.8 * rng.standard_normal((n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def main() -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--topics", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    vectors = synthetic(args.notes, args.dim, args.topics, rng)
+    queries = synthetic(args.queries, args.dim, args.topics, rng)
+    ids = list(range(args.notes))
+
+    exact = VectorIndex(args.dim, QuantizationMode.FLOAT32)
+    exact.add(ids, vectors)
+    truth: List[Set[int]] = [{i for i, _ in exact.search(q, K)} for q in queries]
+
+    print(f"{args.notes:,} notes x {args.dim} dims, {args.queries} queries, recall@{K}")
+    print(f"{'mode':<18} {'RAM/100k':>10} {'p50 ms':>8} {'p95 ms':>8} {'recall':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in QuantizationMode:
+            for rerank in (False, True) if mode is not QuantizationMode.FLOAT32 else (False,):
+                index = VectorIndex(args.dim, mode, keep_full=rerank)
+                index.add(ids, vectors)
+                path = Path(tmp) / f"{mode.value}-{rerank}"
+                index.save(path)
+                index = VectorIndex.load(path)
+
+                latencies: List[float] = []
+                hits = 0
+                for query, expected in zip(queries, truth):
+                    started = time.perf_counter()
+                    found = index.search(query, K, rerank=rerank)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    hits += len(expected & {i for i, _ in found})
+
+                ram = index.nbytes * 100_000 / args.notes / 2**20
+                p95 = statistics.quantiles(latencies, n=20)[18]
+                label = f"{mode.value}{' + rerank' if rerank else ''}"
+                print(
+                    f"{label:<18} {ram:>7.1f} MB {statistics.median(latencies):>8.2f} "
+                    f"{p95:>8.2f} {hits / (K * len(queries)):>8.3f}"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time to steady-state latency after a restart, cold vs snapshot.
+
+A previous process serves ``--warm-requests`` Zipf-distributed requests
+through an LLM response cache (``LRUCache``) next to a vector index of
+``--vectors`` embeddings, then writes warm-start snapshots on shutdown.
+The restarted process either starts cold (re-embeds the index, empty
+cache) or restores both from the snapshots, and serves ``--requests``
+more requests.
+
+Snapshot write and restore times and the index build are measured for
+real; embedding (``--embed-ms`` per 64 texts) and LLM calls
+(``--llm-ms`` per cache miss, ``--hit-ms`` per hit) are charged as
+simulated time so the run takes seconds. Time to steady state is the
+simulated serving time until a rolling window of ``--window`` requests is
+within 10% of the previous process's steady-state mean latency; "head
+mean" is the mean latency of the first two windows after the restart.
+
+Usage:
+    python scripts/bench_warm_start.py [--vectors 100000] [--dim 384] \
+        [--cache 20000] [--requests 60000] [--warm-requests 60000] \
+        [--llm-ms 800] [--hit-ms 2] [--embed-ms 40] [--window 500]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.storage.snapshots import SnapshotManager  # noqa: E402
+from src.storage.vectors import VectorIndex  # noqa: E402
+from src.utils.cache import LRUCache  # noqa: E402
+
+EMBED_BATCH = 64
+
+
+def workload(count: int, universe: int, seed: int) -> List[str]:
+    """Zipf-distributed prompt keys."""
+    rng = np.random.default_rng(seed)
+    ranks = np.minimum(rng.zipf(1.1, count), universe)
+    return [f"prompt-{rank}" for rank in ranks]
+
+
+def serve(cache: LRUCache[str, str], keys: List[str], llm: float, hit: float) -> List[float]:
+    """Simulated per-request latencies in seconds."""
+    latencies = []
+    for key in keys:
+        if cache.get(key) is None:
+            cache.set(key, f"answer to {key}")
+            latencies.append(llm)
+        else:
+            latencies.append(hit)
+    return latencies
+
+
+def build_index(vectors: np.ndarray, embed: float) -> Tuple[VectorIndex, float]:
+    """Cold index build: simulated embedding plus real quantization."""
+    started = time.perf_counter()
+    index = VectorIndex(vectors.shape[1])
+    index.add(list(range(len(vectors))), vectors)
+    batches = -(-len(vectors) // EMBED_BATCH)
+    return index, time.perf_counter() - started + batches * embed
+
+
+def steady_after(latencies: List[float], target: float, window: int) -> Optional[float]:
+    """Simulated seconds until a rolling window mean is within 10% of target."""
+    series = np.asarray(latencies)
+    if len(series) < window:
+        return None
+    means = np.convolve(series, np.ones(window) / window, mode="valid")
+    reached = np.flatnonzero(means <= target * 1.1)
+    if not len(reached):
+        return None
+    return float(series[: reached[0] + window].sum())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--cache", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=60_000)
+    parser.add_argument("--warm-requests", type=int, default=60_000)
+    parser.add_argument("--llm-ms", type=float, default=800.0)
+    parser.add_argument("--hit-ms", type=float, default=2.0)
+    parser.add_argument("--embed-ms", type=float, default=40.0)
+    parser.add_argument("--window", type=int, default=500)
+    args = parser.parse_args()
+    llm, hit, embed = args.llm_ms / 1000, args.hit_ms / 1000, args.embed_ms / 1000
+    universe = args.cache * 5
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.vectors, args.dim)).astype(np.float32)
+    query = vectors[42]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        # Previous process: warm up, then write snapshots on shutdown
+        cache: LRUCache[str, str] = LRUCache(maxsize=args.cache)
+        index, _ = build_index(vectors, embed)
+        before = serve(cache, workload(args.warm_requests, universe, 1), llm, hit)
+        steady = statistics.fmean(before[-args.window * 4 :])
+        manager = SnapshotManager(directory)
+        manager.register_cache("llm-responses", cache)
+        manager.register_index("notes", index)
+        manager.restore_all()
+        asyncio.run(manager.stop())
+        print(
+            f"snapshot written: {manager.stats.bytes_written / 2**20:.1f} MiB "
+            f"in {manager.stats.last_write_seconds * 1000:.0f} ms; "
+            f"steady-state mean latency {steady * 1000:.1f} ms"
+        )
+
+        keys = workload(args.requests, universe, 2)
+        rows = []
+        for mode in ("cold", "snapshot"):
+            fresh: LRUCache[str, str] = LRUCache(maxsize=args.cache)
+            if mode == "cold":
+                restored_index, startup = build_index(vectors, embed)
+            else:
+                restored_index = VectorIndex(args.dim)
+                restarted = SnapshotManager(directory)
+                restarted.register_cache("llm-responses", fresh)
+                restarted.register_index("notes", restored_index)
+                started = time.perf_counter()
+                restarted.restore_all()
+                restored_index.search(query, k=10)
+                startup = time.perf_counter() - started
+            latencies = serve(fresh, keys, llm, hit)
+            head = latencies[: args.window * 2]
+            rows.append(
+                (
+                    mode,
+                    startup,
+                    steady_after(latencies, steady, args.window),
+                    statistics.fmean(head) * 1000,
+                    sum(1 for value in latencies if value == llm),
+                )
+            )
+
+    print(f"{'mode':<10}{'startup s':>11}{'to steady s':>13}{'head mean ms':>14}{'LLM calls':>11}")
+    for mode, startup, to_steady, head_mean, calls in rows:
+        steady_text = f"{to_steady:.0f}" if to_steady is not None else "never"
+        print(f"{mode:<10}{startup:>11.2f}{steady_text:>13}{head_mean:>14.0f}{calls:>11}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Run Evals on the golden dataset (specs/evals/cases.jsonl)
+
+Cases are streamed from the JSONL file and executed concurrently by a
+configurable number of workers against a pluggable target: the deterministic
+local intent router (default) or any object implementing ``EvalTarget``
+loaded with ``--target module:factory``. Results of unchanged cases are
+cached across runs, keyed by case, model and prompt hash.
+
+The report contains accuracy, p50/p95/p99 latency, tokens per case and
+throughput, and can be diffed against a stored baseline run.
+
+Usage:
+    python specs/evals/run_eval.py [--workers 8] [--target fake]
+        [--baseline baseline.json] [--save-baseline baseline.json]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import importlib
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Mapping, Optional, Protocol, Sequence
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils.stats import percentile  # noqa: E402
+
+DEFAULT_CASES = Path(__file__).resolve().parent / "cases.jsonl"
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / ".cache"
+
+
+@dataclass(frozen=True)
+class EvalCase:
+    """Single golden-dataset case."""
+
+    key: str
+    input: str
+    expected_intent: Optional[str]
+    expected_route: Optional[str]
+
+
+@dataclass
+class TargetOutput:
+    """Output of an eval target for one case."""
+
+    intent: Optional[str]
+    route: Optional[str]
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+@dataclass
+class CaseResult:
+    """Scored result for one case."""
+
+    key: str
+    intent: Optional[str]
+    route: Optional[str]
+    intent_correct: bool
+    route_correct: bool
+    latency_ms: float
+    tokens: int
+    cached: bool = False
+    error: Optional[str] = None
+
+
+class EvalTarget(Protocol):
+    """System under evaluation."""
+
+    name: str
+    model: str
+    prompt_hash: str
+
+    async def run(self, case: EvalCase) -> TargetOutput:
+        """Run the target on one case."""
+        ...
+
+
+class FakeTarget:
+    """Deterministic local target: intent router without an LLM.
+
+    Token counts are whitespace-token estimates of input and output so that
+    the cost columns of the report are populated without a provider. The
+    prompt hash covers everything the router is configured with (rules and
+    centroid examples), so editing either invalidates cached results.
+    """
+
+    name = "fake"
+    model = "local-router"
+
+    def __init__(self, examples: Optional[Mapping[Any, Sequence[str]]] = None) -> None:
+        """Initialize target.
+
+        Args:
+            examples: Labelled phrasings per intent (defaults to the router seeds)
+        """
+        from src.llm.intent_router import DEFAULT_EXAMPLES, DEFAULT_RULES, IntentRouter
+
+        examples = DEFAULT_EXAMPLES if examples is None else examples
+        self._router = IntentRouter(examples=examples)
+        prompt = [f"{r.intent.value}:{r.pattern.pattern}" for r in DEFAULT_RULES]
+        prompt += [
+            f"{intent.value}> {text}" for intent, texts in examples.items() for text in texts
+        ]
+        self.prompt_hash = hashlib.sha256("\n".join(prompt).encode("utf-8")).hexdigest()[:16]
+
+    async def run(self, case: EvalCase) -> TargetOutput:
+        prediction = await self._router.route(case.input)
+        return TargetOutput(
+            intent=prediction.intent.value,
+            route=prediction.route,
+            prompt_tokens=len(case.input.split()),
+            completion_tokens=2,
+        )
+
+
+def load_cases(path: Path) -> Iterator[EvalCase]:
+    """Stream cases from a JSONL file.
+
+    Args:
+        path: Path to the dataset
+
+    Yields:
+        EvalCase per non-empty line, keyed by a hash of its content
+    """
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            raw = json.loads(line)
+            key = hashlib.sha256(json.dumps(raw, sort_keys=True).encode("utf-8")).hexdigest()
+            yield EvalCase(
+                key=key,
+                input=raw["input"],
+                expected_intent=raw.get("expected_intent"),
+                expected_route=raw.get("expected_route"),
+            )
+
+
+class ResultCache:
+    """On-disk cache of target outputs keyed by case, model and prompt hash."""
+
+    def __init__(self, directory: Path, model: str, prompt_hash: str) -> None:
+        self._path = directory / f"{_safe(model)}-{prompt_hash}.jsonl"
+        self._model = model
+        self._prompt_hash = prompt_hash
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if self._path.exists():
+            with self._path.open(encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["cache_key"]] = entry
+
+    def key(self, case: EvalCase) -> str:
+        """Cache key for a case under the current model and prompt."""
+        material = f"{case.key}:{self._model}:{self._prompt_hash}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, case: EvalCase) -> Optional[Dict[str, Any]]:
+        """Get a cached entry for a case."""
+        return self._entries.get(self.key(case))
+
+    def put(self, case: EvalCase, output: TargetOutput, latency_ms: float) -> None:
+        """Store a fresh target output."""
+        entry = {"cache_key": self.key(case), "latency_ms": latency_ms, **asdict(output)}
+        self._entries[entry["cache_key"]] = entry
+
+    def save(self) -> None:
+        """Persist the cache."""
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._path.open("w", encoding="utf-8") as f:
+            for entry in self._entries.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def _safe(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+@dataclass
+class EvalReport:
+    """Aggregated run metrics."""
+
+    target: str
+    model: str
+    prompt_hash: str
+    cases: int = 0
+    errors: int = 0
+    cached: int = 0
+    intent_accuracy: float = 0.0
+    route_accuracy: float = 0.0
+    latency_p50_ms: float = 0.0
+    latency_p95_ms: float = 0.0
+    latency_p99_ms: float = 0.0
+    tokens_per_case: float = 0.0
+    throughput_cps: float = 0.0
+    wall_time_s: float = 0.0
+    results: List[CaseResult] = field(default_factory=list)
+
+    METRICS = (
+        "intent_accuracy",
+        "route_accuracy",
+        "latency_p50_ms",
+        "latency_p95_ms",
+        "latency_p99_ms",
+        "tokens_per_case",
+        "throughput_cps",
+    )
+
+    def summary(self) -> Dict[str, Any]:
+        """Report without per-case results."""
+        data = asdict(self)
+        data.pop("results")
+        return data
+
+
+def _score(case: EvalCase, output: TargetOutput, latency_ms: float, cached: bool) -> CaseResult:
+    return CaseResult(
+        key=case.key,
+        intent=output.intent,
+        route=output.route,
+        intent_correct=case.expected_intent is None or output.intent == case.expected_intent,
+        route_correct=case.expected_route is None or output.route == case.expected_route,
+        latency_ms=latency_ms,
+        tokens=output.prompt_tokens + output.completion_tokens,
+        cached=cached,
+    )
+
+
+async def _iterate(cases: Any) -> AsyncIterator[EvalCase]:
+    if hasattr(cases, "__aiter__"):
+        async for case in cases:
+            yield case
+    else:
+        for case in cases:
+            yield case
+
+
+async def run_eval(
+    cases: Any,
+    target: EvalTarget,
+    workers: int = 8,
+    cache: Optional[ResultCache] = None,
+) -> EvalReport:
+    """Run a target over streamed cases with a bounded worker pool.
+
+    Args:
+        cases: Iterable or async iterable of EvalCase
+        target: System under evaluation
+        workers: Number of concurrent workers
+        cache: Optional result cache
+
+    Returns:
+        EvalReport with per-case results and aggregates
+    """
+    queue: "asyncio.Queue[Optional[EvalCase]]" = asyncio.Queue(maxsize=workers * 2)
+    results: List[CaseResult] = []
+
+    async def produce() -> None:
+        async for case in _iterate(cases):
+            await queue.put(case)
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def work() -> None:
+        while (case := await queue.get()) is not None:
+            cached = cache.get(case) if cache else None
+            if cached is not None:
+                output = TargetOutput(
+                    intent=cached["intent"],
+                    route=cached["route"],
+                    prompt_tokens=cached["prompt_tokens"],
+                    completion_tokens=cached["completion_tokens"],
+                )
+                results.append(_score(case, output, cached["latency_ms"], cached=True))
+                continue
+            started = time.perf_counter()
+            try:
+                output = await target.run(case)
+            except Exception as e:
+                results.append(
+                    CaseResult(
+                        key=case.key,
+                        intent=None,
+                        route=None,
+                        intent_correct=False,
+                        route_correct=False,
+                        latency_ms=(time.perf_counter() - started) * 1000,
+                        tokens=0,
+                        error=f"{type(e).__name__}: {e}",
+                    )
+                )
+                continue
+            latency_ms = (time.perf_counter() - started) * 1000
+            if cache:
+                cache.put(case, output, latency_ms)
+            results.append(_score(case, output, latency_ms, cached=False))
+
+    started = time.perf_counter()
+    await asyncio.gather(produce(), *(work() for _ in range(workers)))
+    wall_time = time.perf_counter() - started
+    if cache:
+        cache.save()
+
+    report = EvalReport(target=target.name, model=target.model, prompt_hash=target.prompt_hash)
+    report.results = results
+    report.cases = len(results)
+    report.wall_time_s = wall_time
+    if not results:
+        return report
+    latencies = [r.latency_ms for r in results]
+    report.errors = sum(1 for r in results if r.error)
+    report.cached = sum(1 for r in results if r.cached)
+    report.intent_accuracy = sum(r.intent_correct for r in results) / len(results)
+    report.route_accuracy = sum(r.route_correct for r in results) / len(results)
+    report.latency_p50_ms = percentile(latencies, 50)
+    report.latency_p95_ms = percentile(latencies, 95)
+    report.latency_p99_ms = percentile(latencies, 99)
+    report.tokens_per_case = sum(r.tokens for r in results) / len(results)
+    report.throughput_cps = len(results) / wall_time if wall_time else 0.0
+    return report
+
+
+def diff_reports(current: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Compare report metrics against a baseline.
+
+    Args:
+        current: Summary of the current run
+        baseline: Summary of the baseline run
+
+    Returns:
+        Mapping of metric to {"baseline", "current", "delta"}
+    """
+    diff: Dict[str, Dict[str, float]] = {}
+    for metric in EvalReport.METRICS:
+        if metric in current and metric in baseline:
+            diff[metric] = {
+                "baseline": baseline[metric],
+                "current": current[metric],
+                "delta": current[metric] - baseline[metric],
+            }
+    return diff
+
+
+def load_target(spec: str) -> EvalTarget:
+    """Create a target from ``fake`` or a ``module:factory`` import path."""
+    if spec == "fake":
+        return FakeTarget()
+    module_name, _, attr = spec.partition(":")
+    factory = getattr(importlib.import_module(module_name), attr)
+    target: EvalTarget = factory()
+    return target
+
+
+def print_report(report: EvalReport, diff: Optional[Dict[str, Dict[str, float]]] = None) -> None:
+    """Print a human-readable report."""
+    print("=" * 70)
+    print(f"Eval: target={report.target} model={report.model} prompt={report.prompt_hash}")
+    print("=" * 70)
+    print(f"cases:            {report.cases} ({report.cached} cached, {report.errors} errors)")
+    print(f"intent accuracy:  {report.intent_accuracy:.1%}")
+    print(f"route accuracy:   {report.route_accuracy:.1%}")
+    print(
+        f"latency ms:       p50={report.latency_p50_ms:.1f} "
+        f"p95={report.latency_p95_ms:.1f} p99={report.latency_p99_ms:.1f}"
+    )
+    print(f"tokens per case:  {report.tokens_per_case:.1f}")
+    print(f"throughput:       {report.throughput_cps:.1f} cases/s")
+    for result in report.results:
+        if not (result.intent_correct and result.route_correct):
+            print(
+                f"  [X] {result.key[:12]} intent={result.intent} route={result.route} {result.error or ''}"
+            )
+    if diff:
+        print("-" * 70)
+        print("vs baseline:")
+        for metric, values in diff.items():
+            print(
+                f"  {metric:<16} {values['baseline']:>10.3f} -> "
+                f"{values['current']:>10.3f} ({values['delta']:+.3f})"
+            )
+
+
+def main() -> int:
+    """Parse arguments and run the evaluation."""
+    parser = argparse.ArgumentParser(description="Run evals on the golden dataset")
+    parser.add_argument("--cases", type=Path, default=DEFAULT_CASES)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--target", default="fake", help="'fake' or module:factory")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--baseline", type=Path, help="Baseline report to diff against")
+    parser.add_argument("--save-baseline", type=Path, help="Write this run as a baseline")
+    args = parser.parse_args()
+
+    target = load_target(args.target)
+    cache = None if args.no_cache else ResultCache(args.cache_dir, target.model, target.prompt_hash)
+    report = asyncio.run(run_eval(load_cases(args.cases), target, args.workers, cache))
+
+    diff = None
+    if args.baseline and args.baseline.exists():
+        diff = diff_reports(report.summary(), json.loads(args.baseline.read_text("utf-8")))
+    print_report(report, diff)
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report.summary(), indent=2), encoding="utf-8")
+
+    failed = sum(1 for r in report.results if not (r.intent_correct and r.route_correct))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""Common API dependencies."""
+
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from src.core.security import AuthContext, AuthenticationError, Authenticator
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def get_authenticator(request: Request) -> Authenticator:
+    """Get the authenticator attached to the application state."""
+    authenticator: Optional[Authenticator] = getattr(request.app.state, "authenticator", None)
+    if authenticator is None:
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, "Authentication is not configured")
+    return authenticator
+
+
+async def get_auth_context(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    authenticator: Authenticator = Depends(get_authenticator),
+) -> AuthContext:
+    """Authenticate the bearer token of the request.
+
+    The user id is also stored on ``request.state.user_id``.
+
+    Raises:
+        HTTPException: 401 if the request is not authenticated
+    """
+    if credentials is None:
+        raise HTTPException(
+            status.HTTP_401_UNAUTHORIZED,
+            "Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        context = await authenticator.authenticate(credentials.credentials)
+    except AuthenticationError as e:
+        raise HTTPException(
+            status.HTTP_401_UNAUTHORIZED, str(e), headers={"WWW-Authenticate": "Bearer"}
+        ) from e
+    request.state.user_id = context.user_id
+    return context
+
+
+def get_current_user_id(context: AuthContext = Depends(get_auth_context)) -> int:
+    """Get the authenticated user id."""
+    return context.user_id
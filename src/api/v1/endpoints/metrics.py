@@ -0,0 +1,18 @@
+"""Prometheus metrics endpoint."""
+
+from fastapi import APIRouter, Depends, Response
+
+from src.core.metrics import CONTENT_TYPE, REGISTRY, MetricsRegistry
+
+router = APIRouter(tags=["monitoring"])
+
+
+def get_registry() -> MetricsRegistry:
+    """Get the process metrics registry."""
+    return REGISTRY
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(registry: MetricsRegistry = Depends(get_registry)) -> Response:
+    """Expose metrics in the Prometheus text format."""
+    return Response(registry.expose(), media_type=CONTENT_TYPE)
@@ -0,0 +1,268 @@
+"""Streaming note export (NDJSON/SSE) and bulk NDJSON import.
+
+Both directions run in constant memory: the export pages through the
+database with a server-side cursor (``yield_per``) and writes one chunk per
+page; the import parses the request body line by line as it arrives and
+inserts fixed-size batches, each in its own transaction.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.api.v1.deps import get_current_user_id
+from src.api.v1.schemas.notes import ImportResult, NoteImport
+from src.core.logging import get_logger
+from src.db.base import utcnow
+from src.db.models.note import Note
+from src.db.session import get_sessionmaker
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/v1/notes", tags=["notes"])
+
+EXPORT_PAGE_SIZE = 500
+MAX_LINE_BYTES = 1_048_576
+
+_EXPORT_COLUMNS = (Note.id, Note.content, Note.source, Note.created_at, Note.updated_at)
+
+
+class ImportConflictError(Exception):
+    """An imported note conflicts with a stored one (e.g. duplicate id)."""
+
+    def __init__(self, line: int) -> None:
+        super().__init__(f"line {line}: note conflicts with an existing note")
+        self.line = line
+
+
+def encode_cursor(created_at: datetime, note_id: uuid.UUID) -> str:
+    """Encode an export position."""
+    raw = f"{created_at.isoformat()}|{note_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Decode an export position.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    created_at, _, note_id = base64.urlsafe_b64decode(padded).decode().partition("|")
+    return datetime.fromisoformat(created_at), uuid.UUID(note_id)
+
+
+async def _export_rows(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    user_id: int,
+    after: Optional[Tuple[datetime, uuid.UUID]],
+) -> AsyncIterator[Any]:
+    stmt = (
+        select(*_EXPORT_COLUMNS)
+        .where(Note.user_id == user_id, Note.deleted_at.is_(None))
+        .order_by(Note.created_at, Note.id)
+        .execution_options(yield_per=EXPORT_PAGE_SIZE)
+    )
+    if after is not None:
+        created_at, note_id = after
+        stmt = stmt.where(
+            or_(
+                Note.created_at > created_at,
+                and_(Note.created_at == created_at, Note.id > note_id),
+            )
+        )
+    async with sessionmaker() as session:
+        result = await session.stream(stmt)
+        async for page in result.partitions():
+            yield page
+
+
+def _note_json(row: Any) -> str:
+    return json.dumps(
+        {
+            "id": str(row.id),
+            "content": row.content,
+            "source": row.source,
+            "created_at": row.created_at.isoformat(),
+            "updated_at": row.updated_at.isoformat(),
+        },
+        ensure_ascii=False,
+    )
+
+
+async def _ndjson(rows: AsyncIterator[Any]) -> AsyncIterator[str]:
+    async for page in rows:
+        yield "".join(_note_json(row) + "\n" for row in page)
+
+
+async def _sse(rows: AsyncIterator[Any]) -> AsyncIterator[str]:
+    async for page in rows:
+        yield "".join(
+            f"id: {encode_cursor(row.created_at, row.id)}\nevent: note\ndata: {_note_json(row)}\n\n"
+            for row in page
+        )
+    yield "event: end\ndata: {}\n\n"
+
+
+@router.get("/export")
+async def export_notes(
+    format: Literal["ndjson", "sse"] = "ndjson",
+    after: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    user_id: int = Depends(get_current_user_id),
+    sessionmaker: async_sessionmaker[AsyncSession] = Depends(get_sessionmaker),
+) -> StreamingResponse:
+    """Stream all notes of the current user, oldest first.
+
+    Args:
+        format: ``ndjson`` (one note per line) or ``sse`` (one event per note,
+            event id is the resume cursor)
+        after: Resume cursor; SSE clients may send ``Last-Event-ID`` instead
+        last_event_id: SSE reconnect cursor
+        user_id: Authenticated user
+        sessionmaker: Session factory
+
+    Returns:
+        Streaming response
+    """
+    cursor = after or last_event_id
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid cursor") from e
+
+    rows = _export_rows(sessionmaker, user_id, position)
+    if format == "sse":
+        return StreamingResponse(
+            _sse(rows), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+        )
+    return StreamingResponse(_ndjson(rows), media_type="application/x-ndjson")
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_line: int = MAX_LINE_BYTES
+) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines without buffering the whole body.
+
+    Args:
+        chunks: Body chunks
+        max_line: Longest accepted line in bytes
+
+    Raises:
+        ValueError: If a line exceeds ``max_line``
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+        if len(buffer) > max_line:
+            raise ValueError("Line too long")
+    if buffer:
+        yield buffer
+
+
+@router.post("/import", response_model=ImportResult)
+async def import_notes(
+    request: Request,
+    offset: int = Query(0, ge=0),
+    batch_size: int = Query(500, ge=1, le=5000),
+    user_id: int = Depends(get_current_user_id),
+    sessionmaker: async_sessionmaker[AsyncSession] = Depends(get_sessionmaker),
+) -> Any:
+    """Import notes from an NDJSON body.
+
+    Lines are counted from zero, blank lines included. Each batch is
+    committed in its own transaction; on an invalid line everything before
+    it is committed and the response (422) carries the offset to resume from.
+    A note conflicting with a stored one (e.g. an id imported twice) is
+    reported the same way with 409.
+
+    Args:
+        request: Request with the NDJSON body
+        offset: Number of leading lines to skip (already imported)
+        batch_size: Notes per transaction
+        user_id: Authenticated user
+        sessionmaker: Session factory
+
+    Returns:
+        Import result
+    """
+    imported = 0
+    committed = offset
+    batch: List[Dict[str, Any]] = []
+    batch_lines: List[int] = []
+
+    async def insert_rows(rows: List[Dict[str, Any]]) -> None:
+        async with sessionmaker() as session, session.begin():
+            await session.execute(insert(Note), rows)
+
+    async def flush(next_offset: int) -> None:
+        nonlocal imported, committed
+        if batch:
+            try:
+                await insert_rows(batch)
+                imported += len(batch)
+            except IntegrityError:
+                # Locate the conflicting line, committing the rows before it
+                for row, line in zip(batch, batch_lines):
+                    try:
+                        await insert_rows([row])
+                    except IntegrityError as e:
+                        raise ImportConflictError(line) from e
+                    imported += 1
+                    committed = line + 1
+            batch.clear()
+            batch_lines.clear()
+        committed = next_offset
+
+    position = 0
+    error: Optional[str] = None
+    try:
+        try:
+            async for line in iter_lines(request.stream()):
+                if position >= offset and line.strip():
+                    item = NoteImport.model_validate_json(line)
+                    batch.append(
+                        {
+                            "id": item.id or uuid.uuid4(),
+                            "user_id": user_id,
+                            "content": item.content,
+                            "source": item.source,
+                            "created_at": item.created_at or utcnow(),
+                        }
+                    )
+                    batch_lines.append(position)
+                    if len(batch) >= batch_size:
+                        await flush(position + 1)
+                position += 1
+        except (ValidationError, ValueError) as e:
+            error = f"line {position}: {e}"
+        await flush(max(position, offset))
+    except ImportConflictError as e:
+        logger.warning(
+            "Note import stopped on a conflicting note",
+            extra={"user_id": user_id, "line": e.line, "imported": imported},
+        )
+        result = ImportResult(imported=imported, offset=committed, error=str(e))
+        return JSONResponse(result.model_dump(), status_code=status.HTTP_409_CONFLICT)
+
+    if error is not None:
+        logger.warning(
+            "Note import stopped on invalid input",
+            extra={"user_id": user_id, "line": position, "imported": imported},
+        )
+        result = ImportResult(imported=imported, offset=committed, error=error)
+        return JSONResponse(result.model_dump(), status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    logger.info("Notes imported", extra={"user_id": user_id, "imported": imported})
+    return ImportResult(imported=imported, offset=committed)
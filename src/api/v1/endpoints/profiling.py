@@ -0,0 +1,61 @@
+"""Runtime profiler control (enabled by ``PROFILING_ENABLED``)."""
+
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+from src.core.config import Settings, get_settings
+from src.core.profiling import SamplingProfiler, profiler
+
+router = APIRouter(prefix="/debug/profile", tags=["debug"])
+
+
+def get_profiler(settings: Settings = Depends(get_settings)) -> SamplingProfiler:
+    """Get the shared profiler if profiling is enabled.
+
+    Raises:
+        HTTPException: 404 if profiling is disabled
+    """
+    if not settings.profiling_enabled:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Profiling is disabled")
+    return profiler
+
+
+@router.post("/start", include_in_schema=False)
+async def start_profiling(
+    interval: Optional[float] = None,
+    sampler: SamplingProfiler = Depends(get_profiler),
+) -> Dict[str, Any]:
+    """Start stack sampling.
+
+    Args:
+        interval: Sampling interval in seconds (keeps the current one if omitted)
+        sampler: Shared profiler
+    """
+    if interval is not None:
+        sampler.interval = interval
+    sampler.start()
+    return {"running": True, "interval": sampler.interval}
+
+
+@router.post("/stop", include_in_schema=False)
+async def stop_profiling(sampler: SamplingProfiler = Depends(get_profiler)) -> Dict[str, Any]:
+    """Stop stack sampling; collected stacks stay available."""
+    sampler.stop()
+    return {"running": False, "samples": sampler.samples}
+
+
+@router.get("", include_in_schema=False)
+async def collapsed_stacks(
+    reset: bool = False, sampler: SamplingProfiler = Depends(get_profiler)
+) -> Response:
+    """Collected stacks in the collapsed flamegraph format.
+
+    Args:
+        reset: Drop the stacks after returning them
+        sampler: Shared profiler
+    """
+    body = sampler.collapsed()
+    if reset:
+        sampler.reset()
+    return Response(body, media_type="text/plain; charset=utf-8")
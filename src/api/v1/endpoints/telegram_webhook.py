@@ -0,0 +1,54 @@
+"""Telegram webhook endpoint."""
+
+import hmac
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+
+from src.bot.ingestion import SubmitResult, UpdateIngestor
+from src.core.config import Settings, get_settings
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/telegram", tags=["telegram"])
+
+
+def get_update_ingestor(request: Request) -> UpdateIngestor:
+    """Get the ingestor attached to the application state."""
+    ingestor: Optional[UpdateIngestor] = getattr(request.app.state, "update_ingestor", None)
+    if ingestor is None:
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, "Webhook ingestion is not running")
+    return ingestor
+
+
+@router.post("/webhook")
+async def telegram_webhook(
+    update: Dict[str, Any],
+    ingestor: UpdateIngestor = Depends(get_update_ingestor),
+    settings: Settings = Depends(get_settings),
+    secret_token: Optional[str] = Header(None, alias="X-Telegram-Bot-Api-Secret-Token"),
+) -> Dict[str, bool]:
+    """Receive an update from Telegram.
+
+    The update is handed to the ingestor and ACKed right away; processing
+    happens in the background. Shed and duplicate updates are ACKed too, so
+    Telegram does not retry them.
+
+    Args:
+        update: Raw Telegram update
+        ingestor: Update ingestor
+        settings: Application settings
+        secret_token: Secret token sent by Telegram
+
+    Returns:
+        Acknowledgement
+    """
+    expected = settings.telegram_webhook_secret
+    if expected and not hmac.compare_digest(secret_token or "", expected):
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid secret token")
+
+    result = ingestor.submit(update)
+    if result is SubmitResult.DUPLICATE:
+        logger.debug("Duplicate update ignored", extra={"update_id": update.get("update_id")})
+    return {"ok": True}
@@ -0,0 +1,381 @@
+"""Response caching with ETags and conditional requests.
+
+Every user has a notes version stamp that is bumped whenever the user's
+notes change. GET responses under the cached prefixes get a weak ETag made
+of that stamp and the request URL, so ``If-None-Match`` is answered with
+``304 Not Modified`` from the stamp alone, without calling the endpoint or
+the database. Full responses are cached under the same stamp; bumping it
+invalidates all cached list and search results of that user at once.
+
+The user is resolved in the middleware itself from the bearer token, with
+the ``Authenticator`` on ``app.state`` (its token and user caches make the
+second check in the endpoint dependency a cache hit). Requests without a
+valid token pass through uncached, and the endpoint answers them with 401.
+
+Streamed responses (server-sent events, NDJSON exports) and requests
+resuming a stream with ``Last-Event-ID`` are never cached: their body
+depends on the resume position, which is not part of the cache key.
+
+Successful non-GET requests under the cached prefixes bump the stamp
+automatically. Writes made elsewhere (e.g. notes saved by the bot) must
+call ``ResponseCache.invalidate(user_id)``.
+
+Usage::
+
+    cache = ResponseCache(InMemoryResponseCacheBackend())
+    app.add_middleware(ResponseCacheMiddleware, cache=cache)
+"""
+
+import hashlib
+import inspect
+import json
+import secrets
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.logging import get_logger
+from src.core.metrics import track_cache
+from src.core.security import AuthenticationError, Authenticator
+from src.utils.cache import LRUCache
+
+logger = get_logger(__name__)
+
+DEFAULT_PREFIXES = ("/v1/notes", "/v1/search")
+_WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+_STREAM_TYPES = ("text/event-stream", "application/x-ndjson")
+
+UserResolver = Callable[[Scope], Union[Optional[str], Awaitable[Optional[str]]]]
+
+
+async def user_from_token(scope: Scope) -> Optional[str]:
+    """Default user resolver: verify the bearer token with ``app.state.authenticator``.
+
+    Returns:
+        User id, or None if there is no authenticator or no valid token
+    """
+    app = scope.get("app")
+    authenticator: Optional[Authenticator] = getattr(
+        getattr(app, "state", None), "authenticator", None
+    )
+    scheme, _, token = (Headers(scope=scope).get("authorization") or "").partition(" ")
+    if authenticator is None or scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        context = await authenticator.authenticate(token.strip())
+    except AuthenticationError:
+        return None
+    return str(context.user_id)
+
+
+@dataclass
+class CachedResponse:
+    """Stored response."""
+
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+    def to_bytes(self) -> bytes:
+        """Serialize for a byte-oriented backend."""
+        head = json.dumps(
+            {"status": self.status, "headers": [[k.decode(), v.decode()] for k, v in self.headers]}
+        )
+        return head.encode() + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedResponse":
+        """Deserialize a response stored with ``to_bytes``."""
+        head, _, body = data.partition(b"\n")
+        meta = json.loads(head)
+        headers = [(k.encode(), v.encode()) for k, v in meta["headers"]]
+        return cls(status=meta["status"], headers=headers, body=body)
+
+
+class ResponseCacheBackend(ABC):
+    """Storage for cached responses and per-user version stamps."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get a cached response."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store a response for ``ttl`` seconds."""
+
+    @abstractmethod
+    async def version(self, user_id: str) -> str:
+        """Get the current notes version stamp of a user."""
+
+    @abstractmethod
+    async def bump(self, user_id: str) -> None:
+        """Change the notes version stamp of a user."""
+
+
+class InMemoryResponseCacheBackend(ResponseCacheBackend):
+    """Process-local LRU backend (default)."""
+
+    def __init__(self, maxsize: int = 10_000) -> None:
+        """Initialize backend.
+
+        Args:
+            maxsize: Maximum number of cached responses
+        """
+        self._entries: LRUCache[str, bytes] = LRUCache(maxsize=maxsize)
+        self._versions: Dict[str, int] = {}
+        # Stamps restart from zero with the process; the epoch keeps ETags
+        # issued before a restart from matching.
+        self._epoch = secrets.token_hex(4)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries.set(key, value, ttl=ttl)
+
+    async def version(self, user_id: str) -> str:
+        return f"{self._epoch}.{self._versions.get(user_id, 0)}"
+
+    async def bump(self, user_id: str) -> None:
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+
+class RedisResponseCacheBackend(ResponseCacheBackend):
+    """Backend shared between API workers through Redis."""
+
+    def __init__(self, client: Any, prefix: str = "httpcache:") -> None:
+        """Initialize backend.
+
+        Args:
+            client: ``redis.asyncio.Redis`` instance
+            prefix: Key prefix
+        """
+        self._client = client
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value: Optional[bytes] = await self._client.get(self._prefix + key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(self._prefix + key, value, ex=max(int(ttl), 1))
+
+    async def version(self, user_id: str) -> str:
+        value = await self._client.get(f"{self._prefix}v:{user_id}")
+        if isinstance(value, bytes):
+            value = value.decode()
+        return str(value or 0)
+
+    async def bump(self, user_id: str) -> None:
+        await self._client.incr(f"{self._prefix}v:{user_id}")
+
+
+@dataclass
+class ResponseCacheStats:
+    """Response cache counters."""
+
+    hits: int = 0
+    misses: int = 0
+    not_modified: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """Share of cacheable GETs answered without calling the endpoint."""
+        served = self.hits + self.not_modified
+        total = served + self.misses
+        return served / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Serialize stats."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hit_ratio, 4),
+        }
+
+
+class ResponseCache:
+    """Cache facade shared by the middleware and write paths."""
+
+    def __init__(
+        self,
+        backend: ResponseCacheBackend,
+        ttl: float = 300.0,
+        max_body: int = 1_048_576,
+        stats_log_every: int = 1000,
+    ) -> None:
+        """Initialize cache.
+
+        Args:
+            backend: Storage backend
+            ttl: Lifetime of cached responses in seconds
+            max_body: Largest response body that is cached
+            stats_log_every: Log hit ratio every N cacheable requests (0 = never)
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.max_body = max_body
+        self.stats = ResponseCacheStats()
+        track_cache("http_response", self.stats)
+        self._stats_log_every = stats_log_every
+        self._requests = 0
+
+    async def invalidate(self, user_id: Any) -> None:
+        """Invalidate cached responses and ETags of a user."""
+        await self.backend.bump(str(user_id))
+        self.stats.invalidations += 1
+
+    def record(self) -> None:
+        """Count a cacheable request and periodically log the hit ratio."""
+        self._requests += 1
+        if self._stats_log_every and self._requests % self._stats_log_every == 0:
+            logger.info("Response cache stats", extra=self.stats.as_dict())
+
+
+def _etag(version: str, target: str) -> str:
+    digest = hashlib.blake2b(target.encode(), digest_size=8).hexdigest()
+    return f'W/"{version}-{digest}"'
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110): ignore the W/ prefix on both sides.
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+class ResponseCacheMiddleware:
+    """ASGI middleware serving ETag/304 and cached GET responses."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        cache: ResponseCache,
+        prefixes: Sequence[str] = DEFAULT_PREFIXES,
+        user_resolver: UserResolver = user_from_token,
+    ) -> None:
+        """Initialize middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            cache: Shared response cache
+            prefixes: Path prefixes whose responses depend only on the user's notes
+            user_resolver: Extracts the user id from the ASGI scope (plain or
+                async function); requests without a user are not cached
+        """
+        self.app = app
+        self.cache = cache
+        self.prefixes = tuple(prefixes)
+        self.user_resolver = user_resolver
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefixes):
+            await self.app(scope, receive, send)
+            return
+        resolved = self.user_resolver(scope)
+        user_id = await resolved if inspect.isawaitable(resolved) else resolved
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        if method in _WRITE_METHODS:
+            await self._write(user_id, scope, receive, send)
+        elif method == "GET" and "last-event-id" not in Headers(scope=scope):
+            await self._read(user_id, scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def _write(self, user_id: str, scope: Scope, receive: Receive, send: Send) -> None:
+        status = 0
+
+        async def capture(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, capture)
+        if 200 <= status < 300:
+            await self.cache.invalidate(user_id)
+
+    async def _read(self, user_id: str, scope: Scope, receive: Receive, send: Send) -> None:
+        self.cache.record()
+        query = scope.get("query_string", b"").decode("latin-1")
+        target = f"{scope['path']}?{query}"
+        version = await self.cache.backend.version(user_id)
+        etag = _etag(version, target)
+
+        if _etag_matches(Headers(scope=scope).get("if-none-match"), etag):
+            self.cache.stats.not_modified += 1
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(b"etag", etag.encode())],
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        key = f"{user_id}:{version}:{target}"
+        cached = await self.cache.backend.get(key)
+        if cached is not None:
+            self.cache.stats.hits += 1
+            response = CachedResponse.from_bytes(cached)
+            await self._send(send, response, etag, b"HIT")
+            return
+
+        self.cache.stats.misses += 1
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        size = 0
+        cacheable = True
+
+        async def capture(message: Message) -> None:
+            nonlocal start, size, cacheable
+            if message["type"] == "http.response.start":
+                start = message
+                content_type = Headers(raw=message.get("headers", [])).get("content-type", "")
+                streamed = content_type.startswith(_STREAM_TYPES)
+                cacheable = message["status"] == 200 and not streamed
+                if cacheable:
+                    message = dict(message)
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"etag", etag.encode()),
+                        (b"x-cache", b"MISS"),
+                    ]
+            elif message["type"] == "http.response.body" and cacheable:
+                size += len(message.get("body", b""))
+                if size > self.cache.max_body:
+                    cacheable = False
+                    chunks.clear()
+                else:
+                    chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+        if cacheable and start is not None:
+            headers = [
+                (k, v)
+                for k, v in start.get("headers", [])
+                if k.lower() not in (b"etag", b"x-cache")
+            ]
+            response = CachedResponse(status=200, headers=headers, body=b"".join(chunks))
+            await self.cache.backend.set(key, response.to_bytes(), self.cache.ttl)
+
+    @staticmethod
+    async def _send(send: Send, response: CachedResponse, etag: str, marker: bytes) -> None:
+        headers = [*response.headers, (b"etag", etag.encode()), (b"x-cache", marker)]
+        await send({"type": "http.response.start", "status": response.status, "headers": headers})
+        await send({"type": "http.response.body", "body": response.body})
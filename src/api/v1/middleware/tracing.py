@@ -0,0 +1,53 @@
+"""Per-request traces with stage timings.
+
+Each HTTP request runs inside ``trace()``, so spans recorded by the
+endpoint (DB statements, LLM calls, log formatting) are attached to its log
+records and slow requests are logged with their breakdown. With
+``server_timing`` (only when profiling is enabled: the header exposes
+internal timings to clients) the stage timings known when the response
+starts are returned in ``Server-Timing``.
+
+Usage::
+
+    app.add_middleware(TracingMiddleware, server_timing=settings.profiling_enabled)
+"""
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.profiling import trace
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a trace for every HTTP request."""
+
+    def __init__(self, app: ASGIApp, server_timing: bool = False) -> None:
+        """Initialize middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            server_timing: Return stage timings in the ``Server-Timing`` header
+        """
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with trace(f"{scope['method']} {scope['path']}") as current:
+            if not self.server_timing:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start" and current.spans:
+                    timing = ", ".join(
+                        f"{stage};dur={ms}" for stage, ms in current.timings_ms().items()
+                    )
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", timing.encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
@@ -0,0 +1,28 @@
+"""Note import/export schemas."""
+
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class NoteImport(BaseModel):
+    """One NDJSON line of a bulk import."""
+
+    id: Optional[uuid.UUID] = None
+    content: str = Field(..., min_length=1)
+    source: str = Field(default="import", max_length=32)
+    created_at: Optional[datetime] = None
+
+
+class ImportResult(BaseModel):
+    """Bulk import outcome.
+
+    ``offset`` is the number of input lines that are committed; pass it back
+    as the ``offset`` query parameter to resume an interrupted import.
+    """
+
+    imported: int
+    offset: int
+    error: Optional[str] = None
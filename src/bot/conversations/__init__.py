@@ -0,0 +1 @@
+"""Conversation flows and FSM session storage."""
@@ -0,0 +1,398 @@
+"""aiogram FSM storage with an in-memory LRU and coalesced write-through.
+
+Reading FSM state from the database and writing it back on every update
+costs two round-trips per message. ``CachedSessionStorage`` keeps active
+sessions in a bounded LRU, so reads of a cached session are free and
+writes only mark it dirty. A background task flushes dirty sessions after
+``flush_delay``: all ``set_state``/``set_data`` calls on a session within
+that window become one row write, and all sessions dirty at that moment go
+in one transaction. ``close()`` flushes what is left.
+
+Conversations idle for longer than ``ttl`` expire: their state and data
+read as empty and their rows are purged from the backend periodically.
+
+Several bot processes can share one backend:
+
+* With sticky routing (all updates of a chat handled by the same process,
+  e.g. a single polling process or a webhook balancer hashing the chat id)
+  the cache is authoritative; leave ``revalidate_after`` unset.
+* Otherwise set ``revalidate_after`` so cached sessions are re-read after
+  that many seconds. Every row carries a version and a write only succeeds
+  if the stored version is the one the writer read; a losing write is
+  dropped, logged and counted in ``stats.conflicts``, and the session is
+  re-read on next access, so a process never overwrites newer state with
+  a stale copy.
+"""
+
+import asyncio
+import copy
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import (
+    BaseStorage,
+    DefaultKeyBuilder,
+    KeyBuilder,
+    StateType,
+    StorageKey,
+)
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import Settings
+from src.core.logging import get_logger
+from src.core.metrics import track_cache
+from src.db.models.session import Session
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class SessionRecord:
+    """FSM state and data of one conversation.
+
+    Attributes:
+        key: Storage key string
+        state: Current FSM state
+        data: FSM data
+        version: Version of the stored row (0 = never stored)
+        expires_at: Unix time after which the session is idle
+    """
+
+    key: str
+    state: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    version: int = 0
+    expires_at: float = 0.0
+
+
+class SessionBackend(ABC):
+    """Persistent session store."""
+
+    @abstractmethod
+    async def load(self, key: str, now: float) -> Optional[SessionRecord]:
+        """Load a session; expired sessions come back empty but keep their version."""
+
+    @abstractmethod
+    async def save(self, records: Sequence[SessionRecord]) -> List[str]:
+        """Write records whose stored version is ``record.version - 1``.
+
+        Records without a stored row are inserted whatever their version:
+        the row was never written or purged as idle, so there is no newer
+        state to protect.
+
+        Returns:
+            Keys of records not written because of a version conflict
+        """
+
+    @abstractmethod
+    async def purge(self, now: float) -> int:
+        """Delete expired sessions and return how many were deleted."""
+
+
+class InMemorySessionBackend(SessionBackend):
+    """Process-local backend for development and tests."""
+
+    def __init__(self) -> None:
+        self.rows: Dict[str, SessionRecord] = {}
+        self.saves = 0
+
+    async def load(self, key: str, now: float) -> Optional[SessionRecord]:
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        if row.expires_at <= now:
+            return SessionRecord(key, version=row.version)
+        return SessionRecord(key, row.state, copy.deepcopy(row.data), row.version, row.expires_at)
+
+    async def save(self, records: Sequence[SessionRecord]) -> List[str]:
+        self.saves += 1
+        conflicts: List[str] = []
+        for record in records:
+            stored = self.rows.get(record.key)
+            if stored is not None and stored.version != record.version - 1:
+                conflicts.append(record.key)
+                continue
+            self.rows[record.key] = copy.deepcopy(record)
+        return conflicts
+
+    async def purge(self, now: float) -> int:
+        expired = [key for key, row in self.rows.items() if row.expires_at <= now]
+        for key in expired:
+            del self.rows[key]
+        return len(expired)
+
+
+class SQLSessionBackend(SessionBackend):
+    """Sessions in the ``sessions`` table."""
+
+    def __init__(self, sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+        """Initialize backend.
+
+        Args:
+            sessionmaker: Database session factory
+        """
+        self._sessionmaker = sessionmaker
+
+    async def load(self, key: str, now: float) -> Optional[SessionRecord]:
+        async with self._sessionmaker() as session:
+            row = await session.get(Session, key)
+        if row is None:
+            return None
+        expires_at = _timestamp(row.expires_at)
+        if expires_at <= now:
+            return SessionRecord(key, version=row.version)
+        return SessionRecord(key, row.state, dict(row.data), row.version, expires_at)
+
+    async def save(self, records: Sequence[SessionRecord]) -> List[str]:
+        conflicts: List[str] = []
+        async with self._sessionmaker() as session, session.begin():
+            result = await session.execute(
+                select(Session.key, Session.version).where(
+                    Session.key.in_([record.key for record in records])
+                )
+            )
+            stored: Dict[str, int] = {key: version for key, version in result.all()}
+            for record in records:
+                expected = record.version - 1
+                values = {
+                    "state": record.state,
+                    "data": record.data,
+                    "version": record.version,
+                    "expires_at": datetime.fromtimestamp(record.expires_at, timezone.utc),
+                }
+                if record.key not in stored:
+                    try:
+                        async with session.begin_nested():
+                            session.add(Session(key=record.key, **values))
+                    except IntegrityError:
+                        conflicts.append(record.key)
+                elif stored[record.key] != expected:
+                    conflicts.append(record.key)
+                else:
+                    updated = await session.execute(
+                        update(Session)
+                        .where(Session.key == record.key, Session.version == expected)
+                        .values(**values)
+                    )
+                    if updated.rowcount == 0:  # type: ignore[attr-defined]
+                        conflicts.append(record.key)
+        return conflicts
+
+    async def purge(self, now: float) -> int:
+        async with self._sessionmaker() as session, session.begin():
+            result = await session.execute(
+                delete(Session).where(
+                    Session.expires_at <= datetime.fromtimestamp(now, timezone.utc)
+                )
+            )
+        return int(result.rowcount)  # type: ignore[attr-defined]
+
+
+@dataclass
+class SessionStoreStats:
+    """Session storage counters."""
+
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    coalesced: int = 0
+    conflicts: int = 0
+    expired: int = 0
+    evictions: int = 0
+
+
+class CachedSessionStorage(BaseStorage):
+    """FSM storage caching active sessions in front of a ``SessionBackend``."""
+
+    def __init__(
+        self,
+        backend: SessionBackend,
+        maxsize: int = 10_000,
+        ttl: float = 86_400.0,
+        flush_delay: float = 0.05,
+        revalidate_after: Optional[float] = None,
+        purge_interval: float = 300.0,
+        key_builder: Optional[KeyBuilder] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize storage.
+
+        Args:
+            backend: Persistent store
+            maxsize: Maximum number of cached sessions
+            ttl: Seconds without writes after which a conversation expires
+            flush_delay: Seconds writes are collected before a flush
+            revalidate_after: Re-read cached sessions older than this (None = sticky routing)
+            purge_interval: Seconds between purges of expired rows
+            key_builder: aiogram key builder (bot id and destiny included by default)
+            clock: Wall-clock time source
+        """
+        self._backend = backend
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._flush_delay = flush_delay
+        self._revalidate_after = revalidate_after
+        self._purge_interval = purge_interval
+        self._key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+        self._clock = clock
+        self._cache: "OrderedDict[str, Tuple[SessionRecord, float]]" = OrderedDict()
+        self._pending: Dict[str, SessionRecord] = {}
+        self._flushing: Dict[str, SessionRecord] = {}
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._stopping = False
+        self._last_purge = clock()
+        self.stats = SessionStoreStats()
+        track_cache("fsm_sessions", self.stats)
+
+    @classmethod
+    def from_settings(cls, settings: Settings, backend: SessionBackend) -> "CachedSessionStorage":
+        """Create storage sized by ``Settings.fsm_*``."""
+        return cls(
+            backend,
+            maxsize=settings.fsm_cache_size,
+            ttl=settings.fsm_session_ttl,
+            flush_delay=settings.fsm_flush_delay,
+        )
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = await self._record(key)
+        record.state = state.state if isinstance(state, State) else state
+        self._mark_dirty(record)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self._record(key)).state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        record = await self._record(key)
+        record.data = dict(data)
+        self._mark_dirty(record)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return copy.deepcopy((await self._record(key)).data)
+
+    async def close(self) -> None:
+        """Flush pending writes and stop the flusher."""
+        if self._task is not None:
+            # Not cancelled: a batch in the middle of backend.save finishes
+            self._stopping = True
+            self._wake.set()
+            try:
+                await self._task
+            finally:
+                self._stopping = False
+                self._task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write all dirty sessions in one backend call."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            self._flushing = batch
+            snapshots = [
+                SessionRecord(r.key, r.state, copy.deepcopy(r.data), r.version + 1, r.expires_at)
+                for r in batch.values()
+            ]
+            try:
+                conflicts = set(await self._backend.save(snapshots))
+            except BaseException:
+                # Also on cancellation, so the batch is written by the next flush
+                for key, record in batch.items():
+                    self._pending.setdefault(key, record)
+                raise
+            finally:
+                self._flushing = {}
+            for snapshot, record in zip(snapshots, batch.values()):
+                if snapshot.key in conflicts:
+                    self.stats.conflicts += 1
+                    self._cache.pop(snapshot.key, None)
+                    self._pending.pop(snapshot.key, None)
+                    logger.warning("FSM session write conflict", extra={"key": snapshot.key})
+                else:
+                    record.version = snapshot.version
+                    self.stats.writes += 1
+
+    async def _record(self, key: StorageKey) -> SessionRecord:
+        name = self._key_builder.build(key)
+        now = self._clock()
+        cached = self._cache.get(name)
+        fresh = cached is not None and (
+            self._revalidate_after is None
+            or now - cached[1] < self._revalidate_after
+            or name in self._pending
+        )
+        if cached is not None and fresh and 0 < cached[0].expires_at <= now:
+            # Idle session: re-read, the row may be purged and its version chain restarted
+            self.stats.expired += 1
+            fresh = False
+        if cached is not None and fresh:
+            self._cache.move_to_end(name)
+            self.stats.hits += 1
+            return cached[0]
+        self.stats.misses += 1
+        return await self._load(name, now, cached)
+
+    async def _load(
+        self, name: str, now: float, stale: Optional[Tuple[SessionRecord, float]]
+    ) -> SessionRecord:
+        # Dirty or in-flight sessions are newer than the stored row
+        record = self._pending.get(name) or self._flushing.get(name)
+        if record is None:
+            record = await self._backend.load(name, now) or SessionRecord(name)
+            current = self._cache.get(name)
+            if current is not None and current is not stale:
+                # Loaded concurrently by another update of the same chat
+                record = current[0]
+        self._cache[name] = (record, now)
+        self._cache.move_to_end(name)
+        while len(self._cache) > self._maxsize:
+            self._cache.popitem(last=False)
+            self.stats.evictions += 1
+        return record
+
+    def _mark_dirty(self, record: SessionRecord) -> None:
+        record.expires_at = self._clock() + self._ttl
+        if record.key in self._pending:
+            self.stats.coalesced += 1
+        self._pending[record.key] = record
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._flusher())
+        self._wake.set()
+
+    async def _flusher(self) -> None:
+        while not self._stopping:
+            await self._wake.wait()
+            if self._stopping:
+                break
+            await asyncio.sleep(self._flush_delay)
+            self._wake.clear()
+            try:
+                await self.flush()
+                if self._clock() - self._last_purge >= self._purge_interval:
+                    self._last_purge = self._clock()
+                    purged = await self._backend.purge(self._last_purge)
+                    if purged:
+                        logger.info("Expired FSM sessions purged", extra={"count": purged})
+            except Exception:
+                logger.exception("FSM session flush failed")
+                self._wake.set()
+                await asyncio.sleep(max(self._flush_delay, 1.0))
+
+
+def _timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
@@ -0,0 +1,253 @@
+"""Webhook update ingestion with per-chat ordering and overload control.
+
+Updates are ACKed by the webhook endpoint immediately and handed to
+``UpdateIngestor.submit()``, which never blocks. Each update is routed to a
+shard by ``chat_id % workers``; every shard has a bounded queue drained by a
+single worker, so updates of one chat are processed in order while different
+chats are processed in parallel.
+
+Overload is handled explicitly: when a shard queue is full, low-priority
+updates (edits, channel posts, membership changes) are shed and
+high-priority ones (messages, callback queries) are deferred to a bounded
+per-shard overflow list that is drained in order. Telegram retries are
+deduplicated by ``update_id``.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from src.core.logging import get_logger
+from src.core.metrics import UPDATE_DURATION, UPDATE_FAILURES
+from src.core.profiling import trace
+
+logger = get_logger(__name__)
+
+UpdateHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+# Update types that may be deferred under overload; everything else is shed.
+HIGH_PRIORITY_TYPES = frozenset({"message", "callback_query", "pre_checkout_query"})
+
+# Update fields whose payload carries the chat (directly or via .message)
+_CHAT_FIELDS = (
+    "message",
+    "edited_message",
+    "channel_post",
+    "edited_channel_post",
+    "business_message",
+    "my_chat_member",
+    "chat_member",
+    "chat_join_request",
+    "message_reaction",
+)
+
+
+class SubmitResult(str, Enum):
+    """Outcome of submitting an update."""
+
+    ACCEPTED = "accepted"
+    DEFERRED = "deferred"
+    DUPLICATE = "duplicate"
+    SHED = "shed"
+
+
+@dataclass
+class IngestionStats:
+    """Ingestion counters."""
+
+    accepted: int = 0
+    deferred: int = 0
+    duplicates: int = 0
+    shed: int = 0
+    processed: int = 0
+    failed: int = 0
+
+
+def update_type(payload: Dict[str, Any]) -> str:
+    """Get the type of an update payload (the first non-id field)."""
+    for key in payload:
+        if key != "update_id":
+            return key
+    return "unknown"
+
+
+def chat_key(payload: Dict[str, Any]) -> int:
+    """Get the ordering key of an update.
+
+    Args:
+        payload: Raw update
+
+    Returns:
+        Chat id, or the sender id for chat-less updates (inline queries),
+        or the update id as a last resort
+    """
+    for field_name in _CHAT_FIELDS:
+        obj = payload.get(field_name)
+        if obj and "chat" in obj:
+            return int(obj["chat"]["id"])
+    callback = payload.get("callback_query")
+    if callback:
+        message = callback.get("message")
+        if message and "chat" in message:
+            return int(message["chat"]["id"])
+        return int(callback["from"]["id"])
+    for obj in payload.values():
+        if isinstance(obj, dict) and "from" in obj:
+            return int(obj["from"]["id"])
+    return int(payload.get("update_id", 0))
+
+
+class UpdateIngestor:
+    """Bounded worker pool with per-chat sharded queues."""
+
+    def __init__(
+        self,
+        handler: UpdateHandler,
+        *,
+        workers: int = 16,
+        queue_size: int = 100,
+        overflow_size: int = 1000,
+        dedup_size: int = 10_000,
+    ) -> None:
+        """Initialize ingestor.
+
+        Args:
+            handler: Coroutine processing one raw update
+                (e.g. ``lambda u: dispatcher.feed_raw_update(bot, u)``)
+            workers: Number of shards (one worker each)
+            queue_size: Capacity of each shard queue
+            overflow_size: Capacity of each shard's deferred overflow
+            dedup_size: Number of recent update ids remembered
+        """
+        self._handler = handler
+        self._workers = workers
+        self._queues: List["asyncio.Queue[Dict[str, Any]]"] = [
+            asyncio.Queue(maxsize=queue_size) for _ in range(workers)
+        ]
+        self._overflow: List[Deque[Dict[str, Any]]] = [deque() for _ in range(workers)]
+        self._overflow_size = overflow_size
+        self._seen: "OrderedDict[int, None]" = OrderedDict()
+        self._dedup_size = dedup_size
+        self._tasks: List["asyncio.Task[None]"] = []
+        self.stats = IngestionStats()
+
+    @property
+    def queue_depth(self) -> int:
+        """Updates waiting in shard queues and overflow lists."""
+        return sum(q.qsize() for q in self._queues) + sum(len(o) for o in self._overflow)
+
+    @property
+    def running(self) -> bool:
+        """Whether workers are running."""
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """Start shard workers."""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._work(index), name=f"update-worker-{index}")
+            for index in range(self._workers)
+        ]
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop workers.
+
+        Args:
+            drain: Process queued updates before stopping
+        """
+        if drain:
+            for queue in self._queues:
+                await queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, payload: Dict[str, Any]) -> SubmitResult:
+        """Enqueue an update without blocking.
+
+        Args:
+            payload: Raw Telegram update
+
+        Returns:
+            What happened to the update
+        """
+        update_id = payload.get("update_id")
+        if update_id is not None:
+            if update_id in self._seen:
+                self.stats.duplicates += 1
+                return SubmitResult.DUPLICATE
+            self._seen[update_id] = None
+            if len(self._seen) > self._dedup_size:
+                self._seen.popitem(last=False)
+
+        shard = chat_key(payload) % self._workers
+        queue = self._queues[shard]
+        overflow = self._overflow[shard]
+        # Once a shard overflows, newer updates queue behind the overflow
+        # to keep per-chat order.
+        if not overflow:
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                pass
+            else:
+                self.stats.accepted += 1
+                return SubmitResult.ACCEPTED
+
+        kind = update_type(payload)
+        if kind in HIGH_PRIORITY_TYPES and len(overflow) < self._overflow_size:
+            overflow.append(payload)
+            self.stats.deferred += 1
+            return SubmitResult.DEFERRED
+
+        self.stats.shed += 1
+        logger.warning(
+            "Update shed under overload",
+            extra={"update_id": update_id, "update_type": kind, "shard": shard},
+        )
+        return SubmitResult.SHED
+
+    async def _work(self, shard: int) -> None:
+        queue = self._queues[shard]
+        overflow = self._overflow[shard]
+        while True:
+            payload = await queue.get()
+            kind = update_type(payload)
+            started = time.perf_counter()
+            try:
+                with trace("update", update_id=payload.get("update_id"), update_type=kind):
+                    await self._handler(payload)
+                self.stats.processed += 1
+            except Exception:
+                self.stats.failed += 1
+                UPDATE_FAILURES.labels(kind).inc()
+                logger.exception(
+                    "Update handling failed", extra={"update_id": payload.get("update_id")}
+                )
+            finally:
+                UPDATE_DURATION.labels(kind).observe(time.perf_counter() - started)
+                while overflow and not queue.full():
+                    queue.put_nowait(overflow.popleft())
+                queue.task_done()
+
+
+def dispatcher_handler(dispatcher: Any, bot: Any) -> UpdateHandler:
+    """Adapt an aiogram dispatcher to ``UpdateHandler``.
+
+    Args:
+        dispatcher: aiogram Dispatcher
+        bot: aiogram Bot
+
+    Returns:
+        Coroutine function feeding raw updates to the dispatcher
+    """
+
+    async def handle(payload: Dict[str, Any]) -> Optional[Any]:
+        return await dispatcher.feed_raw_update(bot, payload)
+
+    return handle
@@ -0,0 +1,234 @@
+"""Flood control middleware: per-user/per-chat rate limits and message merging.
+
+Register it as an outer middleware on the message (and optionally callback
+query) observer::
+
+    throttling = ThrottlingMiddleware(InMemoryRateLimitBackend())
+    dp.message.outer_middleware(throttling)
+
+Merging is opt-in: pass a ``mergeable`` predicate (e.g. ``is_forwarded_text``
+for note capture from forwards) and only messages it selects are merged.
+Consecutive selected messages of one chat are collected into one batch,
+handled once the chat has been quiet for ``merge_window`` seconds as a
+single message whose text joins the texts of the batch; the original
+messages are available to the handler as ``batch``. A batch consumes one
+token, also when a later message flushes it early, and a rate-limited batch
+keeps absorbing messages instead of being rejected. Other events are
+checked against the limits directly and dropped when over the limit.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import Chat, Message, TelegramObject, User
+
+from src.core.logging import get_logger
+from src.utils.rate_limit import RateLimit, RateLimitBackend
+
+logger = get_logger(__name__)
+
+Handler = Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]]
+
+DEFAULT_USER_LIMIT = RateLimit(capacity=20, rate=0.5)
+DEFAULT_CHAT_LIMIT = RateLimit(capacity=30, rate=1.0)
+DEFAULT_NOTICE = "Слишком много сообщений подряд, подождите немного."
+_NOTICE_LIMIT = RateLimit(capacity=1, rate=1 / 60)
+# Separator of message texts in a merged event
+MERGED_TEXT_SEPARATOR = "\n\n"
+
+
+def is_forwarded_text(message: Message) -> bool:
+    """Merge predicate for note capture: forwarded text messages."""
+    return bool(message.text) and message.forward_origin is not None
+
+
+@dataclass
+class FloodStats:
+    """Flood control counters."""
+
+    allowed: int = 0
+    throttled: int = 0
+    merged: int = 0
+    batches: int = 0
+    dropped: int = 0
+
+
+@dataclass
+class _Batch:
+    handler: Handler
+    data: Dict[str, Any]
+    user_id: Optional[int]
+    deadline: float
+    hard_deadline: float
+    messages: List[Message] = field(default_factory=list)
+    task: Optional["asyncio.Task[None]"] = None
+    started: bool = False
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Token-bucket flood control with rapid-fire message merging."""
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        *,
+        user_limit: RateLimit = DEFAULT_USER_LIMIT,
+        chat_limit: RateLimit = DEFAULT_CHAT_LIMIT,
+        merge_window: float = 1.0,
+        max_merge_delay: float = 5.0,
+        max_batch: int = 500,
+        mergeable: Optional[Callable[[Message], bool]] = None,
+        notice: Optional[str] = DEFAULT_NOTICE,
+    ) -> None:
+        """Initialize middleware.
+
+        Args:
+            backend: Token bucket storage (in-memory or shared)
+            user_limit: Limit per user
+            chat_limit: Limit per chat
+            merge_window: Quiet period that closes a batch; 0 disables merging
+            max_merge_delay: Maximum time a batch stays open
+            max_batch: Maximum messages per batch; extra messages are dropped
+            mergeable: Predicate selecting text messages that may be merged
+                (None disables merging)
+            notice: Reply sent (at most once a minute per chat) when dropping
+        """
+        self._backend = backend
+        self._user_limit = user_limit
+        self._chat_limit = chat_limit
+        self._merge_window = merge_window
+        self._max_merge_delay = max_merge_delay
+        self._max_batch = max_batch
+        self._mergeable = mergeable
+        self._notice = notice
+        self._pending: Dict[int, _Batch] = {}
+        self.stats = FloodStats()
+
+    async def __call__(
+        self,
+        handler: Handler,
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user: Optional[User] = data.get("event_from_user")
+        chat: Optional[Chat] = data.get("event_chat")
+        user_id = user.id if user else None
+        chat_id = chat.id if chat else None
+
+        if isinstance(event, Message) and chat_id is not None:
+            if self._merge_window > 0 and self._mergeable is not None and self._mergeable(event):
+                self._merge(chat_id, user_id, handler, event, data)
+                return None
+            # Keep chat order: a pending batch goes before this message.
+            await self._flush(chat_id)
+
+        if await self._acquire(user_id, chat_id) > 0:
+            self.stats.throttled += 1
+            logger.warning("Update throttled", extra={"user_id": user_id, "chat_id": chat_id})
+            if isinstance(event, Message) and chat_id is not None:
+                await self._notify(event, chat_id)
+            return None
+        self.stats.allowed += 1
+        return await handler(event, data)
+
+    async def close(self) -> None:
+        """Handle all pending batches now."""
+        for chat_id in list(self._pending):
+            await self._flush(chat_id)
+
+    async def _acquire(self, user_id: Optional[int], chat_id: Optional[int]) -> float:
+        wait = 0.0
+        if user_id is not None:
+            wait = await self._backend.acquire(f"user:{user_id}", self._user_limit)
+        if wait == 0.0 and chat_id is not None:
+            wait = await self._backend.acquire(f"chat:{chat_id}", self._chat_limit)
+        return wait
+
+    def _merge(
+        self,
+        chat_id: int,
+        user_id: Optional[int],
+        handler: Handler,
+        event: Message,
+        data: Dict[str, Any],
+    ) -> None:
+        now = time.monotonic()
+        batch = self._pending.get(chat_id)
+        if batch is None:
+            batch = _Batch(
+                handler=handler,
+                data=data,
+                user_id=user_id,
+                deadline=now + self._merge_window,
+                hard_deadline=now + self._max_merge_delay,
+            )
+            batch.messages.append(event)
+            self._pending[chat_id] = batch
+            batch.task = asyncio.create_task(self._run(chat_id, batch))
+            return
+        if len(batch.messages) >= self._max_batch:
+            self.stats.dropped += 1
+            return
+        batch.messages.append(event)
+        batch.deadline = min(now + self._merge_window, batch.hard_deadline)
+        self.stats.merged += 1
+
+    async def _run(self, chat_id: int, batch: _Batch) -> None:
+        while (delay := batch.deadline - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+        # Over the limit: keep absorbing messages until a token is available.
+        await self._charge(chat_id, batch)
+        await self._handle(chat_id, batch)
+
+    async def _flush(self, chat_id: int) -> None:
+        batch = self._pending.get(chat_id)
+        if batch is None or batch.started:
+            return
+        if batch.task is not None:
+            batch.task.cancel()
+        # Closed before waiting, so later messages start a new batch
+        batch.started = True
+        self._pending.pop(chat_id, None)
+        await self._charge(chat_id, batch)
+        await self._handle(chat_id, batch)
+
+    async def _charge(self, chat_id: int, batch: _Batch) -> None:
+        while (wait := await self._acquire(batch.user_id, chat_id)) > 0:
+            self.stats.throttled += 1
+            await asyncio.sleep(wait)
+
+    async def _handle(self, chat_id: int, batch: _Batch) -> None:
+        batch.started = True
+        self._pending.pop(chat_id, None)
+        self.stats.batches += 1
+        self.stats.allowed += 1
+        data = dict(batch.data)
+        data["batch"] = batch.messages
+        try:
+            await batch.handler(_merged(batch.messages), data)
+        except Exception:
+            logger.exception(
+                "Merged batch handling failed",
+                extra={"chat_id": chat_id, "batch_size": len(batch.messages)},
+            )
+
+    async def _notify(self, event: Message, chat_id: int) -> None:
+        if self._notice is None:
+            return
+        if await self._backend.acquire(f"notice:{chat_id}", _NOTICE_LIMIT) > 0:
+            return
+        try:
+            await event.answer(self._notice)
+        except Exception:
+            logger.exception("Failed to send throttling notice", extra={"chat_id": chat_id})
+
+
+def _merged(messages: List[Message]) -> Message:
+    """First message of a batch carrying the texts of all of them."""
+    if len(messages) == 1:
+        return messages[0]
+    text = MERGED_TEXT_SEPARATOR.join(m.text or "" for m in messages)
+    return messages[0].model_copy(update={"text": text, "entities": None})
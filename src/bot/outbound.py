@@ -0,0 +1,343 @@
+"""Outbound Telegram send queue.
+
+All Bot API calls that produce messages (replies, reminder notifications,
+progress updates) go through ``OutboundQueue``, which keeps them within
+Telegram limits: about 30 messages per second per bot, 1 per second per
+private chat and 20 per minute per group.
+
+* Each chat has its own lane; at most one call per chat is in flight, so
+  messages of a chat are delivered in order.
+* Chats waiting for their per-chat bucket sit in a delay heap, chats ready
+  to send are picked from a priority heap (replies before notifications
+  before progress), so a reminder burst to 100k chats costs O(log n) per send.
+* ``TelegramRetryAfter`` pauses the whole queue for ``retry_after`` seconds
+  and retries the call; network and server errors retry with backoff.
+* Progress messages are coalesced: ``progress()`` sends the first text and
+  turns later ones into ``editMessageText``; updates arriving while an edit
+  is still queued just replace its text.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from aiogram.methods import EditMessageText, SendMessage, TelegramMethod
+
+from src.core.logging import get_logger
+from src.utils.rate_limit import InMemoryRateLimitBackend, RateLimit
+
+logger = get_logger(__name__)
+
+ChatId = Union[int, str]
+MethodFactory = Callable[[], Optional[TelegramMethod[Any]]]
+
+GLOBAL_LIMIT = RateLimit(capacity=30, rate=30.0)
+PRIVATE_CHAT_LIMIT = RateLimit(capacity=1, rate=1.0)
+GROUP_CHAT_LIMIT = RateLimit(capacity=3, rate=20 / 60)
+
+
+class SendPriority(IntEnum):
+    """Priority lanes, lower value is sent first."""
+
+    REPLY = 0
+    NOTIFICATION = 1
+    PROGRESS = 2
+    BULK = 3
+
+
+@dataclass
+class OutboundStats:
+    """Send queue counters."""
+
+    sent: int = 0
+    failed: int = 0
+    retried: int = 0
+    rate_limited: int = 0
+    coalesced: int = 0
+
+
+@dataclass
+class _Job:
+    priority: int
+    seq: int
+    build: MethodFactory
+    future: "asyncio.Future[Any]"
+    attempts: int = 0
+
+    def __lt__(self, other: "_Job") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+@dataclass
+class _Lane:
+    jobs: List[_Job] = field(default_factory=list)
+    busy: bool = False
+    scheduled: bool = False
+
+
+@dataclass
+class _Progress:
+    text: str
+    message_id: Optional[int] = None
+    pending: Optional[_Job] = None
+
+
+class OutboundQueue:
+    """Rate-limited, prioritized Bot API sender."""
+
+    def __init__(
+        self,
+        bot: Any,
+        *,
+        global_limit: RateLimit = GLOBAL_LIMIT,
+        private_limit: RateLimit = PRIVATE_CHAT_LIMIT,
+        group_limit: RateLimit = GROUP_CHAT_LIMIT,
+        max_attempts: int = 5,
+        backoff: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize queue.
+
+        Args:
+            bot: aiogram Bot (any awaitable callable taking a method)
+            global_limit: Limit for the whole bot
+            private_limit: Limit per private chat
+            group_limit: Limit per group/channel (negative chat id)
+            max_attempts: Attempts per call before its future fails
+            backoff: Base delay for network/server error retries
+            clock: Monotonic time source
+        """
+        self._bot = bot
+        self._global_limit = global_limit
+        self._private_limit = private_limit
+        self._group_limit = group_limit
+        self._max_attempts = max_attempts
+        self._backoff = backoff
+        self._clock = clock
+        self._buckets = InMemoryRateLimitBackend(clock=clock)
+        self._lanes: Dict[ChatId, _Lane] = {}
+        self._ready: List[Tuple[int, int, ChatId]] = []
+        self._delayed: List[Tuple[float, int, ChatId]] = []
+        self._progress: Dict[Tuple[ChatId, str], _Progress] = {}
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._wakeup = asyncio.Event()
+        self._in_flight: "set[asyncio.Task[None]]" = set()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self.stats = OutboundStats()
+
+    @property
+    def pending(self) -> int:
+        """Number of queued calls."""
+        return sum(len(lane.jobs) for lane in self._lanes.values())
+
+    def start(self) -> None:
+        """Start the sender loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="outbound-queue")
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop the sender loop.
+
+        Args:
+            drain: Send queued calls before stopping
+        """
+        if drain:
+            while self.pending or self._in_flight:
+                await asyncio.sleep(0.01)
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def submit(
+        self,
+        method: TelegramMethod[Any],
+        priority: SendPriority = SendPriority.NOTIFICATION,
+    ) -> "asyncio.Future[Any]":
+        """Queue a Bot API call.
+
+        Args:
+            method: aiogram method with a ``chat_id``
+            priority: Priority lane
+
+        Returns:
+            Future resolved with the call result
+        """
+        return self._enqueue(getattr(method, "chat_id"), lambda: method, priority).future
+
+    async def send(
+        self,
+        method: TelegramMethod[Any],
+        priority: SendPriority = SendPriority.NOTIFICATION,
+    ) -> Any:
+        """Queue a Bot API call and wait for its result."""
+        return await self.submit(method, priority)
+
+    def progress(self, chat_id: ChatId, text: str, key: str = "default") -> None:
+        """Show progress text in a single, edited message.
+
+        Args:
+            chat_id: Target chat
+            text: Current progress text
+            key: Distinguishes several progress messages in one chat
+        """
+        state = self._progress.get((chat_id, key))
+        if state is None:
+            state = _Progress(text=text)
+            self._progress[(chat_id, key)] = state
+        elif state.pending is not None:
+            state.text = text
+            self.stats.coalesced += 1
+            return
+        state.text = text
+
+        def build() -> Optional[TelegramMethod[Any]]:
+            state.pending = None
+            if state.message_id is None:
+                return SendMessage(chat_id=chat_id, text=state.text)
+            return EditMessageText(chat_id=chat_id, message_id=state.message_id, text=state.text)
+
+        job = self._enqueue(chat_id, build, SendPriority.PROGRESS)
+        state.pending = job
+        job.future.add_done_callback(lambda f: self._remember_message(state, f))
+
+    def finish_progress(self, chat_id: ChatId, key: str = "default") -> None:
+        """Forget a progress message; the next ``progress()`` sends a new one."""
+        self._progress.pop((chat_id, key), None)
+
+    @staticmethod
+    def _remember_message(state: _Progress, future: "asyncio.Future[Any]") -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        message_id = getattr(future.result(), "message_id", None)
+        if message_id is not None:
+            state.message_id = message_id
+
+    def _enqueue(self, chat_id: ChatId, build: MethodFactory, priority: SendPriority) -> _Job:
+        job = _Job(
+            priority=priority,
+            seq=next(self._seq),
+            build=build,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        lane = self._lanes.setdefault(chat_id, _Lane())
+        heapq.heappush(lane.jobs, job)
+        self._schedule(chat_id, lane)
+        return job
+
+    def _schedule(self, chat_id: ChatId, lane: _Lane) -> None:
+        if lane.busy or lane.scheduled or not lane.jobs:
+            return
+        lane.scheduled = True
+        head = lane.jobs[0]
+        heapq.heappush(self._ready, (head.priority, head.seq, chat_id))
+        self._wakeup.set()
+
+    def _chat_limit(self, chat_id: ChatId) -> RateLimit:
+        if isinstance(chat_id, int) and chat_id > 0:
+            return self._private_limit
+        return self._group_limit
+
+    async def _run(self) -> None:
+        while True:
+            now = self._clock()
+            while self._delayed and self._delayed[0][0] <= now:
+                _, _, chat_id = heapq.heappop(self._delayed)
+                lane = self._lanes.get(chat_id)
+                if lane is not None:
+                    lane.scheduled = False
+                    self._schedule(chat_id, lane)
+
+            if self._paused_until > now:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            if not self._ready:
+                timeout = self._delayed[0][0] - now if self._delayed else None
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, chat_id = heapq.heappop(self._ready)
+            lane = self._lanes[chat_id]
+            wait = self._buckets.try_acquire(f"chat:{chat_id}", self._chat_limit(chat_id))
+            if wait > 0:
+                heapq.heappush(self._delayed, (now + wait, next(self._seq), chat_id))
+                continue
+            while (wait := self._buckets.try_acquire("global", self._global_limit)) > 0:
+                await asyncio.sleep(wait)
+
+            lane.scheduled = False
+            lane.busy = True
+            job = heapq.heappop(lane.jobs)
+            task = asyncio.create_task(self._call(chat_id, lane, job))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _call(self, chat_id: ChatId, lane: _Lane, job: _Job) -> None:
+        retry_at = 0.0
+        try:
+            method = job.build()
+            if method is None:
+                job.future.set_result(None)
+                return
+            job.attempts += 1
+            try:
+                result = await self._bot(method)
+            except TelegramRetryAfter as error:
+                self.stats.rate_limited += 1
+                retry_at = self._clock() + error.retry_after
+                self._paused_until = max(self._paused_until, retry_at)
+                logger.warning(
+                    "Telegram flood wait",
+                    extra={"chat_id": chat_id, "retry_after": error.retry_after},
+                )
+                self._retry_or_fail(lane, job, error)
+            except (TelegramNetworkError, TelegramServerError) as error:
+                retry_at = self._clock() + self._backoff * 2 ** (job.attempts - 1)
+                self._retry_or_fail(lane, job, error)
+            except TelegramBadRequest as error:
+                if isinstance(method, EditMessageText) and "not modified" in error.message:
+                    job.future.set_result(None)
+                else:
+                    self._fail(job, error)
+            except Exception as error:
+                self._fail(job, error)
+            else:
+                self.stats.sent += 1
+                job.future.set_result(result)
+        finally:
+            lane.busy = False
+            if not lane.jobs:
+                self._lanes.pop(chat_id, None)
+            elif retry_at:
+                lane.scheduled = True
+                heapq.heappush(self._delayed, (retry_at, next(self._seq), chat_id))
+                self._wakeup.set()
+            else:
+                self._schedule(chat_id, lane)
+
+    def _retry_or_fail(self, lane: _Lane, job: _Job, error: Exception) -> None:
+        if job.attempts >= self._max_attempts:
+            self._fail(job, error)
+            return
+        self.stats.retried += 1
+        heapq.heappush(lane.jobs, job)
+
+    def _fail(self, job: _Job, error: Exception) -> None:
+        self.stats.failed += 1
+        logger.error("Outbound call failed", extra={"error": str(error)})
+        job.future.set_exception(error)
@@ -22,6 +22,10 @@ class Settings(BaseSettings):
     # Telegram settings
     telegram_token: str = Field(..., validation_alias="TELEGRAM_TOKEN")
     telegram_webhook_url: Optional[str] = Field(None, validation_alias="TELEGRAM_WEBHOOK_URL")
+    telegram_webhook_secret: Optional[str] = Field(None, validation_alias="TELEGRAM_WEBHOOK_SECRET")
+    webhook_workers: int = Field(default=16, validation_alias="WEBHOOK_WORKERS")
+    webhook_queue_size: int = Field(default=100, validation_alias="WEBHOOK_QUEUE_SIZE")
+    webhook_overflow_size: int = Field(default=1000, validation_alias="WEBHOOK_OVERFLOW_SIZE")
 
     # Database settings
     db_url: str = Field(..., validation_alias="DATABASE_URL")
@@ -31,6 +35,8 @@ class Settings(BaseSettings):
     llm_api_key: Optional[str] = Field(None, validation_alias="LLM_API_KEY")
     llm_base_url: Optional[str] = Field(None, validation_alias="LLM_BASE_URL")
     llm_model: Optional[str] = Field(None, validation_alias="LLM_MODEL")
+    # Unix socket of the shared model server (None = load models in-process)
+    model_server_socket: Optional[str] = Field(None, validation_alias="MODEL_SERVER_SOCKET")
 
     # Todoist settings
     todoist_api_key: Optional[str] = Field(None, validation_alias="TODOIST_API_KEY")
@@ -49,6 +55,29 @@ class Settings(BaseSettings):
     log_level: str = Field(default="INFO", validation_alias="LOG_LEVEL")
     log_format: str = Field(default="json", validation_alias="LOG_FORMAT")
 
+    # Profiling settings
+    profiling_enabled: bool = Field(default=False, validation_alias="PROFILING_ENABLED")
+    profiling_interval: float = Field(default=0.01, validation_alias="PROFILING_INTERVAL")
+    loop_lag_threshold: float = Field(default=0.0, validation_alias="LOOP_LAG_THRESHOLD")
+    slow_trace_threshold: float = Field(default=1.0, validation_alias="SLOW_TRACE_THRESHOLD")
+
+    # Conversation (FSM) session settings
+    fsm_cache_size: int = Field(default=10_000, validation_alias="FSM_CACHE_SIZE")
+    fsm_session_ttl: float = Field(default=86_400.0, validation_alias="FSM_SESSION_TTL")
+    fsm_flush_delay: float = Field(default=0.05, validation_alias="FSM_FLUSH_DELAY")
+
+    # Warm-start snapshot settings (0 = disabled)
+    snapshot_interval: float = Field(default=300.0, validation_alias="SNAPSHOT_INTERVAL")
+
+    # Backup settings
+    backup_path: str = Field(default="./backups", validation_alias="BACKUP_PATH")
+    backup_jobs: int = Field(default=4, validation_alias="BACKUP_JOBS")
+
+    # Background job runtime settings
+    job_workers: int = Field(default=16, validation_alias="JOB_WORKERS")
+    # Process pool size for CPU-bound jobs (0 = number of CPUs)
+    job_process_workers: int = Field(default=0, validation_alias="JOB_PROCESS_WORKERS")
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
     @field_validator("secret_key")
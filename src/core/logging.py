@@ -8,6 +8,7 @@ from datetime import UTC, datetime
 from typing import Any, Dict
 
 from src.core.config import get_settings
+from src.core.profiling import TraceContextFilter, span
 
 
 class PIIFormatter(logging.Formatter):
@@ -33,8 +34,9 @@ class PIIFormatter(logging.Formatter):
         Returns:
             JSON string with masked PII
         """
-        log_dict = self._format_record(record)
-        return json.dumps(log_dict, ensure_ascii=False)
+        with span("log_format"):
+            log_dict = self._format_record(record)
+            return json.dumps(log_dict, ensure_ascii=False)
 
     def _format_record(self, record: logging.LogRecord) -> Dict[str, Any]:
         """Convert log record to dictionary with masked message.
@@ -193,6 +195,7 @@ def setup_logging() -> logging.Logger:
         formatter = PIIFormatter()
 
     handler.setFormatter(formatter)
+    handler.addFilter(TraceContextFilter())
     logger.addHandler(handler)
 
     return logger
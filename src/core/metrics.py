@@ -0,0 +1,461 @@
+"""In-process metrics registry with Prometheus text exposition.
+
+Counters and histograms are sharded per thread: every thread writes to its
+own cell without taking a lock, and cells are summed only when metrics are
+collected. Recording is therefore a thread-local lookup and an addition
+(see ``scripts/bench_metrics.py``). Bind labels once (``labels(...)``) and
+keep the child on hot paths to skip the label lookup too.
+
+Values that already live elsewhere (cache counters, DB pool) are
+exported with callback metrics read at collection time, so they cost
+nothing to record.
+
+The standard instruments are module-level; ``REGISTRY.expose()`` renders
+everything for the ``/metrics`` endpoint.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+Labels = Dict[str, str]
+Sample = Tuple[str, Labels, float]
+C = TypeVar("C")
+
+
+class _Shards:
+    """Per-thread accumulators; each thread writes only its own cell."""
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._local = threading.local()
+        self._cells: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def cell(self) -> List[float]:
+        try:
+            cell: List[float] = self._local.cell
+        except AttributeError:
+            cell = [0.0] * self._size
+            with self._lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+        return cell
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            cells = list(self._cells)
+        return [sum(cell[i] for cell in cells) for i in range(self._size)]
+
+
+class CounterChild:
+    """Monotonic counter for one label set."""
+
+    __slots__ = ("_shards",)
+
+    def __init__(self) -> None:
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the counter."""
+        self._shards.cell()[0] += amount
+
+    def value(self) -> float:
+        """Current total."""
+        return self._shards.totals()[0]
+
+
+class GaugeChild:
+    """Value that can go up and down, for one label set."""
+
+    __slots__ = ("_value", "_function", "_lock")
+
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        """Set the value."""
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the value."""
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrease the value."""
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from ``function`` at collection time."""
+        self._function = function
+
+    def value(self) -> float:
+        """Current value."""
+        return self._function() if self._function is not None else self._value
+
+
+class HistogramChild:
+    """Bucketed distribution for one label set."""
+
+    __slots__ = ("_bounds", "_shards")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self._bounds = bounds
+        # One count per bucket (the last one is +Inf) and the sum
+        self._shards = _Shards(len(bounds) + 2)
+
+    def observe(self, value: float) -> None:
+        """Record an observation."""
+        cell = self._shards.cell()
+        cell[bisect_left(self._bounds, value)] += 1
+        cell[-1] += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the duration of the block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def snapshot(self) -> Tuple[List[float], float]:
+        """Cumulative bucket counts (including +Inf) and the sum."""
+        totals = self._shards.totals()
+        cumulative: List[float] = []
+        running = 0.0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-1]
+
+
+class Metric(Generic[C]):
+    """Metric family: one child per label set."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        """Initialize metric.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Label names (children are created by ``labels()``)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], C] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: Any) -> C:
+        """Get the child for a label set (bind once for hot paths).
+
+        Raises:
+            ValueError: If the number of values does not match the label names
+        """
+        key = tuple(map(str, values))
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.get(key) or self._children.setdefault(key, self._create())
+        return child
+
+    def _create(self) -> C:
+        raise NotImplementedError
+
+    def _items(self) -> Iterator[Tuple[Labels, C]]:
+        for key, child in list(self._children.items()):
+            yield dict(zip(self.labelnames, key)), child
+
+    def samples(self) -> Iterator[Sample]:
+        """Samples for exposition."""
+        raise NotImplementedError
+
+
+class Counter(Metric[CounterChild]):
+    """Monotonic counter."""
+
+    kind = "counter"
+
+    def _create(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the unlabelled counter."""
+        self.labels().inc(amount)
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, child in self._items():
+            yield self.name, labels, child.value()
+
+
+class Gauge(Metric[GaugeChild]):
+    """Gauge."""
+
+    kind = "gauge"
+
+    def _create(self) -> GaugeChild:
+        return GaugeChild()
+
+    def set(self, value: float) -> None:
+        """Set the unlabelled gauge."""
+        self.labels().set(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the unlabelled gauge from ``function`` at collection time."""
+        self.labels().set_function(function)
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, child in self._items():
+            yield self.name, labels, child.value()
+
+
+class Histogram(Metric[HistogramChild]):
+    """Histogram with fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Initialize histogram.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Label names
+            buckets: Upper bounds of the buckets (+Inf is implicit)
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _create(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record an observation in the unlabelled histogram."""
+        self.labels().observe(value)
+
+    def samples(self) -> Iterator[Sample]:
+        bounds = [*(_format(b) for b in self.buckets), "+Inf"]
+        for labels, child in self._items():
+            cumulative, total = child.snapshot()
+            for bound, count in zip(bounds, cumulative):
+                yield f"{self.name}_bucket", {**labels, "le": bound}, count
+            yield f"{self.name}_count", labels, cumulative[-1]
+            yield f"{self.name}_sum", labels, total
+
+
+class CallbackMetric(Metric[None]):
+    """Metric whose samples are produced by a function at collection time."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        function: Callable[[], Iterable[Tuple[Labels, float]]],
+    ) -> None:
+        """Initialize metric.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            kind: Prometheus type (``counter`` or ``gauge``)
+            function: Returns ``(labels, value)`` pairs
+        """
+        super().__init__(name, documentation)
+        self.kind = kind
+        self._function = function
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, value in self._function():
+            yield self.name, labels, value
+
+
+class MetricsRegistry:
+    """Named metrics and their exposition."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric[Any]] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric[Any]) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.kind != metric.kind:
+                    raise ValueError(
+                        f"Metric {metric.name} is already registered as {existing.kind}"
+                    )
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        counter: Counter = self._register(Counter(name, documentation, labelnames))
+        return counter
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        gauge: Gauge = self._register(Gauge(name, documentation, labelnames))
+        return gauge
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Get or create a histogram."""
+        histogram: Histogram = self._register(Histogram(name, documentation, labelnames, buckets))
+        return histogram
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        function: Callable[[], Iterable[Tuple[Labels, float]]],
+    ) -> CallbackMetric:
+        """Get or create a callback metric."""
+        metric: CallbackMetric = self._register(CallbackMetric(name, documentation, kind, function))
+        return metric
+
+    def get(self, name: str) -> Optional[Metric[Any]]:
+        """Get a registered metric by name."""
+        return self._metrics.get(name)
+
+    def expose(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation, help_text=True)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                    lines.append(f"{name}{{{pairs}}} {_format(value)}")
+                else:
+                    lines.append(f"{name} {_format(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str, help_text: bool = False) -> str:
+    value = value.replace("\\", "\\\\").replace("\n", "\\n")
+    return value if help_text else value.replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    return repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+
+class HitStats(Protocol):
+    """Anything with hit/miss counters (``CacheStats``, ``ResponseCacheStats``)."""
+
+    hits: int
+    misses: int
+
+
+_caches: Dict[str, HitStats] = {}
+
+
+def track_cache(name: str, stats: HitStats) -> None:
+    """Export a cache's hit/miss counters as ``cache`` label ``name``."""
+    _caches[name] = stats
+
+
+def track_db_pool(engine: Any) -> None:
+    """Export connection pool usage of a SQLAlchemy engine."""
+    pool = engine.pool
+
+    def usage() -> Iterable[Tuple[Labels, float]]:
+        for state, method in (
+            ("checked_out", "checkedout"),
+            ("idle", "checkedin"),
+            ("overflow", "overflow"),
+            ("size", "size"),
+        ):
+            reader = getattr(pool, method, None)
+            if reader is not None:
+                yield {"state": state}, float(reader())
+
+    REGISTRY.callback(
+        "telemetriya_db_pool_connections", "Database connection pool usage", "gauge", usage
+    )
+
+
+def _cache_samples(attribute: str) -> Callable[[], Iterable[Tuple[Labels, float]]]:
+    def samples() -> Iterable[Tuple[Labels, float]]:
+        for name, stats in list(_caches.items()):
+            yield {"cache": name}, float(getattr(stats, attribute))
+
+    return samples
+
+
+def _cache_hit_ratio() -> Iterable[Tuple[Labels, float]]:
+    for name, stats in list(_caches.items()):
+        total = stats.hits + stats.misses
+        yield {"cache": name}, stats.hits / total if total else 0.0
+
+
+UPDATE_DURATION = REGISTRY.histogram(
+    "telemetriya_update_duration_seconds", "Telegram update handling latency", ("update_type",)
+)
+UPDATE_FAILURES = REGISTRY.counter(
+    "telemetriya_update_failures_total", "Telegram updates whose handler raised", ("update_type",)
+)
+LLM_DURATION = REGISTRY.histogram(
+    "telemetriya_llm_request_duration_seconds",
+    "LLM completion latency",
+    ("provider",),
+    buckets=LLM_BUCKETS,
+)
+LLM_TOKENS = REGISTRY.counter(
+    "telemetriya_llm_tokens_total", "LLM tokens used", ("provider", "kind")
+)
+REGISTRY.callback("telemetriya_cache_hits_total", "Cache hits", "counter", _cache_samples("hits"))
+REGISTRY.callback(
+    "telemetriya_cache_misses_total", "Cache misses", "counter", _cache_samples("misses")
+)
+REGISTRY.callback("telemetriya_cache_hit_ratio", "Cache hit ratio", "gauge", _cache_hit_ratio)
@@ -0,0 +1,325 @@
+"""Opt-in profiling: stack sampling, event loop lag and per-stage spans.
+
+* ``SamplingProfiler`` samples the stacks of all threads from a background
+  thread and aggregates them in the collapsed format understood by
+  flamegraph.pl, speedscope and inferno. It can be started and stopped at
+  runtime (see ``src/api/v1/endpoints/profiling.py``).
+* ``LoopLagMonitor`` keeps a heartbeat on the event loop; a watchdog thread
+  logs the loop thread's stack whenever the heartbeat stalls longer than
+  the threshold, i.e. while a coroutine is blocking the loop.
+* ``trace()`` opens a trace for one update or request and ``span()`` adds a
+  stage timing to it. The active trace id and stage timings are attached to
+  every log record by ``TraceContextFilter``; traces slower than
+  ``Settings.slow_trace_threshold`` are logged with their breakdown.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+
+from src.core.config import Settings
+from src.core.metrics import REGISTRY
+
+# src.core.logging imports this module, so use the stdlib logger directly
+logger = logging.getLogger(__name__)
+
+LOOP_LAG = REGISTRY.histogram(
+    "telemetriya_event_loop_lag_seconds",
+    "Delay of event loop heartbeats",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+_trace: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+_slow_trace_threshold = 1.0
+
+
+@dataclass
+class Trace:
+    """Stage timings of one update or request."""
+
+    name: str
+    trace_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    started: float = field(default_factory=time.perf_counter)
+    spans: Dict[str, float] = field(default_factory=dict)
+
+    def add(self, stage: str, seconds: float) -> None:
+        """Add time spent in ``stage`` (repeated stages are summed)."""
+        self.spans[stage] = self.spans.get(stage, 0.0) + seconds
+
+    def timings_ms(self) -> Dict[str, float]:
+        """Stage timings in milliseconds."""
+        return {stage: round(seconds * 1000, 3) for stage, seconds in self.spans.items()}
+
+
+def current_trace() -> Optional[Trace]:
+    """Trace of the current update or request (None outside one)."""
+    return _trace.get()
+
+
+@contextmanager
+def trace(name: str, **context: Any) -> Iterator[Trace]:
+    """Trace one unit of work; nested calls reuse the outer trace.
+
+    Args:
+        name: Trace name (e.g. ``update`` or ``GET /v1/notes``)
+        **context: Extra fields for the slow-trace log record
+    """
+    outer = _trace.get()
+    if outer is not None:
+        with span(name):
+            yield outer
+        return
+    current = Trace(name)
+    token = _trace.set(current)
+    try:
+        yield current
+    finally:
+        _trace.reset(token)
+        duration = time.perf_counter() - current.started
+        if duration >= _slow_trace_threshold:
+            logger.warning(
+                "Slow trace",
+                extra={
+                    "trace": name,
+                    "trace_id": current.trace_id,
+                    "duration_ms": round(duration * 1000, 3),
+                    "spans_ms": current.timings_ms(),
+                    **context,
+                },
+            )
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time a stage of the current trace (no-op outside a trace)."""
+    current = _trace.get()
+    if current is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        current.add(stage, time.perf_counter() - started)
+
+
+class TraceContextFilter(logging.Filter):
+    """Attach the active trace id and stage timings to log records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        current = _trace.get()
+        if current is not None:
+            record.trace_id = current.trace_id
+            record.spans_ms = current.timings_ms()
+        return True
+
+
+def trace_queries(engine: Any) -> None:
+    """Record DB statement time of a SQLAlchemy engine as the ``db`` span."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before(
+        conn: Any, cursor: Any, statement: Any, params: Any, context: Any, many: Any
+    ) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def finished(conn: Any) -> None:
+        stack = conn.info.get("query_started")
+        if not stack:
+            return
+        started = stack.pop()
+        current = _trace.get()
+        if current is not None:
+            current.add("db", time.perf_counter() - started)
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after(conn: Any, cursor: Any, statement: Any, params: Any, context: Any, many: Any) -> None:
+        finished(conn)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def failed(context: Any) -> None:
+        # Failed statements never reach "after_cursor_execute"
+        if context.connection is not None:
+            finished(context.connection)
+
+
+class SamplingProfiler:
+    """Statistical profiler sampling all thread stacks at a fixed interval."""
+
+    def __init__(self, interval: float = 0.01, max_depth: int = 128) -> None:
+        """Initialize profiler.
+
+        Args:
+            interval: Seconds between samples
+            max_depth: Deepest frames kept per stack
+        """
+        self.interval = interval
+        self._max_depth = max_depth
+        self._stacks: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.samples = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether sampling is active."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start sampling (no-op if already running)."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        logger.info("Sampling profiler started", extra={"interval": self.interval})
+
+    def stop(self) -> None:
+        """Stop sampling; collected stacks are kept."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        logger.info("Sampling profiler stopped", extra={"samples": self.samples})
+
+    def reset(self) -> None:
+        """Drop collected stacks."""
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+    def collapsed(self) -> str:
+        """Collected stacks in the collapsed (folded) flamegraph format."""
+        with self._lock:
+            stacks = self._stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def dump(self, path: str) -> None:
+        """Write collapsed stacks to ``path``."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+
+    def sample(self) -> None:
+        """Take one sample of every thread except the profiler's own."""
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        frames = sys._current_frames()
+        with self._lock:
+            for ident, frame in frames.items():
+                if ident != own:
+                    self._stacks[self._fold(frame, names.get(ident, str(ident)))] += 1
+            self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def _fold(self, frame: Optional[FrameType], thread_name: str) -> str:
+        names: List[str] = []
+        while frame is not None and len(names) < self._max_depth:
+            code = frame.f_code
+            module = frame.f_globals.get("__name__", "?")
+            names.append(f"{module}:{code.co_qualname}")
+            frame = frame.f_back
+        names.append(thread_name)
+        return ";".join(reversed(names))
+
+
+class LoopLagMonitor:
+    """Log the loop thread's stack whenever the event loop is blocked."""
+
+    def __init__(self, threshold: float = 0.1, interval: Optional[float] = None) -> None:
+        """Initialize monitor.
+
+        Args:
+            threshold: Blocking longer than this many seconds is reported
+            interval: Heartbeat interval (``threshold / 2`` by default)
+        """
+        self.threshold = threshold
+        self.interval = interval if interval is not None else threshold / 2
+        self.stalls = 0
+        self._beat = time.monotonic()
+        self._loop_thread = 0
+        self._task: Optional[asyncio.Task[None]] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional["LoopLagMonitor"]:
+        """Create a monitor if ``Settings.loop_lag_threshold`` is set."""
+        if settings.loop_lag_threshold <= 0:
+            return None
+        return cls(settings.loop_lag_threshold)
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-monitor", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop monitoring."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            LOOP_LAG.observe(max(now - expected, 0.0))
+            self._beat = now
+
+    def _watch(self) -> None:
+        reported = 0.0
+        while not self._stop.wait(self.interval / 2):
+            beat = self._beat
+            blocked = time.monotonic() - beat
+            if blocked <= self.threshold + self.interval or beat == reported:
+                continue
+            reported = beat
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread)
+            logger.warning(
+                "Event loop blocked",
+                extra={
+                    "blocked_ms": round(blocked * 1000, 1),
+                    "stack": "".join(traceback.format_stack(frame)) if frame else "",
+                },
+            )
+
+
+profiler = SamplingProfiler()
+
+
+def configure_profiling(settings: Settings) -> None:
+    """Apply profiling settings to the shared profiler and traces."""
+    global _slow_trace_threshold
+    _slow_trace_threshold = settings.slow_trace_threshold
+    profiler.interval = settings.profiling_interval
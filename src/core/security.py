@@ -0,0 +1,227 @@
+"""JWT access tokens and cached request authentication.
+
+Verifying a token and loading its user on every API request is the main
+fixed cost of an authenticated call. ``Authenticator`` keeps two bounded
+LRU caches:
+
+* verified token claims, keyed by a hash of the token and expiring at the
+  token's ``exp`` (a cached token is never accepted past its expiry);
+* users by id, with a short TTL and explicit invalidation.
+
+Logout revokes the token's ``jti`` until the token would have expired, so a
+revoked token is rejected even though its signature is still valid.
+Revocations are process-local; run a shared store in front of this when
+scaling beyond one API process.
+"""
+
+import hashlib
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional
+
+from jose import JWTError, jwt
+
+from src.core.config import Settings
+from src.core.logging import get_logger
+from src.core.metrics import track_cache
+from src.utils.cache import LRUCache
+
+logger = get_logger(__name__)
+
+
+class AuthenticationError(Exception):
+    """Token is missing, invalid, expired, revoked or its user is inactive."""
+
+
+@dataclass(frozen=True, slots=True)
+class TokenClaims:
+    """Verified access token claims."""
+
+    user_id: int
+    jti: str
+    expires_at: float
+    scopes: FrozenSet[str] = frozenset()
+
+
+@dataclass(slots=True)
+class AuthUser:
+    """User data needed to authorize requests."""
+
+    id: int
+    is_active: bool = True
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True, slots=True)
+class AuthContext:
+    """Authenticated request context."""
+
+    claims: TokenClaims
+    user: AuthUser
+
+    @property
+    def user_id(self) -> int:
+        return self.user.id
+
+
+UserLoader = Callable[[int], Awaitable[Optional[AuthUser]]]
+
+
+async def _token_only_user(user_id: int) -> Optional[AuthUser]:
+    return AuthUser(id=user_id)
+
+
+def create_access_token(
+    user_id: int,
+    secret_key: str,
+    algorithm: str = "HS256",
+    expires_delta: timedelta = timedelta(minutes=30),
+    scopes: FrozenSet[str] = frozenset(),
+) -> str:
+    """Create a signed access token.
+
+    Args:
+        user_id: Token subject
+        secret_key: Signing key
+        algorithm: JWT algorithm
+        expires_delta: Token lifetime
+        scopes: Granted scopes
+
+    Returns:
+        Encoded JWT
+    """
+    now = datetime.now(timezone.utc)
+    payload: Dict[str, Any] = {
+        "sub": str(user_id),
+        "iat": int(now.timestamp()),
+        "exp": int((now + expires_delta).timestamp()),
+        "jti": uuid.uuid4().hex,
+    }
+    if scopes:
+        payload["scopes"] = sorted(scopes)
+    return str(jwt.encode(payload, secret_key, algorithm=algorithm))
+
+
+def decode_access_token(token: str, secret_key: str, algorithm: str = "HS256") -> TokenClaims:
+    """Verify a token signature and expiry.
+
+    Tokens without a ``jti`` are rejected: they could not be revoked.
+
+    Raises:
+        AuthenticationError: If the token is invalid or expired
+    """
+    try:
+        payload = jwt.decode(token, secret_key, algorithms=[algorithm])
+        if not payload.get("jti"):
+            raise AuthenticationError("Invalid token")
+        return TokenClaims(
+            user_id=int(payload["sub"]),
+            jti=str(payload["jti"]),
+            expires_at=float(payload["exp"]),
+            scopes=frozenset(payload.get("scopes", ())),
+        )
+    except (JWTError, KeyError, ValueError) as e:
+        raise AuthenticationError("Invalid token") from e
+
+
+class Authenticator:
+    """Token verification and user lookup with caches."""
+
+    def __init__(
+        self,
+        secret_key: str,
+        algorithm: str = "HS256",
+        user_loader: UserLoader = _token_only_user,
+        token_cache_size: int = 10_000,
+        user_cache_size: int = 10_000,
+        user_ttl: float = 300.0,
+        wall_clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize authenticator.
+
+        Args:
+            secret_key: Signing key
+            algorithm: JWT algorithm
+            user_loader: Loads a user by id (typically from the DB); by
+                default the token subject is trusted as is
+            token_cache_size: Maximum cached tokens
+            user_cache_size: Maximum cached users
+            user_ttl: Seconds a loaded user is reused
+            wall_clock: Time source comparable with ``exp``
+        """
+        self._secret_key = secret_key
+        self._algorithm = algorithm
+        self._user_loader = user_loader
+        self._now = wall_clock
+        self.tokens: LRUCache[str, TokenClaims] = LRUCache(maxsize=token_cache_size)
+        self.users: LRUCache[int, AuthUser] = LRUCache(maxsize=user_cache_size, ttl=user_ttl)
+        track_cache("auth_tokens", self.tokens.stats)
+        track_cache("auth_users", self.users.stats)
+        # jti -> exp; not an LRU, a revocation must not be evicted before exp
+        self._revoked: Dict[str, float] = {}
+
+    @classmethod
+    def from_settings(
+        cls, settings: Settings, user_loader: UserLoader = _token_only_user
+    ) -> "Authenticator":
+        """Create an authenticator using ``secret_key`` and ``algorithm`` from settings."""
+        return cls(settings.secret_key, settings.algorithm, user_loader=user_loader)
+
+    @staticmethod
+    def _token_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def verify(self, token: str) -> TokenClaims:
+        """Get verified claims, from the cache when possible.
+
+        Raises:
+            AuthenticationError: If the token is invalid, expired or revoked
+        """
+        key = self._token_key(token)
+        claims = self.tokens.get(key)
+        now = self._now()
+        if claims is None:
+            claims = decode_access_token(token, self._secret_key, self._algorithm)
+            ttl = claims.expires_at - now
+            if ttl > 0:
+                self.tokens.set(key, claims, ttl=ttl)
+        if claims.expires_at <= now:
+            raise AuthenticationError("Token expired")
+        if claims.jti in self._revoked:
+            raise AuthenticationError("Token revoked")
+        return claims
+
+    async def authenticate(self, token: str) -> AuthContext:
+        """Authenticate a bearer token.
+
+        Raises:
+            AuthenticationError: If the token or its user is not acceptable
+        """
+        claims = self.verify(token)
+        user = self.users.get(claims.user_id)
+        if user is None:
+            user = await self._user_loader(claims.user_id)
+            if user is None:
+                raise AuthenticationError("Unknown user")
+            self.users.set(claims.user_id, user)
+        if not user.is_active:
+            raise AuthenticationError("Inactive user")
+        return AuthContext(claims=claims, user=user)
+
+    def logout(self, token: str) -> None:
+        """Revoke a token until its expiry."""
+        try:
+            claims = self.verify(token)
+        except AuthenticationError:
+            return
+        self.tokens.delete(self._token_key(token))
+        now = self._now()
+        self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        self._revoked[claims.jti] = claims.expires_at
+        logger.info("Token revoked", extra={"user_id": claims.user_id})
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop a cached user (after deactivation, role change, etc.)."""
+        self.users.delete(user_id)
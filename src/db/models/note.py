@@ -0,0 +1,18 @@
+"""Note model."""
+
+from sqlalchemy import BigInteger, Index, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.base import Base, SoftDeleteMixin, TimestampMixin, UUIDMixin
+
+
+class Note(UUIDMixin, TimestampMixin, SoftDeleteMixin, Base):
+    """User note (text, transcribed voice, extracted document text)."""
+
+    __tablename__ = "notes"
+    __table_args__ = (Index("ix_notes_user_created", "user_id", "created_at", "id"),)
+
+    # Telegram user id of the owner
+    user_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    source: Mapped[str] = mapped_column(String(32), default="text", nullable=False)
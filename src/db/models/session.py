@@ -0,0 +1,25 @@
+"""Conversation session model."""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import JSON, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.base import Base, TimestampMixin
+
+
+class Session(TimestampMixin, Base):
+    """FSM state and data of one conversation (aiogram storage key)."""
+
+    __tablename__ = "sessions"
+
+    # Storage key built by aiogram's DefaultKeyBuilder
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    state: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    data: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict, nullable=False)
+    # Incremented on every write; writers expecting another version lose
+    version: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), index=True, nullable=False
+    )
@@ -0,0 +1,22 @@
+"""Async engine and session factory."""
+
+from functools import lru_cache
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.config import get_settings
+from src.core.metrics import track_db_pool
+from src.core.profiling import trace_queries
+
+
+@lru_cache
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Get cached session factory bound to ``Settings.db_url``.
+
+    Returns:
+        Session factory (one engine per process)
+    """
+    engine = create_async_engine(get_settings().db_url, pool_pre_ping=True)
+    track_db_pool(engine)
+    trace_queries(engine)
+    return async_sessionmaker(engine, expire_on_commit=False)
@@ -0,0 +1,356 @@
+"""Todoist Sync API client.
+
+* One pooled ``httpx.AsyncClient`` is shared by all calls.
+* Writes are queued as Sync API commands and sent in batches: commands
+  queued within ``flush_delay`` (or up to ``batch_size`` of them) go out in
+  a single ``commands`` request. Each queued call returns the command's
+  result, including the real id of a created task.
+* Reads are incremental: the client keeps the ``sync_token`` and a local
+  copy of tasks and projects, and ``sync()`` only fetches what changed.
+* 429 and 5xx responses and network errors are retried with exponential
+  backoff and jitter, honouring ``Retry-After`` when Todoist sends it and
+  never sleeping past the caller's deadline.
+* Every HTTP attempt goes through the ``todoist`` resilience dependency
+  (circuit breaker and adaptive concurrency limit).
+"""
+
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+from src.core.config import Settings
+from src.core.logging import get_logger
+from src.utils.resilience import (
+    CircuitOpenError,
+    DeadlineExceeded,
+    Dependency,
+    get_dependency,
+    remaining,
+)
+
+logger = get_logger(__name__)
+
+DEFAULT_BASE_URL = "https://api.todoist.com/api/v1"
+DEFAULT_RESOURCES = ("items", "projects")
+
+
+class TodoistError(Exception):
+    """Todoist request failed."""
+
+
+class TodoistCommandError(TodoistError):
+    """A Sync API command was rejected."""
+
+    def __init__(self, command_type: str, error: Any) -> None:
+        super().__init__(f"{command_type} failed: {error}")
+        self.command_type = command_type
+        self.error = error
+
+
+class _RetryableResponseError(Exception):
+    """429/5xx response, raised so the dependency counts it as a failure."""
+
+    def __init__(self, response: httpx.Response) -> None:
+        super().__init__(f"Todoist returned {response.status_code}")
+        self.response = response
+
+
+@dataclass
+class CommandResult:
+    """Outcome of a successful command."""
+
+    uuid: str
+    temp_id: Optional[str] = None
+    id: Optional[str] = None
+
+
+@dataclass
+class SyncState:
+    """Local replica maintained from incremental syncs."""
+
+    sync_token: str = "*"
+    resources: Dict[str, Dict[str, Dict[str, Any]]] = field(default_factory=dict)
+
+    @property
+    def items(self) -> Dict[str, Dict[str, Any]]:
+        return self.resources.setdefault("items", {})
+
+    @property
+    def projects(self) -> Dict[str, Dict[str, Any]]:
+        return self.resources.setdefault("projects", {})
+
+    def apply(self, payload: Dict[str, Any], resource_types: Sequence[str]) -> None:
+        """Merge a sync response into the replica."""
+        for resource in resource_types:
+            if payload.get("full_sync"):
+                self.resources[resource] = {}
+            store = self.resources.setdefault(resource, {})
+            for obj in payload.get(resource, []):
+                if obj.get("is_deleted"):
+                    store.pop(str(obj["id"]), None)
+                else:
+                    store[str(obj["id"])] = obj
+        self.sync_token = payload["sync_token"]
+
+
+@dataclass
+class _Command:
+    type: str
+    args: Dict[str, Any]
+    uuid: str
+    temp_id: Optional[str]
+    future: "asyncio.Future[CommandResult]"
+
+    def as_json(self) -> Dict[str, Any]:
+        command: Dict[str, Any] = {"type": self.type, "uuid": self.uuid, "args": self.args}
+        if self.temp_id:
+            command["temp_id"] = self.temp_id
+        return command
+
+
+class TodoistClient:
+    """Batched, incremental Todoist client."""
+
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        base_url: str = DEFAULT_BASE_URL,
+        client: Optional[httpx.AsyncClient] = None,
+        batch_size: int = 100,
+        flush_delay: float = 0.05,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        timeout: float = 30.0,
+        dependency: Optional[Dependency] = None,
+    ) -> None:
+        """Initialize client.
+
+        Args:
+            api_key: Todoist API token
+            base_url: API root
+            client: HTTP client to use (a pooled one is created if omitted)
+            batch_size: Maximum commands per request (Todoist allows 100)
+            flush_delay: Time queued commands wait for more to batch with
+            max_retries: Retries for rate-limited or failed requests
+            backoff: Base retry delay in seconds
+            timeout: Request timeout in seconds
+            dependency: Circuit breaker/concurrency guard (shared ``todoist``
+                dependency if omitted)
+        """
+        self._client = client or httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+        )
+        self._owns_client = client is None
+        self._url = base_url.rstrip("/") + "/sync"
+        self._headers = {"Authorization": f"Bearer {api_key}"}
+        self._batch_size = batch_size
+        self._flush_delay = flush_delay
+        self._max_retries = max_retries
+        self._backoff = backoff
+        self._queue: List[_Command] = []
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: "set[asyncio.Task[None]]" = set()
+        self._sync_lock = asyncio.Lock()
+        self.dependency = dependency or get_dependency("todoist", timeout=timeout)
+        self.state = SyncState()
+        self.requests = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings, **kwargs: Any) -> "TodoistClient":
+        """Create a client using ``Settings.todoist_api_key``.
+
+        Raises:
+            TodoistError: If the API key is not configured
+        """
+        if not settings.todoist_api_key:
+            raise TodoistError("TODOIST_API_KEY is not configured")
+        return cls(settings.todoist_api_key, **kwargs)
+
+    async def close(self) -> None:
+        """Send queued commands and release the HTTP client."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        await self.flush()
+        await asyncio.gather(*self._flushes, return_exceptions=True)
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def add_task(self, content: str, **fields: Any) -> CommandResult:
+        """Create a task; the result carries the real task id."""
+        return await self.command("item_add", {"content": content, **fields}, temp_id=True)
+
+    async def update_task(self, task_id: str, **fields: Any) -> CommandResult:
+        """Update task fields."""
+        return await self.command("item_update", {"id": task_id, **fields})
+
+    async def close_task(self, task_id: str) -> CommandResult:
+        """Complete a task."""
+        return await self.command("item_close", {"id": task_id})
+
+    async def delete_task(self, task_id: str) -> CommandResult:
+        """Delete a task."""
+        return await self.command("item_delete", {"id": task_id})
+
+    def command(
+        self, command_type: str, args: Dict[str, Any], temp_id: bool = False
+    ) -> "asyncio.Future[CommandResult]":
+        """Queue a Sync API command for the next batch.
+
+        Args:
+            command_type: Command type (``item_add``, ``item_update``, ...)
+            args: Command arguments
+            temp_id: Assign a temporary id (for commands creating objects)
+
+        Returns:
+            Future resolved with the command result
+        """
+        command = _Command(
+            type=command_type,
+            args=args,
+            uuid=str(uuid.uuid4()),
+            temp_id=str(uuid.uuid4()) if temp_id else None,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._queue.append(command)
+        if len(self._queue) >= self._batch_size:
+            self._spawn_flush()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.get_running_loop().call_later(
+                self._flush_delay, self._spawn_flush
+            )
+        return command.future
+
+    def _spawn_flush(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        task = asyncio.create_task(self.flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def flush(self) -> None:
+        """Send all queued commands now."""
+        while self._queue:
+            batch = self._queue[: self._batch_size]
+            del self._queue[: self._batch_size]
+            await self._send_batch(batch)
+
+    async def _send_batch(self, batch: List[_Command]) -> None:
+        try:
+            payload = await self._post({"commands": json.dumps([c.as_json() for c in batch])})
+        except Exception as e:
+            for command in batch:
+                if not command.future.done():
+                    command.future.set_exception(e)
+            return
+        statuses = payload.get("sync_status", {})
+        mapping = payload.get("temp_id_mapping", {})
+        for command in batch:
+            status = statuses.get(command.uuid)
+            if command.future.done():
+                continue
+            if status == "ok":
+                real_id = mapping.get(command.temp_id) if command.temp_id else None
+                command.future.set_result(
+                    CommandResult(uuid=command.uuid, temp_id=command.temp_id, id=real_id)
+                )
+            else:
+                command.future.set_exception(TodoistCommandError(command.type, status))
+
+    async def sync(self, resource_types: Sequence[str] = DEFAULT_RESOURCES) -> Dict[str, Any]:
+        """Fetch changes since the last sync (everything on the first call).
+
+        Args:
+            resource_types: Resources to sync
+
+        Returns:
+            Raw sync response (the delta); the merged replica is in ``state``
+        """
+        async with self._sync_lock:
+            payload = await self._post(
+                {
+                    "sync_token": self.state.sync_token,
+                    "resource_types": json.dumps(list(resource_types)),
+                }
+            )
+            self.state.apply(payload, resource_types)
+            return payload
+
+    async def _request(self, data: Dict[str, str]) -> httpx.Response:
+        response = await self._client.post(self._url, data=data, headers=self._headers)
+        if response.status_code == 429 or response.status_code >= 500:
+            raise _RetryableResponseError(response)
+        return response
+
+    async def _post(self, data: Dict[str, str]) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            self.requests += 1
+            try:
+                response = await self.dependency.call(self._request, data)
+            except CircuitOpenError as e:
+                raise TodoistError(str(e)) from e
+            except (httpx.TransportError, DeadlineExceeded, _RetryableResponseError) as e:
+                failed = e.response if isinstance(e, _RetryableResponseError) else None
+                delay = self._retry_delay(attempt, failed)
+                budget = remaining()
+                if attempt >= self._max_retries or (budget is not None and budget <= delay):
+                    raise TodoistError(f"Todoist request failed: {e}") from e
+            else:
+                if response.is_error:
+                    raise TodoistError(f"Todoist returned {response.status_code}: {response.text}")
+                result: Dict[str, Any] = response.json()
+                return result
+            logger.warning(
+                "Todoist request retry", extra={"attempt": attempt + 1, "delay": round(delay, 3)}
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after is None:
+                try:
+                    retry_after = response.json().get("error_extra", {}).get("retry_after")
+                except (ValueError, AttributeError):
+                    retry_after = None
+            seconds = _retry_after_seconds(retry_after)
+            if seconds is not None:
+                return seconds + random.uniform(0, self._backoff)
+        delay: float = self._backoff * 2**attempt
+        return delay * random.uniform(0.5, 1.5)
+
+
+def _retry_after_seconds(value: Any) -> Optional[float]:
+    """Seconds to wait from a Retry-After value (delay or HTTP-date).
+
+    Returns:
+        Non-negative delay, or None if the value is missing or malformed
+    """
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        pass
+    else:
+        return max(0.0, seconds) if math.isfinite(seconds) else None
+    try:
+        moment = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        return None
+    return max(0.0, moment.timestamp() - time.time())
@@ -0,0 +1,14 @@
+"""Unified background job runtime (enrichment, transcription, reminders, sync)."""
+
+from src.jobs.definitions import ExecutionMode, Job, JobPriority, JobState, JobType
+from src.jobs.runtime import JobRuntime, JobTypeStats
+
+__all__ = [
+    "ExecutionMode",
+    "Job",
+    "JobPriority",
+    "JobRuntime",
+    "JobState",
+    "JobType",
+    "JobTypeStats",
+]
@@ -0,0 +1,129 @@
+"""Typed job definitions for the background job runtime."""
+
+import asyncio
+import random
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum
+from typing import Any, Awaitable, Callable, Generic, Optional, Tuple, Type, TypeVar, Union
+
+P = TypeVar("P")
+R = TypeVar("R")
+
+Handler = Union[Callable[[P], Awaitable[R]], Callable[[P], R]]
+
+
+class JobPriority(IntEnum):
+    """Scheduling priority, lower value runs first."""
+
+    # A user is waiting for the result (transcribing a voice note they just sent)
+    INTERACTIVE = 0
+    # Time-sensitive (reminder delivery)
+    HIGH = 1
+    # Regular background work (summaries, tags, embeddings)
+    NORMAL = 2
+    # Can lag behind (Todoist sync)
+    LOW = 3
+    # Backfills and re-indexing
+    BULK = 4
+
+
+class ExecutionMode(str, Enum):
+    """Where a job handler runs."""
+
+    # Coroutine on the event loop (plain functions run in a thread)
+    IO = "io"
+    # Module-level function in the process pool (payload and result are pickled)
+    CPU = "cpu"
+
+
+class JobState(str, Enum):
+    """Job lifecycle state."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    RETRY_WAIT = "retry_wait"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+@dataclass(frozen=True)
+class JobType(Generic[P, R]):
+    """Kind of background work and how the runtime treats it.
+
+    Attributes:
+        name: Unique name (metrics label, idempotency namespace)
+        handler: Receives the payload; a coroutine function for ``IO``,
+            a picklable module-level function for ``CPU``
+        mode: Where the handler runs
+        priority: Default priority of submitted jobs
+        concurrency: Jobs of this type running at the same time
+        max_attempts: Attempts before a job fails
+        backoff: Base retry delay in seconds (doubled per attempt, jittered)
+        max_backoff: Upper bound of the retry delay
+        timeout: Seconds an attempt may take (None = no limit)
+        retry_on: Exceptions worth retrying; anything else fails at once
+    """
+
+    name: str
+    handler: Handler[P, R]
+    mode: ExecutionMode = ExecutionMode.IO
+    priority: JobPriority = JobPriority.NORMAL
+    concurrency: int = 4
+    max_attempts: int = 3
+    backoff: float = 1.0
+    max_backoff: float = 60.0
+    timeout: Optional[float] = None
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,)
+
+    def retry_delay(self, attempt: int, error: BaseException) -> float:
+        """Delay before the next attempt.
+
+        Honours ``retry_after``/``retry_in`` hints of the error (Telegram
+        flood waits, open circuits), otherwise exponential backoff with
+        jitter so failed jobs of one burst do not retry in lockstep.
+
+        Args:
+            attempt: Number of the attempt that failed (1-based)
+            error: Raised exception
+        """
+        hint = getattr(error, "retry_after", None) or getattr(error, "retry_in", None)
+        if isinstance(hint, (int, float)) and hint > 0:
+            return float(hint)
+        delay = min(self.max_backoff, self.backoff * 2.0 ** (attempt - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+
+@dataclass(eq=False)
+class Job(Generic[R]):
+    """One submitted unit of work.
+
+    Attributes:
+        id: Sequence number within the runtime
+        type: Job type name
+        payload: Handler argument
+        priority: Effective priority
+        key: Idempotency key (None = not deduplicated)
+        state: Lifecycle state
+        attempts: Attempts made so far
+        enqueued_at: Time the job became runnable (monotonic)
+        started_at: Start time of the last attempt (monotonic)
+        future: Resolved with the handler result or its final error
+    """
+
+    id: int
+    type: str
+    payload: Any
+    priority: int
+    key: Optional[str]
+    future: "asyncio.Future[R]"
+    state: JobState = JobState.QUEUED
+    attempts: int = 0
+    enqueued_at: float = 0.0
+    started_at: float = 0.0
+    error: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        """Whether the job reached a final state."""
+        return self.state in (JobState.SUCCEEDED, JobState.FAILED, JobState.CANCELLED)
@@ -0,0 +1,490 @@
+"""Priority-aware runtime for background jobs.
+
+Enrichment (summaries, tags, embeddings), transcription, reminder delivery
+and Todoist sync all compete for the same CPU, database pool and LLM
+budget. Instead of each running its own loop, they register a ``JobType``
+and submit jobs to one ``JobRuntime``:
+
+* One dispatcher picks the next job across all types: lowest priority
+  value first, then submission order. A job gains one priority level per
+  ``aging`` seconds of waiting, so bulk work is delayed but never starved;
+  this also holds within a type for jobs submitted with a lower priority.
+* ``JobType.concurrency`` caps running jobs per type and ``workers`` caps
+  them overall, so a backfill cannot take every database connection
+  from reminder delivery.
+* ``IO`` handlers run as coroutines on the event loop and ``CPU`` handlers
+  run in a process pool, so parsing and vector math do not block the bot.
+* Failed attempts are retried with jittered exponential backoff; errors
+  carrying ``retry_after``/``retry_in`` (flood waits, open circuits) are
+  retried after that hint instead. A timed-out ``CPU`` or blocking ``IO``
+  attempt cannot be interrupted, so it keeps its slot until it actually
+  ends and the retry never runs alongside it.
+* A job submitted with an idempotency ``key`` is deduplicated against
+  queued, running and recently succeeded jobs of its type: the caller gets
+  the existing job back.
+
+``stats()`` returns a JSON-ready per-type report (queue depth, queue
+latency and run time percentiles, throughput) for dashboards; the same
+data is exported as ``telemetriya_job*`` metrics.
+"""
+
+import asyncio
+import heapq
+import inspect
+import itertools
+import multiprocessing
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from src.core.logging import get_logger
+from src.core.metrics import REGISTRY, Labels
+from src.jobs.definitions import ExecutionMode, Job, JobState, JobType
+from src.utils.cache import LRUCache
+
+if TYPE_CHECKING:
+    from src.core.config import Settings
+
+logger = get_logger(__name__)
+
+P = TypeVar("P")
+R = TypeVar("R")
+
+JOBS_TOTAL = REGISTRY.counter(
+    "telemetriya_jobs_total", "Background job outcomes", ("job", "result")
+)
+JOB_QUEUE_SECONDS = REGISTRY.histogram(
+    "telemetriya_job_queue_seconds", "Time background jobs waited for a worker", ("job",)
+)
+JOB_RUN_SECONDS = REGISTRY.histogram(
+    "telemetriya_job_run_seconds", "Duration of background job attempts", ("job",)
+)
+
+_runtimes: "weakref.WeakSet[JobRuntime]" = weakref.WeakSet()
+
+
+def _job_gauges() -> Iterable[Tuple[Labels, float]]:
+    for runtime in list(_runtimes):
+        for name, queue in runtime._queues.items():
+            yield {"job": name, "state": "queued"}, float(len(queue.heap))
+            yield {"job": name, "state": "retry_wait"}, float(queue.waiting)
+            yield {"job": name, "state": "running"}, float(queue.running)
+
+
+REGISTRY.callback("telemetriya_jobs", "Background jobs by state", "gauge", _job_gauges)
+
+
+@dataclass
+class JobTypeStats:
+    """Counters and recent samples of one job type."""
+
+    submitted: int = 0
+    deduplicated: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retried: int = 0
+    cancelled: int = 0
+    queue_latency: Deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+    run_time: Deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+    finished_at: Deque[float] = field(default_factory=lambda: deque(maxlen=100_000))
+
+
+@dataclass
+class _Queue:
+    spec: JobType[Any, Any]
+    # (rank, id, job); see JobRuntime._rank
+    heap: List[Tuple[float, int, Job[Any]]] = field(default_factory=list)
+    running: int = 0
+    waiting: int = 0
+    stats: JobTypeStats = field(default_factory=JobTypeStats)
+
+
+class JobRuntime:
+    """Shared scheduler for all background work of a process."""
+
+    def __init__(
+        self,
+        workers: int = 16,
+        process_workers: Optional[int] = None,
+        *,
+        aging: Optional[float] = 30.0,
+        idempotency_ttl: float = 3600.0,
+        window: float = 60.0,
+    ) -> None:
+        """Initialize runtime.
+
+        Args:
+            workers: Jobs running at the same time across all types
+            process_workers: Size of the process pool for CPU jobs
+                (None = number of CPUs); created on the first CPU job
+            aging: Seconds of waiting that raise a job by one priority level
+                (None = strict priorities)
+            idempotency_ttl: Seconds a succeeded job's key is remembered
+            window: Seconds of history used for throughput
+        """
+        self._workers = workers
+        self._process_workers = process_workers
+        self._aging = aging
+        self._window = window
+        self._queues: Dict[str, _Queue] = {}
+        self._delayed: List[Tuple[float, int, Job[Any]]] = []
+        self._active: Dict[Tuple[str, str], Job[Any]] = {}
+        self._succeeded: LRUCache[Tuple[str, str], Job[Any]] = LRUCache(
+            maxsize=100_000, ttl=idempotency_ttl
+        )
+        self._seq = itertools.count()
+        self._running = 0
+        self._wakeup = asyncio.Event()
+        self._tasks: "Set[asyncio.Task[None]]" = set()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        _runtimes.add(self)
+
+    @classmethod
+    def from_settings(cls, settings: "Settings") -> "JobRuntime":
+        """Build a runtime from settings."""
+        return cls(settings.job_workers, settings.job_process_workers or None)
+
+    def register(self, job_type: JobType[P, R]) -> JobType[P, R]:
+        """Register a job type.
+
+        Raises:
+            ValueError: If a type with this name is already registered
+        """
+        if job_type.name in self._queues:
+            raise ValueError(f"Job type {job_type.name!r} already registered")
+        if job_type.concurrency < 1:
+            raise ValueError("Job type concurrency must be at least 1")
+        self._queues[job_type.name] = _Queue(job_type)
+        return job_type
+
+    @property
+    def pending(self) -> int:
+        """Jobs queued, waiting for a retry or running."""
+        return sum(len(q.heap) + q.waiting + q.running for q in self._queues.values())
+
+    def submit(
+        self,
+        job_type: JobType[P, R],
+        payload: P,
+        *,
+        key: Optional[str] = None,
+        priority: Optional[int] = None,
+        delay: float = 0.0,
+    ) -> Job[R]:
+        """Submit a job.
+
+        Args:
+            job_type: Registered job type
+            payload: Handler argument (picklable for CPU jobs)
+            key: Idempotency key; a queued, running or recently succeeded
+                job of the same type and key is returned instead
+            priority: Override of the type's priority
+            delay: Seconds before the job becomes runnable
+
+        Returns:
+            Job whose ``future`` resolves with the result
+
+        Raises:
+            KeyError: If the job type is not registered
+        """
+        queue = self._queues[job_type.name]
+        if key is not None:
+            existing = self._active.get((job_type.name, key)) or self._succeeded.get(
+                (job_type.name, key)
+            )
+            if existing is not None:
+                queue.stats.deduplicated += 1
+                JOBS_TOTAL.labels(job_type.name, "deduplicated").inc()
+                return existing
+        job: Job[R] = Job(
+            id=next(self._seq),
+            type=job_type.name,
+            payload=payload,
+            priority=job_type.priority if priority is None else priority,
+            key=key,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        # Fire-and-forget jobs: the failure is logged, not left unretrieved
+        job.future.add_done_callback(_consume)
+        if key is not None:
+            self._active[(job_type.name, key)] = job
+        queue.stats.submitted += 1
+        if delay > 0:
+            queue.waiting += 1
+            heapq.heappush(self._delayed, (time.monotonic() + delay, job.id, job))
+        else:
+            self._enqueue(queue, job)
+        self._wakeup.set()
+        return job
+
+    async def run(self, job_type: JobType[P, R], payload: P, **kwargs: Any) -> R:
+        """Submit a job and wait for its result."""
+        return await self.submit(job_type, payload, **kwargs).future
+
+    def start(self) -> None:
+        """Start the dispatcher."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._dispatch(), name="job-runtime")
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop the dispatcher.
+
+        Args:
+            drain: Finish queued jobs (including pending retries) first;
+                otherwise running jobs and queued jobs are cancelled
+        """
+        if drain and self._task is not None:
+            while self.pending:
+                await asyncio.sleep(0.01)
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        queued = [job for q in self._queues.values() for _, _, job in q.heap]
+        for job in queued + [job for _, _, job in self._delayed]:
+            self._finish(self._queues[job.type], job, JobState.CANCELLED)
+        for queue in self._queues.values():
+            queue.heap.clear()
+            queue.waiting = 0
+        self._delayed.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=drain, cancel_futures=not drain)
+            self._pool = None
+        _runtimes.discard(self)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-type report for dashboards (JSON-serializable)."""
+        now = time.monotonic()
+        report: Dict[str, Dict[str, Any]] = {}
+        for name, queue in self._queues.items():
+            stats = queue.stats
+            recent = sum(1 for at in stats.finished_at if now - at <= self._window)
+            report[name] = {
+                "mode": queue.spec.mode.value,
+                "priority": int(queue.spec.priority),
+                "concurrency": queue.spec.concurrency,
+                "queued": len(queue.heap),
+                "retry_wait": queue.waiting,
+                "running": queue.running,
+                "submitted": stats.submitted,
+                "deduplicated": stats.deduplicated,
+                "succeeded": stats.succeeded,
+                "failed": stats.failed,
+                "retried": stats.retried,
+                "cancelled": stats.cancelled,
+                "throughput_per_second": round(recent / self._window, 3),
+                "queue_latency_ms": _summary(stats.queue_latency),
+                "run_time_ms": _summary(stats.run_time),
+            }
+        return report
+
+    def _enqueue(self, queue: _Queue, job: Job[Any]) -> None:
+        job.state = JobState.QUEUED
+        job.enqueued_at = time.monotonic()
+        heapq.heappush(queue.heap, (self._rank(job), job.id, job))
+
+    def _rank(self, job: Job[Any]) -> float:
+        """Heap order within a type that stays valid as jobs age.
+
+        Aging lowers every waiting job's priority at the same rate, so the
+        order by ``priority - waited / aging`` equals the order by
+        ``priority * aging + enqueued_at``, which does not change over time:
+        the heap head is always the job with the best aged priority.
+        """
+        if self._aging:
+            return job.priority * self._aging + job.enqueued_at
+        return float(job.priority)
+
+    def _effective(self, job: Job[Any], now: float) -> Tuple[int, int]:
+        priority = job.priority
+        if self._aging:
+            priority = max(0, priority - int((now - job.enqueued_at) // self._aging))
+        return priority, job.id
+
+    def _pick(self, now: float) -> Optional[Tuple[_Queue, Job[Any]]]:
+        best: Optional[Tuple[Tuple[int, int], _Queue]] = None
+        for queue in self._queues.values():
+            if not queue.heap or queue.running >= queue.spec.concurrency:
+                continue
+            rank = self._effective(queue.heap[0][2], now)
+            if best is None or rank < best[0]:
+                best = (rank, queue)
+        if best is None:
+            return None
+        queue = best[1]
+        return queue, heapq.heappop(queue.heap)[2]
+
+    async def _dispatch(self) -> None:
+        while True:
+            now = time.monotonic()
+            while self._delayed and self._delayed[0][0] <= now:
+                _, _, job = heapq.heappop(self._delayed)
+                queue = self._queues[job.type]
+                queue.waiting -= 1
+                self._enqueue(queue, job)
+            picked = self._pick(now) if self._running < self._workers else None
+            if picked is None:
+                timeout = self._delayed[0][0] - now if self._delayed else None
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            queue, job = picked
+            queue.running += 1
+            self._running += 1
+            task = asyncio.create_task(self._execute(queue, job), name=f"job-{job.type}")
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, queue: _Queue, job: Job[Any]) -> None:
+        spec = queue.spec
+        job.state = JobState.RUNNING
+        job.attempts += 1
+        job.started_at = time.monotonic()
+        waited = job.started_at - job.enqueued_at
+        queue.stats.queue_latency.append(waited)
+        JOB_QUEUE_SECONDS.labels(spec.name).observe(waited)
+        work, blocking = self._start(spec, job.payload)
+        try:
+            # A thread or process cannot be stopped: a timeout must not
+            # cancel the future that tells when it has really finished
+            attempt = asyncio.shield(work) if blocking else work
+            result = await asyncio.wait_for(attempt, spec.timeout)
+        except asyncio.CancelledError:
+            work.cancel()
+            self._finish(queue, job, JobState.CANCELLED)
+            raise
+        except Exception as error:
+            if not work.done():
+                # Timed out in a thread or process: keep the slot until it ends
+                try:
+                    await asyncio.wait([work])
+                except asyncio.CancelledError:
+                    self._finish(queue, job, JobState.CANCELLED)
+                    raise
+            self._observe_run(queue, job)
+            if isinstance(error, spec.retry_on) and job.attempts < spec.max_attempts:
+                delay = spec.retry_delay(job.attempts, error)
+                queue.stats.retried += 1
+                queue.waiting += 1
+                job.state = JobState.RETRY_WAIT
+                job.error = repr(error)
+                JOBS_TOTAL.labels(spec.name, "retried").inc()
+                heapq.heappush(self._delayed, (time.monotonic() + delay, job.id, job))
+                logger.warning(
+                    "Job attempt failed, retrying",
+                    extra={"job": spec.name, "attempt": job.attempts, "delay": round(delay, 2)},
+                )
+            else:
+                self._finish(queue, job, JobState.FAILED, error=error)
+        else:
+            self._observe_run(queue, job)
+            self._finish(queue, job, JobState.SUCCEEDED, result=result)
+        finally:
+            queue.running -= 1
+            self._running -= 1
+            self._wakeup.set()
+
+    def _start(self, spec: JobType[Any, Any], payload: Any) -> Tuple["asyncio.Future[Any]", bool]:
+        """Start an attempt.
+
+        Returns:
+            Tuple of (future of the result, whether it runs in a thread or
+            process and therefore cannot be cancelled)
+        """
+        work: "asyncio.Future[Any]"
+        if spec.mode is ExecutionMode.CPU:
+            if self._pool is None:
+                # spawn: forking a process with a running event loop and
+                # threads can deadlock the child
+                self._pool = ProcessPoolExecutor(
+                    self._process_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            loop = asyncio.get_running_loop()
+            work = loop.run_in_executor(self._pool, spec.handler, payload)
+            blocking = True
+        else:
+            handler = spec.handler
+            blocking = not (
+                inspect.iscoroutinefunction(handler)
+                or inspect.iscoroutinefunction(getattr(handler, "__call__", None))
+            )
+            call = asyncio.to_thread(handler, payload) if blocking else handler(payload)
+            work = asyncio.ensure_future(call)
+        # The result of an abandoned attempt is not left unretrieved
+        work.add_done_callback(_consume)
+        return work, blocking
+
+    def _observe_run(self, queue: _Queue, job: Job[Any]) -> None:
+        elapsed = time.monotonic() - job.started_at
+        queue.stats.run_time.append(elapsed)
+        JOB_RUN_SECONDS.labels(queue.spec.name).observe(elapsed)
+
+    def _finish(
+        self,
+        queue: _Queue,
+        job: Job[Any],
+        state: JobState,
+        result: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        job.state = state
+        if job.key is not None:
+            self._active.pop((job.type, job.key), None)
+        queue.stats.finished_at.append(time.monotonic())
+        if state is JobState.SUCCEEDED:
+            queue.stats.succeeded += 1
+            if job.key is not None:
+                self._succeeded.set((job.type, job.key), job)
+            if not job.future.done():
+                job.future.set_result(result)
+        elif state is JobState.FAILED:
+            queue.stats.failed += 1
+            job.error = repr(error)
+            logger.error(
+                "Job failed",
+                extra={"job": job.type, "attempts": job.attempts, "error": job.error},
+            )
+            if not job.future.done() and error is not None:
+                job.future.set_exception(error)
+        else:
+            queue.stats.cancelled += 1
+            job.future.cancel()
+        JOBS_TOTAL.labels(job.type, state.value).inc()
+
+
+def _consume(future: "asyncio.Future[Any]") -> None:
+    if not future.cancelled():
+        future.exception()
+
+
+def _summary(samples: Iterable[float]) -> Dict[str, float]:
+    """p50/p95/max of samples in milliseconds."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {"p50": at(0.5), "p95": at(0.95), "max": round(ordered[-1] * 1000, 3)}
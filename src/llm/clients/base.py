@@ -0,0 +1,74 @@
+"""LLM client interface and resilience wrapper."""
+
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Optional, Protocol
+
+from src.core.metrics import LLM_DURATION, LLM_TOKENS
+from src.core.profiling import span
+from src.utils.resilience import Dependency, get_dependency
+
+
+@dataclass(slots=True)
+class Completion:
+    """LLM completion result."""
+
+    text: str
+    model: str = ""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class LLMClient(Protocol):
+    """Provider client (ollama, openai, glm)."""
+
+    async def complete(self, prompt: str, **kwargs: Any) -> Completion:
+        """Complete a prompt."""
+        ...
+
+
+class StreamingLLMClient(Protocol):
+    """Provider client that streams completion text."""
+
+    def stream(self, prompt: str, **kwargs: Any) -> AsyncIterator[str]:
+        """Stream completion text chunks; closing the iterator stops generation."""
+        ...
+
+
+class ResilientLLMClient:
+    """Route every completion of a provider client through a ``Dependency``.
+
+    All LLM clients of one provider share the dependency (``llm:<provider>``),
+    so its circuit breaker and concurrency limit apply process-wide.
+    """
+
+    def __init__(
+        self,
+        client: LLMClient,
+        provider: str,
+        dependency: Optional[Dependency] = None,
+    ) -> None:
+        """Initialize wrapper.
+
+        Args:
+            client: Provider client
+            provider: Provider name (``Settings.llm_provider``)
+            dependency: Dependency to use instead of the shared one
+        """
+        self._client = client
+        self._duration = LLM_DURATION.labels(provider)
+        self._prompt_tokens = LLM_TOKENS.labels(provider, "prompt")
+        self._completion_tokens = LLM_TOKENS.labels(provider, "completion")
+        self.dependency = dependency or get_dependency(f"llm:{provider}", timeout=60.0)
+
+    async def complete(self, prompt: str, **kwargs: Any) -> Completion:
+        """Complete a prompt under the provider's breaker, limit and deadline."""
+        started = time.perf_counter()
+        try:
+            with span("llm"):
+                completion = await self.dependency.call(self._client.complete, prompt, **kwargs)
+        finally:
+            self._duration.observe(time.perf_counter() - started)
+        self._prompt_tokens.inc(completion.prompt_tokens)
+        self._completion_tokens.inc(completion.completion_tokens)
+        return completion
@@ -0,0 +1,185 @@
+"""Fused note enrichment: category, tags and summary in one LLM call.
+
+The fused prompt asks for a single JSON object covering all three fields,
+so the note is sent (and billed) once instead of three times. The output
+is validated field by field against ``NoteEnrichment``; only fields that
+are missing or invalid are requested again with their single-field
+prompt. ``enrich_separately`` runs the classic three-call pipeline and is
+kept for comparison (``scripts/bench_enrichment.py``) and as a fallback.
+
+The combined JSON schema is passed to the client as ``json_schema`` so
+providers with structured output support can enforce it.
+"""
+
+import asyncio
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+from pydantic import ValidationError
+
+from src.core.logging import get_logger
+from src.llm.clients.base import Completion, LLMClient
+from src.llm.prompts.enrichment import FIELD_PROMPTS, FUSED
+from src.llm.schemas.enrichment import FIELD_ADAPTERS, NoteEnrichment
+
+logger = get_logger(__name__)
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.S)
+
+
+class EnrichmentError(Exception):
+    """A field could not be produced even by its single-field prompt."""
+
+    def __init__(self, field_name: str, reason: str) -> None:
+        super().__init__(f"Enrichment field {field_name!r} failed: {reason}")
+        self.field_name = field_name
+
+
+@dataclass
+class EnrichmentResult:
+    """Enrichment with its cost."""
+
+    enrichment: NoteEnrichment
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: float = 0.0
+    fallback_fields: List[str] = field(default_factory=list)
+
+    @property
+    def tokens(self) -> int:
+        """Total tokens spent."""
+        return self.prompt_tokens + self.completion_tokens
+
+
+def extract_json(text: str) -> Dict[str, Any]:
+    """Parse the JSON object in an LLM reply (code fences and chatter allowed).
+
+    Raises:
+        ValueError: If the reply holds no JSON object
+    """
+    match = _JSON_OBJECT.search(text)
+    if match is None:
+        raise ValueError("No JSON object in reply")
+    data = json.loads(match.group(0))
+    if not isinstance(data, dict):
+        raise ValueError("Reply is not a JSON object")
+    return data
+
+
+def validate_fields(data: Dict[str, Any], names: Sequence[str]) -> Dict[str, Any]:
+    """Validate ``names`` of ``data`` independently; invalid fields are left out."""
+    valid: Dict[str, Any] = {}
+    for name in names:
+        if name not in data:
+            continue
+        try:
+            valid[name] = FIELD_ADAPTERS[name].validate_python(data[name])
+        except ValidationError:
+            continue
+    return valid
+
+
+class NoteEnricher:
+    """Classify, tag and summarize notes with one structured call."""
+
+    def __init__(self, client: LLMClient) -> None:
+        """Initialize enricher.
+
+        Args:
+            client: LLM client (typically a ``ResilientLLMClient``)
+        """
+        self._client = client
+
+    async def enrich(self, text: str) -> EnrichmentResult:
+        """Enrich a note with the fused prompt, re-asking only for broken fields.
+
+        Args:
+            text: Note text
+
+        Returns:
+            Validated enrichment and what it cost
+
+        Raises:
+            EnrichmentError: If a field stays invalid after its fallback call
+        """
+        started = time.perf_counter()
+        result = _Accumulator()
+        completion = await self._complete(
+            FUSED.render(text=text),
+            result,
+            json_schema=NoteEnrichment.model_json_schema(),
+        )
+        try:
+            data = extract_json(completion.text)
+        except ValueError:
+            data = {}
+        fields = validate_fields(data, list(FIELD_ADAPTERS))
+
+        missing = [name for name in FIELD_ADAPTERS if name not in fields]
+        if missing:
+            logger.info("Fused enrichment incomplete", extra={"fallback_fields": missing})
+            values = await asyncio.gather(*(self._field(name, text, result) for name in missing))
+            fields.update(zip(missing, values))
+        return result.finish(NoteEnrichment(**fields), started, missing)
+
+    async def enrich_separately(self, text: str, concurrent: bool = False) -> EnrichmentResult:
+        """Enrich a note with one call per field (the unfused pipeline).
+
+        Args:
+            text: Note text
+            concurrent: Send the three calls at once instead of one by one
+
+        Returns:
+            Validated enrichment and what it cost
+        """
+        started = time.perf_counter()
+        result = _Accumulator()
+        names = list(FIELD_ADAPTERS)
+        if concurrent:
+            values = await asyncio.gather(*(self._field(name, text, result) for name in names))
+        else:
+            values = [await self._field(name, text, result) for name in names]
+        return result.finish(NoteEnrichment(**dict(zip(names, values))), started, [])
+
+    async def _field(self, name: str, text: str, result: "_Accumulator") -> Any:
+        prompt = FIELD_PROMPTS[name].render(text=text)
+        completion = await self._complete(prompt, result)
+        try:
+            valid = validate_fields(extract_json(completion.text), [name])
+        except ValueError as e:
+            raise EnrichmentError(name, str(e)) from e
+        if name not in valid:
+            raise EnrichmentError(name, "invalid value")
+        return valid[name]
+
+    async def _complete(self, prompt: str, result: "_Accumulator", **kwargs: Any) -> Completion:
+        completion = await self._client.complete(prompt, **kwargs)
+        result.calls += 1
+        result.prompt_tokens += completion.prompt_tokens
+        result.completion_tokens += completion.completion_tokens
+        return completion
+
+
+class _Accumulator:
+    """Cost counters shared by the calls of one enrichment."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def finish(
+        self, enrichment: NoteEnrichment, started: float, fallback: List[str]
+    ) -> EnrichmentResult:
+        return EnrichmentResult(
+            enrichment=enrichment,
+            calls=self.calls,
+            prompt_tokens=self.prompt_tokens,
+            completion_tokens=self.completion_tokens,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            fallback_fields=list(fallback),
+        )
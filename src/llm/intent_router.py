@@ -0,0 +1,392 @@
+"""Two-stage intent router: local classifiers first, LLM only when unsure.
+
+Stage 1 matches cheap precompiled keyword rules ("напомни …", "саммари").
+Stage 2 embeds the message and picks the nearest intent centroid; it is
+accepted only when the similarity and the margin over the runner-up clear
+configured thresholds. Only the remaining low-confidence messages are sent
+to the LLM classifier. Hit rates and latency of every stage are tracked in
+``RouterStats`` and logged.
+"""
+
+import json
+import math
+import re
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+)
+
+from src.core.logging import get_logger
+from src.llm.schemas.intent import INTENT_ROUTES, Intent, IntentPrediction
+
+logger = get_logger(__name__)
+
+STAGE_RULES = "rules"
+STAGE_CENTROID = "centroid"
+STAGE_LLM = "llm"
+STAGE_FALLBACK = "fallback"
+
+Vector = List[float]
+LLMClassifier = Callable[[str], Awaitable[IntentPrediction]]
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+class Embedder(Protocol):
+    """Text embedding model."""
+
+    def embed(self, texts: Sequence[str]) -> List[Vector]:
+        """Embed texts into L2-normalized vectors."""
+        ...
+
+
+class HashingEmbedder:
+    """Character n-gram hashing embedder.
+
+    Dependency-free and deterministic: character trigrams of each word are
+    hashed (CRC32) into a fixed number of buckets. Good enough to separate
+    short intent phrasings and used when no sentence-transformers model is
+    configured.
+    """
+
+    def __init__(self, dim: int = 512, ngram: int = 3) -> None:
+        self._dim = dim
+        self._ngram = ngram
+
+    def embed(self, texts: Sequence[str]) -> List[Vector]:
+        return [self._embed_one(text) for text in texts]
+
+    def _embed_one(self, text: str) -> Vector:
+        vector = [0.0] * self._dim
+        for word in _WORD_PATTERN.findall(text.lower().replace("ё", "е")):
+            padded = f"<{word}>"
+            for i in range(max(len(padded) - self._ngram + 1, 1)):
+                gram = padded[i : i + self._ngram]
+                vector[zlib.crc32(gram.encode("utf-8")) % self._dim] += 1.0
+        return _normalize(vector)
+
+
+class SentenceTransformerEmbedder:
+    """Adapter for a sentence-transformers model (loaded lazily)."""
+
+    def __init__(self, model_name: str = "paraphrase-multilingual-MiniLM-L12-v2") -> None:
+        self._model_name = model_name
+        self._model: Any = None
+
+    def embed(self, texts: Sequence[str]) -> List[Vector]:
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+
+            self._model = SentenceTransformer(self._model_name)
+        vectors = self._model.encode(list(texts), normalize_embeddings=True)
+        return [list(map(float, vector)) for vector in vectors]
+
+
+def _normalize(vector: Vector) -> Vector:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else vector
+
+
+def _dot(a: Vector, b: Vector) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+@dataclass(frozen=True)
+class IntentRule:
+    """Keyword rule mapping a message pattern to an intent."""
+
+    intent: Intent
+    pattern: "re.Pattern[str]"
+
+
+DEFAULT_RULES: Tuple[IntentRule, ...] = (
+    IntentRule(Intent.REMINDER, re.compile(r"^\s*(напомни|напоминание|не забудь)", re.I)),
+    IntentRule(
+        Intent.SUMMARIZE,
+        re.compile(r"\b(саммари|резюме|кратко перескажи|выжимк|суммаризир)", re.I),
+    ),
+    IntentRule(
+        Intent.SEARCH,
+        re.compile(r"^\s*(найди|поищи|покажи)|что я (кидал|скидывал|писал|сохранял)", re.I),
+    ),
+    IntentRule(Intent.TODOIST, re.compile(r"^\s*(добавь задачу|в todoist|задача:)", re.I)),
+    IntentRule(Intent.HELP, re.compile(r"^\s*(/help|помощь|что ты умеешь)", re.I)),
+)
+
+# Seed phrasings used to build intent centroids
+DEFAULT_EXAMPLES: Dict[Intent, Tuple[str, ...]] = {
+    Intent.NOTE: (
+        "купить молоко и хлеб",
+        "идея для статьи про асинхронный python",
+        "встреча с командой прошла хорошо, обсудили релиз",
+        "ссылка на интересный доклад",
+        "рецепт пирога: мука, яйца, сахар",
+        "мысли о проекте на выходные",
+    ),
+    Intent.SEARCH: (
+        "найди заметку про отпуск",
+        "где мои записи о python",
+        "покажи всё про встречи",
+        "что я сохранял про рецепты",
+        "поиск по заметкам о книгах",
+    ),
+    Intent.SUMMARIZE: (
+        "сделай саммари статьи",
+        "перескажи кратко последнюю заметку",
+        "о чём была статья, которую я скинул",
+        "сделай выжимку из документа",
+        "кратко: что в последнем pdf",
+    ),
+    Intent.REMINDER: (
+        "напомни завтра позвонить маме",
+        "поставь напоминание на 9 утра",
+        "не дай забыть про встречу в пятницу",
+        "через два часа напомнить выпить таблетки",
+    ),
+    Intent.TODOIST: (
+        "добавь задачу сдать отчёт",
+        "создай таск в todoist",
+        "запиши в задачи купить билеты",
+        "поставь задачу на неделю",
+    ),
+    Intent.HELP: (
+        "что ты умеешь",
+        "как пользоваться ботом",
+        "помоги разобраться с командами",
+    ),
+}
+
+
+@dataclass
+class StageStats:
+    """Counters for a single router stage."""
+
+    hits: int = 0
+    attempts: int = 0
+    total_latency_ms: float = 0.0
+
+    @property
+    def avg_latency_ms(self) -> float:
+        """Average latency per attempt."""
+        return self.total_latency_ms / self.attempts if self.attempts else 0.0
+
+
+@dataclass
+class RouterStats:
+    """Aggregated router statistics."""
+
+    total: int = 0
+    stages: Dict[str, StageStats] = field(
+        default_factory=lambda: {
+            name: StageStats() for name in (STAGE_RULES, STAGE_CENTROID, STAGE_LLM, STAGE_FALLBACK)
+        }
+    )
+
+    def hit_rate(self, stage: str) -> float:
+        """Share of all routed messages resolved by ``stage``."""
+        return self.stages[stage].hits / self.total if self.total else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Serialize stats for logging."""
+        return {
+            "total": self.total,
+            **{f"{name}_hit_rate": round(self.hit_rate(name), 4) for name in self.stages},
+            **{
+                f"{name}_avg_ms": round(stats.avg_latency_ms, 3)
+                for name, stats in self.stages.items()
+            },
+        }
+
+
+def load_examples(path: Path) -> Dict[Intent, List[str]]:
+    """Load labelled phrasings from an eval dataset (JSONL).
+
+    Args:
+        path: File with ``{"input": ..., "expected_intent": ...}`` lines
+
+    Returns:
+        Mapping of intent to example inputs (unknown intents are skipped)
+    """
+    examples: Dict[Intent, List[str]] = {}
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            case = json.loads(line)
+            try:
+                intent = Intent(case["expected_intent"])
+            except ValueError:
+                continue
+            examples.setdefault(intent, []).append(case["input"])
+    return examples
+
+
+class IntentRouter:
+    """Route messages to intents with rules, centroids and an LLM fallback."""
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        llm_classifier: Optional[LLMClassifier] = None,
+        *,
+        rules: Sequence[IntentRule] = DEFAULT_RULES,
+        examples: Optional[Mapping[Intent, Sequence[str]]] = None,
+        min_similarity: float = 0.35,
+        min_margin: float = 0.05,
+        stats_log_every: int = 1000,
+    ) -> None:
+        """Initialize router.
+
+        Args:
+            embedder: Embedding model for the centroid stage
+            llm_classifier: Coroutine classifying low-confidence messages
+            rules: Keyword rules tried first
+            examples: Labelled phrasings per intent (defaults to built-in seeds)
+            min_similarity: Minimum cosine similarity to the nearest centroid
+            min_margin: Minimum similarity gap to the second-nearest centroid
+            stats_log_every: Log aggregated stats every N routed messages
+        """
+        self._embedder: Embedder = embedder or HashingEmbedder()
+        self._llm_classifier = llm_classifier
+        self._rules = tuple(rules)
+        self._min_similarity = min_similarity
+        self._min_margin = min_margin
+        self._stats_log_every = stats_log_every
+        self.stats = RouterStats()
+        self._centroids = self._build_centroids(examples or DEFAULT_EXAMPLES)
+
+    def _build_centroids(self, examples: Mapping[Intent, Sequence[str]]) -> Dict[Intent, Vector]:
+        centroids: Dict[Intent, Vector] = {}
+        for intent, texts in examples.items():
+            if not texts:
+                continue
+            vectors = self._embedder.embed(list(texts))
+            summed = [sum(column) for column in zip(*vectors)]
+            centroids[intent] = _normalize(summed)
+        return centroids
+
+    def match_rules(self, text: str) -> Optional[IntentPrediction]:
+        """Stage 1: keyword rules.
+
+        Args:
+            text: User message
+
+        Returns:
+            Prediction with confidence 1.0, or None if no rule matched
+        """
+        for rule in self._rules:
+            if rule.pattern.search(text):
+                return _prediction(rule.intent, 1.0, STAGE_RULES)
+        return None
+
+    def classify_centroid(self, text: str) -> Tuple[IntentPrediction, bool]:
+        """Stage 2: nearest intent centroid.
+
+        Args:
+            text: User message
+
+        Returns:
+            Tuple of (best prediction, whether it clears the confidence thresholds)
+        """
+        vector = self._embedder.embed([text])[0]
+        scored = sorted(
+            ((_dot(vector, centroid), intent) for intent, centroid in self._centroids.items()),
+            reverse=True,
+        )
+        best_score, best_intent = scored[0]
+        runner_up = scored[1][0] if len(scored) > 1 else 0.0
+        confident = (
+            best_score >= self._min_similarity and best_score - runner_up >= self._min_margin
+        )
+        confidence = min(max(best_score, 0.0), 1.0)
+        return _prediction(best_intent, confidence, STAGE_CENTROID), confident
+
+    async def route(self, text: str) -> IntentPrediction:
+        """Route a message through the stages.
+
+        Args:
+            text: User message
+
+        Returns:
+            Intent prediction annotated with the deciding stage
+        """
+        self.stats.total += 1
+
+        with self._timed(STAGE_RULES) as stage:
+            prediction = self.match_rules(text)
+            stage.hit = prediction is not None
+        if prediction is None:
+            with self._timed(STAGE_CENTROID) as stage:
+                guess, confident = self.classify_centroid(text)
+                stage.hit = confident
+            if confident:
+                prediction = guess
+            elif self._llm_classifier is not None:
+                with self._timed(STAGE_LLM) as stage:
+                    try:
+                        prediction = await self._llm_classifier(text)
+                    except Exception:
+                        logger.exception("LLM intent classification failed")
+                    else:
+                        prediction.stage = STAGE_LLM
+                        stage.hit = True
+            if prediction is None:
+                with self._timed(STAGE_FALLBACK) as stage:
+                    prediction = guess.model_copy(update={"stage": STAGE_FALLBACK})
+                    stage.hit = True
+
+        logger.debug(
+            "Intent routed",
+            extra={
+                "intent": prediction.intent.value,
+                "stage": prediction.stage,
+                "confidence": round(prediction.confidence, 3),
+            },
+        )
+        if self._stats_log_every and self.stats.total % self._stats_log_every == 0:
+            self.log_stats()
+        return prediction
+
+    def log_stats(self) -> None:
+        """Log stage hit rates and average latencies."""
+        logger.info("Intent router stats", extra=self.stats.as_dict())
+
+    def _timed(self, stage: str) -> "_StageTimer":
+        return _StageTimer(self.stats.stages[stage])
+
+
+class _StageTimer:
+    """Context manager recording one stage attempt."""
+
+    def __init__(self, stats: StageStats) -> None:
+        self._stats = stats
+        self.hit = False
+        self._started = 0.0
+
+    def __enter__(self) -> "_StageTimer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stats.attempts += 1
+        self._stats.total_latency_ms += (time.perf_counter() - self._started) * 1000
+        if self.hit:
+            self._stats.hits += 1
+
+
+def _prediction(intent: Intent, confidence: float, stage: str) -> IntentPrediction:
+    return IntentPrediction(
+        intent=intent, route=INTENT_ROUTES[intent], confidence=confidence, stage=stage
+    )
@@ -0,0 +1,586 @@
+"""Local model server sharing one embedding model and vector indexes across processes.
+
+Every uvicorn worker and the bot process would otherwise load their own
+copy of the sentence-transformers model (and of any ``VectorIndex``),
+multiplying RAM and startup time. ``ModelServer`` loads them once and
+serves them over a Unix socket; ``ModelClient`` is what workers use.
+
+* Frames are length-prefixed: a JSON header plus an optional binary
+  payload (float32 vectors travel as raw bytes, never as JSON lists).
+* Requests are pipelined over one connection per client and matched to
+  responses by id.
+* Concurrent ``embed`` requests from all clients are micro-batched: the
+  server waits up to ``batch_window`` for more texts (up to ``max_batch``)
+  and runs one model call for all of them in a worker thread.
+* Large array results are written into a shared-memory arena owned by the
+  client instead of being pushed through the socket; the client copies
+  them out with a single memcpy. The arena grows when a result does not fit.
+* The client reconnects transparently (requests are idempotent and are
+  retried with backoff) and ``health()`` reports model, indexes and load.
+
+Run the server with ``python -m src.llm.model_server --socket PATH``; the
+same command with ``--check`` is a health check for process supervisors.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import struct
+import sys
+import time
+from dataclasses import asdict, dataclass
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from src.core.config import Settings
+from src.core.logging import get_logger
+from src.llm.intent_router import Embedder, HashingEmbedder, SentenceTransformerEmbedder
+from src.storage.vectors import VectorIndex
+
+logger = get_logger(__name__)
+
+FloatArray = npt.NDArray[np.float32]
+Frame = Tuple[Dict[str, Any], bytes]
+
+_HEADER = struct.Struct("!II")
+DEFAULT_SOCKET = "/tmp/telemetriya-models.sock"
+
+# Arenas created by clients in this process (their tracker registration must stay)
+_own_arenas: Set[str] = set()
+
+
+class ModelServerError(Exception):
+    """The model server rejected a request."""
+
+
+class ModelServerUnavailableError(ModelServerError):
+    """The model server cannot be reached."""
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Frame:
+    meta_size, payload_size = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    meta = json.loads(await reader.readexactly(meta_size))
+    payload = await reader.readexactly(payload_size) if payload_size else b""
+    return meta, payload
+
+
+def _frame(meta: Dict[str, Any], payload: bytes = b"") -> bytes:
+    header = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(len(header), len(payload)) + header + payload
+
+
+def _attach(name: str) -> SharedMemory:
+    """Attach to a client's arena without letting this process unlink it on exit."""
+    shm = SharedMemory(name=name)
+    if name not in _own_arenas:
+        resource_tracker.unregister(getattr(shm, "_name", "/" + name), "shared_memory")
+    return shm
+
+
+@dataclass
+class ModelServerStats:
+    """Model server counters."""
+
+    requests: int = 0
+    errors: int = 0
+    batches: int = 0
+    batched_texts: int = 0
+    shm_responses: int = 0
+    connections: int = 0
+
+
+class ModelServer:
+    """Serve an embedder and vector indexes over a Unix socket."""
+
+    def __init__(
+        self,
+        path: str,
+        embedder: Embedder,
+        indexes: Optional[Dict[str, VectorIndex]] = None,
+        max_batch: int = 64,
+        batch_window: float = 0.002,
+        model_name: str = "",
+    ) -> None:
+        """Initialize server.
+
+        Args:
+            path: Unix socket path
+            embedder: Loaded embedding model
+            indexes: Vector indexes searchable by name
+            max_batch: Maximum texts per model call
+            batch_window: Seconds to wait for more texts before a model call
+            model_name: Model name reported by the health check
+        """
+        self.path = path
+        self.embedder = embedder
+        self.indexes = indexes or {}
+        self.stats = ModelServerStats()
+        self._max_batch = max_batch
+        self._batch_window = batch_window
+        self._model_name = model_name or type(embedder).__name__
+        self._queue: "asyncio.Queue[Tuple[List[str], asyncio.Future[FloatArray]]]" = asyncio.Queue()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.StreamWriter] = set()
+        self._batcher: Optional["asyncio.Task[None]"] = None
+        self._started = time.monotonic()
+
+    async def start(self) -> None:
+        """Listen on the socket (a stale socket file is replaced)."""
+        Path(self.path).unlink(missing_ok=True)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+        self._batcher = asyncio.get_running_loop().create_task(self._batch_loop())
+        self._started = time.monotonic()
+        logger.info(
+            "Model server listening",
+            extra={"socket": self.path, "model": self._model_name, "indexes": list(self.indexes)},
+        )
+
+    async def stop(self) -> None:
+        """Stop listening and drop connections."""
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        Path(self.path).unlink(missing_ok=True)
+
+    async def serve_forever(self) -> None:
+        """Start and serve until cancelled."""
+        await self.start()
+        assert self._server is not None
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    def health(self) -> Dict[str, Any]:
+        """Health report."""
+        return {
+            "status": "ok",
+            "model": self._model_name,
+            "indexes": {name: len(index) for name, index in self.indexes.items()},
+            "uptime": round(time.monotonic() - self._started, 3),
+            "queued": self._queue.qsize(),
+            **asdict(self.stats),
+        }
+
+    async def embed(self, texts: List[str]) -> FloatArray:
+        """Embed texts as part of the next model batch."""
+        future: "asyncio.Future[FloatArray]" = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future))
+        return await future
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats.connections += 1
+        self._connections.add(writer)
+        arenas: Dict[str, SharedMemory] = {}
+        lock = asyncio.Lock()
+        tasks: "set[asyncio.Task[None]]" = set()
+        try:
+            while True:
+                meta, payload = await _read_frame(reader)
+                task = asyncio.get_running_loop().create_task(
+                    self._respond(meta, payload, writer, lock, arenas)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for task in list(tasks):
+                task.cancel()
+            for arena in arenas.values():
+                arena.close()
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _respond(
+        self,
+        meta: Dict[str, Any],
+        payload: bytes,
+        writer: asyncio.StreamWriter,
+        lock: asyncio.Lock,
+        arenas: Dict[str, SharedMemory],
+    ) -> None:
+        self.stats.requests += 1
+        response: Dict[str, Any] = {"id": meta.get("id")}
+        body = b""
+        try:
+            result = await self._dispatch(meta, payload)
+            if isinstance(result, np.ndarray):
+                response.update(shape=list(result.shape), dtype=str(result.dtype))
+                body = self._place(result, meta.get("shm"), arenas)
+                response["shm"] = not body and result.nbytes > 0
+            else:
+                response["result"] = result
+        except Exception as e:
+            self.stats.errors += 1
+            response = {"id": meta.get("id"), "error": f"{type(e).__name__}: {e}"}
+            body = b""
+        async with lock:
+            writer.write(_frame(response, body))
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    async def _dispatch(self, meta: Dict[str, Any], payload: bytes) -> Any:
+        method = meta.get("method")
+        params = meta.get("params", {})
+        if method == "health":
+            return self.health()
+        if method == "embed":
+            return await self.embed(list(params["texts"]))
+        if method == "search":
+            index = self.indexes.get(params["index"])
+            if index is None:
+                raise KeyError(f"unknown index {params['index']!r}")
+            queries = np.frombuffer(payload, dtype=np.float32).reshape(-1, index.dim)
+            k = int(params.get("k", 10))
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._search, index, queries, k)
+        raise ValueError(f"unknown method {method!r}")
+
+    def _place(
+        self, result: npt.NDArray[Any], arena_name: Optional[str], arenas: Dict[str, SharedMemory]
+    ) -> bytes:
+        """Write a result into the client's arena if it fits, else return it inline."""
+        data = np.ascontiguousarray(result)
+        if arena_name:
+            arena = arenas.get(arena_name)
+            if arena is None:
+                arena = _attach(arena_name)
+                # The client unlinked its previous arena when it made this one
+                for stale in arenas.values():
+                    stale.close()
+                arenas.clear()
+                arenas[arena_name] = arena
+            if data.nbytes <= arena.size:
+                view: npt.NDArray[Any] = np.ndarray(data.shape, dtype=data.dtype, buffer=arena.buf)
+                view[...] = data
+                del view
+                self.stats.shm_responses += 1
+                return b""
+        return data.tobytes()
+
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            count = len(batch[0][0])
+            deadline = loop.time() + self._batch_window
+            while count < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                count += len(batch[-1][0])
+            texts = [text for item, _ in batch for text in item]
+            self.stats.batches += 1
+            self.stats.batched_texts += len(texts)
+            try:
+                vectors = await loop.run_in_executor(None, self._encode, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            offset = 0
+            for item, future in batch:
+                if not future.done():
+                    future.set_result(vectors[offset : offset + len(item)])
+                offset += len(item)
+
+    def _encode(self, texts: List[str]) -> FloatArray:
+        vectors: FloatArray = np.asarray(self.embedder.embed(texts), dtype=np.float32)
+        return vectors
+
+    def _search(
+        self, index: VectorIndex, queries: FloatArray, k: int
+    ) -> List[List[Tuple[int, float]]]:
+        return [index.search(query, k) for query in queries]
+
+
+class ModelClient:
+    """Client of a ``ModelServer`` with request pipelining and reconnects."""
+
+    def __init__(
+        self,
+        path: str,
+        timeout: float = 10.0,
+        arena_size: int = 1 << 20,
+        max_arena_size: int = 64 << 20,
+        retries: int = 3,
+        retry_delay: float = 0.05,
+    ) -> None:
+        """Initialize client (connects lazily).
+
+        Args:
+            path: Server socket path
+            timeout: Seconds to wait for a response
+            arena_size: Initial shared-memory arena size in bytes (0 = no shared memory)
+            max_arena_size: Largest arena the client grows to
+            retries: Reconnect attempts per request
+            retry_delay: Initial delay between attempts (doubles each time)
+        """
+        self.path = path
+        self._timeout = timeout
+        self._arena_size = arena_size
+        self._max_arena_size = max_arena_size
+        self._retries = retries
+        self._retry_delay = retry_delay
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, "asyncio.Future[Frame]"] = {}
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional["asyncio.Task[None]"] = None
+        self._connect_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+        self._arena: Optional[SharedMemory] = None
+        self._arena_lock = asyncio.Lock()
+        self._wanted_arena_size = 0
+        self.reconnects = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional["ModelClient"]:
+        """Create a client if ``Settings.model_server_socket`` is set."""
+        if not settings.model_server_socket:
+            return None
+        return cls(settings.model_server_socket)
+
+    async def embed(self, texts: Sequence[str]) -> FloatArray:
+        """Embed texts on the server.
+
+        Returns:
+            Array of shape (len(texts), dim)
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        result: FloatArray = await self._call("embed", {"texts": list(texts)}, array=True)
+        return result
+
+    async def search(
+        self, index: str, queries: npt.ArrayLike, k: int = 10
+    ) -> List[List[Tuple[int, float]]]:
+        """Search a server-side index with one or more query vectors.
+
+        Returns:
+            ``(id, score)`` pairs per query, best first
+        """
+        matrix = np.ascontiguousarray(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        result = await self._call("search", {"index": index, "k": k}, matrix.tobytes())
+        return [[(int(i), float(score)) for i, score in hits] for hits in result]
+
+    async def health(self) -> Dict[str, Any]:
+        """Server health report."""
+        result: Dict[str, Any] = await self._call("health", {})
+        return result
+
+    async def close(self) -> None:
+        """Close the connection and release the arena."""
+        await self._disconnect(ModelServerUnavailableError("client closed"))
+        self._release_arena()
+
+    def _release_arena(self) -> None:
+        if self._arena is not None:
+            _own_arenas.discard(self._arena.name)
+            self._arena.close()
+            self._arena.unlink()
+            self._arena = None
+
+    async def _call(
+        self, method: str, params: Dict[str, Any], payload: bytes = b"", array: bool = False
+    ) -> Any:
+        delay = self._retry_delay
+        for attempt in range(self._retries + 1):
+            try:
+                await self._connect()
+                return await self._request(method, params, payload, array)
+            except (ConnectionError, OSError, asyncio.IncompleteReadError) as e:
+                await self._disconnect(e)
+                if attempt == self._retries:
+                    raise ModelServerUnavailableError(f"Model server at {self.path}: {e}") from e
+                self.reconnects += 1
+                await asyncio.sleep(delay)
+                delay *= 2
+        raise AssertionError("unreachable")
+
+    async def _request(
+        self, method: str, params: Dict[str, Any], payload: bytes, array: bool
+    ) -> Any:
+        request_id = next(self._ids)
+        meta: Dict[str, Any] = {"id": request_id, "method": method, "params": params}
+        # The arena holds one result at a time; concurrent requests get theirs inline
+        use_arena = array and self._arena is not None and not self._arena_lock.locked()
+        if use_arena:
+            await self._arena_lock.acquire()
+            assert self._arena is not None
+            meta["shm"] = self._arena.name
+        future: "asyncio.Future[Frame]" = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            async with self._write_lock:
+                if self._writer is None:
+                    raise ConnectionResetError("not connected")
+                self._writer.write(_frame(meta, payload))
+                await self._writer.drain()
+            try:
+                response, body = await asyncio.wait_for(future, self._timeout)
+            except asyncio.TimeoutError as e:
+                if use_arena:
+                    # The server may still write the late result into this arena
+                    self._replace_arena()
+                raise ModelServerError(f"Model server timed out on {method}") from e
+            if "error" in response:
+                raise ModelServerError(response["error"])
+            if "result" in response:
+                return response["result"]
+            return self._unpack(response, body)
+        finally:
+            self._pending.pop(request_id, None)
+            if future.done() and not future.cancelled():
+                future.exception()  # failed by the read loop after a write error
+            if use_arena:
+                self._arena_lock.release()
+            if self._wanted_arena_size and not self._arena_lock.locked():
+                self._grow_arena(self._wanted_arena_size)
+                self._wanted_arena_size = 0
+
+    def _unpack(self, response: Dict[str, Any], body: bytes) -> npt.NDArray[Any]:
+        shape = tuple(response["shape"])
+        dtype = np.dtype(response["dtype"])
+        if response.get("shm") and self._arena is not None:
+            buffer = self._arena.buf
+            assert buffer is not None
+            count = int(np.prod(shape))
+            return np.frombuffer(buffer, dtype=dtype, count=count).reshape(shape).copy()
+        if self._arena is not None and len(body) > self._arena.size:
+            self._wanted_arena_size = max(self._wanted_arena_size, len(body))
+        return np.frombuffer(body, dtype=dtype).reshape(shape)
+
+    def _replace_arena(self) -> None:
+        self._release_arena()
+        self._arena = _create_arena(self._arena_size)
+
+    def _grow_arena(self, needed: int) -> None:
+        size = min(max(needed, self._arena_size * 2), self._max_arena_size)
+        if self._arena is None or size <= self._arena.size or self._arena_lock.locked():
+            return
+        self._release_arena()
+        self._arena = _create_arena(size)
+        self._arena_size = size
+
+    async def _connect(self) -> None:
+        if self._writer is not None:
+            return
+        async with self._connect_lock:
+            if self._writer is not None:
+                return
+            self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+            if self._arena is None and self._arena_size:
+                self._arena = _create_arena(self._arena_size)
+            self._reader_task = asyncio.get_running_loop().create_task(
+                self._read_loop(self._reader)
+            )
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                meta, payload = await _read_frame(reader)
+                future = self._pending.get(meta.get("id", 0))
+                if future is not None and not future.done():
+                    future.set_result((meta, payload))
+        except (asyncio.IncompleteReadError, ConnectionError, OSError) as e:
+            self._fail_pending(ConnectionResetError(f"connection lost: {e}"))
+            self._writer = None
+
+    async def _disconnect(self, error: Exception) -> None:
+        writer, self._writer = self._writer, None
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if writer is not None:
+            writer.close()
+        self._fail_pending(error)
+
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+
+def _create_arena(size: int) -> SharedMemory:
+    arena = SharedMemory(create=True, size=size)
+    _own_arenas.add(arena.name)
+    return arena
+
+
+def main() -> int:
+    """Run the model server or check its health."""
+    parser = argparse.ArgumentParser(description="Shared embedding model server")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--model", default="paraphrase-multilingual-MiniLM-L12-v2")
+    parser.add_argument("--hashing", action="store_true", help="Use the hashing embedder")
+    parser.add_argument("--index", action="append", default=[], help="NAME=DIRECTORY")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--batch-window", type=float, default=0.002)
+    parser.add_argument("--check", action="store_true", help="Health check and exit")
+    args = parser.parse_args()
+
+    if args.check:
+        return asyncio.run(_check(args.socket))
+
+    embedder: Embedder = (
+        HashingEmbedder() if args.hashing else SentenceTransformerEmbedder(args.model)
+    )
+    embedder.embed(["warmup"])
+    indexes = {}
+    for spec in args.index:
+        name, directory = spec.split("=", 1)
+        indexes[name] = VectorIndex.load(Path(directory))
+    server = ModelServer(
+        args.socket,
+        embedder,
+        indexes,
+        max_batch=args.max_batch,
+        batch_window=args.batch_window,
+        model_name="hashing" if args.hashing else args.model,
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+async def _check(path: str) -> int:
+    client = ModelClient(path, timeout=2.0, arena_size=0, retries=0)
+    try:
+        print(json.dumps(await client.health()))
+        return 0
+    except ModelServerError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
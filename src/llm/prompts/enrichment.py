@@ -0,0 +1,45 @@
+"""Prompt templates for note enrichment."""
+
+from src.llm.prompts.registry import PROMPTS
+from src.llm.schemas.enrichment import NoteCategory
+
+CATEGORIES = ", ".join(category.value for category in NoteCategory)
+
+FUSED_PROMPT = """Ты помогаешь вести личную базу заметок.
+Проанализируй заметку и верни один JSON-объект с ключами:
+- "category": одна из категорий: {categories};
+- "tags": до 10 коротких тегов в нижнем регистре;
+- "summary": краткое содержание в 1-2 предложениях на языке заметки.
+Верни только JSON.
+
+Заметка:
+{text}"""
+
+CLASSIFY_PROMPT = """Определи категорию заметки: одна из {categories}.
+Верни только JSON вида {{"category": "..."}}.
+
+Заметка:
+{text}"""
+
+TAGS_PROMPT = """Подбери до 10 коротких тегов в нижнем регистре для заметки.
+Верни только JSON вида {{"tags": ["...", "..."]}}.
+
+Заметка:
+{text}"""
+
+SUMMARY_PROMPT = """Кратко перескажи заметку в 1-2 предложениях на её языке.
+Верни только JSON вида {{"summary": "..."}}.
+
+Заметка:
+{text}"""
+
+FUSED = PROMPTS.register("enrichment.fused", FUSED_PROMPT).partial(categories=CATEGORIES)
+
+# Single-field prompts used when the fused output misses or breaks a field
+FIELD_PROMPTS = {
+    "category": PROMPTS.register("enrichment.category", CLASSIFY_PROMPT).partial(
+        categories=CATEGORIES
+    ),
+    "tags": PROMPTS.register("enrichment.tags", TAGS_PROMPT),
+    "summary": PROMPTS.register("enrichment.summary", SUMMARY_PROMPT),
+}
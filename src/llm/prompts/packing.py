@@ -0,0 +1,166 @@
+"""Context-window packing of note snippets.
+
+Instead of concatenating notes and cutting the prompt at a character limit
+(which drops whatever happens to come last, often the best match), the
+packer ranks snippets by score and greedily takes the most valuable ones
+that fit the token budget. Snippets too large for the remaining budget are
+skipped in favour of smaller ones further down, and the first skipped
+snippet may be truncated at a word boundary to use the leftover space.
+Sorting dominates, so packing is O(n log n) with one cached token count
+per snippet.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence
+
+from src.llm.prompts.registry import TOKENS, PromptTemplate, TokenCounter
+
+ELLIPSIS = "…"
+
+
+@dataclass(frozen=True)
+class Snippet:
+    """Candidate context piece.
+
+    Attributes:
+        text: Snippet text
+        score: Value of the snippet (e.g. retrieval similarity); higher is packed first
+        id: Source note id
+        position: Original position, used to restore order with ``keep_order``
+    """
+
+    text: str
+    score: float = 0.0
+    id: Optional[int] = None
+    position: int = 0
+
+
+@dataclass
+class PackResult:
+    """Snippets selected for a budget."""
+
+    snippets: List[Snippet] = field(default_factory=list)
+    tokens: int = 0
+    dropped: int = 0
+    truncated: bool = False
+
+    def join(self, separator: str = "\n\n") -> str:
+        """Packed text."""
+        return separator.join(snippet.text for snippet in self.snippets)
+
+
+@dataclass
+class PackedPrompt:
+    """Rendered prompt with its packed context."""
+
+    text: str
+    tokens: int
+    context: PackResult
+
+
+def pack_snippets(
+    snippets: Sequence[Snippet],
+    budget: int,
+    counter: Optional[TokenCounter] = None,
+    separator: str = "\n\n",
+    min_truncated_tokens: int = 32,
+    keep_order: bool = False,
+) -> PackResult:
+    """Select the highest-scoring snippets that fit a token budget.
+
+    Args:
+        snippets: Candidates in any order
+        budget: Token budget for the joined snippets
+        counter: Token counter (module default if omitted)
+        separator: Text placed between snippets
+        min_truncated_tokens: Truncate the first snippet that does not fit if at
+            least this many tokens are left (0 disables truncation)
+        keep_order: Return snippets in their original order instead of by score
+
+    Returns:
+        Selected snippets, their token count and how many were dropped
+    """
+    counter = counter or TOKENS
+    separator_tokens = counter.count(separator)
+    result = PackResult()
+    remaining = budget
+    ranked = sorted(snippets, key=lambda snippet: -snippet.score)
+    for snippet in ranked:
+        if remaining <= separator_tokens:
+            break
+        gap = separator_tokens if result.snippets else 0
+        cost = counter.count(snippet.text) + gap
+        if cost <= remaining:
+            result.snippets.append(snippet)
+            remaining -= cost
+        elif (
+            min_truncated_tokens
+            and not result.truncated
+            and remaining - gap >= min_truncated_tokens
+        ):
+            shortened = _truncate(snippet.text, remaining - gap, counter)
+            if shortened:
+                result.snippets.append(
+                    Snippet(shortened, snippet.score, snippet.id, snippet.position)
+                )
+                remaining -= counter.count(shortened) + gap
+                result.truncated = True
+    result.dropped = len(ranked) - len(result.snippets)
+    if keep_order:
+        result.snippets.sort(key=lambda snippet: snippet.position)
+    result.tokens = budget - remaining
+    return result
+
+
+def render_packed(
+    template: PromptTemplate,
+    snippets: Sequence[Snippet],
+    context_window: int,
+    reserve_tokens: int = 512,
+    slot: str = "notes",
+    separator: str = "\n\n",
+    keep_order: bool = False,
+    **values: Any,
+) -> PackedPrompt:
+    """Render a template with as much high-value context as the model window allows.
+
+    Args:
+        template: Compiled template with a ``slot`` field for the context
+        snippets: Candidate snippets
+        context_window: Model context window in tokens
+        reserve_tokens: Tokens kept free for the completion
+        slot: Template field receiving the packed snippets
+        separator: Text placed between snippets
+        keep_order: Keep snippets in original order instead of by score
+        **values: Other template fields
+
+    Returns:
+        Rendered prompt, its estimated token count and the packing result
+
+    Raises:
+        ValueError: If the template alone does not fit the window
+    """
+    fixed = template.count_tokens(**values)
+    budget = context_window - reserve_tokens - fixed
+    if budget < 0:
+        raise ValueError(
+            f"Prompt {template.name!r} needs {fixed} tokens, window is {context_window}"
+        )
+    context = pack_snippets(
+        snippets, budget, template.counter, separator=separator, keep_order=keep_order
+    )
+    text = template.render(**{**values, slot: context.join(separator)})
+    return PackedPrompt(text=text, tokens=fixed + context.tokens, context=context)
+
+
+def _truncate(text: str, budget: int, counter: TokenCounter) -> str:
+    """Longest word-boundary prefix of text (plus ellipsis) within budget."""
+    words = text.split(" ")
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if counter.count(" ".join(words[:middle]) + ELLIPSIS) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return " ".join(words[:low]) + ELLIPSIS if low else ""
@@ -0,0 +1,201 @@
+"""Prompt template registry with precompiled templates and cached token counts.
+
+Templates are parsed once into literal and placeholder segments, so
+rendering is a single join instead of a ``str.format`` parse per call, and
+the token count of the literal (static) part is computed once. Token counts
+of dynamic values go through an LRU-cached ``TokenCounter``, so notes that
+are sent again (retrieval hits, retries) are not re-tokenized.
+
+Every template has a ``version`` and a content digest; ``cache_key`` changes
+whenever the wording does, so LLM response caches keyed on it never serve
+answers produced by an older prompt.
+"""
+
+import hashlib
+import re
+from string import Formatter
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from src.core.metrics import track_cache
+from src.utils.cache import LRUCache
+
+# Rough BPE approximation: letter runs in pieces of up to 4, digit groups of 3, other symbols
+_TOKEN_PATTERN = re.compile(r"[^\W\d_]{1,4}|\d{1,3}|\S")
+
+Tokenizer = Callable[[str], int]
+
+
+def approx_tokens(text: str) -> int:
+    """Approximate token count of text (used when no model tokenizer is set)."""
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+class TokenCounter:
+    """Token counting with an LRU cache of recent texts."""
+
+    def __init__(
+        self, tokenize: Tokenizer = approx_tokens, maxsize: int = 4096, name: Optional[str] = None
+    ) -> None:
+        """Initialize counter.
+
+        Args:
+            tokenize: Function returning the token count of a text
+            maxsize: Number of cached texts
+            name: Export cache hit/miss counters under this ``cache`` label
+        """
+        self._tokenize = tokenize
+        self._cache: LRUCache[str, int] = LRUCache(maxsize)
+        if name is not None:
+            track_cache(name, self._cache.stats)
+
+    def count(self, text: str) -> int:
+        """Token count of text."""
+        cached = self._cache.get(text)
+        if cached is None:
+            cached = self._tokenize(text)
+            self._cache.set(text, cached)
+        return cached
+
+
+TOKENS = TokenCounter(name="prompt_tokens")
+
+
+class PromptTemplate:
+    """Compiled prompt template with ``{placeholder}`` fields."""
+
+    __slots__ = (
+        "name",
+        "version",
+        "template",
+        "fields",
+        "digest",
+        "static_tokens",
+        "_segments",
+        "counter",
+    )
+
+    def __init__(
+        self, name: str, version: int, template: str, counter: Optional[TokenCounter] = None
+    ) -> None:
+        """Compile template.
+
+        Args:
+            name: Template name (``feature.purpose``)
+            version: Template version, bumped on every wording change
+            template: ``str.format`` template with plain named fields
+            counter: Token counter (module default if omitted)
+
+        Raises:
+            ValueError: If a field is positional or uses a format spec or conversion
+        """
+        self.name = name
+        self.version = version
+        self.template = template
+        self.counter = counter or TOKENS
+        segments: List[Tuple[str, Optional[str]]] = []
+        for literal, field_name, spec, conversion in Formatter().parse(template):
+            if field_name is not None and (not field_name.isidentifier() or spec or conversion):
+                raise ValueError(f"Unsupported placeholder {{{field_name}}} in prompt {name!r}")
+            segments.append((literal, field_name))
+        self._segments = tuple(segments)
+        self.fields: FrozenSet[str] = frozenset(f for _, f in segments if f is not None)
+        self.digest = hashlib.sha256(template.encode("utf-8")).hexdigest()[:12]
+        self.static_tokens = self.counter.count("".join(literal for literal, _ in segments))
+
+    def __repr__(self) -> str:
+        return f"PromptTemplate({self.cache_key!r})"
+
+    @property
+    def cache_key(self) -> str:
+        """Stable key of this exact template text, for LLM response caches."""
+        return f"{self.name}@v{self.version}:{self.digest}"
+
+    def render(self, **values: Any) -> str:
+        """Render template.
+
+        Raises:
+            KeyError: If a field value is missing
+        """
+        parts: List[str] = []
+        for literal, field_name in self._segments:
+            parts.append(literal)
+            if field_name is not None:
+                parts.append(str(values[field_name]))
+        return "".join(parts)
+
+    def count_tokens(self, **values: Any) -> int:
+        """Token count of the rendered prompt (static part cached, missing fields count 0)."""
+        return self.static_tokens + sum(
+            self.counter.count(str(values[name])) for name in self.fields if name in values
+        )
+
+    def partial(self, **values: Any) -> "PromptTemplate":
+        """Template with some fields bound as constants.
+
+        Bound values become part of the static text, so their tokens are
+        counted once and they are part of the digest.
+        """
+        parts: List[str] = []
+        for literal, field_name in self._segments:
+            parts.append(_escape(literal))
+            if field_name in values:
+                parts.append(_escape(str(values[field_name])))
+            elif field_name is not None:
+                parts.append("{" + field_name + "}")
+        return PromptTemplate(self.name, self.version, "".join(parts), self.counter)
+
+
+class PromptRegistry:
+    """Named, versioned prompt templates."""
+
+    def __init__(self, counter: Optional[TokenCounter] = None) -> None:
+        """Initialize registry.
+
+        Args:
+            counter: Token counter shared by the registered templates
+        """
+        self.counter = counter or TOKENS
+        self._templates: Dict[str, Dict[int, PromptTemplate]] = {}
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._templates
+
+    def __iter__(self) -> Iterator[PromptTemplate]:
+        for versions in self._templates.values():
+            yield versions[max(versions)]
+
+    def register(self, name: str, template: str, version: int = 1) -> PromptTemplate:
+        """Compile and register a template version.
+
+        Raises:
+            ValueError: If this name and version is already registered with other text
+        """
+        versions = self._templates.setdefault(name, {})
+        existing = versions.get(version)
+        if existing is not None:
+            if existing.template != template:
+                raise ValueError(f"Prompt {name!r} v{version} is already registered")
+            return existing
+        compiled = PromptTemplate(name, version, template, self.counter)
+        versions[version] = compiled
+        return compiled
+
+    def get(self, name: str, version: Optional[int] = None) -> PromptTemplate:
+        """Template by name, latest version unless ``version`` is given.
+
+        Raises:
+            KeyError: If the template or version is not registered
+        """
+        versions = self._templates[name]
+        return versions[max(versions) if version is None else version]
+
+    def versions(self, name: str) -> List[int]:
+        """Registered versions of a template."""
+        return sorted(self._templates.get(name, {}))
+
+
+PROMPTS = PromptRegistry()
+
+
+def _escape(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
@@ -0,0 +1,48 @@
+"""Note enrichment schema (classification, tags and summary)."""
+
+from enum import Enum
+from typing import Annotated, Any, Dict, List
+
+from pydantic import BaseModel, Field, StringConstraints, TypeAdapter
+
+
+class NoteCategory(str, Enum):
+    """Note categories."""
+
+    IDEA = "idea"
+    TASK = "task"
+    LINK = "link"
+    ARTICLE = "article"
+    MEETING = "meeting"
+    RECIPE = "recipe"
+    PERSONAL = "personal"
+    OTHER = "other"
+
+
+Tag = Annotated[
+    str, StringConstraints(strip_whitespace=True, to_lower=True, min_length=1, max_length=32)
+]
+TagList = Annotated[List[Tag], Field(max_length=10)]
+SummaryText = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=600)]
+
+
+class NoteEnrichment(BaseModel):
+    """Enrichment of a note produced by one structured LLM call.
+
+    Attributes:
+        category: Note category
+        tags: Lowercase topic tags
+        summary: One- or two-sentence summary in the note's language
+    """
+
+    category: NoteCategory
+    tags: TagList
+    summary: SummaryText
+
+
+# Per-field validators, used to keep valid fields of a partially invalid output
+FIELD_ADAPTERS: Dict[str, TypeAdapter[Any]] = {
+    "category": TypeAdapter(NoteCategory),
+    "tags": TypeAdapter(TagList),
+    "summary": TypeAdapter(SummaryText),
+}
@@ -0,0 +1,43 @@
+"""Intent classification schema."""
+
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+
+class Intent(str, Enum):
+    """User message intents."""
+
+    NOTE = "note"
+    SEARCH = "search"
+    SUMMARIZE = "summarize"
+    REMINDER = "reminder"
+    TODOIST = "todoist"
+    HELP = "help"
+
+
+# Default handler route for each intent (see specs/evals/cases.jsonl)
+INTENT_ROUTES = {
+    Intent.NOTE: "save_note",
+    Intent.SEARCH: "search_notes",
+    Intent.SUMMARIZE: "summarize_last_or_by_date",
+    Intent.REMINDER: "create_reminder",
+    Intent.TODOIST: "create_todoist_task",
+    Intent.HELP: "help",
+}
+
+
+class IntentPrediction(BaseModel):
+    """Routed intent of a user message.
+
+    Attributes:
+        intent: Predicted intent
+        route: Handler route for the intent
+        confidence: Confidence in [0, 1]
+        stage: Router stage that produced the prediction (rules, centroid, llm)
+    """
+
+    intent: Intent
+    route: str
+    confidence: float = Field(ge=0.0, le=1.0)
+    stage: str = "llm"
@@ -0,0 +1,452 @@
+"""Incremental parsing of streamed structured LLM output.
+
+``StreamingJSONParser`` consumes the completion chunk by chunk and tracks
+the top-level JSON object with a small state machine. A field is validated
+against its Pydantic annotation as soon as its value is complete and is
+emitted as a ``FieldEvent``, so a handler can use the category of a note
+while the summary is still being generated.
+
+Output that goes off-schema is rejected as early as the stream allows:
+text before the object (other than a code fence), an unknown key on a
+model with ``extra="forbid"``, a value that starts with the wrong JSON
+type, a string running past ``max_length`` or a field that fails
+validation. ``stream_structured`` then closes the stream, which stops
+generation, so ``generate_structured`` can start the retry right away
+instead of waiting for the full completion. Once the object is closed the
+stream is closed as well; trailing chatter is never generated.
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from typing import (
+    Annotated,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    NoReturn,
+    Optional,
+    Set,
+    Type,
+    TypeVar,
+)
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from src.core.logging import get_logger
+from src.core.metrics import REGISTRY
+from src.llm.clients.base import StreamingLLMClient
+
+logger = get_logger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+STRUCTURED_ABORTS = REGISTRY.counter(
+    "telemetriya_llm_structured_aborts_total",
+    "Streamed structured outputs aborted as off-schema",
+    ("schema",),
+)
+
+_WHITESPACE = " \t\r\n"
+_FENCE = "```json"
+_NUMBER_START = "-0123456789"
+_START_CHARS = {
+    "string": '"',
+    "array": "[",
+    "object": "{",
+    "number": _NUMBER_START,
+    "integer": _NUMBER_START,
+    "boolean": "tf",
+    "null": "n",
+}
+
+# Parser states
+_START, _KEY_OR_END, _KEY_START, _KEY, _COLON, _VALUE_START, _VALUE, _AFTER_VALUE, _DONE = range(9)
+
+
+class StructuredOutputError(Exception):
+    """Streamed output does not match the schema."""
+
+    def __init__(self, reason: str, field_name: Optional[str] = None, position: int = 0) -> None:
+        where = f" in field {field_name!r}" if field_name else ""
+        super().__init__(f"Off-schema output{where} at char {position}: {reason}")
+        self.reason = reason
+        self.field_name = field_name
+        self.position = position
+
+
+@dataclass(frozen=True)
+class FieldEvent:
+    """A validated top-level field.
+
+    Attributes:
+        name: Field name (alias if the model defines one)
+        value: Validated value
+        elapsed: Seconds from the first chunk to the field's completion
+    """
+
+    name: str
+    value: Any
+    elapsed: float = 0.0
+
+
+@dataclass
+class _FieldSpec:
+    adapter: TypeAdapter[Any]
+    start_chars: Optional[str] = None
+    max_length: Optional[int] = None
+
+
+class StreamingJSONParser(Generic[ModelT]):
+    """Parse a streamed JSON object into a Pydantic model field by field."""
+
+    def __init__(self, model: Type[ModelT]) -> None:
+        """Initialize parser.
+
+        Args:
+            model: Pydantic model the output must match
+        """
+        self.model = model
+        self._fields = _field_specs(model)
+        self._forbid_extra = model.model_config.get("extra") == "forbid"
+        self._state = _START
+        self._position = 0
+        self._started: Optional[float] = None
+        self._preamble: List[str] = []
+        self._raw: List[str] = []
+        self._key = ""
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._unicode_digits = 0
+        self._string_chars = 0
+        self._values: Dict[str, Any] = {}
+        self._result: Optional[ModelT] = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the top-level object has been closed and validated."""
+        return self._result is not None
+
+    @property
+    def values(self) -> Dict[str, Any]:
+        """Raw JSON values of the completed fields so far."""
+        return dict(self._values)
+
+    def result(self) -> ModelT:
+        """Validated model.
+
+        Raises:
+            StructuredOutputError: If the object is not complete yet
+        """
+        if self._result is None:
+            raise StructuredOutputError("incomplete output", position=self._position)
+        return self._result
+
+    def feed(self, chunk: str) -> List[FieldEvent]:
+        """Consume a chunk of completion text.
+
+        Args:
+            chunk: Next piece of the streamed completion
+
+        Returns:
+            Fields completed by this chunk, in output order
+
+        Raises:
+            StructuredOutputError: As soon as the output leaves the schema
+        """
+        if self._started is None:
+            self._started = time.perf_counter()
+        events: List[FieldEvent] = []
+        for char in chunk:
+            if self._state == _DONE:
+                break
+            self._consume(char, events)
+            self._position += 1
+        return events
+
+    def _consume(self, char: str, events: List[FieldEvent]) -> None:
+        state = self._state
+        if state == _VALUE:
+            self._consume_value(char, events)
+        elif state == _KEY:
+            self._consume_key(char)
+        elif char in _WHITESPACE:
+            return
+        elif state == _START:
+            self._consume_preamble(char)
+        elif state == _KEY_OR_END and char == "}":
+            self._finish()
+        elif state in (_KEY_OR_END, _KEY_START) and char == '"':
+            self._raw = []
+            self._state = _KEY
+        elif state == _COLON and char == ":":
+            self._state = _VALUE_START
+        elif state == _VALUE_START:
+            self._start_value(char)
+        elif state == _AFTER_VALUE and char == ",":
+            self._state = _KEY_START
+        elif state == _AFTER_VALUE and char == "}":
+            self._finish()
+        else:
+            self._fail(f"unexpected {char!r}")
+
+    def _consume_preamble(self, char: str) -> None:
+        if char == "{":
+            self._state = _KEY_OR_END
+            return
+        self._preamble.append(char)
+        if not _FENCE.startswith("".join(self._preamble).lower()):
+            self._fail("text before the JSON object")
+
+    def _consume_key(self, char: str) -> None:
+        if self._escape:
+            self._escape = False
+        elif char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._key = json.loads('"' + "".join(self._raw) + '"')
+            if self._key in self._values:
+                self._fail("duplicate key")
+            if self._key not in self._fields and self._forbid_extra:
+                self._fail("unknown key")
+            self._state = _COLON
+            return
+        self._raw.append(char)
+
+    def _start_value(self, char: str) -> None:
+        spec = self._fields.get(self._key)
+        if spec is not None and spec.start_chars is not None and char not in spec.start_chars:
+            self._fail(f"value starts with {char!r}", self._key)
+        self._raw = [char]
+        self._depth = 1 if char in "{[" else 0
+        self._in_string = char == '"'
+        self._escape = False
+        self._unicode_digits = 0
+        self._string_chars = 0
+        self._state = _VALUE
+
+    def _consume_value(self, char: str, events: List[FieldEvent]) -> None:
+        if self._in_string:
+            self._raw.append(char)
+            self._consume_string_char(char)
+            if not self._in_string and self._depth == 0:
+                self._complete_value(events)
+            return
+        if char in "{[":
+            self._depth += 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth < 0:
+                # "}" of the top-level object right after a scalar
+                self._complete_value(events)
+                self._finish()
+                return
+        elif char == '"':
+            self._in_string = True
+            self._string_chars = 0
+        elif self._depth == 0 and (char == "," or char in _WHITESPACE):
+            self._complete_value(events)
+            if char == ",":
+                self._state = _KEY_START
+            return
+        self._raw.append(char)
+        if char in "}]" and self._depth == 0:
+            self._complete_value(events)
+
+    def _consume_string_char(self, char: str) -> None:
+        if self._unicode_digits:
+            self._unicode_digits -= 1
+            return
+        if self._escape:
+            self._escape = False
+            if char == "u":
+                self._unicode_digits = 4
+            return
+        if char == '"':
+            self._in_string = False
+            return
+        if char == "\\":
+            self._escape = True
+        self._string_chars += 1
+        spec = self._fields.get(self._key)
+        if (
+            self._depth == 0
+            and spec is not None
+            and spec.max_length is not None
+            and self._string_chars > spec.max_length
+        ):
+            self._fail(f"string longer than {spec.max_length}", self._key)
+
+    def _complete_value(self, events: List[FieldEvent]) -> None:
+        self._state = _AFTER_VALUE
+        try:
+            value = json.loads("".join(self._raw))
+        except json.JSONDecodeError as e:
+            self._fail(f"malformed value ({e.msg})", self._key)
+        spec = self._fields.get(self._key)
+        if spec is None:
+            return
+        try:
+            validated = spec.adapter.validate_python(value)
+        except ValidationError as e:
+            self._fail(e.errors()[0]["msg"], self._key)
+        self._values[self._key] = value
+        started = self._started if self._started is not None else time.perf_counter()
+        events.append(FieldEvent(self._key, validated, time.perf_counter() - started))
+
+    def _finish(self) -> None:
+        self._state = _DONE
+        try:
+            self._result = self.model.model_validate(self._values)
+        except ValidationError as e:
+            error = e.errors()[0]
+            field_name = ".".join(str(part) for part in error["loc"]) or None
+            self._fail(error["msg"], field_name)
+
+    def _fail(self, reason: str, field_name: Optional[str] = None) -> NoReturn:
+        self._state = _DONE
+        raise StructuredOutputError(reason, field_name, self._position)
+
+
+async def stream_structured(
+    client: StreamingLLMClient, prompt: str, model: Type[ModelT], **kwargs: Any
+) -> AsyncIterator[FieldEvent]:
+    """Stream a completion and yield validated fields as they complete.
+
+    The completion stream is closed as soon as the object is complete or
+    the output goes off-schema.
+
+    Args:
+        client: Streaming LLM client
+        prompt: Prompt asking for a JSON object matching ``model``
+        model: Pydantic model of the output
+        **kwargs: Passed to ``client.stream``
+
+    Yields:
+        Validated fields in output order
+
+    Raises:
+        StructuredOutputError: If the output leaves the schema or ends early
+    """
+    parser = StreamingJSONParser(model)
+    chunks = client.stream(prompt, **kwargs)
+    try:
+        async for chunk in chunks:
+            for event in parser.feed(chunk):
+                yield event
+            if parser.done:
+                return
+        parser.result()
+    except StructuredOutputError as e:
+        STRUCTURED_ABORTS.labels(model.__name__).inc()
+        logger.warning(
+            "Structured output aborted",
+            extra={"schema": model.__name__, "field": e.field_name, "reason": e.reason},
+        )
+        raise
+    finally:
+        close = getattr(chunks, "aclose", None)
+        if close is not None:
+            await close()
+
+
+async def generate_structured(
+    client: StreamingLLMClient,
+    prompt: str,
+    model: Type[ModelT],
+    attempts: int = 2,
+    on_field: Optional[Callable[[FieldEvent], None]] = None,
+    **kwargs: Any,
+) -> ModelT:
+    """Generate a validated model, restarting as soon as an attempt goes off-schema.
+
+    Args:
+        client: Streaming LLM client
+        prompt: Prompt asking for a JSON object matching ``model``
+        model: Pydantic model of the output
+        attempts: Maximum number of generations
+        on_field: Called with every validated field of the current attempt
+        **kwargs: Passed to ``client.stream``
+
+    Returns:
+        Validated model
+
+    Raises:
+        StructuredOutputError: If every attempt went off-schema
+    """
+    error: Optional[StructuredOutputError] = None
+    for _ in range(attempts):
+        values: Dict[str, Any] = {}
+        try:
+            async for event in stream_structured(client, prompt, model, **kwargs):
+                values[event.name] = event.value
+                if on_field is not None:
+                    on_field(event)
+            return model.model_validate(values)
+        except StructuredOutputError as e:
+            error = e
+    assert error is not None
+    raise error
+
+
+def _field_specs(model: Type[BaseModel]) -> Dict[str, _FieldSpec]:
+    """Validator, allowed first characters and length limit of each field."""
+    schema = model.model_json_schema()
+    definitions = schema.get("$defs", {})
+    properties = schema.get("properties", {})
+    specs: Dict[str, _FieldSpec] = {}
+    for name, info in model.model_fields.items():
+        key = info.alias or name
+        annotation: Any = info.annotation
+        if info.metadata:
+            annotation = Annotated[(annotation, *info.metadata)]  # type: ignore[valid-type]
+        field_schema = _resolve(properties.get(key, {}), definitions)
+        types = _json_types(field_schema, definitions)
+        specs[key] = _FieldSpec(
+            adapter=TypeAdapter(annotation),
+            start_chars="".join(_START_CHARS[t] for t in types) if types else None,
+            max_length=field_schema.get("maxLength") if types == {"string"} else None,
+        )
+    return specs
+
+
+def _resolve(schema: Dict[str, Any], definitions: Dict[str, Any]) -> Dict[str, Any]:
+    while "$ref" in schema:
+        schema = definitions.get(schema["$ref"].rsplit("/", 1)[-1], {})
+    return schema
+
+
+def _json_types(schema: Dict[str, Any], definitions: Dict[str, Any]) -> Optional[Set[str]]:
+    """JSON types a value may have, or None if the schema does not say."""
+    schema = _resolve(schema, definitions)
+    if "type" in schema:
+        types = schema["type"]
+        return {types} if isinstance(types, str) else set(types)
+    if "enum" in schema or "const" in schema:
+        values = schema.get("enum", [schema.get("const")])
+        return {_JSON_TYPE_NAMES.get(type(value), "object") for value in values}
+    for combinator in ("anyOf", "oneOf", "allOf"):
+        if combinator in schema:
+            result: Set[str] = set()
+            for member in schema[combinator]:
+                member_types = _json_types(member, definitions)
+                if member_types is None:
+                    return None
+                result |= member_types
+            return result
+    return None
+
+
+_JSON_TYPE_NAMES = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    type(None): "null",
+    list: "array",
+    dict: "object",
+}
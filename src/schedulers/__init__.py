@@ -0,0 +1,17 @@
+"""Background schedulers (reminders, periodic jobs)."""
+
+from src.schedulers.reminder_scheduler import (
+    InMemoryReminderStore,
+    Reminder,
+    ReminderScheduler,
+    ReminderStore,
+    shard_for,
+)
+
+__all__ = [
+    "InMemoryReminderStore",
+    "Reminder",
+    "ReminderScheduler",
+    "ReminderStore",
+    "shard_for",
+]
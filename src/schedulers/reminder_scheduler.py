@@ -0,0 +1,381 @@
+"""Horizon-window reminder scheduler backed by an in-memory min-heap.
+
+Instead of polling the reminders table every N seconds, the scheduler loads
+only the reminders due within the next ``horizon`` seconds into a min-heap,
+sleeps until the earliest one is due and is woken early by ``notify()`` when
+a new reminder is created. Reminders are partitioned between worker
+processes by ``shard_for()`` and every delivery is preceded by an atomic
+``claim()`` in the store, so a reminder is never delivered twice even while
+shards are being rebalanced.
+"""
+
+import asyncio
+import bisect
+import heapq
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_CLAIMED = "claimed"
+STATUS_DELIVERED = "delivered"
+# Shortest wait before the next refill when a window was truncated by
+# batch_size while still overdue (avoids re-querying in a tight loop)
+MIN_REFILL_INTERVAL = 0.01
+
+
+@dataclass(slots=True)
+class Reminder:
+    """Reminder ready for delivery.
+
+    Attributes:
+        id: Reminder primary key
+        chat_id: Telegram chat to notify
+        text: Reminder text
+        due_at: Due time as UTC epoch seconds
+    """
+
+    id: int
+    chat_id: int
+    text: str
+    due_at: float
+
+
+def shard_for(reminder_id: int, shard_count: int) -> int:
+    """Get the shard that owns a reminder.
+
+    Mirrors the ``id % :shard_count = :shard_index`` predicate used by SQL
+    stores, so in-memory and database partitioning always agree.
+
+    Args:
+        reminder_id: Reminder primary key
+        shard_count: Total number of scheduler shards
+
+    Returns:
+        Shard index in ``[0, shard_count)``
+    """
+    return reminder_id % shard_count
+
+
+class ReminderStore(ABC):
+    """Persistence interface used by the scheduler.
+
+    Implementations must make ``claim()`` atomic (for SQL:
+    ``UPDATE ... SET status = 'claimed' WHERE id = :id AND status = 'pending'``),
+    which is what prevents double delivery across worker processes.
+    """
+
+    @abstractmethod
+    async def fetch_due(
+        self, until: float, shard_index: int, shard_count: int, limit: int
+    ) -> List[Reminder]:
+        """Fetch pending reminders due at or before ``until``, ordered by due time."""
+
+    @abstractmethod
+    async def claim(self, reminder_id: int, worker_id: str, now: float) -> bool:
+        """Atomically mark a pending reminder as claimed by ``worker_id``."""
+
+    @abstractmethod
+    async def complete(self, reminder_id: int) -> None:
+        """Mark a claimed reminder as delivered."""
+
+    @abstractmethod
+    async def release(self, reminder_id: int, retry_at: float) -> None:
+        """Return a claimed reminder to pending with a new due time."""
+
+    @abstractmethod
+    async def recover_stale(self, claimed_before: float) -> int:
+        """Return claims older than ``claimed_before`` to pending (crashed workers)."""
+
+
+class InMemoryReminderStore(ReminderStore):
+    """Reminder store kept in process memory.
+
+    Used in tests and benchmarks. Pending reminders are indexed by a sorted
+    ``(due_at, id)`` list, so ``fetch_due`` is a bisect plus a slice scan.
+    """
+
+    def __init__(self) -> None:
+        self._reminders: Dict[int, Reminder] = {}
+        self._status: Dict[int, str] = {}
+        self._claims: Dict[int, Tuple[str, float]] = {}
+        self._index: List[Tuple[float, int]] = []
+
+    def add(self, reminder: Reminder) -> None:
+        """Add a pending reminder.
+
+        Args:
+            reminder: Reminder to store
+        """
+        self._reminders[reminder.id] = reminder
+        self._status[reminder.id] = STATUS_PENDING
+        bisect.insort(self._index, (reminder.due_at, reminder.id))
+
+    def add_many(self, reminders: List[Reminder]) -> None:
+        """Bulk-add pending reminders with a single sort.
+
+        Args:
+            reminders: Reminders to store
+        """
+        for reminder in reminders:
+            self._reminders[reminder.id] = reminder
+            self._status[reminder.id] = STATUS_PENDING
+            self._index.append((reminder.due_at, reminder.id))
+        self._index.sort()
+
+    def status(self, reminder_id: int) -> Optional[str]:
+        """Get the status of a reminder, or None if unknown."""
+        return self._status.get(reminder_id)
+
+    def __len__(self) -> int:
+        return len(self._reminders)
+
+    async def fetch_due(
+        self, until: float, shard_index: int, shard_count: int, limit: int
+    ) -> List[Reminder]:
+        hi = bisect.bisect_right(self._index, (until, float("inf")))
+        # Drop delivered entries from the scanned prefix so repeated
+        # refills do not rescan history.
+        live = [entry for entry in self._index[:hi] if self._status[entry[1]] != STATUS_DELIVERED]
+        self._index[:hi] = live
+
+        result: List[Reminder] = []
+        for due_at, reminder_id in live:
+            if self._status[reminder_id] != STATUS_PENDING:
+                continue
+            if shard_for(reminder_id, shard_count) != shard_index:
+                continue
+            reminder = self._reminders[reminder_id]
+            if reminder.due_at != due_at:
+                continue
+            result.append(reminder)
+            if len(result) >= limit:
+                break
+        return result
+
+    async def claim(self, reminder_id: int, worker_id: str, now: float) -> bool:
+        if self._status.get(reminder_id) != STATUS_PENDING:
+            return False
+        self._status[reminder_id] = STATUS_CLAIMED
+        self._claims[reminder_id] = (worker_id, now)
+        return True
+
+    async def complete(self, reminder_id: int) -> None:
+        self._status[reminder_id] = STATUS_DELIVERED
+        self._claims.pop(reminder_id, None)
+
+    async def release(self, reminder_id: int, retry_at: float) -> None:
+        reminder = self._reminders[reminder_id]
+        reminder.due_at = retry_at
+        self._status[reminder_id] = STATUS_PENDING
+        self._claims.pop(reminder_id, None)
+        bisect.insort(self._index, (retry_at, reminder_id))
+
+    async def recover_stale(self, claimed_before: float) -> int:
+        stale = [rid for rid, (_, at) in self._claims.items() if at < claimed_before]
+        for reminder_id in stale:
+            self._status[reminder_id] = STATUS_PENDING
+            del self._claims[reminder_id]
+        return len(stale)
+
+
+DeliverFn = Callable[[Reminder], Awaitable[None]]
+
+
+class ReminderScheduler:
+    """Event-driven reminder scheduler for one shard.
+
+    The scheduler keeps reminders due before ``loaded_until`` in a min-heap
+    of ``(due_at, id)``. It refills from the store only when the horizon is
+    exhausted, so the store is queried once per horizon instead of once per
+    tick. Reminders already overdue at startup (missed while the process was
+    down) are part of the first window and fire immediately.
+    """
+
+    def __init__(
+        self,
+        store: ReminderStore,
+        deliver: DeliverFn,
+        *,
+        horizon: float = 300.0,
+        batch_size: int = 10_000,
+        shard_index: int = 0,
+        shard_count: int = 1,
+        worker_id: Optional[str] = None,
+        max_concurrency: int = 32,
+        retry_delay: float = 30.0,
+        claim_timeout: float = 120.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize scheduler.
+
+        Args:
+            store: Reminder persistence
+            deliver: Coroutine that sends a reminder notification
+            horizon: Seconds of future reminders kept in memory
+            batch_size: Maximum reminders loaded per refill
+            shard_index: Shard handled by this worker
+            shard_count: Total number of shards
+            worker_id: Identifier recorded on claims (random if omitted)
+            max_concurrency: Maximum deliveries in flight
+            retry_delay: Seconds before a failed delivery is retried
+            claim_timeout: Age after which claims of crashed workers are recovered
+            clock: Source of current UTC epoch seconds
+        """
+        if not 0 <= shard_index < shard_count:
+            raise ValueError("shard_index must be in [0, shard_count)")
+        self._store = store
+        self._deliver = deliver
+        self._horizon = horizon
+        self._batch_size = batch_size
+        self._shard_index = shard_index
+        self._shard_count = shard_count
+        self._worker_id = worker_id or uuid.uuid4().hex
+        self._retry_delay = retry_delay
+        self._claim_timeout = claim_timeout
+        self._clock = clock
+
+        self._heap: List[Tuple[float, int]] = []
+        self._scheduled: Dict[int, Reminder] = {}
+        self._loaded_until = float("-inf")
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight: Set["asyncio.Task[None]"] = set()
+        self._dispatching: Set[int] = set()
+        self._running = False
+
+    @property
+    def pending_count(self) -> int:
+        """Number of reminders currently held in memory."""
+        return len(self._scheduled)
+
+    @property
+    def loaded_until(self) -> float:
+        """End of the currently loaded horizon window (epoch seconds)."""
+        return self._loaded_until
+
+    def owns(self, reminder_id: int) -> bool:
+        """Check whether a reminder belongs to this scheduler's shard."""
+        return shard_for(reminder_id, self._shard_count) == self._shard_index
+
+    def notify(self, reminder: Reminder) -> None:
+        """Inform the scheduler about a created or rescheduled reminder.
+
+        Reminders moved beyond the loaded horizon are dropped from memory
+        (so their old due time does not fire) and picked up by the refill
+        that loads their window.
+
+        Args:
+            reminder: Reminder that was persisted as pending
+        """
+        if not self.owns(reminder.id):
+            return
+        if reminder.due_at >= self._loaded_until:
+            self._scheduled.pop(reminder.id, None)
+            return
+        if self._push(reminder) and self._heap[0][1] == reminder.id:
+            self._wakeup.set()
+
+    def cancel(self, reminder_id: int) -> None:
+        """Drop a reminder from memory (its heap entry is skipped lazily)."""
+        self._scheduled.pop(reminder_id, None)
+
+    async def run(self) -> None:
+        """Run the scheduling loop until ``stop()`` is called."""
+        self._running = True
+        recovered = await self._store.recover_stale(self._clock() - self._claim_timeout)
+        if recovered:
+            logger.info(
+                "Recovered stale reminder claims",
+                extra={"recovered": recovered, "shard": self._shard_index},
+            )
+
+        while self._running:
+            now = self._clock()
+            if now >= self._loaded_until:
+                await self._refill(now)
+            self._fire_due(now)
+
+            self._wakeup.clear()
+            timeout = self._loaded_until - now
+            if self._heap:
+                timeout = min(timeout, self._heap[0][0] - now)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), max(timeout, 0.0))
+            except asyncio.TimeoutError:
+                pass
+
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def stop(self) -> None:
+        """Ask the scheduling loop to exit after in-flight deliveries finish."""
+        self._running = False
+        self._wakeup.set()
+
+    async def _refill(self, now: float) -> None:
+        until = now + self._horizon
+        batch = await self._store.fetch_due(
+            until, self._shard_index, self._shard_count, self._batch_size
+        )
+        if len(batch) >= self._batch_size:
+            # Window truncated: only trust it up to the last loaded due time,
+            # but never up to now, or an overdue backlog refills in a tight loop
+            until = max(batch[-1].due_at, now + MIN_REFILL_INTERVAL)
+        self._loaded_until = until
+        for reminder in batch:
+            self._push(reminder)
+        logger.debug(
+            "Loaded reminder window",
+            extra={"loaded": len(batch), "shard": self._shard_index, "until": until},
+        )
+
+    def _push(self, reminder: Reminder) -> bool:
+        if reminder.id in self._dispatching:
+            return False
+        current = self._scheduled.get(reminder.id)
+        if current is not None and current.due_at == reminder.due_at:
+            return False
+        self._scheduled[reminder.id] = reminder
+        heapq.heappush(self._heap, (reminder.due_at, reminder.id))
+        return True
+
+    def _fire_due(self, now: float) -> None:
+        while self._heap and self._heap[0][0] <= now:
+            due_at, reminder_id = heapq.heappop(self._heap)
+            reminder = self._scheduled.get(reminder_id)
+            if reminder is None or reminder.due_at != due_at:
+                continue  # cancelled or rescheduled
+            del self._scheduled[reminder_id]
+            self._dispatching.add(reminder_id)
+            task = asyncio.create_task(self._dispatch(reminder))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, reminder: Reminder) -> None:
+        try:
+            retry = await self._claim_and_deliver(reminder)
+        finally:
+            self._dispatching.discard(reminder.id)
+        if retry is not None:
+            self.notify(retry)
+
+    async def _claim_and_deliver(self, reminder: Reminder) -> Optional[Reminder]:
+        async with self._semaphore:
+            if not await self._store.claim(reminder.id, self._worker_id, self._clock()):
+                return None
+            try:
+                await self._deliver(reminder)
+            except Exception:
+                logger.exception("Reminder delivery failed", extra={"reminder_id": reminder.id})
+                retry_at = self._clock() + self._retry_delay
+                await self._store.release(reminder.id, retry_at)
+                return Reminder(reminder.id, reminder.chat_id, reminder.text, retry_at)
+            await self._store.complete(reminder.id)
+            return None
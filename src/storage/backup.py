@@ -0,0 +1,690 @@
+"""Incremental, parallel backup and restore of the database and file storage.
+
+A backup repository is a directory holding content-addressed objects and
+one manifest per backup::
+
+    objects/ab/ab12…ef.zst     compressed content, named by sha256 of the raw data
+    backups/<id>/manifest.json files, database chunks and parent backup
+    backups/<id>/postgres/     pg_dump directory (PostgreSQL only)
+
+Files under ``STORAGE_PATH`` are hashed in parallel; a file whose size and
+mtime match the previous manifest reuses its hash without being read, and
+only hashes missing from ``objects/`` are compressed and written. A nightly
+backup therefore costs roughly the size of what changed, not of the whole
+history.
+
+SQLite databases are copied with the online backup API (a consistent
+point-in-time copy while the bot keeps running), cut into fixed-size
+chunks and compressed by several workers; unchanged chunks are shared with
+earlier backups. PostgreSQL is dumped with ``pg_dump --format=directory
+--jobs N --compress=zstd`` and restored with ``pg_restore --jobs N``.
+
+Every manifest lists the complete state, so any backup can be restored on
+its own (point-in-time restore) and old backups can be pruned without
+breaking newer ones. The manifest is written last: an interrupted backup
+leaves unreferenced objects behind but never a partial backup. Backups and
+restores hold a shared lock on the repository and ``prune`` an exclusive
+one, so pruning never deletes objects a running backup has written but not
+yet listed in its manifest.
+
+Usage::
+
+    python -m src.storage.backup backup --target ./backups
+    python -m src.storage.backup restore --target ./backups [--id ID]
+"""
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from sqlalchemy.engine import make_url
+
+from src.core.logging import get_logger
+
+if TYPE_CHECKING:
+    from src.core.config import Settings
+
+logger = get_logger(__name__)
+
+MANIFEST_VERSION = 1
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+# Regenerated at runtime; never worth backing up
+DEFAULT_EXCLUDE = ("temp", "snapshots")
+_READ_BLOCK = 1024 * 1024
+# Objects whose sample does not shrink below this ratio are stored raw
+# (voice messages and PDFs are usually compressed already)
+_MIN_SAVING = 0.9
+_SAMPLE = 64 * 1024
+
+
+class BackupError(Exception):
+    """Backup or restore failed."""
+
+
+@dataclass(frozen=True)
+class Codec:
+    """Object compression."""
+
+    name: str
+    suffix: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+def get_codec(name: str = "auto", level: int = 3) -> Codec:
+    """Get a compression codec.
+
+    Args:
+        name: ``zstd``, ``zlib``, ``raw`` or ``auto`` (zstd when ``zstandard``
+            is installed)
+        level: Compression level
+
+    Returns:
+        Codec
+
+    Raises:
+        BackupError: If the codec is unknown or not installed
+    """
+    if name in ("auto", "zstd"):
+        try:
+            import zstandard
+        except ImportError:
+            if name == "zstd":
+                raise BackupError("zstd codec requires the zstandard package") from None
+        else:
+            # (De)compressor objects must not be shared between threads:
+            # every worker thread gets its own pair
+            local = threading.local()
+
+            def compress(data: bytes) -> bytes:
+                if not hasattr(local, "compressor"):
+                    local.compressor = zstandard.ZstdCompressor(level=level)
+                result: bytes = local.compressor.compress(data)
+                return result
+
+            def decompress(data: bytes) -> bytes:
+                if not hasattr(local, "decompressor"):
+                    local.decompressor = zstandard.ZstdDecompressor()
+                result: bytes = local.decompressor.decompress(data)
+                return result
+
+            return Codec("zstd", ".zst", compress, decompress)
+    if name in ("auto", "zlib"):
+        return Codec("zlib", ".zz", lambda data: zlib.compress(data, level), zlib.decompress)
+    if name == "raw":
+        return Codec("raw", ".raw", bytes, bytes)
+    raise BackupError(f"Unknown codec {name!r}")
+
+
+_CODEC_BY_SUFFIX = {".zst": "zstd", ".zz": "zlib", ".raw": "raw"}
+
+
+@dataclass
+class BackupStats:
+    """Work done by one backup or restore."""
+
+    files: int = 0
+    files_hashed: int = 0
+    files_restored: int = 0
+    objects_written: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class Manifest:
+    """Complete description of one backup."""
+
+    id: str
+    created_at: str
+    codec: str
+    parent: Optional[str] = None
+    # Relative path -> {"sha256", "size", "mtime_ns"}
+    files: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # {"kind": "sqlite", "size", "sha256", "chunk_size", "chunks"} or {"kind": "postgres", ...}
+    database: Optional[Dict[str, Any]] = None
+    stats: BackupStats = field(default_factory=BackupStats)
+    version: int = MANIFEST_VERSION
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Manifest":
+        """Parse a manifest written by ``asdict``."""
+        if data.get("version") != MANIFEST_VERSION:
+            raise BackupError(f"Unsupported manifest version {data.get('version')}")
+        return cls(**{**data, "stats": BackupStats(**data["stats"])})
+
+
+class BackupRepository:
+    """Content-addressed backup repository."""
+
+    def __init__(
+        self,
+        root: Path,
+        codec: str = "auto",
+        jobs: int = 4,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """Initialize repository.
+
+        Args:
+            root: Repository directory (created on first backup)
+            codec: Compression of new objects (see ``get_codec``)
+            jobs: Parallel workers for hashing, compression and pg_dump/pg_restore
+            chunk_size: SQLite chunk size in bytes
+        """
+        self.root = Path(root)
+        self.codec = get_codec(codec)
+        self.jobs = max(1, jobs)
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def from_settings(cls, settings: "Settings") -> "BackupRepository":
+        """Build a repository from settings."""
+        return cls(Path(settings.backup_path), jobs=settings.backup_jobs)
+
+    def backups(self) -> List[str]:
+        """Ids of complete backups, oldest first."""
+        directory = self.root / "backups"
+        if not directory.exists():
+            return []
+        return sorted(p.parent.name for p in directory.glob("*/manifest.json"))
+
+    def manifest(self, backup_id: Optional[str] = None) -> Manifest:
+        """Load a manifest.
+
+        Args:
+            backup_id: Backup id (None = latest)
+
+        Raises:
+            BackupError: If there is no such backup
+        """
+        ids = self.backups()
+        if backup_id is None:
+            if not ids:
+                raise BackupError(f"No backups in {self.root}")
+            backup_id = ids[-1]
+        path = self.root / "backups" / backup_id / "manifest.json"
+        if not path.exists():
+            raise BackupError(f"Unknown backup {backup_id!r}")
+        return Manifest.from_json(json.loads(path.read_text(encoding="utf-8")))
+
+    def backup(
+        self,
+        storage: Optional[Path] = None,
+        db_url: Optional[str] = None,
+        exclude: Sequence[str] = DEFAULT_EXCLUDE,
+    ) -> Manifest:
+        """Take an incremental backup.
+
+        Args:
+            storage: File storage directory
+            db_url: SQLAlchemy database URL (SQLite or PostgreSQL)
+            exclude: Top-level storage directories to skip
+
+        Returns:
+            Manifest of the new backup
+        """
+        started = time.perf_counter()
+        with self._lock(exclusive=False):
+            previous = self.manifest() if self.backups() else None
+            backup_id = self._new_id()
+            workdir = self.root / "backups" / backup_id
+            workdir.mkdir(parents=True)
+            manifest = Manifest(
+                backup_id,
+                datetime.now(timezone.utc).isoformat(),
+                self.codec.name,
+                parent=previous.id if previous else None,
+            )
+            with ThreadPoolExecutor(self.jobs, thread_name_prefix="backup") as pool:
+                if storage is not None:
+                    manifest.files = self._backup_files(
+                        Path(storage), exclude, previous, pool, manifest.stats
+                    )
+                if db_url is not None:
+                    manifest.database = self._backup_database(db_url, workdir, pool, manifest.stats)
+            manifest.stats.seconds = round(time.perf_counter() - started, 3)
+            _write_atomic(workdir / "manifest.json", json.dumps(asdict(manifest)).encode("utf-8"))
+        logger.info("Backup finished", extra={"backup_id": backup_id, **asdict(manifest.stats)})
+        return manifest
+
+    @contextmanager
+    def _lock(self, exclusive: bool) -> Iterator[None]:
+        """Hold the repository lock (shared: backup/restore, exclusive: prune)."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / "lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _new_id(self) -> str:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%fZ")
+        while (self.root / "backups" / stamp).exists():
+            time.sleep(1e-6)
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%fZ")
+        return stamp
+
+    def _backup_files(
+        self,
+        storage: Path,
+        exclude: Sequence[str],
+        previous: Optional[Manifest],
+        pool: ThreadPoolExecutor,
+        stats: BackupStats,
+    ) -> Dict[str, Dict[str, Any]]:
+        known = previous.files if previous else {}
+        entries: Dict[str, Dict[str, Any]] = {}
+        changed: List[Tuple[str, Path]] = []
+        for path in _walk(storage, exclude):
+            rel = path.relative_to(storage).as_posix()
+            st = path.stat()
+            old = known.get(rel)
+            if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                entries[rel] = old
+            else:
+                entries[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+                changed.append((rel, path))
+        stats.files = len(entries)
+        stats.files_hashed = len(changed)
+        # Digests stored by this backup (identical files are written once)
+        claimed: Set[str] = set()
+        claim_lock = threading.Lock()
+
+        def backup_one(path: Path) -> Tuple[str, int, int]:
+            # The stored bytes are the hashed bytes, even if the file changes meanwhile
+            data = path.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            with claim_lock:
+                new = digest not in claimed and not self._object(digest).exists()
+                claimed.add(digest)
+            written, read = self._store(digest, data) if new else (0, 0)
+            return digest, written, read
+
+        for (rel, _), (digest, written, read) in zip(
+            changed, pool.map(lambda item: backup_one(item[1]), changed)
+        ):
+            entries[rel]["sha256"] = digest
+            stats.objects_written += written > 0
+            stats.bytes_written += written
+            stats.bytes_read += read
+        return dict(sorted(entries.items()))
+
+    def _backup_database(
+        self, db_url: str, workdir: Path, pool: ThreadPoolExecutor, stats: BackupStats
+    ) -> Dict[str, Any]:
+        url = make_url(db_url)
+        if url.get_backend_name() == "sqlite":
+            return self._backup_sqlite(Path(url.database or ""), pool, stats)
+        if url.get_backend_name() == "postgresql":
+            target = workdir / "postgres"
+            _run(pg_dump_command(db_url, target, self.jobs))
+            size = sum(p.stat().st_size for p in target.iterdir())
+            stats.bytes_written += size
+            return {"kind": "postgres", "path": "postgres", "size": size}
+        raise BackupError(f"Unsupported database {url.get_backend_name()!r}")
+
+    def _backup_sqlite(
+        self, path: Path, pool: ThreadPoolExecutor, stats: BackupStats
+    ) -> Dict[str, Any]:
+        if not path.exists():
+            raise BackupError(f"SQLite database {path} does not exist")
+        self.root.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=self.root) as tmp:
+            copy = Path(tmp) / "db.sqlite"
+            source, target = sqlite3.connect(path), sqlite3.connect(copy)
+            try:
+                # Online backup API: consistent even with concurrent writers
+                source.backup(target)
+            finally:
+                source.close()
+                target.close()
+            digest = hashlib.sha256()
+            chunks: List[str] = []
+            with open(copy, "rb") as f:
+                pending = []
+                while block := f.read(self.chunk_size):
+                    digest.update(block)
+                    pending.append(pool.submit(self._store_chunk, block))
+                for future in pending:
+                    chunk, written, read = future.result()
+                    chunks.append(chunk)
+                    stats.objects_written += written > 0
+                    stats.bytes_written += written
+                    stats.bytes_read += read
+            return {
+                "kind": "sqlite",
+                "size": copy.stat().st_size,
+                "sha256": digest.hexdigest(),
+                "chunk_size": self.chunk_size,
+                "chunks": chunks,
+            }
+
+    def _store_chunk(self, block: bytes) -> Tuple[str, int, int]:
+        digest = hashlib.sha256(block).hexdigest()
+        written, read = self._store(digest, block) if not self._object(digest).exists() else (0, 0)
+        return digest, written, read
+
+    def _object(self, digest: str, codec: Optional[Codec] = None) -> Path:
+        """Object path; any codec's copy satisfies an existence check."""
+        directory = self.root / "objects" / digest[:2]
+        if codec is not None:
+            return directory / f"{digest}{codec.suffix}"
+        for suffix in _CODEC_BY_SUFFIX:
+            candidate = directory / f"{digest}{suffix}"
+            if candidate.exists():
+                return candidate
+        return directory / f"{digest}{self.codec.suffix}"
+
+    def _store(self, digest: str, data: bytes) -> Tuple[int, int]:
+        """Compress and write one object; returns (bytes written, bytes read)."""
+        codec = self.codec
+        sample = data[:_SAMPLE]
+        if len(codec.compress(sample)) > len(sample) * _MIN_SAVING:
+            codec = get_codec("raw")
+        stored = codec.compress(data)
+        _write_atomic(self._object(digest, codec), stored)
+        return len(stored), len(data)
+
+    def _load(self, digest: str) -> bytes:
+        path = self._object(digest)
+        if not path.exists():
+            raise BackupError(f"Missing object {digest}")
+        codec = get_codec(_CODEC_BY_SUFFIX[path.suffix])
+        try:
+            data = codec.decompress(path.read_bytes())
+        except Exception as e:  # zlib.error / zstandard.ZstdError
+            raise BackupError(f"Object {digest} is corrupted: {e}") from e
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise BackupError(f"Object {digest} is corrupted")
+        return data
+
+    def restore(
+        self,
+        backup_id: Optional[str] = None,
+        storage: Optional[Path] = None,
+        db_url: Optional[str] = None,
+        exclude: Sequence[str] = DEFAULT_EXCLUDE,
+    ) -> Manifest:
+        """Restore a backup in parallel.
+
+        Storage is made identical to the backup: changed and missing files
+        are written, files absent from the backup are removed (excluded
+        directories are left alone), unchanged files are skipped.
+
+        Args:
+            backup_id: Backup to restore (None = latest)
+            storage: File storage directory to restore into
+            db_url: Database to overwrite
+            exclude: Top-level storage directories to leave untouched
+
+        Returns:
+            Restored manifest
+
+        Raises:
+            BackupError: If the backup is unknown or its objects are missing
+                or corrupted (storage is left untouched when objects are missing)
+        """
+        started = time.perf_counter()
+        with (
+            self._lock(exclusive=False),
+            ThreadPoolExecutor(self.jobs, thread_name_prefix="restore") as pool,
+        ):
+            manifest = self.manifest(backup_id)
+            stats = BackupStats(files=len(manifest.files))
+            if storage is not None:
+                self._restore_files(manifest, Path(storage), exclude, pool, stats)
+            if db_url is not None:
+                if manifest.database is None:
+                    raise BackupError(f"Backup {manifest.id} has no database")
+                self._restore_database(manifest, db_url, pool, stats)
+        stats.seconds = round(time.perf_counter() - started, 3)
+        logger.info("Restore finished", extra={"backup_id": manifest.id, **asdict(stats)})
+        return manifest
+
+    def _restore_files(
+        self,
+        manifest: Manifest,
+        storage: Path,
+        exclude: Sequence[str],
+        pool: ThreadPoolExecutor,
+        stats: BackupStats,
+    ) -> None:
+        storage.mkdir(parents=True, exist_ok=True)
+        stale: List[Tuple[str, Dict[str, Any]]] = []
+        for rel, entry in manifest.files.items():
+            path = storage / rel
+            if path.exists():
+                st = path.stat()
+                if st.st_size == entry["size"] and st.st_mtime_ns == entry["mtime_ns"]:
+                    continue
+            stale.append((rel, entry))
+        # Nothing is deleted or overwritten unless every needed object is there
+        missing = {e["sha256"] for _, e in stale if not self._object(e["sha256"]).exists()}
+        if missing:
+            raise BackupError(f"Backup {manifest.id} is missing {len(missing)} objects")
+        for path in _walk(storage, exclude):
+            if path.relative_to(storage).as_posix() not in manifest.files:
+                path.unlink()
+
+        def restore_one(item: Tuple[str, Dict[str, Any]]) -> int:
+            rel, entry = item
+            path = storage / rel
+            data = self._load(entry["sha256"])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(path, data)
+            os.utime(path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+            return len(data)
+
+        for written in pool.map(restore_one, stale):
+            stats.files_restored += 1
+            stats.bytes_written += written
+
+    def _restore_database(
+        self, manifest: Manifest, db_url: str, pool: ThreadPoolExecutor, stats: BackupStats
+    ) -> None:
+        database = manifest.database or {}
+        url = make_url(db_url)
+        if database["kind"] == "postgres":
+            dump = self.root / "backups" / manifest.id / database["path"]
+            _run(pg_restore_command(db_url, dump, self.jobs))
+            return
+        if url.get_backend_name() != "sqlite":
+            raise BackupError("SQLite backups can only be restored into SQLite")
+        path = Path(url.database or "")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        chunk_size = database["chunk_size"]
+        tmp = path.with_name(f"{path.name}.restore")
+        try:
+            with open(tmp, "wb") as f:
+                f.truncate(database["size"])
+
+                def write_chunk(item: Tuple[int, str]) -> int:
+                    position, digest = item
+                    data = self._load(digest)
+                    os.pwrite(f.fileno(), data, position * chunk_size)
+                    return len(data)
+
+                stats.bytes_written += sum(pool.map(write_chunk, enumerate(database["chunks"])))
+                f.flush()
+                os.fsync(f.fileno())
+            if _sha256(tmp) != database["sha256"]:
+                raise BackupError(f"Restored database does not match backup {manifest.id}")
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        for suffix in ("-wal", "-shm", "-journal"):
+            path.with_name(path.name + suffix).unlink(missing_ok=True)
+        os.replace(tmp, path)
+
+    def prune(self, keep: int) -> int:
+        """Delete all but the newest ``keep`` backups and their unshared objects.
+
+        Args:
+            keep: Number of backups to keep
+
+        Returns:
+            Number of deleted objects
+        """
+        with self._lock(exclusive=True):
+            ids = self.backups()
+            for backup_id in ids[: max(0, len(ids) - keep)]:
+                shutil.rmtree(self.root / "backups" / backup_id)
+            live: Set[str] = set()
+            for backup_id in self.backups():
+                manifest = self.manifest(backup_id)
+                live.update(entry["sha256"] for entry in manifest.files.values())
+                if manifest.database and manifest.database["kind"] == "sqlite":
+                    live.update(manifest.database["chunks"])
+            removed = 0
+            for path in (self.root / "objects").glob("*/*"):
+                if path.name.split(".", 1)[0] not in live:
+                    path.unlink()
+                    removed += 1
+            return removed
+
+
+def pg_dump_command(db_url: str, target: Path, jobs: int) -> List[str]:
+    """``pg_dump`` invocation writing a parallel, zstd-compressed directory dump."""
+    return [
+        "pg_dump",
+        "--format=directory",
+        f"--jobs={jobs}",
+        "--compress=zstd:3",
+        f"--file={target}",
+        f"--dbname={_libpq_url(db_url)}",
+    ]
+
+
+def pg_restore_command(db_url: str, source: Path, jobs: int) -> List[str]:
+    """``pg_restore`` invocation restoring a directory dump in parallel."""
+    return [
+        "pg_restore",
+        f"--jobs={jobs}",
+        "--clean",
+        "--if-exists",
+        "--no-owner",
+        f"--dbname={_libpq_url(db_url)}",
+        str(source),
+    ]
+
+
+def _libpq_url(db_url: str) -> str:
+    """Strip the SQLAlchemy driver (``postgresql+asyncpg://`` -> ``postgresql://``)."""
+    return make_url(db_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def _run(command: List[str]) -> None:
+    try:
+        subprocess.run(command, check=True, capture_output=True)
+    except FileNotFoundError as e:
+        raise BackupError(f"{command[0]} is not installed") from e
+    except subprocess.CalledProcessError as e:
+        raise BackupError(f"{command[0]} failed: {e.stderr.decode(errors='replace')}") from e
+
+
+def _walk(root: Path, exclude: Sequence[str]) -> Iterable[Path]:
+    if not root.exists():
+        return
+    for path in sorted(root.rglob("*")):
+        rel = path.relative_to(root)
+        if rel.parts[0] in exclude or not path.is_file() or path.name == ".gitkeep":
+            continue
+        yield path
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(_READ_BLOCK):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def main() -> int:
+    """Backup command line."""
+    from src.core.config import get_settings
+
+    parser = argparse.ArgumentParser(description="Incremental backup and restore")
+    parser.add_argument("command", choices=("backup", "restore", "list", "prune"))
+    parser.add_argument("--target", help="Backup repository (default: BACKUP_PATH)")
+    parser.add_argument("--storage", help="File storage (default: STORAGE_PATH)")
+    parser.add_argument("--database-url", help="Database (default: DATABASE_URL)")
+    parser.add_argument("--id", help="Backup to restore (default: latest)")
+    parser.add_argument("--jobs", type=int)
+    parser.add_argument("--codec", default="auto", choices=("auto", "zstd", "zlib"))
+    parser.add_argument("--keep", type=int, default=14, help="Backups kept by prune")
+    parser.add_argument("--no-database", action="store_true")
+    parser.add_argument("--no-files", action="store_true")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    repository = BackupRepository(
+        Path(args.target or settings.backup_path),
+        codec=args.codec,
+        jobs=args.jobs or settings.backup_jobs,
+    )
+    storage = None if args.no_files else Path(args.storage or settings.storage_path)
+    db_url = None if args.no_database else args.database_url or settings.db_url
+    try:
+        if args.command == "backup":
+            manifest = repository.backup(storage, db_url)
+            print(json.dumps({"id": manifest.id, **asdict(manifest.stats)}))
+        elif args.command == "restore":
+            manifest = repository.restore(args.id, storage, db_url)
+            print(json.dumps({"id": manifest.id, "files": len(manifest.files)}))
+        elif args.command == "list":
+            for backup_id in repository.backups():
+                print(backup_id)
+        else:
+            print(json.dumps({"objects_removed": repository.prune(args.keep)}))
+    except BackupError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
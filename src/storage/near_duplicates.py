@@ -0,0 +1,347 @@
+"""Near-duplicate note detection with MinHash and LSH banding.
+
+Incoming note text is normalized, split into word shingles and reduced to
+a MinHash signature. Signatures are split into ``bands`` of ``rows``; notes
+sharing any band land in the same bucket, so candidates are found with a
+few dict lookups instead of a scan, and only they are compared by
+estimated Jaccard similarity. With 20 bands of 5 rows, pairs above 0.7
+similarity become candidates with >99% probability while pairs below ~0.3
+rarely collide.
+
+``NoteDeduplicator`` sits in front of the expensive enrichment (classify,
+tag, summarize, embed): for a near-duplicate it returns the artifacts
+derived for the earlier note instead of calling the LLM again. Every user
+has a separate index, so a note is only matched against (and only reuses
+artifacts of) the same user's notes. The indexes are persisted as one
+append-only log, so every added note costs one small write and the indexes
+are rebuilt by replaying the log on start.
+"""
+
+import base64
+import json
+import re
+import zlib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from src.core.logging import get_logger
+from src.core.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+# Largest prime below 2^32: (a * x + b) with a, b < p and 32-bit x fits in uint64
+_PRIME = 4_294_967_291
+_WORD_PATTERN = re.compile(r"\w+")
+_URL_PATTERN = re.compile(r"https?://\S+")
+
+NOTE_DEDUP = REGISTRY.counter(
+    "telemetriya_note_dedup_total", "Notes checked for near-duplicates", ("result",)
+)
+LLM_CALLS_SAVED = REGISTRY.counter(
+    "telemetriya_llm_calls_saved_total", "LLM calls avoided by reusing near-duplicate artifacts"
+)
+
+Signature = npt.NDArray[np.uint32]
+
+
+def shingles(text: str, size: int = 5) -> Set[int]:
+    """Hashed character shingles of normalized text.
+
+    Text is lowercased (``ё`` folded to ``е``), query strings are dropped
+    from URLs and punctuation is collapsed, so forwarded copies with a
+    different header, emoji or tracking parameters still share most
+    shingles. Texts shorter than ``size`` become a single shingle.
+    """
+    text = _URL_PATTERN.sub(lambda m: m.group(0).split("?")[0], text.lower().replace("ё", "е"))
+    normalized = " ".join(_WORD_PATTERN.findall(text))
+    if len(normalized) <= size:
+        return {zlib.crc32(normalized.encode("utf-8"))}
+    return {
+        zlib.crc32(normalized[i : i + size].encode("utf-8"))
+        for i in range(len(normalized) - size + 1)
+    }
+
+
+class MinHasher:
+    """MinHash signatures from universal hash permutations."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1) -> None:
+        """Initialize hasher.
+
+        Args:
+            num_perm: Signature length
+            seed: Permutation seed (must stay fixed for a persisted index)
+        """
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)[:, None]
+
+    def signature(self, hashed: Iterable[int]) -> Signature:
+        """Signature of a set of 32-bit shingle hashes."""
+        values = np.fromiter(hashed, dtype=np.uint64)
+        if not len(values):
+            values = np.zeros(1, dtype=np.uint64)
+        permuted = (self._a * values[None, :] + self._b) % np.uint64(_PRIME)
+        result: Signature = permuted.min(axis=1).astype(np.uint32)
+        return result
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(a == b))
+
+
+class MinHashIndex:
+    """LSH index of note signatures."""
+
+    def __init__(self, bands: int = 20, rows: int = 5, threshold: float = 0.7) -> None:
+        """Initialize index.
+
+        Args:
+            bands: Number of LSH bands
+            rows: Signature rows per band (``bands * rows`` is the signature length)
+            threshold: Minimum estimated similarity of a near-duplicate
+        """
+        self.bands = bands
+        self.rows = rows
+        self.threshold = threshold
+        self.hasher = MinHasher(bands * rows)
+        self.signatures: Dict[int, Signature] = {}
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def signature(self, text: str) -> Signature:
+        """Signature of note text."""
+        return self.hasher.signature(shingles(text))
+
+    def add(self, note_id: int, signature: Signature) -> None:
+        """Add or replace a note signature."""
+        if note_id in self.signatures:
+            self.remove(note_id)
+        self.signatures[note_id] = signature
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(note_id)
+
+    def remove(self, note_id: int) -> None:
+        """Remove a note (no-op if unknown)."""
+        signature = self.signatures.pop(note_id, None)
+        if signature is None:
+            return
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key, [])
+            if note_id in bucket:
+                bucket.remove(note_id)
+            if not bucket:
+                self._buckets[band].pop(key, None)
+
+    def query(self, signature: Signature) -> Optional[Tuple[int, float]]:
+        """Most similar indexed note above the threshold.
+
+        Returns:
+            Tuple of (note id, estimated similarity) or None
+        """
+        candidates: Set[int] = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        best: Optional[Tuple[int, float]] = None
+        for note_id in candidates:
+            score = similarity(signature, self.signatures[note_id])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (note_id, score)
+        return best
+
+    def _band_keys(self, signature: Signature) -> Iterable[bytes]:
+        for band in range(self.bands):
+            yield signature[band * self.rows : (band + 1) * self.rows].tobytes()
+
+
+@dataclass
+class DerivedArtifacts:
+    """Enrichment results that can be reused for a near-duplicate."""
+
+    tags: List[str] = field(default_factory=list)
+    summary: Optional[str] = None
+    embedding: Optional[List[float]] = None
+    llm_calls: int = 0
+
+
+@dataclass
+class DedupResult:
+    """Outcome of ``NoteDeduplicator.process``."""
+
+    artifacts: DerivedArtifacts
+    duplicate_of: Optional[int] = None
+    similarity: float = 0.0
+
+
+@dataclass
+class DedupStats:
+    """Deduplication counters."""
+
+    checked: int = 0
+    duplicates: int = 0
+    llm_calls: int = 0
+    saved_llm_calls: int = 0
+
+    @property
+    def dedup_rate(self) -> float:
+        """Share of checked notes that were near-duplicates."""
+        return self.duplicates / self.checked if self.checked else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        """Serialize stats for logging."""
+        return {**asdict(self), "dedup_rate": round(self.dedup_rate, 4)}
+
+
+Deriver = Callable[[str], Awaitable[DerivedArtifacts]]
+
+
+class NoteDeduplicator:
+    """Reuse enrichment artifacts of near-duplicate notes."""
+
+    def __init__(
+        self,
+        index_factory: Callable[[], MinHashIndex] = MinHashIndex,
+        path: Optional[Path] = None,
+        stats_log_every: int = 1000,
+    ) -> None:
+        """Initialize deduplicator.
+
+        Args:
+            index_factory: Creates the signature index of a user
+            path: Append-only log file; replayed on start when it exists
+            stats_log_every: Log dedup stats every N checked notes (0 = never)
+        """
+        self._index_factory = index_factory
+        # user id -> index / note id -> artifacts
+        self.indexes: Dict[int, MinHashIndex] = {}
+        self.artifacts: Dict[int, Dict[int, DerivedArtifacts]] = {}
+        self.stats = DedupStats()
+        self._path = path
+        self._stats_log_every = stats_log_every
+        if path is not None and path.exists():
+            self._replay(path)
+
+    def index(self, user_id: int) -> MinHashIndex:
+        """Signature index of a user's notes (created on first use)."""
+        index = self.indexes.get(user_id)
+        if index is None:
+            index = self.indexes[user_id] = self._index_factory()
+            self.artifacts[user_id] = {}
+        return index
+
+    async def process(self, user_id: int, note_id: int, text: str, derive: Deriver) -> DedupResult:
+        """Get artifacts for a note, deriving them only for new content.
+
+        Only notes of the same user are considered near-duplicates.
+
+        Args:
+            user_id: Owner of the note
+            note_id: Note id
+            text: Note text
+            derive: Coroutine running the enrichment pipeline
+
+        Returns:
+            Artifacts and the near-duplicate they were taken from, if any
+        """
+        index = self.index(user_id)
+        signature = index.signature(text)
+        match = index.query(signature)
+        known = self.artifacts[user_id]
+        self.stats.checked += 1
+        if match is not None and match[0] in known:
+            artifacts = known[match[0]]
+            self.stats.duplicates += 1
+            self.stats.saved_llm_calls += artifacts.llm_calls
+            NOTE_DEDUP.labels("duplicate").inc()
+            LLM_CALLS_SAVED.inc(artifacts.llm_calls)
+            result = DedupResult(artifacts, duplicate_of=match[0], similarity=match[1])
+        else:
+            artifacts = await derive(text)
+            self.stats.llm_calls += artifacts.llm_calls
+            NOTE_DEDUP.labels("unique").inc()
+            result = DedupResult(artifacts)
+        self.add(user_id, note_id, signature, artifacts)
+        if self._stats_log_every and self.stats.checked % self._stats_log_every == 0:
+            logger.info("Note dedup stats", extra=self.stats.as_dict())
+        return result
+
+    def add(
+        self, user_id: int, note_id: int, signature: Signature, artifacts: DerivedArtifacts
+    ) -> None:
+        """Index a user's note with its artifacts and append it to the log."""
+        self._add(user_id, note_id, signature, artifacts)
+        record = {"op": "add", "user": user_id, "id": note_id, "sig": _encode(signature)}
+        self._append({**record, **asdict(artifacts)})
+
+    def remove(self, user_id: int, note_id: int) -> None:
+        """Forget a user's deleted note."""
+        self._remove(user_id, note_id)
+        self._append({"op": "remove", "user": user_id, "id": note_id})
+
+    def compact(self) -> None:
+        """Rewrite the log with live notes only."""
+        if self._path is None:
+            return
+        tmp = self._path.with_suffix(self._path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for user_id, index in self.indexes.items():
+                for note_id, signature in index.signatures.items():
+                    record = {"op": "add", "user": user_id, "id": note_id}
+                    record["sig"] = _encode(signature)
+                    record.update(asdict(self.artifacts[user_id][note_id]))
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        tmp.replace(self._path)
+
+    def _add(
+        self, user_id: int, note_id: int, signature: Signature, artifacts: DerivedArtifacts
+    ) -> None:
+        self.index(user_id).add(note_id, signature)
+        self.artifacts[user_id][note_id] = artifacts
+
+    def _remove(self, user_id: int, note_id: int) -> None:
+        index = self.indexes.get(user_id)
+        if index is None:
+            return
+        index.remove(note_id)
+        self.artifacts[user_id].pop(note_id, None)
+        if not len(index):
+            del self.indexes[user_id], self.artifacts[user_id]
+
+    def _append(self, record: Dict[str, object]) -> None:
+        if self._path is None:
+            return
+        with self._path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _replay(self, path: Path) -> None:
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                user_id, note_id = record.pop("user"), record.pop("id")
+                if record.pop("op") == "remove":
+                    self._remove(user_id, note_id)
+                    continue
+                self._add(user_id, note_id, _decode(record.pop("sig")), DerivedArtifacts(**record))
+        notes = sum(len(index) for index in self.indexes.values())
+        logger.info(
+            "Dedup index loaded",
+            extra={"path": str(path), "users": len(self.indexes), "notes": notes},
+        )
+
+
+def _encode(signature: Signature) -> str:
+    return base64.b64encode(signature.astype("<u4").tobytes()).decode("ascii")
+
+
+def _decode(value: str) -> Signature:
+    return np.frombuffer(base64.b64decode(value), dtype="<u4").astype(np.uint32)
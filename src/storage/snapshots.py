@@ -0,0 +1,493 @@
+"""Warm-start snapshots of in-memory caches and indexes.
+
+Caches and vector indexes are rebuilt from nothing on every restart, so
+after a deploy latency and LLM spend stay high until they warm up again.
+``SnapshotManager`` periodically writes registered structures under
+``STORAGE_PATH/snapshots`` and restores them on the next start.
+
+File layout (little-endian)::
+
+    magic "TLMSNAP\\0" | format version u32 | meta length u32 | meta crc32 u32
+    meta JSON: name, schema, created_at, sections {name: kind/offset/length/crc/...}
+    sections, each aligned to 64 bytes from the start of the file
+
+Sections are numpy arrays, raw bytes or JSON documents. The file is opened
+with ``mmap``: opening only parses the header, arrays are zero-copy
+read-only views whose pages are read when first touched, and a section's
+CRC is checked the first time it is read. Files are written to a temporary
+name and renamed, so a crash mid-write leaves the previous snapshot intact.
+
+A snapshot is used only when its format version, provider name and
+provider ``schema`` match and it is not older than ``max_age``; anything
+else (including a checksum mismatch) is logged and the structure starts
+cold as before.
+"""
+
+import asyncio
+import base64
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Set, Union
+
+import numpy as np
+
+from src.core.logging import get_logger
+from src.core.metrics import REGISTRY
+from src.storage.vectors import QuantizationMode, VectorIndex
+from src.utils.cache import LRUCache
+
+if TYPE_CHECKING:
+    from src.core.config import Settings
+
+logger = get_logger(__name__)
+
+MAGIC = b"TLMSNAP\x00"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sIII")
+
+SNAPSHOT_LOADS = REGISTRY.counter(
+    "telemetriya_snapshot_loads_total", "Warm-start snapshot restore attempts", ("result",)
+)
+
+SectionValue = Union[np.ndarray, bytes, Any]
+Dumper = Callable[[], Mapping[str, SectionValue]]
+Restorer = Callable[["Snapshot"], None]
+
+
+class SnapshotError(Exception):
+    """Snapshot is missing, damaged, stale or does not match its provider."""
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_snapshot(
+    path: Path, name: str, sections: Mapping[str, SectionValue], schema: int = 1
+) -> int:
+    """Atomically write a snapshot file.
+
+    Args:
+        path: Destination file
+        name: Provider name stored in the header
+        sections: Section name to numpy array, ``bytes`` or JSON-serializable value
+        schema: Provider layout version
+
+    Returns:
+        Size of the written file in bytes
+    """
+    blobs: List[memoryview] = []
+    index: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    for section, value in sections.items():
+        entry: Dict[str, Any]
+        if isinstance(value, np.ndarray):
+            array = np.ascontiguousarray(value)
+            entry = {"kind": "array", "dtype": array.dtype.str, "shape": list(array.shape)}
+            blob = memoryview(array).cast("B")
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            entry = {"kind": "bytes"}
+            blob = memoryview(value).cast("B")
+        else:
+            entry = {"kind": "json"}
+            blob = memoryview(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+        offset = _aligned(offset)
+        entry.update(offset=offset, length=blob.nbytes, crc=zlib.crc32(blob))
+        index[section] = entry
+        blobs.append(blob)
+        offset += blob.nbytes
+
+    meta = json.dumps(
+        {"name": name, "schema": schema, "created_at": time.time(), "sections": index}
+    ).encode("utf-8")
+    start = _aligned(_PREFIX.size + len(meta))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(meta), zlib.crc32(meta)))
+        f.write(meta)
+        for entry, blob in zip(index.values(), blobs):
+            f.seek(start + entry["offset"])
+            f.write(blob)
+        size = start + offset
+        f.truncate(size)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return size
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file."""
+
+    def __init__(self, path: Path) -> None:
+        """Open a snapshot and validate its header.
+
+        Args:
+            path: Snapshot file
+
+        Raises:
+            SnapshotError: If the file is missing, truncated or not a snapshot
+        """
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"cannot open {path}: {e}") from e
+        if len(self._map) < _PREFIX.size:
+            raise SnapshotError("truncated header")
+        magic, version, meta_len, meta_crc = _PREFIX.unpack_from(self._map)
+        if magic != MAGIC:
+            raise SnapshotError("not a snapshot file")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"format version {version}, expected {FORMAT_VERSION}")
+        meta = self._map[_PREFIX.size : _PREFIX.size + meta_len]
+        if len(meta) != meta_len or zlib.crc32(meta) != meta_crc:
+            raise SnapshotError("header checksum mismatch")
+        info = json.loads(meta)
+        self.name: str = info["name"]
+        self.schema: int = info["schema"]
+        self.created_at: float = info["created_at"]
+        self.sections: Dict[str, Dict[str, Any]] = info["sections"]
+        self._start = _aligned(_PREFIX.size + meta_len)
+        self._verified: Set[str] = set()
+
+    def __contains__(self, section: object) -> bool:
+        return section in self.sections
+
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was written."""
+        return max(0.0, time.time() - self.created_at)
+
+    def _view(self, section: str, kind: str) -> memoryview:
+        entry = self.sections.get(section)
+        if entry is None or entry["kind"] != kind:
+            raise SnapshotError(f"no {kind} section {section!r}")
+        start = self._start + entry["offset"]
+        if start + entry["length"] > len(self._map):
+            raise SnapshotError(f"section {section!r} is truncated")
+        view = memoryview(self._map)[start : start + entry["length"]]
+        if section not in self._verified:
+            if zlib.crc32(view) != entry["crc"]:
+                raise SnapshotError(f"section {section!r} checksum mismatch")
+            self._verified.add(section)
+        return view
+
+    def array(self, section: str) -> np.ndarray:
+        """Read-only array backed by the mapped file (no copy)."""
+        entry = self.sections.get(section, {})
+        view = self._view(section, "array")
+        return np.frombuffer(view, dtype=np.dtype(entry["dtype"])).reshape(entry["shape"])
+
+    def blob(self, section: str) -> bytes:
+        """Copy of a bytes section."""
+        return self._view(section, "bytes").tobytes()
+
+    def document(self, section: str) -> Any:
+        """Decoded JSON section."""
+        return json.loads(self._view(section, "json").tobytes())
+
+
+@dataclass
+class SnapshotProvider:
+    """Structure registered for snapshots."""
+
+    name: str
+    dump: Dumper
+    restore: Restorer
+    # Bump when the section layout changes; older snapshots are ignored
+    schema: int = 1
+    # Oldest snapshot worth restoring in seconds (None = any)
+    max_age: Optional[float] = None
+
+
+@dataclass
+class SnapshotStats:
+    """Snapshot counters."""
+
+    written: int = 0
+    bytes_written: int = 0
+    restored: int = 0
+    rejected: int = 0
+    last_write_seconds: float = 0.0
+
+
+@dataclass
+class _State:
+    attempted: Set[str] = field(default_factory=set)
+    restored: Set[str] = field(default_factory=set)
+
+
+class SnapshotManager:
+    """Periodic snapshots with lazy restore and a final write on shutdown.
+
+    Typical lifecycle::
+
+        manager.register_cache("prompt-tokens", TOKENS.cache)
+        manager.register_index("notes", index)
+        manager.restore_all()        # at startup, or manager.restore(name) on first use
+        await manager.start()        # periodic snapshots
+        ...
+        await manager.stop()         # graceful shutdown: final snapshot
+
+    A provider is only written after its restore was attempted, so a
+    structure that has not been warmed yet never overwrites a good snapshot.
+    """
+
+    def __init__(self, directory: Path, interval: float = 300.0) -> None:
+        """Initialize manager.
+
+        Args:
+            directory: Directory holding ``<name>.snap`` files
+            interval: Seconds between periodic snapshots
+        """
+        self.directory = Path(directory)
+        self.interval = interval
+        self.stats = SnapshotStats()
+        self._providers: Dict[str, SnapshotProvider] = {}
+        self._state = _State()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: "Settings") -> Optional["SnapshotManager"]:
+        """Build a manager from settings; None when snapshots are disabled."""
+        if settings.snapshot_interval <= 0:
+            return None
+        return cls(Path(settings.storage_path) / "snapshots", settings.snapshot_interval)
+
+    def path(self, name: str) -> Path:
+        """Snapshot file of a provider."""
+        return self.directory / f"{name}.snap"
+
+    def register(
+        self,
+        name: str,
+        dump: Dumper,
+        restore: Restorer,
+        *,
+        schema: int = 1,
+        max_age: Optional[float] = None,
+    ) -> None:
+        """Register a structure.
+
+        Args:
+            name: Unique provider name (file name of its snapshot)
+            dump: Returns the sections to write; called on the event loop
+            restore: Loads a validated snapshot into the structure
+            schema: Section layout version
+            max_age: Oldest snapshot worth restoring in seconds
+
+        Raises:
+            ValueError: If the name is already registered
+        """
+        if name in self._providers:
+            raise ValueError(f"Snapshot provider {name!r} already registered")
+        self._providers[name] = SnapshotProvider(name, dump, restore, schema, max_age)
+
+    def register_cache(
+        self,
+        name: str,
+        cache: LRUCache[Any, Any],
+        *,
+        values: str = "json",
+        schema: int = 1,
+        max_age: Optional[float] = None,
+    ) -> None:
+        """Register an ``LRUCache`` with string keys.
+
+        Args:
+            name: Provider name
+            cache: Cache to snapshot
+            values: Value encoding: ``json``, ``bytes`` or ``array``
+                (equal-shape numpy vectors stored as one mapped matrix)
+            schema: Section layout version
+            max_age: Oldest snapshot worth restoring in seconds
+        """
+        if values not in ("json", "bytes", "array"):
+            raise ValueError(f"Unknown cache value encoding {values!r}")
+
+        def dump() -> Dict[str, SectionValue]:
+            entries = cache.dump()
+            keys = [key for key, _, _ in entries]
+            ttls = np.asarray([left for _, _, left in entries], dtype=np.float64)
+            if values == "array":
+                stored: SectionValue = (
+                    np.stack([np.asarray(v) for _, v, _ in entries]) if entries else np.empty(0)
+                )
+            elif values == "bytes":
+                stored = [base64.b64encode(v).decode("ascii") for _, v, _ in entries]
+            else:
+                stored = [v for _, v, _ in entries]
+            return {"keys": keys, "ttls": ttls, "values": stored}
+
+        def restore(snapshot: Snapshot) -> None:
+            keys = snapshot.document("keys")
+            # Entries kept ticking while the process was down
+            ttls = snapshot.array("ttls") - snapshot.age
+            if values == "array":
+                stored: Any = snapshot.array("values")
+            else:
+                stored = snapshot.document("values")
+                if values == "bytes":
+                    stored = [base64.b64decode(v) for v in stored]
+            if len(keys) != len(ttls) or len(keys) != len(stored):
+                raise SnapshotError("cache sections differ in length")
+            cache.load(zip(keys, stored, ttls.tolist()))
+
+        self.register(name, dump, restore, schema=schema, max_age=max_age)
+
+    def register_index(self, name: str, index: VectorIndex, *, schema: int = 1) -> None:
+        """Register a vector index; restored arrays stay memory-mapped.
+
+        Args:
+            name: Provider name
+            index: Index to snapshot and restore in place
+            schema: Section layout version
+        """
+
+        def dump() -> Dict[str, SectionValue]:
+            sections: Dict[str, SectionValue] = {
+                "meta": {
+                    "dim": index.dim,
+                    "mode": index.mode.value,
+                    "keep_full": index.full is not None,
+                },
+                "ids": index.ids,
+                "codes": index.codes,
+            }
+            if index.full is not None:
+                sections["full"] = np.asarray(index.full)
+            if index.scale is not None and index.offset is not None:
+                sections["scale"] = index.scale
+                sections["offset"] = index.offset
+            return sections
+
+        def restore(snapshot: Snapshot) -> None:
+            meta = snapshot.document("meta")
+            expected = (index.dim, index.mode, index.full is not None)
+            if (meta["dim"], QuantizationMode(meta["mode"]), meta["keep_full"]) != expected:
+                raise SnapshotError("index configuration changed")
+            ids, codes = snapshot.array("ids"), snapshot.array("codes")
+            full = snapshot.array("full") if meta["keep_full"] else None
+            if index.mode is QuantizationMode.INT8:
+                index.scale, index.offset = snapshot.array("scale"), snapshot.array("offset")
+            index.ids, index.codes, index.full = ids, codes, full
+
+        self.register(name, dump, restore, schema=schema)
+
+    def restore(self, name: str) -> bool:
+        """Restore one provider from its snapshot, at most once.
+
+        Cheap enough to call on the first use of a structure: only the
+        header is parsed until the provider reads its sections.
+
+        Args:
+            name: Provider name
+
+        Returns:
+            True if the structure was restored (now or earlier)
+        """
+        if name in self._state.attempted:
+            return name in self._state.restored
+        self._state.attempted.add(name)
+        provider = self._providers[name]
+        path = self.path(name)
+        if not path.exists():
+            SNAPSHOT_LOADS.labels("missing").inc()
+            return False
+        started = time.perf_counter()
+        try:
+            snapshot = Snapshot(path)
+            if snapshot.name != name or snapshot.schema != provider.schema:
+                raise SnapshotError(f"schema {snapshot.schema}, expected {provider.schema}")
+            if provider.max_age is not None and snapshot.age > provider.max_age:
+                raise SnapshotError(f"snapshot is {snapshot.age:.0f}s old")
+            provider.restore(snapshot)
+        except (SnapshotError, KeyError, ValueError) as e:
+            self.stats.rejected += 1
+            SNAPSHOT_LOADS.labels("rejected").inc()
+            logger.warning("Snapshot ignored", extra={"snapshot": name, "reason": str(e)})
+            return False
+        self._state.restored.add(name)
+        self.stats.restored += 1
+        SNAPSHOT_LOADS.labels("restored").inc()
+        logger.info(
+            "Snapshot restored",
+            extra={
+                "snapshot": name,
+                "age_seconds": round(snapshot.age, 1),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            },
+        )
+        return True
+
+    def restore_all(self) -> List[str]:
+        """Restore every registered provider.
+
+        Returns:
+            Names of restored providers
+        """
+        return [name for name in self._providers if self.restore(name)]
+
+    async def snapshot(self) -> Dict[str, int]:
+        """Write snapshots of all providers whose restore was attempted.
+
+        Sections are collected on the event loop (so they are consistent
+        with concurrent updates) and written from a worker thread.
+
+        Returns:
+            Provider name to written bytes
+        """
+        async with self._lock:
+            started = time.perf_counter()
+            written: Dict[str, int] = {}
+            for name, provider in self._providers.items():
+                if name not in self._state.attempted:
+                    continue
+                try:
+                    sections = provider.dump()
+                    written[name] = await asyncio.to_thread(
+                        write_snapshot, self.path(name), name, sections, provider.schema
+                    )
+                except (OSError, TypeError, ValueError):
+                    logger.exception("Snapshot write failed", extra={"snapshot": name})
+            self.stats.written += len(written)
+            self.stats.bytes_written += sum(written.values())
+            self.stats.last_write_seconds = time.perf_counter() - started
+            return written
+
+    async def start(self) -> None:
+        """Start periodic snapshots."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="snapshot-writer")
+
+    async def stop(self, final: bool = True) -> None:
+        """Stop periodic snapshots; graceful-shutdown hook.
+
+        Args:
+            final: Write a last snapshot so the next start is warm
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if final:
+            await self.snapshot()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.snapshot()
@@ -0,0 +1,346 @@
+"""Compact embedding storage with quantized search and exact re-ranking.
+
+Vectors are kept as one contiguous NumPy array per index in one of three
+formats:
+
+* ``float32`` — full precision (4 bytes per dimension);
+* ``float16`` — half precision (2 bytes per dimension; NumPy converts
+  half floats slowly on most CPUs, so this halves memory but scans slower
+  than int8);
+* ``int8`` — scalar quantization with a per-dimension scale and offset
+  fitted on the stored vectors and widened (re-quantizing what is stored)
+  when a new vector falls outside it (1 byte per dimension).
+
+Search scans the quantized array in small chunks converted into one
+reused float32 buffer (so the working copy stays in cache) and, when
+full-precision vectors are kept, re-ranks the best ``k * rerank_factor``
+candidates with exact dot products. Saved indexes memory-map the
+full-precision array, so only the candidate rows are read from disk while
+the quantized array stays in RAM.
+
+Vectors are expected to be L2-normalized, so the dot product is the cosine
+similarity. Keep one index per user to search a user's notes.
+"""
+
+import json
+from enum import Enum
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+SCAN_CHUNK = 1024
+_INT8_LEVELS = 255.0
+# Smallest quantization step, so a constant dimension still has a range
+_INT8_MIN_SCALE = 1e-6
+# Share of the span added on both sides when the int8 range is widened
+_INT8_HEADROOM = 0.125
+# Rows allocated for the first add
+_MIN_CAPACITY = 64
+
+FloatArray = npt.NDArray[np.float32]
+
+
+class QuantizationMode(str, Enum):
+    """Storage format of quantized vectors."""
+
+    FLOAT32 = "float32"
+    FLOAT16 = "float16"
+    INT8 = "int8"
+
+
+def fit_int8(vectors: FloatArray) -> Tuple[FloatArray, FloatArray]:
+    """Fit per-dimension int8 quantization parameters.
+
+    Args:
+        vectors: Matrix of shape (n, dim)
+
+    Returns:
+        Tuple of (scale, offset), each of shape (dim,)
+    """
+    low = vectors.min(axis=0)
+    high = vectors.max(axis=0)
+    scale = np.maximum((high - low) / _INT8_LEVELS, _INT8_MIN_SCALE)
+    return scale.astype(np.float32), low.astype(np.float32)
+
+
+def quantize_int8(
+    vectors: FloatArray, scale: FloatArray, offset: FloatArray
+) -> npt.NDArray[np.int8]:
+    """Quantize vectors to int8 (values outside the fitted range are clipped)."""
+    levels = np.rint((vectors - offset) / scale)
+    codes: npt.NDArray[np.int8] = (np.clip(levels, 0, _INT8_LEVELS) - 128).astype(np.int8)
+    return codes
+
+
+def dequantize_int8(
+    codes: npt.NDArray[np.int8], scale: FloatArray, offset: FloatArray
+) -> FloatArray:
+    """Reconstruct approximate float32 vectors from int8 codes."""
+    result: FloatArray = (codes.astype(np.float32) + 128) * scale + offset
+    return result
+
+
+class VectorIndex:
+    """Quantized vector index with optional full-precision re-ranking."""
+
+    def __init__(
+        self,
+        dim: int,
+        mode: QuantizationMode = QuantizationMode.INT8,
+        *,
+        keep_full: bool = True,
+        rerank_factor: int = 4,
+    ) -> None:
+        """Initialize an empty index.
+
+        Args:
+            dim: Vector dimension
+            mode: Storage format of the searched vectors
+            keep_full: Keep float32 vectors for re-ranking
+            rerank_factor: Candidates re-ranked per requested result
+        """
+        self.dim = dim
+        self.mode = QuantizationMode(mode)
+        self.keep_full = keep_full and self.mode is not QuantizationMode.FLOAT32
+        self.rerank_factor = rerank_factor
+        # Arrays are allocated with spare rows and grown geometrically, so
+        # adding one note at a time does not copy the whole index
+        self._size = 0
+        self._ids: npt.NDArray[np.int64] = np.empty(0, dtype=np.int64)
+        self._codes: np.ndarray = np.empty((0, dim), dtype=self.mode.value)
+        self._full: Optional[FloatArray] = (
+            np.empty((0, dim), dtype=np.float32) if self.keep_full else None
+        )
+        self.scale: Optional[FloatArray] = None
+        self.offset: Optional[FloatArray] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def ids(self) -> npt.NDArray[np.int64]:
+        """Identifiers of the stored vectors."""
+        return self._ids[: self._size]
+
+    @ids.setter
+    def ids(self, value: npt.NDArray[np.int64]) -> None:
+        self._ids = value
+        self._size = len(value)
+
+    @property
+    def codes(self) -> np.ndarray:
+        """Searched (quantized) vectors."""
+        return self._codes[: self._size]
+
+    @codes.setter
+    def codes(self, value: np.ndarray) -> None:
+        self._codes = value
+
+    @property
+    def full(self) -> Optional[FloatArray]:
+        """Full-precision vectors used for re-ranking (None if not kept)."""
+        return None if self._full is None else self._full[: self._size]
+
+    @full.setter
+    def full(self, value: Optional[FloatArray]) -> None:
+        self._full = value
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held in RAM for search (memory-mapped vectors excluded)."""
+        size = self._ids.nbytes + self._codes.nbytes
+        if self.scale is not None and self.offset is not None:
+            size += self.scale.nbytes + self.offset.nbytes
+        if self._full is not None and not isinstance(self._full, np.memmap):
+            size += self._full.nbytes
+        return size
+
+    def add(self, ids: Sequence[int], vectors: npt.ArrayLike) -> None:
+        """Add vectors.
+
+        int8 parameters are fitted on the first batch; when a later vector
+        falls outside that range it is widened (with headroom) and the
+        stored vectors are re-quantized, from the full-precision copy if
+        one is kept.
+
+        Args:
+            ids: Identifiers returned by ``search``
+            vectors: Matrix of shape (len(ids), dim)
+
+        Raises:
+            ValueError: If shapes do not match
+        """
+        matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != self.dim or len(matrix) != len(ids):
+            raise ValueError(f"Expected {len(ids)} vectors of dimension {self.dim}")
+        if not len(matrix):
+            return
+        start, end = self._size, self._size + len(matrix)
+        # Growing also copies memory-mapped arrays of a loaded index into RAM
+        self._reserve(end)
+        if self.mode is QuantizationMode.INT8:
+            self._fit_int8(matrix)
+            assert self.scale is not None and self.offset is not None
+            self._codes[start:end] = quantize_int8(matrix, self.scale, self.offset)
+        else:
+            self._codes[start:end] = matrix
+        self._ids[start:end] = np.asarray(ids, dtype=np.int64)
+        if self._full is not None:
+            self._full[start:end] = matrix
+        self._size = end
+
+    def _reserve(self, rows: int) -> None:
+        capacity = len(self._ids)
+        if rows <= capacity:
+            return
+        capacity = max(rows, 2 * capacity, _MIN_CAPACITY)
+        self._ids = _resized(self._ids, self._size, capacity)
+        self._codes = _resized(self._codes, self._size, capacity)
+        if self._full is not None:
+            self._full = _resized(self._full, self._size, capacity)
+
+    def _fit_int8(self, matrix: FloatArray) -> None:
+        if self.scale is None or self.offset is None:
+            self.scale, self.offset = fit_int8(matrix)
+            return
+        top = self.offset + self.scale * _INT8_LEVELS
+        low, high = matrix.min(axis=0), matrix.max(axis=0)
+        if np.all(low >= self.offset) and np.all(high <= top):
+            return
+        low, high = np.minimum(low, self.offset), np.maximum(high, top)
+        margin = (high - low) * _INT8_HEADROOM
+        old_scale, old_offset = self.scale, self.offset
+        self.scale, self.offset = fit_int8(np.stack([low - margin, high + margin]))
+        for begin in range(0, self._size, SCAN_CHUNK):
+            rows = slice(begin, min(begin + SCAN_CHUNK, self._size))
+            if self._full is not None:
+                source = np.asarray(self._full[rows])
+            else:
+                source = dequantize_int8(self._codes[rows], old_scale, old_offset)
+            self._codes[rows] = quantize_int8(source, self.scale, self.offset)
+        logger.debug("Vector index int8 range widened", extra={"vectors": self._size})
+
+    def search(
+        self, query: npt.ArrayLike, k: int = 10, rerank: bool = True
+    ) -> List[Tuple[int, float]]:
+        """Find the ``k`` most similar vectors.
+
+        Args:
+            query: Query vector of shape (dim,)
+            k: Number of results
+            rerank: Re-rank quantized candidates with full-precision vectors
+
+        Returns:
+            ``(id, score)`` pairs, best first
+        """
+        if not len(self):
+            return []
+        vector = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        use_full = rerank and self.full is not None
+        wanted = min(k * self.rerank_factor if use_full else k, len(self))
+        scores = self.scores(vector)
+        candidates = _top(scores, wanted)
+        if use_full and self.full is not None:
+            order = np.sort(candidates)
+            exact = np.asarray(self.full[order]) @ vector
+            best = _top(exact, min(k, len(order)))
+            return [(int(self.ids[order[i]]), float(exact[i])) for i in best]
+        return [(int(self.ids[i]), float(scores[i])) for i in candidates[:k]]
+
+    def scores(self, query: FloatArray) -> FloatArray:
+        """Approximate similarity of ``query`` to every stored vector."""
+        result = np.empty(len(self), dtype=np.float32)
+        if (
+            self.mode is QuantizationMode.INT8
+            and self.scale is not None
+            and self.offset is not None
+        ):
+            # x . (scale * (q + 128) + offset) = (x * scale) . q + const
+            weights = query * self.scale
+            const = float(query @ self.offset + 128 * weights.sum())
+            self._scan(weights, result)
+            result += const
+        elif self.mode is QuantizationMode.FLOAT16:
+            self._scan(query, result)
+        else:
+            result[:] = self.codes @ query
+        return result
+
+    def _scan(self, weights: FloatArray, out: FloatArray) -> None:
+        # Chunks are converted into one reused float32 buffer that stays in cache
+        buffer = np.empty((min(SCAN_CHUNK, len(self)), self.dim), dtype=np.float32)
+        for start in range(0, len(self), SCAN_CHUNK):
+            chunk = self.codes[start : start + SCAN_CHUNK]
+            converted = buffer[: len(chunk)]
+            converted[...] = chunk
+            np.matmul(converted, weights, out=out[start : start + len(chunk)])
+
+    def save(self, directory: Path) -> None:
+        """Write the index as contiguous ``.npy`` arrays plus metadata."""
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "ids.npy", self.ids)
+        np.save(directory / "codes.npy", self.codes)
+        if self.full is not None:
+            np.save(directory / "full.npy", np.asarray(self.full))
+        if self.scale is not None and self.offset is not None:
+            np.save(directory / "scale.npy", self.scale)
+            np.save(directory / "offset.npy", self.offset)
+        meta = {
+            "dim": self.dim,
+            "mode": self.mode.value,
+            "keep_full": self.full is not None,
+            "rerank_factor": self.rerank_factor,
+        }
+        (directory / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+    @classmethod
+    def load(cls, directory: Path, mmap_full: bool = True) -> "VectorIndex":
+        """Load an index written by ``save``.
+
+        Args:
+            directory: Index directory
+            mmap_full: Memory-map full-precision vectors instead of reading them
+
+        Returns:
+            Loaded index
+        """
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        index = cls(
+            meta["dim"],
+            QuantizationMode(meta["mode"]),
+            keep_full=meta["keep_full"],
+            rerank_factor=meta["rerank_factor"],
+        )
+        index.ids = np.load(directory / "ids.npy")
+        index.codes = np.load(directory / "codes.npy")
+        if meta["keep_full"]:
+            index.full = np.load(directory / "full.npy", mmap_mode="r" if mmap_full else None)
+        if index.mode is QuantizationMode.INT8:
+            index.scale = np.load(directory / "scale.npy")
+            index.offset = np.load(directory / "offset.npy")
+        logger.debug(
+            "Vector index loaded",
+            extra={"path": str(directory), "vectors": len(index), "bytes": index.nbytes},
+        )
+        return index
+
+
+def _resized(array: np.ndarray, rows: int, capacity: int) -> np.ndarray:
+    """Copy of the first ``rows`` rows of ``array`` with room for ``capacity``."""
+    grown = np.empty((capacity, *array.shape[1:]), dtype=array.dtype)
+    grown[:rows] = array[:rows]
+    return grown
+
+
+def _top(scores: FloatArray, k: int) -> npt.NDArray[np.intp]:
+    """Indices of the ``k`` highest scores, best first."""
+    if k >= len(scores):
+        return np.argsort(-scores)
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part])]
@@ -0,0 +1,141 @@
+"""In-process LRU cache with optional TTL and hit/miss statistics."""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    """Cache counters."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """Share of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache(Generic[K, V]):
+    """Bounded mapping evicting the least recently used entry.
+
+    Entries may expire after ``ttl`` seconds; expired entries are dropped
+    lazily on access or when they reach the LRU end.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize cache.
+
+        Args:
+            maxsize: Maximum number of entries
+            ttl: Default entry lifetime in seconds (None = no expiry)
+            clock: Monotonic time source
+        """
+        self._data: "OrderedDict[K, Tuple[V, float]]" = OrderedDict()
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._clock = clock
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        item = self._data.get(key)  # type: ignore[arg-type]
+        return item is not None and item[1] > self._clock()
+
+    def get(self, key: K) -> Optional[V]:
+        """Get a value and mark it recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if missing or expired
+        """
+        item = self._data.get(key)
+        if item is None:
+            self.stats.misses += 1
+            return None
+        value, expires = item
+        if expires <= self._clock():
+            del self._data[key]
+            self.stats.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        """Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Lifetime override in seconds
+        """
+        lifetime = ttl if ttl is not None else self._ttl
+        expires = self._clock() + lifetime if lifetime is not None else float("inf")
+        self._data[key] = (value, expires)
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def delete(self, key: K) -> None:
+        """Remove a value if present."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all values."""
+        self._data.clear()
+
+    def dump(self) -> List[Tuple[K, V, float]]:
+        """Live entries with their remaining lifetime, least recently used first.
+
+        Lifetimes are relative so they survive a change of clock (for
+        example a process restart with a new monotonic origin).
+
+        Returns:
+            ``(key, value, seconds_left)`` tuples (``inf`` = no expiry)
+        """
+        now = self._clock()
+        return [
+            (key, value, expires - now)
+            for key, (value, expires) in self._data.items()
+            if expires > now
+        ]
+
+    def load(self, entries: Iterable[Tuple[K, V, float]]) -> int:
+        """Insert entries produced by ``dump``, keeping their LRU order.
+
+        Args:
+            entries: ``(key, value, seconds_left)`` tuples
+
+        Returns:
+            Number of entries inserted
+        """
+        now = self._clock()
+        loaded = 0
+        for key, value, left in entries:
+            if left <= 0:
+                continue
+            self._data[key] = (value, now + left)
+            self._data.move_to_end(key)
+            loaded += 1
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+        return loaded
@@ -0,0 +1,447 @@
+"""Natural-language Russian date/time parsing.
+
+Phrases such as "напомни завтра 9:00", "через 2 часа", "в следующую среду
+вечером" or "что я кидал вчера" are parsed in two stages:
+
+1. The phrase is normalized and scanned once by a single precompiled token
+   regex; every word is classified by a dictionary lookup (no chain of
+   per-pattern regex attempts). The token stream is reduced to a
+   ``DateSpec`` that is relative ("tomorrow at 9:00") and independent of
+   the current time, so it is memoized in an LRU cache per normalized
+   phrase.
+2. The cached spec is resolved against "now" in the user's timezone.
+"""
+
+import re
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time, timedelta, tzinfo
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
+
+from dateutil.relativedelta import relativedelta
+
+# Token kinds
+_REL_DAY = "rel_day"
+_WEEKDAY = "weekday"
+_MOD = "mod"
+_IN = "in"
+_AGO = "ago"
+_NUM = "num"
+_UNIT = "unit"
+_HALF_HOUR = "half_hour"
+_ONE_AND_HALF = "one_and_half"
+_PART = "part"
+_MONTH = "month"
+_PREP = "prep"
+_DATE = "date"
+_TIME = "time"
+
+# Hour implied by a bare part of day ("вечером" → 19:00)
+_PART_DEFAULT_HOUR = {"morning": 9, "afternoon": 13, "evening": 19, "night": 23}
+
+_UNITS = ("minutes", "hours", "days", "weeks", "months", "years")
+
+# Tokens that may follow a bare number for it to be read as an hour ("" = end of phrase)
+_HOUR_FOLLOWERS = ("", _PART, _REL_DAY, _WEEKDAY)
+
+
+def _forms(kind: str, value: Any, *words: str) -> Dict[str, Tuple[str, Any]]:
+    return {word: (kind, value) for word in words}
+
+
+_WORDS: Dict[str, Tuple[str, Any]] = {
+    **_forms(_REL_DAY, 0, "сегодня"),
+    **_forms(_REL_DAY, 1, "завтра"),
+    **_forms(_REL_DAY, 2, "послезавтра"),
+    **_forms(_REL_DAY, -1, "вчера"),
+    **_forms(_REL_DAY, -2, "позавчера"),
+    **_forms(_WEEKDAY, 0, "понедельник", "понедельника"),
+    **_forms(_WEEKDAY, 1, "вторник", "вторника"),
+    **_forms(_WEEKDAY, 2, "среда", "среду", "среды"),
+    **_forms(_WEEKDAY, 3, "четверг", "четверга"),
+    **_forms(_WEEKDAY, 4, "пятница", "пятницу", "пятницы"),
+    **_forms(_WEEKDAY, 5, "суббота", "субботу", "субботы"),
+    **_forms(_WEEKDAY, 6, "воскресенье", "воскресенья"),
+    **_forms(_MOD, 1, "следующий", "следующая", "следующую", "следующее", "следующей", "следующем"),
+    **_forms(_MOD, -1, "прошлый", "прошлая", "прошлую", "прошлое", "прошлой", "прошлом"),
+    **_forms(_MOD, 0, "этот", "эта", "эту", "это", "этой", "этом"),
+    **_forms(_IN, None, "через"),
+    **_forms(_AGO, None, "назад"),
+    **_forms(_HALF_HOUR, None, "полчаса"),
+    **_forms(_ONE_AND_HALF, None, "полтора", "полторы"),
+    **_forms(_UNIT, "minutes", "минута", "минуту", "минуты", "минут", "мин"),
+    **_forms(_UNIT, "hours", "час", "часа", "часов", "часам"),
+    **_forms(_UNIT, "days", "день", "дня", "дней", "сутки", "суток"),
+    **_forms(_UNIT, "weeks", "неделя", "неделю", "недели", "недель", "неделе"),
+    **_forms(_UNIT, "months", "месяц", "месяца", "месяцев", "месяце"),
+    **_forms(_UNIT, "years", "год", "года", "лет"),
+    **_forms(_PART, "morning", "утром", "утра"),
+    **_forms(_PART, "afternoon", "днем"),
+    **_forms(_PART, "evening", "вечером", "вечера"),
+    **_forms(_PART, "night", "ночью", "ночи"),
+    **_forms(_TIME, (12, 0), "полдень"),
+    **_forms(_TIME, (0, 0), "полночь"),
+    **_forms(_PREP, None, "в", "во", "к", "на"),
+    **_forms(_NUM, 1, "один", "одну", "одна"),
+    **_forms(_NUM, 2, "два", "две"),
+    **_forms(_NUM, 3, "три"),
+    **_forms(_NUM, 4, "четыре"),
+    **_forms(_NUM, 5, "пять"),
+    **_forms(_NUM, 6, "шесть"),
+    **_forms(_NUM, 7, "семь"),
+    **_forms(_NUM, 8, "восемь"),
+    **_forms(_NUM, 9, "девять"),
+    **_forms(_NUM, 10, "десять"),
+    **_forms(_NUM, 15, "пятнадцать"),
+    **_forms(_NUM, 20, "двадцать"),
+    **_forms(_NUM, 30, "тридцать"),
+    **_forms(_NUM, 40, "сорок"),
+}
+
+_MONTHS = (
+    "января",
+    "февраля",
+    "марта",
+    "апреля",
+    "мая",
+    "июня",
+    "июля",
+    "августа",
+    "сентября",
+    "октября",
+    "ноября",
+    "декабря",
+)
+_WORDS.update({name: (_MONTH, index + 1) for index, name in enumerate(_MONTHS)})
+
+_TOKEN_PATTERN = re.compile(
+    r"(?P<date>\b\d{1,2}\.\d{1,2}(?:\.\d{2,4})?\b)"
+    r"|(?P<time>\b\d{1,2}:\d{2}\b)"
+    r"|(?P<num>\b\d+\b)"
+    r"|(?P<word>[а-яa-z]+)"
+)
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+Token = Tuple[str, Any]
+
+
+@dataclass(frozen=True, slots=True)
+class DateSpec:
+    """Relative date/time description extracted from a phrase.
+
+    Independent of the current moment, so it can be cached per phrase.
+    """
+
+    day_offset: Optional[int] = None
+    weekday: Optional[int] = None
+    weekday_mod: Optional[int] = None
+    week_offset: Optional[int] = None
+    day: Optional[int] = None
+    month: Optional[int] = None
+    year: Optional[int] = None
+    hour: Optional[int] = None
+    minute: int = 0
+    part: Optional[str] = None
+    delta: Tuple[int, int, int, int, int, int] = (0, 0, 0, 0, 0, 0)
+
+    @property
+    def has_subday_delta(self) -> bool:
+        """Whether the delta contains minutes or hours."""
+        return bool(self.delta[0] or self.delta[1])
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedDateTime:
+    """Resolved date/time.
+
+    Attributes:
+        start: Aware start moment in the user's timezone
+        end: Exclusive end of the range (equals ``start`` for exact moments)
+        has_time: Whether a time of day was given or implied
+    """
+
+    start: datetime
+    end: datetime
+    has_time: bool
+
+
+def normalize_phrase(text: str) -> str:
+    """Normalize phrase for tokenization and cache keys.
+
+    Args:
+        text: Raw user text
+
+    Returns:
+        Lowercased text with ё→е and collapsed whitespace
+    """
+    return _WHITESPACE_PATTERN.sub(" ", text.lower().replace("ё", "е")).strip()
+
+
+def _tokenize(normalized: str) -> List[Token]:
+    tokens: List[Token] = []
+    for match in _TOKEN_PATTERN.finditer(normalized):
+        kind = match.lastgroup
+        value = match.group()
+        if kind == "word":
+            entry = _WORDS.get(value)
+            if entry is not None:
+                tokens.append(entry)
+            else:
+                tokens.append(("other", value))
+        elif kind == "num":
+            tokens.append((_NUM, int(value)))
+        elif kind == "time":
+            hour, minute = value.split(":")
+            tokens.append((_TIME, (int(hour), int(minute))))
+        else:
+            tokens.append((_DATE, tuple(int(part) for part in value.split("."))))
+    return tokens
+
+
+def _read_duration(tokens: List[Token], i: int) -> Optional[Tuple[List[int], int]]:
+    """Read ``[number] unit`` starting at ``i``.
+
+    Returns:
+        Tuple of (delta in _UNITS order, consumed token count) or None
+    """
+    delta = [0] * len(_UNITS)
+    current: Token = tokens[i] if i < len(tokens) else ("", None)
+    nxt: Token = tokens[i + 1] if i + 1 < len(tokens) else ("", None)
+    kind, value = current
+
+    if kind == _HALF_HOUR:
+        delta[0] = 30
+        return delta, 1
+    if kind == _ONE_AND_HALF and nxt[0] == _UNIT:
+        unit = str(nxt[1])
+        if unit == "hours":
+            delta[0] = 90
+        elif unit == "minutes":
+            delta[0] = 1  # "полторы минуты" rounds down to a minute
+        else:
+            delta[_UNITS.index(unit)] = 1
+        return delta, 2
+    if kind == _NUM and nxt[0] == _UNIT:
+        delta[_UNITS.index(str(nxt[1]))] = int(value)
+        return delta, 2
+    if kind == _UNIT:
+        delta[_UNITS.index(str(value))] = 1
+        return delta, 1
+    return None
+
+
+@lru_cache(maxsize=4096)
+def compile_phrase(normalized: str) -> Optional[DateSpec]:
+    """Reduce a normalized phrase to a cached relative ``DateSpec``.
+
+    Args:
+        normalized: Output of ``normalize_phrase``
+
+    Returns:
+        DateSpec, or None when the phrase contains no date/time expression
+    """
+    tokens = _tokenize(normalized)
+    spec = DateSpec()
+    delta = [0] * len(_UNITS)
+    found = False
+    i = 0
+    n = len(tokens)
+
+    def peek(offset: int) -> Token:
+        return tokens[i + offset] if i + offset < n else ("", None)
+
+    while i < n:
+        kind, value = tokens[i]
+
+        if kind == _IN:
+            duration = _read_duration(tokens, i + 1)
+            if duration is not None:
+                delta = [a + b for a, b in zip(delta, duration[0])]
+                found = True
+                i += 1 + duration[1]
+                continue
+
+        if kind in (_NUM, _UNIT, _HALF_HOUR, _ONE_AND_HALF):
+            duration = _read_duration(tokens, i)
+            if duration is not None and peek(duration[1])[0] == _AGO:
+                delta = [a - b for a, b in zip(delta, duration[0])]
+                found = True
+                i += duration[1] + 1
+                continue
+
+        if kind == _REL_DAY:
+            spec = replace(spec, day_offset=int(value))
+            found = True
+        elif kind == _MOD and peek(1)[0] == _WEEKDAY:
+            spec = replace(spec, weekday=peek(1)[1], weekday_mod=value)
+            found = True
+            i += 1
+        elif kind == _MOD and peek(1) == (_UNIT, "weeks"):
+            spec = replace(spec, week_offset=value)
+            found = True
+            i += 1
+        elif kind == _WEEKDAY:
+            spec = replace(spec, weekday=value, weekday_mod=None)
+            found = True
+        elif kind == _DATE:
+            parts = tuple(value)
+            year = parts[2] if len(parts) > 2 else None
+            if year is not None and year < 100:
+                year += 2000
+            spec = replace(spec, day=parts[0], month=parts[1], year=year)
+            found = True
+        elif kind == _NUM and peek(1)[0] == _MONTH:
+            spec = replace(spec, day=value, month=peek(1)[1])
+            found = True
+            i += 1
+            if peek(1)[0] == _NUM and int(peek(1)[1]) > 1900:
+                spec = replace(spec, year=peek(1)[1])
+                i += 1
+        elif kind == _TIME:
+            hour, minute = value
+            spec = replace(spec, hour=hour, minute=minute)
+            found = True
+        elif kind == _PREP and peek(1)[0] == _NUM and int(peek(1)[1]) <= 24:
+            # "в 9", "в 9 утра", "к 3 часам", "в 3 часа дня", "в 9 в субботу";
+            # not "в 5 магазинах" or "в 2 раза больше".
+            following = peek(2)
+            anchor = peek(3) if following[0] == _PREP else following
+            if following == (_UNIT, "hours") or anchor[0] in _HOUR_FOLLOWERS:
+                spec = replace(spec, hour=peek(1)[1], minute=0)
+                found = True
+                i += 2 if following == (_UNIT, "hours") else 1
+        elif kind == _NUM and peek(1)[0] == _PART and int(value) <= 12:
+            spec = replace(spec, hour=value, minute=0)
+            found = True
+        elif kind == _PART or (kind == _UNIT and value == "days" and spec.hour is not None):
+            # Bare "дня" right after an hour means "p.m." ("в 3 дня").
+            spec = replace(spec, part="afternoon" if kind == _UNIT else value)
+            found = True
+        i += 1
+
+    if not found:
+        return None
+    return replace(spec, delta=tuple(delta))  # type: ignore[arg-type]
+
+
+@lru_cache(maxsize=256)
+def _zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+def _apply_part(hour: int, part: Optional[str]) -> int:
+    if part in ("afternoon", "evening") and hour < 12:
+        return hour + 12
+    if part == "night" and hour == 12:
+        return 0
+    return hour
+
+
+def resolve_spec(
+    spec: DateSpec, now: datetime, prefer_future: bool = True
+) -> Optional[ParsedDateTime]:
+    """Resolve a relative ``DateSpec`` against the current moment.
+
+    Args:
+        spec: Compiled spec
+        now: Aware current time in the user's timezone
+        prefer_future: Resolve ambiguous expressions (bare weekday, date
+            without year, time without day) forward in time for reminders,
+            or backward for "что я кидал в понедельник"-style queries
+
+    Returns:
+        Resolved ParsedDateTime, or None if the date or time does not exist
+        ("31 февраля", "25:70")
+    """
+    tz = now.tzinfo
+    today = now.date()
+    day = today
+    has_day = True
+
+    if spec.month is not None and spec.day is not None:
+        year = spec.year or today.year
+        try:
+            day = date(year, spec.month, spec.day)
+            if spec.year is None and prefer_future and day < today:
+                day = day.replace(year=year + 1)
+            elif spec.year is None and not prefer_future and day > today:
+                day = day.replace(year=year - 1)
+        except ValueError:
+            return None
+    elif spec.day_offset is not None:
+        day = today + timedelta(days=spec.day_offset)
+    elif spec.weekday is not None:
+        ahead = (spec.weekday - today.weekday()) % 7
+        behind = (today.weekday() - spec.weekday) % 7
+        if spec.weekday_mod == 1:
+            day = today + timedelta(days=ahead or 7)
+        elif spec.weekday_mod == -1:
+            day = today - timedelta(days=behind or 7)
+        elif spec.weekday_mod == 0 or prefer_future:
+            day = today + timedelta(days=ahead)
+        else:
+            day = today - timedelta(days=behind)
+    elif spec.week_offset is not None and spec.hour is None:
+        monday = today - timedelta(days=today.weekday()) + timedelta(weeks=spec.week_offset)
+        start = datetime.combine(monday, time(), tzinfo=tz)
+        return ParsedDateTime(start, start + timedelta(weeks=1), has_time=False)
+    else:
+        has_day = False
+
+    minutes, hours, days, weeks, months, years = spec.delta
+    if spec.has_subday_delta and spec.hour is None:
+        moment = now + relativedelta(
+            years=years, months=months, weeks=weeks, days=days, hours=hours, minutes=minutes
+        )
+        return ParsedDateTime(moment, moment, has_time=True)
+    if any(spec.delta):
+        day = day + relativedelta(years=years, months=months, weeks=weeks, days=days)
+        has_day = True
+
+    hour = spec.hour
+    if hour is None and spec.part is not None:
+        hour = _PART_DEFAULT_HOUR[spec.part]
+    elif hour is not None:
+        hour = _apply_part(hour, spec.part)
+
+    if hour is None:
+        start = datetime.combine(day, time(), tzinfo=tz)
+        return ParsedDateTime(start, start + timedelta(days=1), has_time=False)
+
+    # "24:00" is midnight; anything else out of range is not a time
+    if spec.minute > 59 or hour > 24 or (hour == 24 and spec.minute):
+        return None
+    if hour == 24:
+        # Midnight at the end of ``day``, not at its start
+        day, hour = day + timedelta(days=1), 0
+    moment = datetime.combine(day, time(hour, spec.minute), tzinfo=tz)
+    if not has_day and prefer_future and moment <= now:
+        moment += timedelta(days=1)
+    return ParsedDateTime(moment, moment, has_time=True)
+
+
+def parse_datetime(
+    text: str,
+    tz: Union[str, tzinfo] = "UTC",
+    now: Optional[datetime] = None,
+    prefer_future: bool = True,
+) -> Optional[ParsedDateTime]:
+    """Parse a Russian natural-language date/time expression.
+
+    Args:
+        text: User text, e.g. "напомни завтра 9:00"
+        tz: User timezone name or tzinfo
+        now: Current moment (defaults to the current time in ``tz``)
+        prefer_future: Direction for ambiguous expressions (see ``resolve_spec``)
+
+    Returns:
+        ParsedDateTime in the user's timezone, or None if nothing was found
+        or the date or time does not exist
+    """
+    spec = compile_phrase(normalize_phrase(text))
+    if spec is None:
+        return None
+    zone = _zone(tz) if isinstance(tz, str) else tz
+    current = now.astimezone(zone) if now is not None else datetime.now(zone)
+    return resolve_spec(spec, current, prefer_future=prefer_future)
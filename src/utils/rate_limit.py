@@ -0,0 +1,176 @@
+"""Token-bucket rate limiting with pluggable backends.
+
+``InMemoryRateLimitBackend`` keeps one bucket per key in an LRU-ordered
+dict: checks are O(1) and buckets idle for longer than ``idle_ttl`` are
+evicted as a side effect of later checks. ``RedisRateLimitBackend`` runs the
+same algorithm atomically in Redis so several bot processes share limits.
+"""
+
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimit:
+    """Bucket parameters: burst ``capacity`` refilled at ``rate`` tokens per second."""
+
+    capacity: float
+    rate: float
+
+
+@dataclass(slots=True)
+class TokenBucket:
+    """Token bucket state."""
+
+    tokens: float
+    updated: float
+
+    def consume(self, limit: RateLimit, now: float, cost: float = 1.0) -> float:
+        """Refill and try to take ``cost`` tokens.
+
+        Args:
+            limit: Bucket parameters
+            now: Current monotonic time
+            cost: Tokens to take
+
+        Returns:
+            0.0 if the tokens were taken, otherwise seconds until they are available
+        """
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(limit.capacity, self.tokens + elapsed * limit.rate)
+            self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / limit.rate
+
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets."""
+
+    @abstractmethod
+    async def acquire(self, key: str, limit: RateLimit, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens from the bucket of ``key``.
+
+        Args:
+            key: Bucket key (e.g. ``"user:42"``)
+            limit: Bucket parameters
+            cost: Tokens to take
+
+        Returns:
+            0.0 if allowed, otherwise seconds to wait before retrying
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Process-local buckets with idle eviction."""
+
+    def __init__(
+        self,
+        idle_ttl: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize backend.
+
+        Args:
+            idle_ttl: Seconds after which an untouched bucket is dropped
+                (a bucket idle for capacity/rate seconds is full anyway)
+            clock: Monotonic time source
+        """
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._idle_ttl = idle_ttl
+        self._clock = clock
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def try_acquire(self, key: str, limit: RateLimit, cost: float = 1.0) -> float:
+        """Synchronous variant of ``acquire``."""
+        now = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(limit.capacity, now)
+            self._buckets[key] = bucket
+        else:
+            self._buckets.move_to_end(key)
+        wait = bucket.consume(limit, now, cost)
+        self._evict(now)
+        return wait
+
+    async def acquire(self, key: str, limit: RateLimit, cost: float = 1.0) -> float:
+        """Take tokens from a process-local bucket."""
+        return self.try_acquire(key, limit, cost)
+
+    def _evict(self, now: float) -> None:
+        # Buckets are ordered by last access, so idle ones are at the front.
+        while self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            if now - bucket.updated < self._idle_ttl:
+                break
+            del self._buckets[key]
+
+
+# KEYS[1] = bucket key; ARGV = capacity, rate, cost, ttl seconds.
+# Returns the wait as a string because Redis truncates Lua numbers to integers.
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+if now > ts then
+    tokens = math.min(capacity, tokens + (now - ts) * rate)
+    ts = now
+end
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', ts)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+return tostring(wait)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Buckets shared between processes through Redis.
+
+    The bucket is updated by a Lua script, so the check is atomic and uses
+    the Redis server clock. Idle buckets expire via key TTL.
+    """
+
+    def __init__(self, client: Any, prefix: str = "ratelimit:", idle_ttl: int = 600) -> None:
+        """Initialize backend.
+
+        Args:
+            client: ``redis.asyncio.Redis`` instance
+            prefix: Key prefix
+            idle_ttl: Seconds after which an untouched bucket expires
+        """
+        self._client = client
+        self._prefix = prefix
+        self._idle_ttl = idle_ttl
+
+    async def acquire(self, key: str, limit: RateLimit, cost: float = 1.0) -> float:
+        """Take tokens from a shared bucket."""
+        result = await self._client.eval(
+            _REDIS_TOKEN_BUCKET,
+            1,
+            self._prefix + key,
+            limit.capacity,
+            limit.rate,
+            cost,
+            self._idle_ttl,
+        )
+        if isinstance(result, bytes):
+            result = result.decode()
+        return float(result)
@@ -0,0 +1,367 @@
+"""Resilience primitives for remote dependencies.
+
+* ``CircuitBreaker`` fails fast after consecutive failures and lets a
+  probe call through after ``recovery_timeout``.
+* ``deadline()`` sets a deadline for everything awaited inside it; it is
+  carried in a context variable, so nested calls (and tasks created inside)
+  inherit the tightest deadline and never wait past it.
+* ``AdaptiveLimiter`` bounds in-flight calls with an AIMD limit: the limit
+  grows by one per limit-worth of fast calls and is cut multiplicatively
+  when latency rises above the learned baseline or a call fails.
+
+``Dependency`` combines the three for one remote service; use it through
+``Dependency.call`` or the ``resilient`` decorator. Dependencies are shared
+per name via ``get_dependency``; ``log_dependency_metrics`` reports them
+through the application logger.
+"""
+
+import asyncio
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple, Type, TypeVar
+
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class CircuitOpenError(Exception):
+    """Call rejected because the dependency's circuit is open."""
+
+    def __init__(self, name: str, retry_in: float) -> None:
+        super().__init__(f"Circuit for {name} is open, retry in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The propagated deadline has passed."""
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """Limit everything awaited in the block to ``seconds`` from now.
+
+    An enclosing, earlier deadline is kept.
+
+    Yields:
+        Absolute deadline (``time.monotonic()`` scale)
+    """
+    proposed = time.monotonic() + seconds
+    current = _deadline.get()
+    effective = proposed if current is None else min(current, proposed)
+    token = _deadline.set(effective)
+    try:
+        yield effective
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left until the current deadline (None if there is none)."""
+    current = _deadline.get()
+    return None if current is None else current - time.monotonic()
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker state."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize breaker.
+
+        Args:
+            name: Dependency name (for errors and logs)
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds before a probe call is allowed
+            clock: Monotonic time source
+        """
+        self.name = name
+        self._threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.state = CircuitState.CLOSED
+
+    def allow(self) -> None:
+        """Check that a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (or a probe is running)
+        """
+        if self.state is CircuitState.CLOSED:
+            return
+        elapsed = self._clock() - self._opened_at
+        if self.state is CircuitState.OPEN and elapsed >= self._recovery_timeout:
+            self._transition(CircuitState.HALF_OPEN)
+        if self.state is CircuitState.HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        raise CircuitOpenError(self.name, max(self._recovery_timeout - elapsed, 0.0))
+
+    def release_probe(self) -> None:
+        """Hand back a probe slot taken by ``allow()`` for a call that never ran."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        self._failures = 0
+        self._probing = False
+        if self.state is not CircuitState.CLOSED:
+            self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a failed call."""
+        self._failures += 1
+        self._probing = False
+        if self.state is CircuitState.HALF_OPEN or self._failures >= self._threshold:
+            self._opened_at = self._clock()
+            if self.state is not CircuitState.OPEN:
+                self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        logger.warning(
+            "Circuit state changed",
+            extra={
+                "dependency": self.name,
+                "from_state": self.state.value,
+                "to_state": state.value,
+            },
+        )
+        self.state = state
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit driven by latency and failures."""
+
+    def __init__(
+        self,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        backoff_ratio: float = 0.7,
+        tolerance: float = 2.0,
+        smoothing: float = 0.05,
+    ) -> None:
+        """Initialize limiter.
+
+        Args:
+            initial_limit: Starting concurrency limit
+            min_limit: Lower bound of the limit
+            max_limit: Upper bound of the limit
+            backoff_ratio: Multiplier applied on congestion
+            tolerance: Latency above ``baseline * tolerance`` counts as congestion
+            smoothing: EWMA weight of new samples in the latency baseline
+        """
+        self.limit = float(initial_limit)
+        self._min = min_limit
+        self._max = max_limit
+        self._backoff = backoff_ratio
+        self._tolerance = tolerance
+        self._smoothing = smoothing
+        self.baseline: Optional[float] = None
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        """Wait for a free slot (bounded by the current deadline).
+
+        Raises:
+            DeadlineExceeded: If the deadline passes while waiting
+        """
+        async with self._condition:
+            if self.in_flight >= int(self.limit):
+                try:
+                    await asyncio.wait_for(
+                        self._condition.wait_for(lambda: self.in_flight < int(self.limit)),
+                        remaining(),
+                    )
+                except asyncio.TimeoutError as e:
+                    raise DeadlineExceeded("Deadline exceeded waiting for a slot") from e
+            self.in_flight += 1
+
+    async def release(self, latency: float, failed: bool = False) -> None:
+        """Free a slot and adapt the limit.
+
+        Args:
+            latency: Call duration in seconds
+            failed: Whether the call failed or timed out
+        """
+        congested = failed
+        if not failed:
+            if self.baseline is None:
+                self.baseline = latency
+            else:
+                congested = latency > self.baseline * self._tolerance
+                self.baseline += self._smoothing * (latency - self.baseline)
+        if congested:
+            self.limit = max(self._min, self.limit * self._backoff)
+        else:
+            self.limit = min(self._max, self.limit + 1 / self.limit)
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+
+@dataclass
+class DependencyStats:
+    """Per-dependency counters."""
+
+    calls: int = 0
+    failures: int = 0
+    rejected: int = 0
+    timeouts: int = 0
+    latency_total: float = 0.0
+
+
+class Dependency:
+    """Circuit breaker, deadline and adaptive limit for one remote service."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        timeout: Optional[float] = 30.0,
+        breaker: Optional[CircuitBreaker] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        ignore: Tuple[Type[BaseException], ...] = (),
+    ) -> None:
+        """Initialize dependency.
+
+        Args:
+            name: Dependency name
+            timeout: Default per-call timeout (capped by the current deadline)
+            breaker: Circuit breaker (default settings if omitted)
+            limiter: Concurrency limiter (default settings if omitted)
+            ignore: Exception types that do not count as dependency failures
+                (e.g. validation errors returned by a healthy service)
+        """
+        self.name = name
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker(name)
+        self.limiter = limiter or AdaptiveLimiter()
+        self._ignore = ignore
+        self.stats = DependencyStats()
+
+    async def call(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """Call ``func`` under the breaker, the limiter and the deadline.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            DeadlineExceeded: If the deadline or timeout passes
+        """
+        # Checked before allow(): a half-open probe taken here must reach
+        # record_success/record_failure or be handed back
+        budget = remaining()
+        if budget is not None and budget <= 0:
+            self.stats.timeouts += 1
+            raise DeadlineExceeded(f"Deadline exceeded before calling {self.name}")
+        try:
+            self.breaker.allow()
+        except CircuitOpenError:
+            self.stats.rejected += 1
+            raise
+
+        try:
+            await self.limiter.acquire()
+        except BaseException:
+            self.breaker.release_probe()
+            raise
+        started = time.monotonic()
+        failed = True
+        try:
+            timeout = self.timeout
+            budget = remaining()
+            if budget is not None:
+                timeout = budget if timeout is None else min(timeout, budget)
+            try:
+                result = await asyncio.wait_for(func(*args, **kwargs), timeout)
+            except asyncio.TimeoutError as e:
+                self.stats.timeouts += 1
+                raise DeadlineExceeded(f"{self.name} call timed out") from e
+            except self._ignore:
+                failed = False
+                raise
+            failed = False
+            return result
+        finally:
+            latency = time.monotonic() - started
+            self.stats.calls += 1
+            self.stats.latency_total += latency
+            if failed:
+                self.stats.failures += 1
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            await self.limiter.release(latency, failed)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Current state and counters."""
+        calls = self.stats.calls
+        return {
+            "dependency": self.name,
+            "state": self.breaker.state.value,
+            "limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "calls": calls,
+            "failures": self.stats.failures,
+            "rejected": self.stats.rejected,
+            "timeouts": self.stats.timeouts,
+            "latency_avg_ms": round(self.stats.latency_total / calls * 1000, 2) if calls else 0.0,
+        }
+
+
+_dependencies: Dict[str, Dependency] = {}
+
+
+def get_dependency(name: str, **kwargs: Any) -> Dependency:
+    """Get the shared dependency ``name``, creating it with ``kwargs`` on first use."""
+    dependency = _dependencies.get(name)
+    if dependency is None:
+        dependency = Dependency(name, **kwargs)
+        _dependencies[name] = dependency
+    return dependency
+
+
+def log_dependency_metrics() -> None:
+    """Log metrics of all shared dependencies."""
+    for dependency in _dependencies.values():
+        logger.info("Dependency metrics", extra=dependency.metrics())
+
+
+def resilient(
+    dependency: Dependency,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Decorate an async function so every call goes through ``dependency``."""
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            return await dependency.call(func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,20 @@
+"""Small statistics helpers shared by reports and benchmarks."""
+
+from typing import List
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile.
+
+    Args:
+        values: Sample values
+        pct: Percentile in (0, 100]
+
+    Returns:
+        Percentile value, or 0.0 for an empty sample
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(-(-pct * len(ordered) // 100)), 1)
+    return ordered[rank - 1]
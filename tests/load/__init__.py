@@ -0,0 +1 @@
+"""Load tests (synthetic Telegram update bursts against the bot)."""
@@ -0,0 +1,78 @@
+"""
+Run a load test against the bot.
+
+Usage:
+    python -m tests.load [--mode inprocess|webhook] [--rate 100] [--duration 10]
+        [--shape constant|poisson|burst|ramp] [--url URL]
+
+In webhook mode the URL defaults to Settings.telegram_webhook_url.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from aiogram import Bot
+
+from tests.load.generator import SHAPES, LoadProfile
+from tests.load.harness import InProcessSink, LoadHarness, Sink, WebhookSink
+from tests.load.stubs import (
+    STUB_TOKEN,
+    StubLLM,
+    StubTelegramSession,
+    StubTodoist,
+    build_demo_dispatcher,
+)
+
+
+async def _run(args: argparse.Namespace) -> int:
+    profile = LoadProfile(
+        rate=args.rate,
+        duration=args.duration,
+        shape=args.shape,
+        burst_factor=args.burst_factor,
+        chats=args.chats,
+    )
+    sink: Sink
+    if args.mode == "inprocess":
+        bot = Bot(STUB_TOKEN, session=StubTelegramSession(latency_ms=args.telegram_ms))
+        dispatcher = build_demo_dispatcher(
+            StubLLM(latency_ms=args.llm_ms), StubTodoist(latency_ms=args.todoist_ms)
+        )
+        sink = InProcessSink(dispatcher, bot)
+    else:
+        url = args.url
+        if url is None:
+            from src.core.config import get_settings
+
+            url = get_settings().telegram_webhook_url
+        if not url:
+            print("Webhook URL is not configured (TELEGRAM_WEBHOOK_URL or --url)")
+            return 1
+        sink = WebhookSink(url, secret_token=args.secret_token)
+
+    report = await LoadHarness(profile, sink).run()
+    print(json.dumps(report.as_dict(), indent=2))
+    return 0 if report.errors == 0 else 1
+
+
+def main() -> int:
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(description="Telegram update load generator")
+    parser.add_argument("--mode", choices=("inprocess", "webhook"), default="inprocess")
+    parser.add_argument("--url")
+    parser.add_argument("--secret-token")
+    parser.add_argument("--rate", type=float, default=100.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--shape", choices=SHAPES, default="constant")
+    parser.add_argument("--burst-factor", type=float, default=10.0)
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--telegram-ms", type=float, default=20.0)
+    parser.add_argument("--llm-ms", type=float, default=300.0)
+    parser.add_argument("--todoist-ms", type=float, default=150.0)
+    return asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
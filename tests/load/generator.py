@@ -0,0 +1,144 @@
+"""Synthetic Telegram updates and arrival schedules."""
+
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+UPDATE_KINDS = ("text", "voice", "document", "forward")
+SHAPES = ("constant", "poisson", "burst", "ramp")
+
+SAMPLE_TEXTS = (
+    "Сделай саммари статьи, которую я скинул вчера",
+    "напомни завтра в 9:00 позвонить маме",
+    "купить молоко и хлеб",
+    "найди заметку про отпуск",
+    "идея: бот для заметок с поиском по смыслу",
+)
+
+
+@dataclass
+class LoadProfile:
+    """Shape and content of generated load.
+
+    Attributes:
+        rate: Base updates per second
+        duration: Length of the run in seconds
+        shape: Arrival shape (constant, poisson, burst, ramp)
+        burst_factor: Rate multiplier during a burst
+        burst_every: Seconds between burst starts
+        burst_length: Burst duration in seconds
+        ramp_to: Final rate for the ramp shape (defaults to 10x rate)
+        chats: Number of distinct chats updates are spread over
+        mix: Relative weights of update kinds
+        seed: Random seed for reproducible runs
+    """
+
+    rate: float = 50.0
+    duration: float = 10.0
+    shape: str = "constant"
+    burst_factor: float = 10.0
+    burst_every: float = 5.0
+    burst_length: float = 0.5
+    ramp_to: Optional[float] = None
+    chats: int = 100
+    mix: Dict[str, float] = field(
+        default_factory=lambda: {"text": 0.7, "voice": 0.1, "document": 0.1, "forward": 0.1}
+    )
+    seed: int = 42
+
+    def rate_at(self, t: float) -> float:
+        """Instantaneous target rate at offset ``t`` seconds."""
+        if self.shape == "burst" and t % self.burst_every < self.burst_length:
+            return self.rate * self.burst_factor
+        if self.shape == "ramp":
+            final = self.ramp_to if self.ramp_to is not None else self.rate * 10
+            return self.rate + (final - self.rate) * min(t / self.duration, 1.0)
+        return self.rate
+
+
+def arrival_times(profile: LoadProfile) -> Iterator[float]:
+    """Generate send offsets (seconds from start) for a profile.
+
+    Args:
+        profile: Load profile
+
+    Yields:
+        Monotonic offsets below ``profile.duration``
+    """
+    if profile.shape not in SHAPES:
+        raise ValueError(f"Unknown shape: {profile.shape}")
+    rng = random.Random(profile.seed)
+    t = 0.0
+    while True:
+        rate = profile.rate_at(t)
+        if profile.shape == "poisson":
+            t += -math.log(1.0 - rng.random()) / rate
+        else:
+            t += 1.0 / rate
+        if t >= profile.duration:
+            return
+        yield t
+
+
+class UpdateFactory:
+    """Builds Telegram ``Update`` payloads as the Bot API would send them."""
+
+    def __init__(self, profile: LoadProfile) -> None:
+        self._profile = profile
+        self._rng = random.Random(profile.seed)
+        self._kinds = [k for k in UPDATE_KINDS if profile.mix.get(k, 0) > 0]
+        self._weights = [profile.mix[k] for k in self._kinds]
+        self._message_ids: Dict[int, int] = {}
+
+    def make(self, update_id: int, kind: Optional[str] = None) -> Dict[str, Any]:
+        """Create an update payload.
+
+        Args:
+            update_id: Update identifier
+            kind: Update kind (random according to the mix if omitted)
+
+        Returns:
+            JSON-compatible update dictionary
+        """
+        kind = kind or self._rng.choices(self._kinds, self._weights)[0]
+        chat_id = 100_000 + self._rng.randrange(self._profile.chats)
+        message_id = self._message_ids.get(chat_id, 0) + 1
+        self._message_ids[chat_id] = message_id
+        user = {"id": chat_id, "is_bot": False, "first_name": "Load", "language_code": "ru"}
+        message: Dict[str, Any] = {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private", "first_name": "Load"},
+            "from": user,
+        }
+        unique = f"{update_id:012d}"
+        if kind == "text":
+            message["text"] = self._rng.choice(SAMPLE_TEXTS)
+        elif kind == "voice":
+            message["voice"] = {
+                "file_id": f"voice-{unique}",
+                "file_unique_id": f"v{unique}",
+                "duration": self._rng.randint(1, 120),
+                "mime_type": "audio/ogg",
+            }
+        elif kind == "document":
+            message["document"] = {
+                "file_id": f"doc-{unique}",
+                "file_unique_id": f"d{unique}",
+                "file_name": "article.pdf",
+                "mime_type": "application/pdf",
+                "file_size": self._rng.randint(10_000, 5_000_000),
+            }
+        elif kind == "forward":
+            message["text"] = self._rng.choice(SAMPLE_TEXTS)
+            message["forward_origin"] = {
+                "type": "channel",
+                "date": int(time.time()) - 3600,
+                "chat": {"id": -1001234567890, "type": "channel", "title": "Channel"},
+                "message_id": self._rng.randint(1, 10_000),
+            }
+        else:
+            raise ValueError(f"Unknown update kind: {kind}")
+        return {"update_id": update_id, "message": message}
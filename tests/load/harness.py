@@ -0,0 +1,237 @@
+"""Load harness: feeds synthetic updates to the bot and measures it.
+
+Two sinks are supported:
+
+* ``InProcessSink`` calls ``Dispatcher.feed_update`` directly, one task
+  per update (as aiogram does when handling updates as tasks).
+* ``WebhookSink`` POSTs updates to the webhook endpoint. End-to-end latency
+  is measured to handler completion when the dispatcher runs in the same
+  process (see ``install_completion_tracking``); otherwise to the HTTP ACK.
+
+While the load runs, a sampler records in-flight updates (queue depth) and
+event-loop lag.
+"""
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol
+
+import httpx
+from aiogram import Bot, Dispatcher
+from aiogram.types import TelegramObject, Update
+
+from src.utils.stats import percentile
+from tests.load.generator import LoadProfile, UpdateFactory, arrival_times
+
+
+class Tracker:
+    """Tracks send and completion times per update id."""
+
+    def __init__(self) -> None:
+        self.pending: Dict[int, float] = {}
+        self.latencies_ms: List[float] = []
+        self.errors = 0
+
+    def sent(self, update_id: int) -> None:
+        self.pending[update_id] = time.perf_counter()
+
+    def completed(self, update_id: int, error: bool = False) -> None:
+        started = self.pending.pop(update_id, None)
+        if started is None:
+            return
+        if error:
+            self.errors += 1
+        else:
+            self.latencies_ms.append((time.perf_counter() - started) * 1000)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self.pending)
+
+
+def install_completion_tracking(dispatcher: Dispatcher, tracker: Tracker) -> None:
+    """Mark updates completed when the dispatcher finishes handling them.
+
+    Args:
+        dispatcher: Dispatcher receiving the load
+        tracker: Tracker shared with the harness
+    """
+
+    async def middleware(
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        assert isinstance(event, Update)
+        try:
+            result = await handler(event, data)
+        except Exception:
+            tracker.completed(event.update_id, error=True)
+            raise
+        tracker.completed(event.update_id)
+        return result
+
+    dispatcher.update.outer_middleware(middleware)
+
+
+class Sink(Protocol):
+    """Destination for generated updates."""
+
+    tracks_completion: bool
+
+    async def send(self, payload: Dict[str, Any]) -> None:
+        """Deliver one update payload."""
+        ...
+
+
+class InProcessSink:
+    """Feed updates straight into an in-process dispatcher."""
+
+    tracks_completion = False
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot) -> None:
+        self._dispatcher = dispatcher
+        self._bot = bot
+
+    async def send(self, payload: Dict[str, Any]) -> None:
+        update = Update.model_validate(payload, context={"bot": self._bot})
+        await self._dispatcher.feed_update(self._bot, update)
+
+
+class WebhookSink:
+    """POST updates to a webhook URL."""
+
+    def __init__(
+        self,
+        url: str,
+        client: Optional[httpx.AsyncClient] = None,
+        secret_token: Optional[str] = None,
+        tracks_completion: bool = False,
+    ) -> None:
+        """Initialize sink.
+
+        Args:
+            url: Webhook endpoint URL
+            client: HTTP client (e.g. with an ASGI transport for in-process apps)
+            secret_token: Value for X-Telegram-Bot-Api-Secret-Token
+            tracks_completion: Whether completion is reported by the dispatcher
+                via ``install_completion_tracking`` instead of the HTTP ACK
+        """
+        self._url = url
+        self._client = client or httpx.AsyncClient(timeout=30.0)
+        self._headers = {"X-Telegram-Bot-Api-Secret-Token": secret_token} if secret_token else {}
+        self.tracks_completion = tracks_completion
+
+    async def send(self, payload: Dict[str, Any]) -> None:
+        response = await self._client.post(self._url, json=payload, headers=self._headers)
+        response.raise_for_status()
+
+
+class LoopSampler:
+    """Samples event-loop lag and in-flight updates at a fixed interval."""
+
+    def __init__(self, tracker: Tracker, interval: float = 0.05) -> None:
+        self._tracker = tracker
+        self._interval = interval
+        self.lag_ms: List[float] = []
+        self.depth: List[int] = []
+
+    async def run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self._interval)
+            lag = time.perf_counter() - started - self._interval
+            self.lag_ms.append(max(lag, 0.0) * 1000)
+            self.depth.append(self._tracker.in_flight)
+
+
+@dataclass
+class LoadReport:
+    """Results of a load run."""
+
+    sent: int
+    completed: int
+    errors: int
+    duration_s: float
+    throughput_ups: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_p99_ms: float
+    latency_max_ms: float
+    queue_depth_max: int
+    queue_depth_mean: float
+    loop_lag_p99_ms: float
+    loop_lag_max_ms: float
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Serialize report."""
+        return asdict(self)
+
+
+class LoadHarness:
+    """Drive a sink with updates following a load profile."""
+
+    def __init__(
+        self,
+        profile: LoadProfile,
+        sink: Sink,
+        tracker: Optional[Tracker] = None,
+        drain_timeout: float = 30.0,
+    ) -> None:
+        self._profile = profile
+        self._sink = sink
+        self.tracker = tracker or Tracker()
+        self._drain_timeout = drain_timeout
+        self._factory = UpdateFactory(profile)
+
+    async def run(self) -> LoadReport:
+        """Run the profile and wait for outstanding updates to finish."""
+        sampler = LoopSampler(self.tracker)
+        sampler_task = asyncio.create_task(sampler.run())
+        tasks: List["asyncio.Task[None]"] = []
+        started = time.perf_counter()
+        sent = 0
+
+        for update_id, offset in enumerate(arrival_times(self._profile), start=1):
+            delay = started + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            payload = self._factory.make(update_id)
+            self.tracker.sent(update_id)
+            tasks.append(asyncio.create_task(self._send(update_id, payload)))
+            sent += 1
+
+        if tasks:
+            await asyncio.wait(tasks, timeout=self._drain_timeout)
+        deadline = time.perf_counter() + self._drain_timeout
+        while self.tracker.in_flight and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        duration = time.perf_counter() - started
+        sampler_task.cancel()
+
+        latencies = self.tracker.latencies_ms
+        return LoadReport(
+            sent=sent,
+            completed=len(latencies),
+            errors=self.tracker.errors,
+            duration_s=duration,
+            throughput_ups=len(latencies) / duration if duration else 0.0,
+            latency_p50_ms=percentile(latencies, 50),
+            latency_p95_ms=percentile(latencies, 95),
+            latency_p99_ms=percentile(latencies, 99),
+            latency_max_ms=max(latencies, default=0.0),
+            queue_depth_max=max(sampler.depth, default=0),
+            queue_depth_mean=sum(sampler.depth) / len(sampler.depth) if sampler.depth else 0.0,
+            loop_lag_p99_ms=percentile(sampler.lag_ms, 99),
+            loop_lag_max_ms=max(sampler.lag_ms, default=0.0),
+        )
+
+    async def _send(self, update_id: int, payload: Dict[str, Any]) -> None:
+        try:
+            await self._sink.send(payload)
+        except Exception:
+            self.tracker.completed(update_id, error=True)
+            return
+        if not self._sink.tracks_completion:
+            self.tracker.completed(update_id)
@@ -0,0 +1,141 @@
+"""Stubbed Telegram, LLM and Todoist backends for load tests."""
+
+import asyncio
+import json
+import random
+import time
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import Message
+
+STUB_TOKEN = "123456789:AAHstubTokenForLoadTestsOnly000000000"
+
+
+class _Latency:
+    """Latency model: base delay plus uniform jitter."""
+
+    def __init__(self, latency_ms: float, jitter_ms: float, seed: int) -> None:
+        self._base = latency_ms / 1000
+        self._jitter = jitter_ms / 1000
+        self._rng = random.Random(seed)
+
+    async def wait(self) -> None:
+        delay = self._base + self._rng.random() * self._jitter
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class StubTelegramSession(BaseSession):
+    """aiogram session answering Bot API calls locally.
+
+    Message-returning methods get a synthetic message; everything else
+    returns ``True``. Call counts per method are kept for assertions.
+    """
+
+    def __init__(self, latency_ms: float = 20.0, jitter_ms: float = 10.0, seed: int = 1) -> None:
+        super().__init__()
+        self._latency = _Latency(latency_ms, jitter_ms, seed)
+        self.calls: Dict[str, int] = {}
+        self._message_id = 0
+
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod[TelegramType], timeout: Optional[int] = None
+    ) -> TelegramType:
+        await self._latency.wait()
+        name = type(method).__name__
+        self.calls[name] = self.calls.get(name, 0) + 1
+        result: Any = True
+        if name.startswith(("Send", "Edit", "Forward", "Copy")):
+            self._message_id += 1
+            result = {
+                "message_id": self._message_id,
+                "date": int(time.time()),
+                "chat": {"id": getattr(method, "chat_id", 0) or 0, "type": "private"},
+                "text": getattr(method, "text", None),
+            }
+        elif name == "GetMe":
+            result = {"id": 123456789, "is_bot": True, "first_name": "Stub"}
+        response = self.check_response(bot, method, 200, json.dumps({"ok": True, "result": result}))
+        return response.result  # type: ignore[return-value]
+
+    async def stream_content(
+        self,
+        url: str,
+        headers: Optional[Dict[str, Any]] = None,
+        timeout: int = 30,
+        chunk_size: int = 65536,
+        raise_for_status: bool = True,
+    ) -> AsyncGenerator[bytes, None]:
+        await self._latency.wait()
+        yield b"\x00" * chunk_size
+
+    async def close(self) -> None:
+        return None
+
+
+class StubLLM:
+    """LLM backend stub with configurable latency."""
+
+    def __init__(self, latency_ms: float = 300.0, jitter_ms: float = 200.0, seed: int = 2) -> None:
+        self._latency = _Latency(latency_ms, jitter_ms, seed)
+        self.calls = 0
+
+    async def complete(self, prompt: str) -> str:
+        self.calls += 1
+        await self._latency.wait()
+        return "note"
+
+    async def transcribe(self, file_id: str) -> str:
+        self.calls += 1
+        await self._latency.wait()
+        return "расшифровка голосового сообщения"
+
+
+class StubTodoist:
+    """Todoist backend stub with configurable latency."""
+
+    def __init__(self, latency_ms: float = 150.0, jitter_ms: float = 50.0, seed: int = 3) -> None:
+        self._latency = _Latency(latency_ms, jitter_ms, seed)
+        self.calls = 0
+
+    async def add_task(self, content: str) -> Dict[str, Any]:
+        self.calls += 1
+        await self._latency.wait()
+        return {"id": str(self.calls), "content": content}
+
+
+def build_demo_dispatcher(llm: StubLLM, todoist: StubTodoist) -> Dispatcher:
+    """Dispatcher approximating the planned handler workload.
+
+    Text and forwarded messages go through the LLM, reminders also hit
+    Todoist, voice is transcribed first, documents are acknowledged. Every
+    handler replies through the Bot API.
+    """
+    router = Router(name="load-demo")
+
+    @router.message(F.voice)
+    async def on_voice(message: Message, llm: StubLLM) -> None:
+        assert message.voice is not None
+        text = await llm.transcribe(message.voice.file_id)
+        await llm.complete(text)
+        await message.answer("Голосовое сохранено")
+
+    @router.message(F.document)
+    async def on_document(message: Message) -> None:
+        await message.answer("Документ сохранён")
+
+    @router.message(F.text)
+    async def on_text(message: Message, llm: StubLLM, todoist: StubTodoist) -> None:
+        assert message.text is not None
+        await llm.complete(message.text)
+        if message.text.startswith("напомни"):
+            await todoist.add_task(message.text)
+        await message.answer("Заметка сохранена")
+
+    dispatcher = Dispatcher(llm=llm, todoist=todoist)
+    dispatcher.include_router(router)
+    return dispatcher
@@ -0,0 +1,176 @@
+"""Unit tests for incremental backup and restore."""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from src.storage.backup import (
+    BackupError,
+    BackupRepository,
+    pg_dump_command,
+    pg_restore_command,
+)
+
+
+def write_tree(root: Path, files: Dict[str, bytes]) -> None:
+    """Create files under ``root``."""
+    for rel, data in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+
+def read_tree(root: Path) -> Dict[str, bytes]:
+    """Read all files under ``root``."""
+    return {
+        p.relative_to(root).as_posix(): p.read_bytes()
+        for p in sorted(root.rglob("*"))
+        if p.is_file()
+    }
+
+
+def rows(path: Path) -> List[tuple]:
+    """Notes stored in a SQLite database."""
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT id, text FROM notes ORDER BY id").fetchall()
+
+
+@pytest.fixture
+def database(tmp_path: Path) -> Path:
+    path = tmp_path / "bot.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, text TEXT)")
+        conn.executemany(
+            "INSERT INTO notes (text) VALUES (?)", [(f"заметка {i} " * 50,) for i in range(500)]
+        )
+    return path
+
+
+def test_incremental_file_backup_copies_only_new_hashes(tmp_path: Path):
+    """Test that unchanged files are neither re-read nor re-stored."""
+    storage = tmp_path / "storage"
+    write_tree(storage, {"pdf/a.pdf": b"A" * 1000, "voice/b.ogg": b"B" * 500, "temp/x": b"tmp"})
+    repo = BackupRepository(tmp_path / "backups", jobs=3)
+
+    first = repo.backup(storage)
+    second = repo.backup(storage)
+    write_tree(storage, {"pdf/copy.pdf": b"A" * 1000, "voice/b.ogg": b"changed"})
+    third = repo.backup(storage)
+
+    assert sorted(first.files) == ["pdf/a.pdf", "voice/b.ogg"]
+    assert first.stats.objects_written == 2
+    assert second.parent == first.id
+    assert second.stats.files_hashed == 0 and second.stats.objects_written == 0
+    assert third.stats.files_hashed == 2 and third.stats.objects_written == 1
+    assert third.files["pdf/copy.pdf"]["sha256"] == third.files["pdf/a.pdf"]["sha256"]
+    assert repo.backups() == [first.id, second.id, third.id]
+
+
+def test_point_in_time_restore_of_files(tmp_path: Path):
+    """Test restoring an older backup over a diverged storage directory."""
+    storage = tmp_path / "storage"
+    write_tree(storage, {"pdf/a.pdf": b"v1", "voice/b.ogg": b"voice"})
+    repo = BackupRepository(tmp_path / "backups")
+    first = repo.backup(storage)
+    write_tree(storage, {"pdf/a.pdf": b"version 2", "pdf/new.pdf": b"new", "temp/keep": b"t"})
+    repo.backup(storage)
+
+    restored = repo.restore(first.id, storage)
+
+    assert restored.id == first.id
+    assert read_tree(storage) == {"pdf/a.pdf": b"v1", "temp/keep": b"t", "voice/b.ogg": b"voice"}
+    mtime = (storage / "pdf/a.pdf").stat().st_mtime_ns
+    assert mtime == first.files["pdf/a.pdf"]["mtime_ns"]
+    assert repo.restore(storage=storage).files == repo.manifest().files
+    assert read_tree(storage)["pdf/new.pdf"] == b"new"
+
+
+def test_restore_with_missing_objects_leaves_storage_untouched(tmp_path: Path):
+    """Test that extra files are not deleted before objects are verified."""
+    storage = tmp_path / "storage"
+    write_tree(storage, {"pdf/a.pdf": b"old"})
+    repo = BackupRepository(tmp_path / "backups")
+    first = repo.backup(storage)
+    write_tree(storage, {"pdf/a.pdf": b"newer", "pdf/b.pdf": b"only here"})
+    for path in (tmp_path / "backups" / "objects").rglob("*.*"):
+        path.unlink()
+
+    with pytest.raises(BackupError, match="missing 1 objects"):
+        repo.restore(first.id, storage)
+
+    assert read_tree(storage) == {"pdf/a.pdf": b"newer", "pdf/b.pdf": b"only here"}
+
+
+def test_prune_waits_for_running_backup(tmp_path: Path):
+    """Test that prune cannot run while a backup holds the repository."""
+    repo = BackupRepository(tmp_path / "backups")
+    repo.backup(tmp_path / "storage")
+    done = threading.Event()
+    worker = threading.Thread(target=lambda: (repo.prune(keep=0), done.set()))
+
+    with repo._lock(exclusive=False):
+        worker.start()
+        assert not done.wait(0.1)
+    worker.join(5)
+
+    assert done.is_set() and repo.backups() == []
+
+
+def test_sqlite_backup_restore_shares_unchanged_chunks(tmp_path: Path, database: Path):
+    """Test chunked SQLite backups, parallel restore and corruption detection."""
+    url = f"sqlite+aiosqlite:///{database}"
+    repo = BackupRepository(tmp_path / "backups", jobs=4, chunk_size=16 * 1024)
+    original = rows(database)
+    first = repo.backup(db_url=url)
+    with sqlite3.connect(database) as conn:
+        conn.execute("UPDATE notes SET text = 'изменено' WHERE id = 1")
+    second = repo.backup(db_url=url)
+
+    assert first.database is not None and len(first.database["chunks"]) > 4
+    assert 0 < second.stats.objects_written < len(first.database["chunks"])
+
+    repo.restore(first.id, db_url=url)
+    assert rows(database) == original
+
+    chunk = first.database["chunks"][0]
+    target = next((tmp_path / "backups" / "objects" / chunk[:2]).glob(f"{chunk}*"))
+    data = bytearray(target.read_bytes())
+    data[len(data) // 2] ^= 0xFF
+    target.write_bytes(bytes(data))
+    with pytest.raises(BackupError):
+        repo.restore(first.id, db_url=url)
+    assert rows(database) == original
+    assert not database.with_name("bot.db.restore").exists()
+
+
+def test_prune_and_postgres_commands(tmp_path: Path):
+    """Test retention and the pg_dump/pg_restore invocations."""
+    storage = tmp_path / "storage"
+    repo = BackupRepository(tmp_path / "backups")
+    for version in range(3):
+        write_tree(storage, {"pdf/a.pdf": f"v{version}".encode()})
+        os.utime(storage / "pdf/a.pdf", ns=(version, version))
+        repo.backup(storage)
+
+    assert repo.prune(keep=1) == 2
+    assert len(repo.backups()) == 1
+    repo.restore(storage=tmp_path / "restored")
+    assert read_tree(tmp_path / "restored") == {"pdf/a.pdf": b"v2"}
+
+    url = "postgresql+asyncpg://bot:secret@db:5432/telemetriya"
+    dump = pg_dump_command(url, Path("/b/postgres"), 8)
+    assert dump[:5] == [
+        "pg_dump",
+        "--format=directory",
+        "--jobs=8",
+        "--compress=zstd:3",
+        "--file=/b/postgres",
+    ]
+    assert dump[-1] == "--dbname=postgresql://bot:secret@db:5432/telemetriya"
+    assert "--jobs=8" in pg_restore_command(url, Path("/b/postgres"), 8)
+    with pytest.raises(BackupError, match="No backups"):
+        BackupRepository(tmp_path / "empty").restore()
@@ -0,0 +1,49 @@
+"""Unit tests for the LRU cache utility."""
+
+from src.utils.cache import LRUCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction_order():
+    """Test that the least recently used entry is evicted first."""
+    cache: LRUCache[str, int] = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.stats.evictions == 1
+
+
+def test_ttl_expiry():
+    """Test entries expire after their TTL."""
+    clock = _Clock()
+    cache: LRUCache[str, int] = LRUCache(ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=100)
+    clock.now = 11
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+def test_hit_ratio():
+    """Test hit/miss accounting."""
+    cache: LRUCache[str, int] = LRUCache()
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("missing")
+
+    assert cache.stats.hits == 2
+    assert cache.stats.misses == 1
+    assert round(cache.stats.hit_ratio, 2) == 0.67
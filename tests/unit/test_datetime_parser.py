@@ -0,0 +1,146 @@
+"""Unit tests for Russian datetime parser."""
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from src.utils.datetime import compile_phrase, normalize_phrase, parse_datetime
+
+MSK = ZoneInfo("Europe/Moscow")
+# Monday, 14:30 Moscow time
+NOW = datetime(2026, 10, 19, 14, 30, tzinfo=MSK)
+
+
+def _at(*args: int) -> datetime:
+    return datetime(*args, tzinfo=MSK)
+
+
+@pytest.mark.parametrize(
+    ("phrase", "expected"),
+    [
+        ("напомни завтра 9:00", _at(2026, 10, 20, 9, 0)),
+        ("через 2 часа", _at(2026, 10, 19, 16, 30)),
+        ("через полчаса", _at(2026, 10, 19, 15, 0)),
+        ("через час", _at(2026, 10, 19, 15, 30)),
+        ("полтора часа назад", _at(2026, 10, 19, 13, 0)),
+        ("в 3 часа дня", _at(2026, 10, 19, 15, 0)),
+        ("в 7 вечера", _at(2026, 10, 19, 19, 0)),
+        ("в 9 утра", _at(2026, 10, 20, 9, 0)),
+        ("в 12 ночи", _at(2026, 10, 20, 0, 0)),
+        ("послезавтра в полдень", _at(2026, 10, 21, 12, 0)),
+        ("в пятницу вечером", _at(2026, 10, 23, 19, 0)),
+        ("15 марта в 10", _at(2027, 3, 15, 10, 0)),
+        ("в 9 в субботу", _at(2026, 10, 24, 9, 0)),
+        ("сегодня в 24:00", _at(2026, 10, 20, 0, 0)),
+        ("в 24:00", _at(2026, 10, 20, 0, 0)),
+        ("25.12.2026 18:30", _at(2026, 12, 25, 18, 30)),
+        ("через 2 дня в 10:00", _at(2026, 10, 21, 10, 0)),
+        ("через три минуты", _at(2026, 10, 19, 14, 33)),
+    ],
+)
+def test_exact_moments(phrase: str, expected: datetime):
+    """Test phrases that resolve to an exact moment."""
+    result = parse_datetime(phrase, MSK, now=NOW)
+
+    assert result is not None
+    assert result.has_time
+    assert result.start == expected
+    assert result.end == result.start
+
+
+@pytest.mark.parametrize(
+    ("phrase", "start", "end"),
+    [
+        ("что я кидал вчера", _at(2026, 10, 18), _at(2026, 10, 19)),
+        ("Сделай саммари статьи, которую я скинул вчера", _at(2026, 10, 18), _at(2026, 10, 19)),
+        ("3 дня назад", _at(2026, 10, 16), _at(2026, 10, 17)),
+        ("на прошлой неделе", _at(2026, 10, 12), _at(2026, 10, 19)),
+        ("сегодня", _at(2026, 10, 19), _at(2026, 10, 20)),
+    ],
+)
+def test_day_ranges(phrase: str, start: datetime, end: datetime):
+    """Test phrases without a time of day resolve to ranges."""
+    result = parse_datetime(phrase, MSK, now=NOW)
+
+    assert result is not None
+    assert not result.has_time
+    assert (result.start, result.end) == (start, end)
+
+
+@pytest.mark.parametrize(
+    "phrase",
+    [
+        "купить молоко и хлеб",
+        "купить 2 пакета молока в 5 магазинах",
+        "я на 3 этаже",
+        "в 2 раза больше",
+    ],
+)
+def test_no_datetime_returns_none(phrase: str):
+    """Test that plain notes, including numbers after prepositions, yield no result."""
+    assert parse_datetime(phrase, MSK, now=NOW) is None
+
+
+@pytest.mark.parametrize(
+    "phrase", ["31 февраля в 25:70", "31 февраля", "30.02.2027", "завтра в 25:70", "в 10:75"]
+)
+def test_impossible_dates_and_times_return_none(phrase: str):
+    """Test that nonexistent dates and times are rejected, not wrapped to today."""
+    assert parse_datetime(phrase, MSK, now=NOW) is None
+
+
+def test_weekday_direction_follows_preference():
+    """Test that a bare weekday resolves forward or backward on request."""
+    future = parse_datetime("в среду", MSK, now=NOW)
+    past = parse_datetime("что я писал в среду", MSK, now=NOW, prefer_future=False)
+
+    assert future is not None and future.start == _at(2026, 10, 21)
+    assert past is not None and past.start == _at(2026, 10, 14)
+
+
+def test_next_and_previous_weekday_modifiers():
+    """Test "следующий" and "прошлый" weekday modifiers."""
+    nxt = parse_datetime("в следующий понедельник", MSK, now=NOW)
+    prev = parse_datetime("в прошлый понедельник", MSK, now=NOW)
+
+    assert nxt is not None and nxt.start == _at(2026, 10, 26)
+    assert prev is not None and prev.start == _at(2026, 10, 12)
+
+
+def test_time_already_passed_rolls_to_tomorrow():
+    """Test that a past time without a day moves to the next day."""
+    result = parse_datetime("в 9:00", MSK, now=NOW)
+
+    assert result is not None
+    assert result.start == _at(2026, 10, 20, 9, 0)
+
+
+def test_user_timezone_is_respected():
+    """Test that the same phrase resolves in the user's own timezone."""
+    utc_now = datetime(2026, 10, 19, 20, 0, tzinfo=ZoneInfo("UTC"))
+
+    tokyo = parse_datetime("завтра в 9:00", "Asia/Tokyo", now=utc_now)
+    london = parse_datetime("завтра в 9:00", "Europe/London", now=utc_now)
+
+    assert tokyo is not None and london is not None
+    assert tokyo.start.tzinfo == ZoneInfo("Asia/Tokyo")
+    assert tokyo.start.date().isoformat() == "2026-10-21"
+    assert london.start.date().isoformat() == "2026-10-20"
+
+
+def test_normalize_phrase():
+    """Test normalization of case, ё and whitespace."""
+    assert normalize_phrase("  Завтра   Днём ") == "завтра днем"
+
+
+def test_compiled_specs_are_memoized():
+    """Test that equivalent phrases hit the LRU cache."""
+    compile_phrase.cache_clear()
+
+    parse_datetime("Завтра  в 9:00", MSK, now=NOW)
+    parse_datetime("завтра в 9:00", MSK, now=NOW)
+
+    info = compile_phrase.cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
@@ -0,0 +1,93 @@
+"""Unit tests for fused note enrichment."""
+
+import json
+from typing import Any, Dict, List
+
+import pytest
+
+from src.llm.clients.base import Completion
+from src.llm.enrichment import EnrichmentError, NoteEnricher, extract_json
+from src.llm.schemas.enrichment import NoteCategory
+
+NOTE = "Рецепт пирога: мука, яйца, сахар. Печь 40 минут."
+VALID = {"category": "recipe", "tags": ["Выпечка", "пирог"], "summary": "Рецепт пирога."}
+
+
+class ScriptedClient:
+    """Fake LLM client answering fused and single-field prompts."""
+
+    def __init__(self, fused: str, fields: Dict[str, Any]) -> None:
+        self.fused = fused
+        self.fields = fields
+        self.prompts: List[str] = []
+        self.kwargs: List[Dict[str, Any]] = []
+
+    async def complete(self, prompt: str, **kwargs: Any) -> Completion:
+        self.prompts.append(prompt)
+        self.kwargs.append(kwargs)
+        if "json_schema" in kwargs:
+            text = self.fused
+        else:
+            name = next(n for n in ("category", "tags", "summary") if f'"{n}"' in prompt)
+            text = json.dumps({name: self.fields[name]}, ensure_ascii=False)
+        return Completion(
+            text=text, prompt_tokens=len(prompt) // 4, completion_tokens=len(text) // 4
+        )
+
+
+async def test_fused_call_produces_all_fields():
+    """Test that a valid fused reply needs exactly one call."""
+    client = ScriptedClient(json.dumps(VALID, ensure_ascii=False), VALID)
+
+    result = await NoteEnricher(client).enrich(NOTE)
+
+    assert result.calls == 1
+    assert result.fallback_fields == []
+    assert result.enrichment.category is NoteCategory.RECIPE
+    assert result.enrichment.tags == ["выпечка", "пирог"]
+    assert "properties" in client.kwargs[0]["json_schema"]
+    assert result.tokens > 0
+
+
+async def test_only_invalid_fields_are_requested_again():
+    """Test per-field fallback for a partially invalid fused reply."""
+    fused = json.dumps({"category": "recipe", "tags": "пирог", "summary": "Рецепт пирога."})
+    client = ScriptedClient(f"```json\n{fused}\n```", VALID)
+
+    result = await NoteEnricher(client).enrich(NOTE)
+
+    assert result.calls == 2
+    assert result.fallback_fields == ["tags"]
+    assert result.enrichment.tags == ["выпечка", "пирог"]
+    assert result.enrichment.summary == "Рецепт пирога."
+
+
+async def test_unparseable_reply_falls_back_to_all_fields():
+    """Test that a non-JSON fused reply triggers every single-field prompt."""
+    client = ScriptedClient("Конечно! Вот анализ заметки.", VALID)
+
+    result = await NoteEnricher(client).enrich(NOTE)
+
+    assert result.calls == 4
+    assert sorted(result.fallback_fields) == ["category", "summary", "tags"]
+
+
+async def test_failed_fallback_raises():
+    """Test that a field invalid in both passes raises EnrichmentError."""
+    client = ScriptedClient("{}", {**VALID, "category": "poem"})
+
+    with pytest.raises(EnrichmentError) as exc_info:
+        await NoteEnricher(client).enrich(NOTE)
+
+    assert exc_info.value.field_name == "category"
+
+
+async def test_separate_pipeline_makes_one_call_per_field():
+    """Test the unfused baseline."""
+    client = ScriptedClient("", VALID)
+
+    result = await NoteEnricher(client).enrich_separately(NOTE, concurrent=True)
+
+    assert result.calls == 3
+    assert result.enrichment.summary == "Рецепт пирога."
+    assert extract_json('ok: {"a": 1}') == {"a": 1}
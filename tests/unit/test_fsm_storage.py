@@ -0,0 +1,176 @@
+"""Unit tests for the cached FSM session storage."""
+
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator, List, Sequence
+
+import pytest
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import StorageKey
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.bot.conversations.storage import (
+    CachedSessionStorage,
+    InMemorySessionBackend,
+    SessionRecord,
+    SQLSessionBackend,
+)
+from src.db.base import Base
+
+KEY = StorageKey(bot_id=1, chat_id=10, user_id=10)
+OTHER = StorageKey(bot_id=1, chat_id=20, user_id=20)
+
+
+class NoteFlow(StatesGroup):
+    """Example dialog."""
+
+    waiting_text = State()
+    waiting_tags = State()
+
+
+class CountingBackend(InMemorySessionBackend):
+    """In-memory backend counting loads."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.loads = 0
+
+    async def load(self, key: str, now: float) -> SessionRecord | None:
+        self.loads += 1
+        return await super().load(key, now)
+
+
+class Clock:
+    """Manually advanced clock."""
+
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+async def sessionmaker(tmp_path: Path) -> AsyncIterator[async_sessionmaker[AsyncSession]]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'sessions.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def test_cached_reads_and_coalesced_writes():
+    """Test that a dialog step costs one load and one batched write."""
+    backend = CountingBackend()
+    storage = CachedSessionStorage(backend, flush_delay=0.01)
+
+    await storage.set_state(KEY, NoteFlow.waiting_text)
+    await storage.update_data(KEY, {"text": "купить молоко"})
+    await storage.set_state(KEY, NoteFlow.waiting_tags)
+    await storage.update_data(OTHER, {"draft": 1})
+    assert await storage.get_state(KEY) == NoteFlow.waiting_tags.state
+    await asyncio.sleep(0.05)
+
+    assert backend.loads == 2
+    assert backend.saves == 1
+    row = next(row for key, row in backend.rows.items() if key.endswith(":10:10:default"))
+    assert row.state == NoteFlow.waiting_tags.state and row.version == 1
+    assert storage.stats.coalesced == 2
+    await storage.close()
+
+
+async def test_idle_sessions_expire_and_are_purged():
+    """Test TTL expiry of idle conversations."""
+    clock = Clock()
+    backend = InMemorySessionBackend()
+    storage = CachedSessionStorage(backend, ttl=60, clock=clock)
+    await storage.set_state(KEY, "form:step")
+    await storage.set_data(KEY, {"a": 1})
+    await storage.flush()
+
+    clock.now += 61
+    assert await storage.get_state(KEY) is None
+    assert await storage.get_data(KEY) == {}
+    assert storage.stats.expired == 1
+    assert await backend.purge(clock.now) == 1
+
+    await storage.set_state(KEY, "form:restart")
+    await storage.close()
+    assert storage.stats.conflicts == 0
+    assert [row.state for row in backend.rows.values()] == ["form:restart"]
+
+
+async def test_evicted_dirty_session_is_not_lost():
+    """Test that LRU eviction of an unflushed session keeps its pending write."""
+    backend = InMemorySessionBackend()
+    storage = CachedSessionStorage(backend, maxsize=1)
+
+    await storage.set_state(KEY, "form:step")
+    await storage.get_state(OTHER)
+
+    assert len(storage) == 1 and storage.stats.evictions == 1
+    assert await storage.get_state(KEY) == "form:step"
+    await storage.close()
+    assert [row.state for row in backend.rows.values()] == ["form:step"]
+
+
+async def test_close_during_backend_save_keeps_the_batch():
+    """Test that closing while the flusher is saving does not drop the batch."""
+
+    class SlowBackend(InMemorySessionBackend):
+        async def save(self, records: Sequence[SessionRecord]) -> List[str]:
+            await asyncio.sleep(0.05)
+            return await super().save(records)
+
+    backend = SlowBackend()
+    storage = CachedSessionStorage(backend, flush_delay=0)
+    await storage.set_state(KEY, "form:step")
+    await asyncio.sleep(0.01)
+
+    await storage.close()
+
+    assert [row.state for row in backend.rows.values()] == ["form:step"]
+    assert storage.stats.writes == 1 and storage.stats.conflicts == 0
+
+
+async def test_stale_writer_loses_version_conflict():
+    """Test that two processes sharing a backend never overwrite newer state."""
+    backend = InMemorySessionBackend()
+    first = CachedSessionStorage(backend, revalidate_after=0)
+    second = CachedSessionStorage(backend)
+    await first.get_state(KEY)
+    await second.get_state(KEY)
+
+    await first.set_state(KEY, "first")
+    await first.flush()
+    await second.set_state(KEY, "second")
+    await second.flush()
+
+    assert second.stats.conflicts == 1
+    assert await second.get_state(KEY) == "first"
+    await second.set_state(KEY, "second")
+    await second.flush()
+    assert await first.get_state(KEY) == "second"
+    await first.close()
+    await second.close()
+
+
+async def test_sql_backend_round_trip(sessionmaker):
+    """Test persistence, versioning and purge in the sessions table."""
+    clock = Clock()
+    backend = SQLSessionBackend(sessionmaker)
+    storage = CachedSessionStorage(backend, ttl=60, clock=clock)
+    await storage.set_state(KEY, "form:step")
+    await storage.set_data(KEY, {"items": [1, 2]})
+    await storage.set_state(OTHER, "other")
+    await storage.flush()
+    await storage.set_data(KEY, {"items": [1, 2, 3]})
+    await storage.flush()
+
+    restored = CachedSessionStorage(backend, clock=clock)
+    assert await restored.get_state(KEY) == "form:step"
+    assert await restored.get_data(KEY) == {"items": [1, 2, 3]}
+
+    stale: List[SessionRecord] = [SessionRecord(storage._key_builder.build(KEY), version=2)]
+    assert await backend.save(stale) == [stale[0].key]
+    assert await backend.purge(clock.now + 61) == 2
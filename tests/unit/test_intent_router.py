@@ -0,0 +1,145 @@
+"""Unit tests for intent router module."""
+
+import json
+import logging
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from src.llm.intent_router import (
+    STAGE_CENTROID,
+    STAGE_FALLBACK,
+    STAGE_LLM,
+    STAGE_RULES,
+    IntentRouter,
+    load_examples,
+)
+from src.llm.schemas.intent import Intent, IntentPrediction
+
+CASES_PATH = Path(__file__).resolve().parents[2] / "specs" / "evals" / "cases.jsonl"
+
+
+class FakeLLM:
+    """LLM classifier stub that records calls."""
+
+    def __init__(self, intent: Intent = Intent.NOTE) -> None:
+        self.calls: List[str] = []
+        self._intent = intent
+
+    async def __call__(self, text: str) -> IntentPrediction:
+        self.calls.append(text)
+        return IntentPrediction(intent=self._intent, route="save_note", confidence=0.9)
+
+
+async def test_eval_cases_are_routed_without_llm():
+    """Test that golden dataset cases are resolved by local stages."""
+    llm = FakeLLM()
+    router = IntentRouter(llm_classifier=llm)
+
+    with CASES_PATH.open(encoding="utf-8") as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+    for case in cases:
+        prediction = await router.route(case["input"])
+        assert prediction.intent.value == case["expected_intent"]
+        assert prediction.route == case["expected_route"]
+
+    assert llm.calls == []
+
+
+@pytest.mark.parametrize(
+    ("text", "intent"),
+    [
+        ("напомни завтра купить хлеб", Intent.REMINDER),
+        ("Сделай саммари статьи", Intent.SUMMARIZE),
+        ("что я кидал вчера", Intent.SEARCH),
+        ("найди заметку про отпуск", Intent.SEARCH),
+        ("что ты умеешь?", Intent.HELP),
+    ],
+)
+async def test_rules_stage(text: str, intent: Intent):
+    """Test that obvious messages are decided by rules."""
+    prediction = await IntentRouter().route(text)
+
+    assert prediction.intent == intent
+    assert prediction.stage == STAGE_RULES
+    assert prediction.confidence == 1.0
+
+
+async def test_centroid_stage_handles_paraphrases():
+    """Test that paraphrases without keywords hit the centroid stage."""
+    llm = FakeLLM()
+    router = IntentRouter(llm_classifier=llm)
+
+    prediction = await router.route("поставь напоминание на вечер")
+
+    assert prediction.intent == Intent.REMINDER
+    assert prediction.stage == STAGE_CENTROID
+    assert llm.calls == []
+
+
+async def test_low_confidence_escalates_to_llm():
+    """Test that ambiguous messages are sent to the LLM."""
+    llm = FakeLLM(Intent.NOTE)
+    router = IntentRouter(llm_classifier=llm)
+
+    prediction = await router.route("асдф")
+
+    assert llm.calls == ["асдф"]
+    assert prediction.stage == STAGE_LLM
+    assert router.stats.stages[STAGE_LLM].hits == 1
+
+
+async def test_llm_failure_falls_back_to_centroid_guess():
+    """Test that an LLM error does not fail routing."""
+
+    async def broken(text: str) -> IntentPrediction:
+        raise RuntimeError("provider down")
+
+    prediction = await IntentRouter(llm_classifier=broken).route("асдф")
+
+    assert prediction.stage == STAGE_FALLBACK
+
+
+async def test_without_llm_uses_fallback_stage():
+    """Test routing without an LLM classifier configured."""
+    prediction = await IntentRouter().route("асдф")
+
+    assert prediction.stage == STAGE_FALLBACK
+
+
+async def test_stats_track_hit_rates_and_latency():
+    """Test per-stage counters."""
+    router = IntentRouter(llm_classifier=FakeLLM())
+
+    await router.route("напомни позвонить")
+    await router.route("асдф")
+
+    stats = router.stats
+    assert stats.total == 2
+    assert stats.hit_rate(STAGE_RULES) == 0.5
+    assert stats.hit_rate(STAGE_LLM) == 0.5
+    assert stats.stages[STAGE_RULES].attempts == 2
+    assert stats.stages[STAGE_CENTROID].attempts == 1
+    assert stats.stages[STAGE_CENTROID].total_latency_ms > 0
+
+
+async def test_stats_are_logged_periodically(caplog: pytest.LogCaptureFixture):
+    """Test that aggregated stats are logged every N messages."""
+    router = IntentRouter(stats_log_every=2)
+
+    with caplog.at_level(logging.INFO, logger="src.llm.intent_router"):
+        await router.route("напомни позвонить")
+        await router.route("найди рецепт")
+
+    records = [r for r in caplog.records if r.getMessage() == "Intent router stats"]
+    assert len(records) == 1
+    assert records[0].rules_hit_rate == 1.0
+
+
+def test_load_examples_from_eval_dataset():
+    """Test that labelled examples are read from the eval dataset."""
+    examples = load_examples(CASES_PATH)
+
+    assert Intent.SUMMARIZE in examples
+    assert examples[Intent.SUMMARIZE]
@@ -0,0 +1,204 @@
+"""Unit tests for the background job runtime."""
+
+import asyncio
+import math
+import threading
+import time
+from typing import List, Optional
+
+import pytest
+
+from src.jobs import ExecutionMode, JobPriority, JobRuntime, JobState, JobType
+
+
+class Recorder:
+    """Async handler recording order and peak concurrency."""
+
+    def __init__(self, delay: float = 0.01, total: Optional["Recorder"] = None) -> None:
+        self.delay = delay
+        self.total = total
+        self.order: List[str] = []
+        self.running = 0
+        self.peak = 0
+
+    def _enter(self, payload: str) -> None:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        self.order.append(payload)
+
+    async def __call__(self, payload: str) -> str:
+        for recorder in (self, self.total):
+            if recorder is not None:
+                recorder._enter(payload)
+        await asyncio.sleep(self.delay)
+        for recorder in (self, self.total):
+            if recorder is not None:
+                recorder.running -= 1
+        return payload.upper()
+
+
+class Flaky:
+    """Fails the first ``failures`` calls."""
+
+    def __init__(self, failures: int, error: Exception) -> None:
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self, payload: int) -> int:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return payload * 2
+
+
+class FloodWaitError(Exception):
+    """Error carrying a retry hint."""
+
+    retry_after = 0.02
+
+
+async def test_priorities_and_concurrency_caps():
+    """Test cross-type priority order and per-type and global caps."""
+    total = Recorder()
+    sync, remind = Recorder(total=total), Recorder(total=total)
+    runtime = JobRuntime(workers=3)
+    sync_type = runtime.register(JobType("sync", sync, priority=JobPriority.LOW, concurrency=2))
+    remind_type = runtime.register(JobType("remind", remind, priority=JobPriority.HIGH))
+    jobs = [runtime.submit(sync_type, f"s{i}") for i in range(6)]
+    jobs += [runtime.submit(remind_type, f"r{i}") for i in range(3)]
+    urgent = runtime.submit(sync_type, "urgent", priority=JobPriority.INTERACTIVE)
+
+    runtime.start()
+    results = await asyncio.gather(*(job.future for job in jobs))
+    await runtime.stop()
+
+    assert results[0] == "S0" and urgent.state is JobState.SUCCEEDED
+    assert remind.order == ["r0", "r1", "r2"]
+    assert sync.order[0] == "urgent"
+    assert sync.peak == 2 and total.peak == 3
+
+
+async def test_retries_with_backoff_and_permanent_failures():
+    """Test retry until success, retry hints and non-retryable errors."""
+    flaky = Flaky(2, ConnectionError("db down"))
+    hinted = Flaky(1, FloodWaitError())
+    broken = Flaky(5, ValueError("bad payload"))
+    runtime = JobRuntime()
+    flaky_type = runtime.register(JobType("flaky", flaky, backoff=0.01, max_attempts=3))
+    hinted_type = runtime.register(JobType("hinted", hinted, backoff=10))
+    broken_type = runtime.register(JobType("broken", broken, retry_on=(ConnectionError,)))
+    runtime.start()
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    assert await runtime.run(flaky_type, 21) == 42
+    assert await runtime.run(hinted_type, 1) == 2
+    assert loop.time() - started < 1
+    with pytest.raises(ValueError):
+        await runtime.run(broken_type, 1)
+    await runtime.stop()
+
+    stats = runtime.stats()
+    assert flaky.calls == 3 and stats["flaky"]["retried"] == 2
+    assert broken.calls == 1 and stats["broken"]["failed"] == 1
+
+
+async def test_idempotency_keys():
+    """Test deduplication of queued, running and succeeded jobs."""
+    handler = Recorder()
+    runtime = JobRuntime()
+    summarize = runtime.register(JobType("summarize", handler))
+
+    first = runtime.submit(summarize, "note-1", key="note:1")
+    assert runtime.submit(summarize, "note-1 again", key="note:1") is first
+    runtime.start()
+    await first.future
+    again = runtime.submit(summarize, "note-1 later", key="note:1")
+    other = runtime.submit(summarize, "note-2", key="note:2")
+    await other.future
+    await runtime.stop()
+
+    assert again is first
+    assert handler.order == ["note-1", "note-2"]
+    assert runtime.stats()["summarize"]["deduplicated"] == 2
+
+
+async def test_cpu_jobs_run_in_process_pool_and_sync_io_in_thread():
+    """Test execution modes."""
+    runtime = JobRuntime(process_workers=1)
+    factorial = runtime.register(JobType("factorial", math.factorial, mode=ExecutionMode.CPU))
+    thread_name = runtime.register(JobType("blocking", lambda _: threading.current_thread().name))
+    runtime.start()
+
+    assert await runtime.run(factorial, 20) == math.factorial(20)
+    assert await runtime.run(thread_name, None) != threading.current_thread().name
+    await runtime.stop()
+
+
+async def test_stats_aging_and_cancel_on_stop():
+    """Test the dashboard report, starvation protection and non-draining stop."""
+    slow = Recorder(delay=0.05)
+    runtime = JobRuntime(workers=1, aging=0.01)
+    bulk = runtime.register(JobType("reindex", slow, priority=JobPriority.BULK))
+    normal = runtime.register(JobType("embed", slow))
+    old = runtime.submit(bulk, "old bulk")
+    await asyncio.sleep(0.05)
+    fresh = runtime.submit(normal, "fresh")
+    runtime.start()
+    await fresh.future
+    leftover = runtime.submit(bulk, "never", delay=10)
+
+    report = runtime.stats()
+    await runtime.stop(drain=False)
+
+    assert slow.order == ["old bulk", "fresh"] and old.done
+    assert report["reindex"]["retry_wait"] == 1
+    assert report["embed"]["succeeded"] == 1 and report["embed"]["throughput_per_second"] > 0
+    assert report["reindex"]["queue_latency_ms"]["max"] >= 50
+    assert set(report["embed"]["run_time_ms"]) == {"p50", "p95", "max"}
+    assert leftover.state is JobState.CANCELLED and leftover.future.cancelled()
+
+
+async def test_lower_priority_override_ages_within_its_type():
+    """Test that an old low-priority job overtakes newer jobs of its own type."""
+    handler = Recorder()
+    runtime = JobRuntime(workers=1, aging=0.01)
+    embed = runtime.register(JobType("embed", handler))
+    runtime.submit(embed, "old backfill", priority=JobPriority.BULK)
+    await asyncio.sleep(0.05)
+    jobs = [runtime.submit(embed, f"new {i}") for i in range(3)]
+
+    runtime.start()
+    await asyncio.gather(*(job.future for job in jobs))
+    await runtime.stop()
+
+    assert handler.order[0] == "old backfill"
+
+
+async def test_timed_out_thread_job_keeps_its_slot_until_it_ends():
+    """Test that a retry never runs next to an attempt that timed out in a thread."""
+    lock = threading.Lock()
+    running = peak = calls = 0
+
+    def slow(payload: float) -> str:
+        nonlocal running, peak, calls
+        with lock:
+            calls += 1
+            first = calls == 1
+            running += 1
+            peak = max(peak, running)
+        time.sleep(payload if first else 0)
+        with lock:
+            running -= 1
+        return "done"
+
+    runtime = JobRuntime()
+    job_type = runtime.register(JobType("parse", slow, concurrency=1, timeout=0.02, backoff=0.001))
+    runtime.start()
+
+    assert await runtime.run(job_type, 0.2) == "done"
+    await runtime.stop()
+
+    assert calls == 2 and peak == 1
+    assert runtime.stats()["parse"]["retried"] == 1
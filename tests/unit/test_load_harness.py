@@ -0,0 +1,135 @@
+"""Unit tests for the load-test harness (tests/load)."""
+
+import json
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+from aiogram import Bot
+from aiogram.types import Update
+
+from tests.load.generator import LoadProfile, UpdateFactory, arrival_times
+from tests.load.harness import (
+    InProcessSink,
+    LoadHarness,
+    Tracker,
+    WebhookSink,
+    install_completion_tracking,
+    percentile,
+)
+from tests.load.stubs import (
+    STUB_TOKEN,
+    StubLLM,
+    StubTelegramSession,
+    StubTodoist,
+    build_demo_dispatcher,
+)
+
+
+def _fast_bot() -> Bot:
+    return Bot(STUB_TOKEN, session=StubTelegramSession(latency_ms=0, jitter_ms=0))
+
+
+@pytest.mark.parametrize("kind", ["text", "voice", "document", "forward"])
+def test_factory_payloads_are_valid_updates(kind: str):
+    """Test that every synthesized kind parses as an aiogram Update."""
+    payload = UpdateFactory(LoadProfile()).make(1, kind)
+
+    update = Update.model_validate(payload)
+
+    assert update.update_id == 1
+    assert update.message is not None
+    assert json.loads(json.dumps(payload)) == payload
+
+
+def test_constant_shape_rate():
+    """Test constant arrivals match the configured rate."""
+    offsets = list(arrival_times(LoadProfile(rate=100, duration=1.0)))
+
+    assert 98 <= len(offsets) <= 100
+    assert offsets == sorted(offsets)
+
+
+def test_burst_shape_has_more_arrivals_than_constant():
+    """Test that bursts multiply the arrival rate."""
+    constant = list(arrival_times(LoadProfile(rate=10, duration=2.0)))
+    burst = list(
+        arrival_times(
+            LoadProfile(rate=10, duration=2.0, shape="burst", burst_every=1.0, burst_length=0.5)
+        )
+    )
+
+    assert len(burst) > 3 * len(constant)
+
+
+def test_unknown_shape_is_rejected():
+    """Test validation of the shape name."""
+    with pytest.raises(ValueError):
+        list(arrival_times(LoadProfile(shape="sawtooth")))
+
+
+def test_percentile():
+    """Test nearest-rank percentile helper."""
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert percentile([], 99) == 0.0
+
+
+async def test_in_process_run_reports_latency_and_depth():
+    """Test an in-process run against the demo dispatcher with stubs."""
+    llm = StubLLM(latency_ms=5, jitter_ms=0)
+    todoist = StubTodoist(latency_ms=1, jitter_ms=0)
+    sink = InProcessSink(build_demo_dispatcher(llm, todoist), _fast_bot())
+
+    report = await LoadHarness(LoadProfile(rate=200, duration=0.3, chats=5), sink).run()
+
+    assert report.sent == report.completed
+    assert report.errors == 0
+    assert report.latency_p50_ms >= 5
+    assert report.latency_p99_ms >= report.latency_p50_ms
+    assert report.queue_depth_max >= 0
+    assert llm.calls > 0
+
+
+async def test_webhook_sink_measures_ack_latency():
+    """Test webhook mode against a mock endpoint."""
+    received: List[Dict[str, Any]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["X-Telegram-Bot-Api-Secret-Token"] == "s3cret"
+        received.append(json.loads(request.content))
+        return httpx.Response(200, json={"ok": True})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    sink = WebhookSink("http://bot.local/webhook", client=client, secret_token="s3cret")
+
+    report = await LoadHarness(LoadProfile(rate=100, duration=0.2), sink).run()
+
+    assert report.completed == len(received) == report.sent
+    await client.aclose()
+
+
+async def test_failed_sends_are_counted_as_errors():
+    """Test that HTTP errors are reported instead of aborting the run."""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(503)))
+    sink = WebhookSink("http://bot.local/webhook", client=client)
+
+    report = await LoadHarness(LoadProfile(rate=50, duration=0.1), sink).run()
+
+    assert report.errors == report.sent
+    assert report.completed == 0
+    await client.aclose()
+
+
+async def test_completion_tracking_middleware():
+    """Test that the dispatcher middleware marks updates completed."""
+    tracker = Tracker()
+    dispatcher = build_demo_dispatcher(StubLLM(0, 0), StubTodoist(0, 0))
+    install_completion_tracking(dispatcher, tracker)
+    bot = _fast_bot()
+
+    tracker.sent(7)
+    payload = UpdateFactory(LoadProfile()).make(7, "text")
+    await dispatcher.feed_update(bot, Update.model_validate(payload, context={"bot": bot}))
+
+    assert tracker.in_flight == 0
+    assert len(tracker.latencies_ms) == 1
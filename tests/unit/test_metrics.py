@@ -0,0 +1,134 @@
+"""Unit tests for the metrics registry and /metrics endpoint."""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.api.v1.endpoints.metrics import get_registry, router
+from src.bot.ingestion import UpdateIngestor
+from src.core.metrics import REGISTRY, MetricsRegistry, track_cache
+from src.llm.clients.base import Completion, ResilientLLMClient
+from src.utils.cache import LRUCache
+from src.utils.resilience import Dependency
+
+
+def _sample(text: str, prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{prefix} not found in exposition")
+
+
+def test_counter_shards_sum_across_threads():
+    """Test that per-thread counter cells add up at collection."""
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs", ("queue",)).labels("default")
+
+    def work() -> None:
+        for _ in range(10_000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value() == 80_000
+    assert 'jobs_total{queue="default"} 80000.0' in registry.expose()
+
+
+def test_histogram_exposition_is_cumulative():
+    """Test bucket, count and sum lines of a histogram."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    text = registry.expose()
+
+    assert "# TYPE latency_seconds histogram" in text
+    assert _sample(text, 'latency_seconds_bucket{le="0.1"}') == 2
+    assert _sample(text, 'latency_seconds_bucket{le="1.0"}') == 3
+    assert _sample(text, 'latency_seconds_bucket{le="+Inf"}') == 4
+    assert _sample(text, "latency_seconds_count") == 4
+    assert _sample(text, "latency_seconds_sum") == pytest.approx(3.65)
+
+
+def test_registration_is_idempotent_and_typed():
+    """Test get-or-create semantics and label validation."""
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events", ("kind",))
+
+    assert registry.counter("events_total", "Events", ("kind",)) is counter
+    with pytest.raises(ValueError):
+        registry.gauge("events_total", "Events")
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+
+
+def test_non_string_labels_hit_the_lock_free_path():
+    """Test that int label values find their child without taking the lock."""
+    registry = MetricsRegistry()
+    counter = registry.counter("calls_total", "Calls", ("user",))
+    child = counter.labels(42)
+    counter._lock = None  # type: ignore[assignment]
+
+    assert counter.labels(42) is child
+    assert counter.labels("42") is child
+
+
+def test_cache_callbacks():
+    """Test that tracked caches are read at collection."""
+    cache: LRUCache[str, int] = LRUCache()
+    track_cache("test_lru", cache.stats)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    text = REGISTRY.expose()
+
+    assert _sample(text, 'telemetriya_cache_hits_total{cache="test_lru"}') == 1
+    assert _sample(text, 'telemetriya_cache_hit_ratio{cache="test_lru"}') == 0.5
+
+
+async def test_update_and_llm_instruments():
+    """Test the standard update and LLM instruments."""
+    ingestor = UpdateIngestor(lambda payload: asyncio.sleep(0), workers=1)
+    ingestor.start()
+    ingestor.submit({"update_id": 1, "message": {"chat": {"id": 1}}})
+    await ingestor.stop()
+
+    class Provider:
+        async def complete(self, prompt: str, **kwargs) -> Completion:
+            return Completion("ok", prompt_tokens=7, completion_tokens=3)
+
+    client = ResilientLLMClient(Provider(), "metrics-test", dependency=Dependency("metrics-test"))
+    await client.complete("hi")
+    text = REGISTRY.expose()
+
+    assert _sample(text, 'telemetriya_update_duration_seconds_count{update_type="message"}') >= 1
+    assert _sample(text, 'telemetriya_llm_tokens_total{provider="metrics-test",kind="prompt"}') == 7
+    assert (
+        _sample(text, 'telemetriya_llm_request_duration_seconds_count{provider="metrics-test"}')
+        == 1
+    )
+
+
+async def test_metrics_endpoint():
+    """Test the exposition endpoint and its content type."""
+    registry = MetricsRegistry()
+    registry.gauge("up", "Process is up").set(1)
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_registry] = lambda: registry
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert response.text == "# HELP up Process is up\n# TYPE up gauge\nup 1.0\n"
@@ -0,0 +1,161 @@
+"""Unit tests for the shared model server."""
+
+import asyncio
+import threading
+import time
+from pathlib import Path
+from typing import AsyncIterator, List, Sequence, Tuple
+
+import numpy as np
+import pytest
+
+from src.llm.intent_router import HashingEmbedder, Vector
+from src.llm.model_server import (
+    ModelClient,
+    ModelServer,
+    ModelServerError,
+    ModelServerUnavailableError,
+)
+from src.storage.vectors import VectorIndex
+
+
+class CountingEmbedder(HashingEmbedder):
+    """Hashing embedder recording the size of every model call."""
+
+    def __init__(self) -> None:
+        super().__init__(dim=64)
+        self.calls: List[int] = []
+
+    def embed(self, texts: Sequence[str]) -> List[Vector]:
+        self.calls.append(len(texts))
+        return super().embed(texts)
+
+
+class SlowEmbedder(CountingEmbedder):
+    """Counting embedder whose first call blocks for ``delay`` seconds."""
+
+    def __init__(self, delay: float) -> None:
+        super().__init__()
+        self.delay = delay
+
+    def embed(self, texts: Sequence[str]) -> List[Vector]:
+        delay, self.delay = self.delay, 0.0
+        time.sleep(delay)
+        return super().embed(texts)
+
+
+@pytest.fixture
+async def served(tmp_path: Path) -> AsyncIterator[Tuple[ModelServer, ModelClient]]:
+    embedder = CountingEmbedder()
+    index = VectorIndex(64)
+    index.add([1, 2, 3], np.asarray(embedder.embed(["молоко", "python", "отпуск"])))
+    embedder.calls.clear()
+    server = ModelServer(
+        str(tmp_path / "models.sock"), embedder, {"notes": index}, batch_window=0.02
+    )
+    await server.start()
+    client = ModelClient(server.path, arena_size=4096)
+    yield server, client
+    await client.close()
+    await server.stop()
+
+
+async def test_concurrent_embeds_share_one_model_call(served):
+    """Test pipelined requests and server-side micro-batching."""
+    server, client = served
+    texts = [["купить молоко"], ["заметка про python", "ещё одна"], ["отпуск"]]
+
+    results = await asyncio.gather(*(client.embed(batch) for batch in texts))
+
+    assert server.embedder.calls == [4]
+    for batch, vectors in zip(texts, results):
+        assert vectors.shape == (len(batch), 64)
+        np.testing.assert_allclose(vectors, np.asarray(HashingEmbedder(64).embed(batch)), atol=1e-6)
+
+
+async def test_large_results_use_shared_memory(served):
+    """Test that array results go through the client arena when they fit."""
+    server, client = served
+
+    small = await client.embed(["a"] * 10)
+    large = await client.embed([f"note {i}" for i in range(100)])
+
+    assert small.shape == (10, 64) and large.shape == (100, 64)
+    assert server.stats.shm_responses == 1
+    assert client._arena is not None and client._arena.size >= large.nbytes
+    again = await client.embed([f"note {i}" for i in range(100)])
+    np.testing.assert_array_equal(again, large)
+    assert server.stats.shm_responses == 2
+
+
+async def test_search_health_and_errors(served):
+    """Test index search, the health report and remote errors."""
+    server, client = served
+    query = np.asarray(HashingEmbedder(64).embed(["молоко"]))
+
+    hits = await client.search("notes", query, k=2)
+    health = await client.health()
+
+    assert hits[0][0][0] == 1
+    assert health["status"] == "ok" and health["indexes"] == {"notes": 3}
+    with pytest.raises(ModelServerError, match="unknown index"):
+        await client.search("missing", query)
+
+
+async def test_search_runs_off_the_event_loop(served):
+    """Test that index scans do not block other requests on the loop."""
+    server, client = served
+    threads: List[threading.Thread] = []
+    index = server.indexes["notes"]
+    scan = index.search
+
+    def search(query: np.ndarray, k: int = 10) -> List[Tuple[int, float]]:
+        threads.append(threading.current_thread())
+        return scan(query, k)
+
+    index.search = search  # type: ignore[method-assign]
+    await client.search("notes", np.asarray(HashingEmbedder(64).embed(["молоко"])))
+
+    assert threads and threads[0] is not threading.current_thread()
+
+
+async def test_timed_out_request_does_not_reuse_its_arena(tmp_path):
+    """Test that a late result cannot land in the arena of the next request."""
+    server = ModelServer(str(tmp_path / "models.sock"), SlowEmbedder(0.3), batch_window=0)
+    await server.start()
+    client = ModelClient(server.path, timeout=0.1, arena_size=4096)
+
+    await client.health()
+    assert client._arena is not None
+    stale = client._arena.name
+    with pytest.raises(ModelServerError, match="timed out"):
+        await client.embed(["медленно"])
+    await asyncio.sleep(0.3)
+    vectors = await client.embed(["быстро"])
+    fresh = client._arena.name
+    await client.close()
+    await server.stop()
+
+    assert fresh != stale
+    np.testing.assert_allclose(
+        vectors, np.asarray(HashingEmbedder(64).embed(["быстро"])), atol=1e-6
+    )
+
+
+async def test_client_reconnects_after_server_restart(served, tmp_path):
+    """Test transparent reconnect and failure when the server stays down."""
+    server, client = served
+    await client.health()
+    await server.stop()
+    restarted = ModelServer(server.path, CountingEmbedder())
+    await restarted.start()
+
+    vectors = await client.embed(["после рестарта"])
+
+    assert vectors.shape == (1, 64)
+    assert client.reconnects >= 1
+    await restarted.stop()
+    down = ModelClient(str(tmp_path / "missing.sock"), retries=1, retry_delay=0.001)
+    with pytest.raises(ModelServerUnavailableError):
+        await down.health()
+    await down.close()
@@ -0,0 +1,119 @@
+"""Unit tests for near-duplicate note detection."""
+
+from src.storage.near_duplicates import (
+    DerivedArtifacts,
+    MinHashIndex,
+    NoteDeduplicator,
+    shingles,
+    similarity,
+)
+
+USER = 7
+
+ARTICLE = (
+    "Вышла новая версия Python 3.13 с экспериментальным JIT компилятором и режимом "
+    "без GIL, подробности в блоге разработчиков "
+    "https://blog.python.org/2024/10/python-3130-final-released.html"
+)
+FORWARDED = "Переслано из канала: " + ARTICLE.replace("подробности", "детали") + "?utm=tg 🔥"
+RELATED = (
+    "Вышла новая версия Python 3.12 с улучшенными сообщениями об ошибках, подробности "
+    "в блоге разработчиков https://blog.python.org/2023/10/python-3120-final-released.html"
+)
+
+
+class CountingDeriver:
+    """Fake enrichment pipeline spending two LLM calls per note."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def __call__(self, text: str) -> DerivedArtifacts:
+        self.calls += 1
+        return DerivedArtifacts(tags=["python"], summary=text[:20], llm_calls=2)
+
+
+def test_shingles_ignore_case_punctuation_and_tracking():
+    """Test text normalization before shingling."""
+    assert shingles("Ёжик, http://x.io/a?utm=1 !") == shingles("ежик http://x.io/a")
+    assert len(shingles("hi")) == 1
+
+
+def test_forwarded_copy_is_found_and_related_post_is_not():
+    """Test LSH lookup of an edited copy against a merely related text."""
+    index = MinHashIndex()
+    index.add(1, index.signature(ARTICLE))
+    index.add(2, index.signature("рецепт пирога с яблоками и корицей от бабушки"))
+
+    match = index.query(index.signature(FORWARDED))
+
+    assert match is not None and match[0] == 1
+    assert index.query(index.signature(RELATED)) is None
+    assert similarity(index.signature(ARTICLE), index.signature(ARTICLE)) == 1.0
+
+
+def test_remove_drops_note_from_buckets():
+    """Test that removed notes are no longer returned."""
+    index = MinHashIndex()
+    signature = index.signature(ARTICLE)
+    index.add(1, signature)
+    index.remove(1)
+
+    assert index.query(signature) is None
+    assert len(index) == 0
+
+
+async def test_duplicates_reuse_artifacts_and_count_saved_calls():
+    """Test artifact reuse and dedup statistics."""
+    derive = CountingDeriver()
+    dedup = NoteDeduplicator()
+
+    first = await dedup.process(USER, 1, ARTICLE, derive)
+    second = await dedup.process(USER, 2, FORWARDED, derive)
+    third = await dedup.process(USER, 3, RELATED, derive)
+
+    assert first.duplicate_of is None and third.duplicate_of is None
+    assert second.duplicate_of == 1
+    assert second.artifacts is first.artifacts
+    assert derive.calls == 2
+    assert dedup.stats.dedup_rate == 1 / 3
+    assert dedup.stats.saved_llm_calls == 2
+    assert dedup.stats.llm_calls == 4
+
+
+async def test_log_is_replayed_and_compacted(tmp_path):
+    """Test incremental persistence, removal and compaction."""
+    path = tmp_path / "dedup.jsonl"
+    derive = CountingDeriver()
+    dedup = NoteDeduplicator(path=path)
+    await dedup.process(USER, 1, ARTICLE, derive)
+    await dedup.process(USER, 2, RELATED, derive)
+    dedup.remove(USER, 2)
+
+    restored = NoteDeduplicator(path=path)
+    result = await restored.process(USER, 3, FORWARDED, derive)
+
+    assert result.duplicate_of == 1
+    assert result.artifacts.tags == ["python"]
+    assert 2 not in restored.artifacts[USER]
+    lines_before = len(path.read_text().splitlines())
+    restored.compact()
+    assert len(path.read_text().splitlines()) == 2 < lines_before
+    assert sorted(NoteDeduplicator(path=path).artifacts[USER]) == [1, 3]
+
+
+async def test_notes_of_other_users_are_never_matched(tmp_path):
+    """Test that the same text from two users is derived separately."""
+    path = tmp_path / "dedup.jsonl"
+    derive = CountingDeriver()
+    dedup = NoteDeduplicator(path=path)
+
+    first = await dedup.process(1, 10, ARTICLE, derive)
+    other = await dedup.process(2, 20, ARTICLE, derive)
+    dedup.remove(1, 10)
+    again = await NoteDeduplicator(path=path).process(2, 21, FORWARDED, derive)
+
+    assert first.duplicate_of is None and other.duplicate_of is None
+    assert other.artifacts is not first.artifacts
+    assert again.duplicate_of == 20
+    assert derive.calls == 2
@@ -0,0 +1,199 @@
+"""Unit tests for streaming note export and bulk import."""
+
+import json
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.api.v1.deps import get_current_user_id
+from src.api.v1.endpoints import notes_transfer
+from src.api.v1.endpoints.notes_transfer import decode_cursor, encode_cursor, iter_lines, router
+from src.api.v1.middleware.cache import (
+    InMemoryResponseCacheBackend,
+    ResponseCache,
+    ResponseCacheMiddleware,
+)
+from src.db.base import Base
+from src.db.models.note import Note
+from src.db.session import get_sessionmaker
+
+
+@pytest.fixture
+async def sessionmaker(tmp_path: Path) -> AsyncIterator[async_sessionmaker[AsyncSession]]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'notes.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+def _client(
+    factory: async_sessionmaker[AsyncSession],
+    user_id: int = 1,
+    cache: Optional[ResponseCache] = None,
+) -> httpx.AsyncClient:
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_sessionmaker] = lambda: factory
+    app.dependency_overrides[get_current_user_id] = lambda: user_id
+    if cache is not None:
+        app.add_middleware(
+            ResponseCacheMiddleware, cache=cache, user_resolver=lambda scope: str(user_id)
+        )
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api")
+
+
+async def _seed(factory: async_sessionmaker[AsyncSession], count: int, user_id: int = 1) -> None:
+    start = datetime(2024, 1, 1)
+    async with factory() as session, session.begin():
+        session.add_all(
+            Note(user_id=user_id, content=f"note {i}", created_at=start + timedelta(minutes=i))
+            for i in range(count)
+        )
+
+
+async def _count(factory: async_sessionmaker[AsyncSession]) -> int:
+    async with factory() as session:
+        return int((await session.execute(select(func.count(Note.id)))).scalar_one())
+
+
+async def test_ndjson_export_streams_all_pages(sessionmaker, monkeypatch):
+    """Test NDJSON export across several cursor pages, scoped to the user."""
+    monkeypatch.setattr(notes_transfer, "EXPORT_PAGE_SIZE", 7)
+    await _seed(sessionmaker, 20)
+    await _seed(sessionmaker, 3, user_id=2)
+
+    async with _client(sessionmaker) as client:
+        response = await client.get("/v1/notes/export")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [item["content"] for item in lines] == [f"note {i}" for i in range(20)]
+
+
+async def test_sse_export_resumes_from_last_event_id(sessionmaker):
+    """Test SSE events carry resume cursors honoured via Last-Event-ID."""
+    await _seed(sessionmaker, 5)
+
+    async with _client(sessionmaker) as client:
+        full = await client.get("/v1/notes/export", params={"format": "sse"})
+        ids = [line[4:] for line in full.text.splitlines() if line.startswith("id: ")]
+        resumed = await client.get(
+            "/v1/notes/export", params={"format": "sse"}, headers={"Last-Event-ID": ids[2]}
+        )
+
+    data = [
+        json.loads(line[6:]) for line in resumed.text.splitlines() if line.startswith('data: {"')
+    ]
+    assert len(ids) == 5
+    assert [item["content"] for item in data] == ["note 3", "note 4"]
+    assert resumed.text.endswith("event: end\ndata: {}\n\n")
+
+
+async def test_export_resumes_through_response_cache(sessionmaker):
+    """Test that streamed exports bypass the response cache."""
+    await _seed(sessionmaker, 5)
+    cache = ResponseCache(InMemoryResponseCacheBackend())
+
+    async with _client(sessionmaker, cache=cache) as client:
+        full = await client.get("/v1/notes/export", params={"format": "sse"})
+        ids = [line[4:] for line in full.text.splitlines() if line.startswith("id: ")]
+        resumed = await client.get(
+            "/v1/notes/export", params={"format": "sse"}, headers={"Last-Event-ID": ids[2]}
+        )
+        again = await client.get("/v1/notes/export")
+        repeated = await client.get("/v1/notes/export")
+
+    events = [line for line in resumed.text.splitlines() if line.startswith("id: ")]
+    assert "x-cache" not in resumed.headers and len(events) == 2
+    assert "x-cache" not in again.headers and "x-cache" not in repeated.headers
+    assert cache.stats.hits == 0
+
+
+async def test_invalid_cursor_is_rejected(sessionmaker):
+    """Test malformed cursors return 400."""
+    async with _client(sessionmaker) as client:
+        response = await client.get("/v1/notes/export", params={"after": "garbage"})
+
+    assert response.status_code == 400
+
+
+def test_cursor_round_trip():
+    """Test cursor encoding."""
+    position = (datetime(2024, 5, 1, 12, 30), uuid.uuid4())
+
+    assert decode_cursor(encode_cursor(*position)) == position
+
+
+async def test_import_in_batches(sessionmaker):
+    """Test bulk import from a chunked NDJSON body."""
+    body = "".join(json.dumps({"content": f"imported {i}"}) + "\n" for i in range(12))
+
+    async def chunks() -> AsyncIterator[bytes]:
+        data = body.encode()
+        for i in range(0, len(data), 17):
+            yield data[i : i + 17]
+
+    async with _client(sessionmaker) as client:
+        response = await client.post("/v1/notes/import", params={"batch_size": 5}, content=chunks())
+
+    assert response.status_code == 200
+    assert response.json() == {"imported": 12, "offset": 12, "error": None}
+    assert await _count(sessionmaker) == 12
+
+
+async def test_import_stops_on_invalid_line_and_resumes(sessionmaker):
+    """Test a bad line commits the prefix and reports the resume offset."""
+    lines: List[str] = [json.dumps({"content": f"n{i}"}) for i in range(4)]
+    lines.insert(3, "{not json")
+    body = "\n".join(lines)
+
+    async with _client(sessionmaker) as client:
+        failed = await client.post("/v1/notes/import", params={"batch_size": 2}, content=body)
+        lines[3] = json.dumps({"content": "fixed"})
+        resumed = await client.post(
+            "/v1/notes/import",
+            params={"offset": failed.json()["offset"]},
+            content="\n".join(lines),
+        )
+
+    assert failed.status_code == 422
+    assert failed.json()["offset"] == 3
+    assert failed.json()["imported"] == 3
+    assert resumed.json() == {"imported": 2, "offset": 5, "error": None}
+    assert await _count(sessionmaker) == 5
+
+
+async def test_import_reports_conflicting_line(sessionmaker):
+    """Test a duplicate note id commits the prefix and reports its line (409)."""
+    note_id = str(uuid.uuid4())
+    lines = [json.dumps({"content": f"n{i}"}) for i in range(3)]
+    lines.insert(2, json.dumps({"id": note_id, "content": "first"}))
+    lines.insert(4, json.dumps({"id": note_id, "content": "again"}))
+
+    async with _client(sessionmaker) as client:
+        response = await client.post(
+            "/v1/notes/import", params={"batch_size": 10}, content="\n".join(lines)
+        )
+
+    assert response.status_code == 409
+    assert response.json()["offset"] == 4 and response.json()["imported"] == 4
+    assert response.json()["error"].startswith("line 4:")
+    assert await _count(sessionmaker) == 4
+
+
+async def test_iter_lines_limits_line_length():
+    """Test oversized lines are rejected without buffering the body."""
+
+    async def chunks() -> AsyncIterator[bytes]:
+        yield b"ok\n" + b"x" * 20
+
+    with pytest.raises(ValueError):
+        [line async for line in iter_lines(chunks(), max_line=10)]
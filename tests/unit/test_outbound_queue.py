@@ -0,0 +1,132 @@
+"""Unit tests for the outbound send queue."""
+
+import asyncio
+from typing import Any, List, Tuple
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.methods import EditMessageText, SendMessage, TelegramMethod
+
+from src.bot.outbound import OutboundQueue, SendPriority
+from src.utils.rate_limit import RateLimit
+
+FAST = RateLimit(capacity=1000, rate=1000.0)
+
+
+class FakeBot:
+    """Records calls and can fail the first N of them with flood waits."""
+
+    def __init__(self, flood_waits: int = 0) -> None:
+        self.calls: List[Tuple[str, Any, str]] = []
+        self.flood_waits = flood_waits
+        self._message_id = 100
+
+    async def __call__(self, method: TelegramMethod[Any]) -> Any:
+        if self.flood_waits:
+            self.flood_waits -= 1
+            raise TelegramRetryAfter(method, "Flood control exceeded", retry_after=0)  # type: ignore[arg-type]
+        self.calls.append((type(method).__name__, method.chat_id, method.text))  # type: ignore[attr-defined]
+        await asyncio.sleep(0)
+        if isinstance(method, SendMessage):
+            self._message_id += 1
+            return type("Sent", (), {"message_id": self._message_id})()
+        return True
+
+
+async def test_per_chat_order_and_priority():
+    """Test replies go before notifications and chat order is kept."""
+    bot = FakeBot()
+    queue = OutboundQueue(bot, global_limit=FAST, private_limit=FAST)
+    futures = [
+        queue.submit(SendMessage(chat_id=1, text="n1")),
+        queue.submit(SendMessage(chat_id=1, text="n2")),
+        queue.submit(SendMessage(chat_id=2, text="r"), priority=SendPriority.REPLY),
+    ]
+    queue.start()
+    await asyncio.gather(*futures)
+    await queue.stop()
+
+    assert bot.calls[0][2] == "r"
+    assert [c[2] for c in bot.calls if c[1] == 1] == ["n1", "n2"]
+    assert queue.stats.sent == 3
+
+
+async def test_per_chat_rate_limit_spaces_sends():
+    """Test the per-chat bucket delays a second message to the same chat."""
+    bot = FakeBot()
+    queue = OutboundQueue(bot, global_limit=FAST, private_limit=RateLimit(capacity=1, rate=20))
+    queue.start()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await asyncio.gather(
+        queue.send(SendMessage(chat_id=1, text="a")),
+        queue.send(SendMessage(chat_id=1, text="b")),
+        queue.send(SendMessage(chat_id=2, text="c")),
+    )
+    elapsed = loop.time() - started
+    await queue.stop()
+
+    assert elapsed >= 0.04
+    assert len(bot.calls) == 3
+
+
+async def test_retry_after_is_respected():
+    """Test that flood waits are retried instead of failing."""
+    bot = FakeBot(flood_waits=2)
+    queue = OutboundQueue(bot, global_limit=FAST, private_limit=FAST)
+    queue.start()
+
+    await queue.send(SendMessage(chat_id=1, text="hello"))
+    await queue.stop()
+
+    assert bot.calls == [("SendMessage", 1, "hello")]
+    assert queue.stats.rate_limited == 2
+    assert queue.stats.retried == 2
+
+
+async def test_gives_up_after_max_attempts():
+    """Test that a call failing with flood waits eventually fails."""
+    queue = OutboundQueue(
+        FakeBot(flood_waits=10), global_limit=FAST, private_limit=FAST, max_attempts=3
+    )
+    queue.start()
+
+    with pytest.raises(TelegramRetryAfter):
+        await queue.send(SendMessage(chat_id=1, text="hello"))
+    await queue.stop()
+
+    assert queue.stats.failed == 1
+
+
+async def test_progress_updates_are_coalesced_into_edits():
+    """Test progress messages become one send plus edits of the latest text."""
+    bot = FakeBot()
+    queue = OutboundQueue(bot, global_limit=FAST, private_limit=RateLimit(capacity=1, rate=50))
+    queue.start()
+
+    queue.progress(1, "0%")
+    await asyncio.sleep(0.005)
+    for pct in range(10, 101, 10):
+        queue.progress(1, f"{pct}%")
+    await queue.stop()
+
+    assert bot.calls[0] == ("SendMessage", 1, "0%")
+    assert bot.calls[-1] == ("EditMessageText", 1, "100%")
+    assert len(bot.calls) == 2
+    assert queue.stats.coalesced == 9
+
+
+async def test_not_modified_edit_is_not_an_error():
+    """Test 'message is not modified' responses resolve quietly."""
+
+    async def bot(method: TelegramMethod[Any]) -> Any:
+        raise TelegramBadRequest(method, "Bad Request: message is not modified")
+
+    queue = OutboundQueue(bot, global_limit=FAST, private_limit=FAST)
+    queue.start()
+
+    result = await queue.send(EditMessageText(chat_id=1, message_id=5, text="same"))
+    await queue.stop()
+
+    assert result is None
+    assert queue.stats.failed == 0
@@ -0,0 +1,160 @@
+"""Unit tests for the sampling profiler, loop lag monitor and spans."""
+
+import asyncio
+import logging
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from src.api.v1.endpoints.profiling import get_profiler, router
+from src.api.v1.middleware.tracing import TracingMiddleware
+from src.core import profiling
+from src.core.config import Settings, get_settings
+from src.core.profiling import (
+    LoopLagMonitor,
+    SamplingProfiler,
+    TraceContextFilter,
+    current_trace,
+    span,
+    trace,
+)
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_profiler_collects_collapsed_stacks():
+    """Test that samples of a busy thread show up as folded stacks."""
+    sampler = SamplingProfiler(interval=0.001)
+    worker = threading.Thread(target=_busy, args=(0.2,), name="busy-worker")
+    worker.start()
+    sampler.start()
+    worker.join()
+    sampler.stop()
+
+    lines = sampler.collapsed().splitlines()
+
+    assert sampler.samples > 0
+    busy = [line for line in lines if line.startswith("busy-worker;")]
+    assert busy and all(line.rsplit(" ", 1)[1].isdigit() for line in busy)
+    assert any("test_profiling:_busy" in line for line in busy)
+
+
+def test_spans_are_summed_and_attached_to_logs():
+    """Test stage timings of a trace and the log context filter."""
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "msg", None, None)
+
+    with trace("update") as current:
+        with span("db"):
+            _busy(0.002)
+        with span("db"):
+            pass
+        with span("llm"):
+            pass
+        TraceContextFilter().filter(record)
+
+    assert set(current.spans) == {"db", "llm"}
+    assert current.spans["db"] >= 0.002
+    assert record.trace_id == current.trace_id
+    assert "db" in record.spans_ms
+    assert current_trace() is None
+
+
+def test_failed_queries_are_timed_and_cleared():
+    """Test that a statement that raises leaves no start time behind."""
+    engine = create_engine("sqlite://")
+    profiling.trace_queries(engine)
+
+    with engine.connect() as conn, trace("update") as current:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing"))
+        conn.execute(text("SELECT 1"))
+        pending = conn.info["query_started"]
+
+    assert pending == [] and "db" in current.spans
+
+
+def test_slow_trace_is_logged(caplog, monkeypatch):
+    """Test that traces over the threshold log their breakdown."""
+    monkeypatch.setattr(profiling, "_slow_trace_threshold", 0.0)
+
+    with caplog.at_level(logging.WARNING, logger="src.core.profiling"):
+        with trace("update", update_id=7):
+            with span("handler"):
+                pass
+
+    slow = [r for r in caplog.records if r.getMessage() == "Slow trace"]
+    assert slow and slow[0].update_id == 7
+    assert "handler" in slow[0].spans_ms
+
+
+async def test_loop_lag_monitor_logs_blocking_stack(caplog):
+    """Test that blocking the loop produces a warning with the stack."""
+    monitor = LoopLagMonitor(threshold=0.05)
+    with caplog.at_level(logging.WARNING, logger="src.core.profiling"):
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.3)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    assert monitor.stalls == 1
+    blocked = [r for r in caplog.records if r.getMessage() == "Event loop blocked"]
+    assert "test_loop_lag_monitor_logs_blocking_stack" in blocked[0].stack
+
+
+def test_loop_lag_monitor_is_opt_in():
+    """Test that no monitor is created without a threshold."""
+    assert LoopLagMonitor.from_settings(Settings.model_construct()) is None
+    monitor = LoopLagMonitor.from_settings(Settings.model_construct(loop_lag_threshold=0.2))
+    assert monitor is not None and monitor.threshold == 0.2
+
+
+def _app(enabled: bool) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware, server_timing=enabled)
+    app.include_router(router)
+
+    @app.get("/work")
+    async def work() -> str:
+        with span("db"):
+            pass
+        return "ok"
+
+    settings = Settings.model_construct(profiling_enabled=enabled)
+    app.dependency_overrides[get_settings] = lambda: settings
+    return app
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+async def test_profile_endpoints_and_server_timing(enabled):
+    """Test runtime profiler control and Server-Timing from request spans."""
+    sampler = SamplingProfiler(interval=0.001)
+    app = _app(enabled)
+    if enabled:
+        app.dependency_overrides[get_profiler] = lambda: sampler
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        started = await client.post("/debug/profile/start")
+        work = await client.get("/work")
+        await asyncio.sleep(0.02)
+        await client.post("/debug/profile/stop")
+        stacks = await client.get("/debug/profile")
+
+    if not enabled:
+        assert started.status_code == 404
+        assert "server-timing" not in work.headers
+        return
+    assert work.headers["server-timing"].startswith("db;dur=")
+    assert started.json()["running"] is True
+    assert not sampler.running
+    assert stacks.status_code == 200 and stacks.text
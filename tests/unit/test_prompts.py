@@ -0,0 +1,97 @@
+"""Unit tests for the prompt registry and context packing."""
+
+import pytest
+
+from src.llm.prompts.packing import Snippet, pack_snippets, render_packed
+from src.llm.prompts.registry import PromptRegistry, PromptTemplate, TokenCounter, approx_tokens
+
+SEARCH_PROMPT = "Ответь на вопрос {question} по заметкам ({{json}}):\n{notes}"
+
+
+class CountingTokenizer:
+    """Word tokenizer recording how often it was called."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, text: str) -> int:
+        self.calls += 1
+        return len(text.split())
+
+
+def test_template_renders_like_format_and_counts_static_part_once():
+    """Test compiled rendering and cached static token counts."""
+    tokenizer = CountingTokenizer()
+    counter = TokenCounter(tokenizer)
+    template = PromptTemplate("search.answer", 1, SEARCH_PROMPT, counter)
+
+    rendered = template.render(question="где ключи?", notes="ключи в ящике")
+
+    assert rendered == SEARCH_PROMPT.format(question="где ключи?", notes="ключи в ящике")
+    assert template.fields == {"question", "notes"}
+    calls = tokenizer.calls
+    for _ in range(3):
+        template.count_tokens(question="где ключи?", notes="ключи в ящике")
+    assert tokenizer.calls == calls + 2
+    assert approx_tokens("Привет, мир 2024!") == 7
+
+    with pytest.raises(ValueError):
+        PromptTemplate("bad", 1, "{0} {x!r}")
+
+
+def test_registry_versions_and_cache_keys():
+    """Test versioned lookup and cache keys that follow the wording."""
+    registry = PromptRegistry()
+    v1 = registry.register("intent.classify", "Определи интент: {text}")
+    v2 = registry.register("intent.classify", "Определи намерение: {text}", version=2)
+
+    assert registry.get("intent.classify") is v2
+    assert registry.get("intent.classify", 1) is v1
+    assert registry.versions("intent.classify") == [1, 2]
+    assert v1.cache_key.startswith("intent.classify@v1:")
+    assert v1.cache_key != v2.cache_key
+    assert registry.register("intent.classify", "Определи интент: {text}") is v1
+    with pytest.raises(ValueError):
+        registry.register("intent.classify", "Другой текст {text}")
+
+    bound = v2.partial(text="{x}")
+    assert bound.fields == frozenset()
+    assert bound.render() == "Определи намерение: {x}"
+
+
+def test_packer_prefers_high_scores_and_fills_the_budget():
+    """Test greedy packing by score with skipping and truncation."""
+    counter = TokenCounter(lambda text: len(text.split()))
+    snippets = [
+        Snippet("a " * 50, score=0.2, id=1, position=0),
+        Snippet("b " * 30, score=0.9, id=2, position=1),
+        Snippet("c " * 80, score=0.8, id=3, position=2),
+        Snippet("d " * 5, score=0.1, id=4, position=3),
+    ]
+
+    result = pack_snippets(snippets, 100, counter, separator=" | ", min_truncated_tokens=20)
+
+    assert [s.id for s in result.snippets] == [2, 3]
+    assert result.truncated
+    assert result.snippets[1].text.endswith("…")
+    assert result.tokens <= 100
+    assert result.dropped == 2
+
+    plain = pack_snippets(snippets, 100, counter, separator=" | ", min_truncated_tokens=0)
+    assert [s.id for s in plain.snippets] == [2, 1, 4]
+    ordered = pack_snippets(snippets, 100, counter, separator=" | ", keep_order=True)
+    assert [s.position for s in ordered.snippets] == sorted(s.position for s in ordered.snippets)
+
+
+def test_render_packed_respects_the_context_window():
+    """Test that the rendered prompt stays within window minus reserve."""
+    template = PromptTemplate("search.answer", 1, SEARCH_PROMPT)
+    snippets = [Snippet(f"заметка номер {i} " * 20, score=i, position=i) for i in range(50)]
+
+    packed = render_packed(template, snippets, 1024, reserve_tokens=256, question="что?")
+
+    assert packed.tokens <= 1024 - 256
+    assert approx_tokens(packed.text) <= packed.tokens + 5
+    assert packed.context.snippets[0].score == 49
+    with pytest.raises(ValueError):
+        render_packed(template, snippets, 10, reserve_tokens=8, question="что?")
@@ -0,0 +1,223 @@
+"""Unit tests for reminder scheduler module."""
+
+import asyncio
+import time
+from typing import List
+
+from src.schedulers.reminder_scheduler import (
+    STATUS_DELIVERED,
+    STATUS_PENDING,
+    InMemoryReminderStore,
+    Reminder,
+    ReminderScheduler,
+    shard_for,
+)
+
+
+class RecordingDeliverer:
+    """Collects delivered reminders."""
+
+    def __init__(self) -> None:
+        self.delivered: List[int] = []
+
+    async def __call__(self, reminder: Reminder) -> None:
+        self.delivered.append(reminder.id)
+
+
+async def _run_for(schedulers: List[ReminderScheduler], seconds: float) -> None:
+    tasks = [asyncio.create_task(s.run()) for s in schedulers]
+    await asyncio.sleep(seconds)
+    for scheduler in schedulers:
+        scheduler.stop()
+    await asyncio.gather(*tasks)
+
+
+def test_shard_for_partitions_ids():
+    """Test that every id maps to exactly one shard."""
+    assert {shard_for(i, 4) for i in range(100)} == {0, 1, 2, 3}
+    assert shard_for(7, 1) == 0
+
+
+async def test_missed_reminders_fire_on_start():
+    """Test that reminders overdue after a restart are delivered immediately."""
+    store = InMemoryReminderStore()
+    now = time.time()
+    store.add(Reminder(1, 10, "overdue", now - 3600))
+    store.add(Reminder(2, 10, "later", now + 3600))
+    deliver = RecordingDeliverer()
+
+    await _run_for([ReminderScheduler(store, deliver)], 0.05)
+
+    assert deliver.delivered == [1]
+    assert store.status(1) == STATUS_DELIVERED
+    assert store.status(2) == STATUS_PENDING
+
+
+async def test_only_horizon_window_is_loaded():
+    """Test that reminders beyond the horizon stay in the store."""
+    store = InMemoryReminderStore()
+    now = time.time()
+    store.add_many([Reminder(i, 1, "r", now + 10 + i) for i in range(5)])
+    store.add(Reminder(99, 1, "far", now + 10_000))
+    scheduler = ReminderScheduler(store, RecordingDeliverer(), horizon=60)
+
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.02)
+
+    assert scheduler.pending_count == 5
+    scheduler.stop()
+    await task
+
+
+async def test_notify_wakes_scheduler_early():
+    """Test that a new reminder due soon is delivered without waiting for a refill."""
+    store = InMemoryReminderStore()
+    deliver = RecordingDeliverer()
+    scheduler = ReminderScheduler(store, deliver, horizon=600)
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.01)
+
+    reminder = Reminder(5, 1, "soon", time.time() + 0.05)
+    store.add(reminder)
+    scheduler.notify(reminder)
+    await asyncio.sleep(0.15)
+
+    assert deliver.delivered == [5]
+    scheduler.stop()
+    await task
+
+
+async def test_cancelled_reminder_is_not_delivered():
+    """Test that cancel() drops a scheduled reminder."""
+    store = InMemoryReminderStore()
+    deliver = RecordingDeliverer()
+    scheduler = ReminderScheduler(store, deliver)
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.01)
+
+    reminder = Reminder(3, 1, "cancel me", time.time() + 0.05)
+    store.add(reminder)
+    scheduler.notify(reminder)
+    scheduler.cancel(3)
+    await asyncio.sleep(0.1)
+
+    assert deliver.delivered == []
+    scheduler.stop()
+    await task
+
+
+async def test_reminder_moved_past_horizon_does_not_fire_early():
+    """Test that rescheduling beyond the loaded window drops the old due time."""
+    store = InMemoryReminderStore()
+    deliver = RecordingDeliverer()
+    scheduler = ReminderScheduler(store, deliver, horizon=600)
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.01)
+
+    reminder = Reminder(4, 1, "moved", time.time() + 0.05)
+    store.add(reminder)
+    scheduler.notify(reminder)
+    scheduler.notify(Reminder(4, 1, "moved", time.time() + 10_000))
+    await asyncio.sleep(0.1)
+
+    assert deliver.delivered == []
+    assert scheduler.pending_count == 0
+    scheduler.stop()
+    await task
+
+
+async def test_shards_never_double_deliver():
+    """Test that several workers deliver each reminder exactly once."""
+    store = InMemoryReminderStore()
+    now = time.time()
+    store.add_many([Reminder(i, 1, "r", now - 1) for i in range(200)])
+    deliver = RecordingDeliverer()
+    schedulers = [ReminderScheduler(store, deliver, shard_index=i, shard_count=3) for i in range(3)]
+
+    await _run_for(schedulers, 0.05)
+
+    assert sorted(deliver.delivered) == list(range(200))
+
+
+async def test_competing_workers_on_same_shard_claim_once():
+    """Test that atomic claims prevent duplicates when shards overlap."""
+    store = InMemoryReminderStore()
+    now = time.time()
+    store.add_many([Reminder(i, 1, "r", now - 1) for i in range(50)])
+    deliver = RecordingDeliverer()
+    schedulers = [ReminderScheduler(store, deliver) for _ in range(2)]
+
+    await _run_for(schedulers, 0.05)
+
+    assert sorted(deliver.delivered) == list(range(50))
+
+
+async def test_failed_delivery_is_retried():
+    """Test that a failed delivery is released and delivered again."""
+    store = InMemoryReminderStore()
+    store.add(Reminder(1, 1, "flaky", time.time() - 1))
+    attempts: List[int] = []
+
+    async def flaky(reminder: Reminder) -> None:
+        attempts.append(reminder.id)
+        if len(attempts) == 1:
+            raise RuntimeError("telegram down")
+
+    await _run_for([ReminderScheduler(store, flaky, retry_delay=0.02)], 0.1)
+
+    assert attempts == [1, 1]
+    assert store.status(1) == STATUS_DELIVERED
+
+
+async def test_stale_claims_are_recovered():
+    """Test that claims left by a crashed worker are returned to pending."""
+    store = InMemoryReminderStore()
+    now = time.time()
+    store.add(Reminder(1, 1, "orphan", now - 600))
+    assert await store.claim(1, "crashed-worker", now - 600)
+    deliver = RecordingDeliverer()
+
+    await _run_for([ReminderScheduler(store, deliver, claim_timeout=60)], 0.05)
+
+    assert deliver.delivered == [1]
+
+
+async def test_truncated_window_is_refilled():
+    """Test that a refill limited by batch_size continues with the next batch."""
+    store = InMemoryReminderStore()
+    now = time.time()
+    store.add_many([Reminder(i, 1, "r", now - 100 + i) for i in range(25)])
+    deliver = RecordingDeliverer()
+
+    await _run_for([ReminderScheduler(store, deliver, batch_size=10)], 0.1)
+
+    assert sorted(deliver.delivered) == list(range(25))
+
+
+async def test_truncated_overdue_window_does_not_spin():
+    """Test that a truncated window of unclaimed overdue reminders is not re-fetched in a loop."""
+    fetches = 0
+
+    class CountingStore(InMemoryReminderStore):
+        async def fetch_due(
+            self, until: float, shard_index: int, shard_count: int, limit: int
+        ) -> List[Reminder]:
+            nonlocal fetches
+            fetches += 1
+            return await super().fetch_due(until, shard_index, shard_count, limit)
+
+    store = CountingStore()
+    store.add_many([Reminder(i, 1, "r", time.time() - 100 + i) for i in range(5)])
+    blocked = asyncio.Event()
+
+    async def hang(reminder: Reminder) -> None:
+        await blocked.wait()
+
+    scheduler = ReminderScheduler(store, hang, batch_size=2, max_concurrency=1)
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.1)
+    blocked.set()
+    scheduler.stop()
+    await task
+
+    assert fetches <= 12
@@ -0,0 +1,194 @@
+"""Unit tests for circuit breakers, deadlines and adaptive concurrency."""
+
+import asyncio
+from typing import List
+
+import pytest
+
+from src.llm.clients.base import Completion, ResilientLLMClient
+from src.utils.resilience import (
+    AdaptiveLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    DeadlineExceeded,
+    Dependency,
+    deadline,
+    remaining,
+    resilient,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_and_recovers_through_probe():
+    """Test closed -> open -> half-open -> closed transitions."""
+    clock = FakeClock()
+    breaker = CircuitBreaker("svc", failure_threshold=3, recovery_timeout=10, clock=clock)
+
+    for _ in range(3):
+        breaker.allow()
+        breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    clock.now = 10
+    breaker.allow()
+    assert breaker.state is CircuitState.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_failed_probe_reopens_circuit():
+    """Test that a failing probe opens the circuit for another timeout."""
+    clock = FakeClock()
+    breaker = CircuitBreaker("svc", failure_threshold=1, recovery_timeout=5, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 5
+    breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state is CircuitState.OPEN
+    clock.now = 9
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+
+async def test_aborted_call_does_not_leave_circuit_half_open():
+    """Test that a call rejected before running does not hold the probe."""
+    clock = FakeClock()
+    breaker = CircuitBreaker("svc", failure_threshold=1, recovery_timeout=5, clock=clock)
+    dependency = Dependency("svc", breaker=breaker)
+    breaker.record_failure()
+    clock.now = 5
+
+    with deadline(-1):
+        with pytest.raises(DeadlineExceeded):
+            await dependency.call(asyncio.sleep, 0)
+
+    await dependency.call(asyncio.sleep, 0)
+    assert breaker.state is CircuitState.CLOSED
+
+
+async def test_deadline_is_inherited_and_tightest_wins():
+    """Test nested deadlines and propagation into tasks."""
+    with deadline(10):
+        with deadline(60):
+            inner = remaining()
+        child = await asyncio.create_task(_remaining())
+
+    assert inner is not None and inner <= 10
+    assert child is not None and child <= 10
+    assert remaining() is None
+
+
+async def _remaining():
+    return remaining()
+
+
+async def test_call_stops_at_deadline():
+    """Test that a slow call is cut off at the caller's deadline."""
+    dependency = Dependency("slow", timeout=None)
+
+    with deadline(0.02):
+        with pytest.raises(DeadlineExceeded):
+            await dependency.call(asyncio.sleep, 1)
+        await asyncio.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            await dependency.call(asyncio.sleep, 0)
+
+    assert dependency.stats.timeouts == 2
+    assert dependency.stats.failures == 1
+
+
+async def test_limiter_adapts_to_latency_and_failures():
+    """Test additive increase on fast calls and multiplicative decrease."""
+    limiter = AdaptiveLimiter(initial_limit=10, max_limit=20)
+    for _ in range(20):
+        await limiter.acquire()
+        await limiter.release(0.01)
+    grown = limiter.limit
+    assert grown > 11
+
+    await limiter.acquire()
+    await limiter.release(0.5)
+    assert limiter.limit == pytest.approx(grown * 0.7)
+
+    await limiter.acquire()
+    await limiter.release(0.01, failed=True)
+    assert limiter.limit == pytest.approx(grown * 0.49)
+
+
+async def test_limiter_bounds_concurrency():
+    """Test that calls beyond the limit wait for a slot."""
+    dependency = Dependency("bounded", limiter=AdaptiveLimiter(initial_limit=2))
+    running: List[int] = []
+    peak = 0
+
+    async def work() -> None:
+        nonlocal peak
+        running.append(1)
+        peak = max(peak, len(running))
+        await asyncio.sleep(0.01)
+        running.pop()
+
+    await asyncio.gather(*(dependency.call(work) for _ in range(6)))
+
+    assert peak == 2
+
+
+async def test_ignored_errors_do_not_open_circuit():
+    """Test that ignored exceptions count as healthy responses."""
+    dependency = Dependency(
+        "validating",
+        breaker=CircuitBreaker("validating", failure_threshold=1),
+        ignore=(ValueError,),
+    )
+
+    @resilient(dependency)
+    async def validate(value: int) -> int:
+        if value < 0:
+            raise ValueError(value)
+        return value
+
+    with pytest.raises(ValueError):
+        await validate(-1)
+    assert await validate(3) == 3
+    assert dependency.breaker.state is CircuitState.CLOSED
+    assert dependency.metrics()["calls"] == 2
+
+
+async def test_llm_client_fails_fast_when_provider_is_down():
+    """Test that the LLM wrapper stops calling a failing provider."""
+
+    class DownProvider:
+        calls = 0
+
+        async def complete(self, prompt: str, **kwargs) -> Completion:
+            self.calls += 1
+            raise ConnectionError("provider down")
+
+    provider = DownProvider()
+    dependency = Dependency("llm:test", breaker=CircuitBreaker("llm:test", failure_threshold=2))
+    client = ResilientLLMClient(provider, "test", dependency=dependency)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await client.complete("hi")
+    with pytest.raises(CircuitOpenError):
+        await client.complete("hi")
+
+    assert provider.calls == 2
+    assert dependency.metrics()["rejected"] == 1
@@ -0,0 +1,151 @@
+"""Unit tests for the response caching middleware."""
+
+from typing import Dict, List, Optional
+
+import httpx
+from fastapi import Depends, FastAPI
+from starlette.types import Scope
+
+from src.api.v1.deps import get_current_user_id
+from src.api.v1.middleware.cache import (
+    CachedResponse,
+    InMemoryResponseCacheBackend,
+    ResponseCache,
+    ResponseCacheMiddleware,
+)
+from src.core.security import Authenticator, create_access_token
+
+
+def _user_from_header(scope: Scope) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == b"x-user":
+            return str(value.decode())
+    return None
+
+
+def _app(cache: ResponseCache, db_calls: List[str]) -> FastAPI:
+    app = FastAPI()
+    notes: Dict[str, List[str]] = {"1": ["first"], "2": ["other"]}
+
+    @app.get("/v1/notes")
+    async def list_notes(user: str, page: int = 1) -> List[str]:
+        db_calls.append(f"list:{user}:{page}")
+        return notes[user]
+
+    @app.get("/v1/search")
+    async def search(user: str, q: str) -> List[str]:
+        db_calls.append(f"search:{user}:{q}")
+        return [n for n in notes[user] if q in n]
+
+    @app.post("/v1/notes")
+    async def create_note(user: str, text: str) -> Dict[str, str]:
+        notes[user].append(text)
+        return {"text": text}
+
+    app.add_middleware(ResponseCacheMiddleware, cache=cache, user_resolver=_user_from_header)
+    return app
+
+
+def _client(app: FastAPI) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api")
+
+
+async def test_repeated_get_is_served_from_cache():
+    """Test that a repeated list query does not reach the endpoint."""
+    cache = ResponseCache(InMemoryResponseCacheBackend())
+    db_calls: List[str] = []
+    async with _client(_app(cache, db_calls)) as client:
+        first = await client.get("/v1/notes?user=1", headers={"x-user": "1"})
+        second = await client.get("/v1/notes?user=1", headers={"x-user": "1"})
+
+    assert first.json() == second.json() == ["first"]
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert first.headers["etag"] == second.headers["etag"]
+    assert db_calls == ["list:1:1"]
+    assert cache.stats.hit_ratio == 0.5
+
+
+async def test_if_none_match_returns_304():
+    """Test conditional GET with a current ETag."""
+    cache = ResponseCache(InMemoryResponseCacheBackend())
+    db_calls: List[str] = []
+    async with _client(_app(cache, db_calls)) as client:
+        etag = (await client.get("/v1/search?user=1&q=f", headers={"x-user": "1"})).headers["etag"]
+        response = await client.get(
+            "/v1/search?user=1&q=f", headers={"x-user": "1", "if-none-match": etag}
+        )
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert db_calls == ["search:1:f"]
+    assert cache.stats.not_modified == 1
+
+
+async def test_write_invalidates_only_that_user():
+    """Test that a user's write bumps only their ETags and cache entries."""
+    cache = ResponseCache(InMemoryResponseCacheBackend())
+    db_calls: List[str] = []
+    async with _client(_app(cache, db_calls)) as client:
+        etag1 = (await client.get("/v1/notes?user=1", headers={"x-user": "1"})).headers["etag"]
+        etag2 = (await client.get("/v1/notes?user=2", headers={"x-user": "2"})).headers["etag"]
+        await client.post("/v1/notes?user=1&text=second", headers={"x-user": "1"})
+        after1 = await client.get(
+            "/v1/notes?user=1", headers={"x-user": "1", "if-none-match": etag1}
+        )
+        after2 = await client.get(
+            "/v1/notes?user=2", headers={"x-user": "2", "if-none-match": etag2}
+        )
+
+    assert after1.status_code == 200
+    assert after1.json() == ["first", "second"]
+    assert after2.status_code == 304
+    assert cache.stats.invalidations == 1
+
+
+async def test_explicit_invalidate_and_anonymous_requests():
+    """Test invalidation from outside the API and bypass without a user."""
+    cache = ResponseCache(InMemoryResponseCacheBackend())
+    db_calls: List[str] = []
+    async with _client(_app(cache, db_calls)) as client:
+        await client.get("/v1/notes?user=1", headers={"x-user": "1"})
+        await cache.invalidate(1)
+        await client.get("/v1/notes?user=1", headers={"x-user": "1"})
+        anonymous = await client.get("/v1/notes?user=1")
+
+    assert db_calls == ["list:1:1", "list:1:1", "list:1:1"]
+    assert "etag" not in anonymous.headers
+
+
+def test_cached_response_round_trip():
+    """Test byte serialization used by shared backends."""
+    response = CachedResponse(200, [(b"content-type", b"application/json")], b'{"a":\n1}')
+
+    assert CachedResponse.from_bytes(response.to_bytes()) == response
+
+
+async def test_default_resolver_uses_real_auth_dependency():
+    """Test caching behind the bearer-token dependency used by the API."""
+    cache = ResponseCache(InMemoryResponseCacheBackend())
+    db_calls: List[str] = []
+    app = FastAPI()
+    app.state.authenticator = Authenticator("secret")
+
+    @app.get("/v1/notes")
+    async def list_notes(user_id: int = Depends(get_current_user_id)) -> List[int]:
+        db_calls.append(f"list:{user_id}")
+        return [user_id]
+
+    app.add_middleware(ResponseCacheMiddleware, cache=cache)
+    tokens = {user: create_access_token(user, "secret") for user in (1, 2)}
+    async with _client(app) as client:
+        responses = [
+            await client.get("/v1/notes", headers={"authorization": f"Bearer {tokens[user]}"})
+            for user in (1, 1, 2)
+        ]
+        forged = await client.get("/v1/notes", headers={"authorization": "Bearer forged"})
+
+    assert [r.headers["x-cache"] for r in responses] == ["MISS", "HIT", "MISS"]
+    assert [r.json() for r in responses] == [[1], [1], [2]]
+    assert db_calls == ["list:1", "list:2"]
+    assert forged.status_code == 401 and "etag" not in forged.headers
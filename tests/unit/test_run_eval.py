@@ -0,0 +1,167 @@
+"""Unit tests for the eval runner (specs/evals/run_eval.py)."""
+
+import asyncio
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import List
+
+import pytest
+
+EVALS_DIR = Path(__file__).resolve().parents[2] / "specs" / "evals"
+
+
+def _load_module() -> ModuleType:
+    spec = importlib.util.spec_from_file_location("run_eval", EVALS_DIR / "run_eval.py")
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["run_eval"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+run_eval = _load_module()
+
+
+class CountingTarget:
+    """Target stub that echoes the expected labels and counts calls."""
+
+    name = "counting"
+    model = "stub-model"
+
+    def __init__(self, prompt_hash: str = "p1", delay: float = 0.0) -> None:
+        self.prompt_hash = prompt_hash
+        self.calls: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._delay = delay
+
+    async def run(self, case):
+        self.calls.append(case.input)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self._delay)
+        self.in_flight -= 1
+        if case.input == "boom":
+            raise RuntimeError("provider error")
+        return run_eval.TargetOutput(
+            intent=case.expected_intent,
+            route=case.expected_route,
+            prompt_tokens=10,
+            completion_tokens=5,
+        )
+
+
+def _write_cases(path: Path, count: int) -> Path:
+    lines = [
+        f'{{"input": "case {i}", "expected_intent": "note", "expected_route": "save_note"}}'
+        for i in range(count)
+    ]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def test_percentile_nearest_rank():
+    """Test nearest-rank percentiles."""
+    values = [float(v) for v in range(1, 101)]
+
+    assert run_eval.percentile(values, 50) == 50.0
+    assert run_eval.percentile(values, 95) == 95.0
+    assert run_eval.percentile(values, 99) == 99.0
+    assert run_eval.percentile([], 50) == 0.0
+
+
+async def test_runs_cases_concurrently(tmp_path: Path):
+    """Test that workers process cases in parallel and metrics are aggregated."""
+    cases = _write_cases(tmp_path / "cases.jsonl", 20)
+    target = CountingTarget(delay=0.01)
+
+    report = await run_eval.run_eval(run_eval.load_cases(cases), target, workers=4)
+
+    assert report.cases == 20
+    assert target.max_in_flight == 4
+    assert report.intent_accuracy == 1.0
+    assert report.tokens_per_case == 15
+    assert report.latency_p50_ms >= 10
+    assert report.throughput_cps > 0
+
+
+async def test_unchanged_cases_are_cached(tmp_path: Path):
+    """Test that a second run with the same model and prompt hits the cache."""
+    cases = _write_cases(tmp_path / "cases.jsonl", 5)
+    cache_dir = tmp_path / "cache"
+
+    first = CountingTarget()
+    cache = run_eval.ResultCache(cache_dir, first.model, first.prompt_hash)
+    await run_eval.run_eval(run_eval.load_cases(cases), first, cache=cache)
+
+    second = CountingTarget()
+    cache = run_eval.ResultCache(cache_dir, second.model, second.prompt_hash)
+    report = await run_eval.run_eval(run_eval.load_cases(cases), second, cache=cache)
+
+    assert len(first.calls) == 5
+    assert second.calls == []
+    assert report.cached == 5
+
+
+async def test_prompt_change_invalidates_cache(tmp_path: Path):
+    """Test that a new prompt hash reruns every case."""
+    cases = _write_cases(tmp_path / "cases.jsonl", 3)
+    cache_dir = tmp_path / "cache"
+    first = CountingTarget("p1")
+    await run_eval.run_eval(
+        run_eval.load_cases(cases), first, cache=run_eval.ResultCache(cache_dir, "m", "p1")
+    )
+
+    second = CountingTarget("p2")
+    await run_eval.run_eval(
+        run_eval.load_cases(cases), second, cache=run_eval.ResultCache(cache_dir, "m", "p2")
+    )
+
+    assert len(second.calls) == 3
+
+
+def test_fake_target_prompt_hash_covers_examples():
+    """Test that editing centroid examples changes the prompt hash."""
+    from src.llm.intent_router import DEFAULT_EXAMPLES
+
+    edited = dict(DEFAULT_EXAMPLES)
+    first = next(iter(edited))
+    edited[first] = (*edited[first], "ещё один пример")
+
+    assert run_eval.FakeTarget().prompt_hash == run_eval.FakeTarget().prompt_hash
+    assert run_eval.FakeTarget(edited).prompt_hash != run_eval.FakeTarget().prompt_hash
+
+
+async def test_target_errors_are_reported(tmp_path: Path):
+    """Test that a failing case is recorded instead of aborting the run."""
+    path = tmp_path / "cases.jsonl"
+    path.write_text('{"input": "boom", "expected_intent": "note"}\n', encoding="utf-8")
+
+    report = await run_eval.run_eval(run_eval.load_cases(path), CountingTarget())
+
+    assert report.errors == 1
+    assert report.intent_accuracy == 0.0
+    assert "provider error" in report.results[0].error
+
+
+def test_diff_against_baseline():
+    """Test metric deltas against a stored baseline."""
+    baseline = {"intent_accuracy": 0.9, "latency_p95_ms": 100.0}
+    current = {"intent_accuracy": 1.0, "latency_p95_ms": 80.0}
+
+    diff = run_eval.diff_reports(current, baseline)
+
+    assert diff["intent_accuracy"]["delta"] == pytest.approx(0.1)
+    assert diff["latency_p95_ms"]["delta"] == pytest.approx(-20.0)
+
+
+async def test_fake_target_on_golden_dataset():
+    """Test that the deterministic local target passes the golden dataset."""
+    report = await run_eval.run_eval(
+        run_eval.load_cases(EVALS_DIR / "cases.jsonl"), run_eval.FakeTarget()
+    )
+
+    assert report.cases >= 1
+    assert report.route_accuracy == 1.0
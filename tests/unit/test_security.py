@@ -0,0 +1,130 @@
+"""Unit tests for JWT security and cached authentication."""
+
+import time
+from datetime import timedelta
+from typing import List, Optional
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from jose import jwt
+
+from src.api.v1.deps import get_current_user_id
+from src.core.security import (
+    AuthenticationError,
+    Authenticator,
+    AuthUser,
+    create_access_token,
+    decode_access_token,
+)
+
+SECRET = "unit-test-secret-key-0123456789"
+
+
+class _Loader:
+    def __init__(self, active: bool = True) -> None:
+        self.calls: List[int] = []
+        self.active = active
+
+    async def __call__(self, user_id: int) -> Optional[AuthUser]:
+        self.calls.append(user_id)
+        return AuthUser(id=user_id, is_active=self.active)
+
+
+def test_token_round_trip():
+    """Test encoding and decoding of access tokens."""
+    token = create_access_token(42, SECRET, scopes=frozenset({"notes"}))
+
+    claims = decode_access_token(token, SECRET)
+
+    assert claims.user_id == 42
+    assert claims.scopes == {"notes"}
+    assert claims.expires_at > time.time()
+
+
+def test_invalid_and_expired_tokens_are_rejected():
+    """Test signature and expiry validation."""
+    with pytest.raises(AuthenticationError):
+        decode_access_token(create_access_token(1, "another-secret-key-xxxxx"), SECRET)
+    with pytest.raises(AuthenticationError):
+        decode_access_token(create_access_token(1, SECRET, expires_delta=timedelta(-1)), SECRET)
+    without_jti = jwt.encode({"sub": "1", "exp": int(time.time()) + 60}, SECRET)
+    with pytest.raises(AuthenticationError):
+        decode_access_token(without_jti, SECRET)
+
+
+async def test_token_and_user_are_cached():
+    """Test repeated requests skip decoding and user loading."""
+    loader = _Loader()
+    auth = Authenticator(SECRET, user_loader=loader)
+    token = create_access_token(7, SECRET)
+
+    first = await auth.authenticate(token)
+    second = await auth.authenticate(token)
+
+    assert first.user_id == second.user_id == 7
+    assert loader.calls == [7]
+    assert auth.tokens.stats.hits == 1
+
+
+async def test_cached_token_expires_at_exp():
+    """Test a cached token is rejected once its exp has passed."""
+    now = [time.time()]
+    auth = Authenticator(SECRET, wall_clock=lambda: now[0])
+    token = create_access_token(7, SECRET, expires_delta=timedelta(minutes=5))
+    await auth.authenticate(token)
+
+    now[0] += 301
+
+    with pytest.raises(AuthenticationError, match="expired"):
+        await auth.authenticate(token)
+
+
+async def test_logout_revokes_token():
+    """Test logout rejects the token but not other tokens of the user."""
+    auth = Authenticator(SECRET)
+    token = create_access_token(7, SECRET)
+    other = create_access_token(7, SECRET)
+    await auth.authenticate(token)
+
+    auth.logout(token)
+
+    with pytest.raises(AuthenticationError, match="revoked"):
+        await auth.authenticate(token)
+    assert (await auth.authenticate(other)).user_id == 7
+
+
+async def test_invalidate_user_reloads_user():
+    """Test user invalidation picks up deactivation."""
+    loader = _Loader()
+    auth = Authenticator(SECRET, user_loader=loader)
+    token = create_access_token(7, SECRET)
+    await auth.authenticate(token)
+
+    loader.active = False
+    auth.invalidate_user(7)
+
+    with pytest.raises(AuthenticationError, match="Inactive"):
+        await auth.authenticate(token)
+    assert loader.calls == [7, 7]
+
+
+async def test_auth_dependency():
+    """Test the FastAPI dependency returns 401 without a valid bearer token."""
+    app = FastAPI()
+    app.state.authenticator = Authenticator(SECRET)
+
+    @app.get("/me")
+    async def me(user_id: int = Depends(get_current_user_id)) -> int:
+        return user_id
+
+    token = create_access_token(9, SECRET)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+        ok = await client.get("/me", headers={"Authorization": f"Bearer {token}"})
+        missing = await client.get("/me")
+        bad = await client.get("/me", headers={"Authorization": "Bearer nope"})
+
+    assert ok.json() == 9
+    assert missing.status_code == bad.status_code == 401
+    assert missing.headers["www-authenticate"] == "Bearer"
@@ -0,0 +1,150 @@
+"""Unit tests for warm-start snapshots."""
+
+import asyncio
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.storage.snapshots import Snapshot, SnapshotError, SnapshotManager, write_snapshot
+from src.storage.vectors import VectorIndex
+from src.utils.cache import LRUCache
+
+
+class Clock:
+    """Manually advanced clock."""
+
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_sections_round_trip_memory_mapped(tmp_path: Path):
+    """Test arrays, bytes and JSON sections and zero-copy array reads."""
+    path = tmp_path / "state.snap"
+    matrix = np.arange(12, dtype=np.float32).reshape(3, 4)
+
+    size = write_snapshot(path, "state", {"m": matrix, "raw": b"\x00\x01", "doc": {"a": [1]}}, 3)
+    snapshot = Snapshot(path)
+
+    assert size == path.stat().st_size
+    assert snapshot.name == "state" and snapshot.schema == 3 and "m" in snapshot
+    array = snapshot.array("m")
+    np.testing.assert_array_equal(array, matrix)
+    assert not array.flags.writeable and not array.flags.owndata
+    assert snapshot.blob("raw") == b"\x00\x01"
+    assert snapshot.document("doc") == {"a": [1]}
+    with pytest.raises(SnapshotError):
+        snapshot.document("m")
+
+
+def test_damaged_or_stale_snapshots_are_rejected(tmp_path: Path):
+    """Test checksum, format and schema validation."""
+    cache: LRUCache[str, int] = LRUCache()
+    manager = SnapshotManager(tmp_path)
+    manager.register_cache("tokens", cache, schema=2)
+    write_snapshot(
+        manager.path("tokens"), "tokens", {"keys": ["a"], "ttls": np.ones(1), "values": [1]}, 2
+    )
+    data = bytearray(manager.path("tokens").read_bytes())
+    data[-2] ^= 0xFF
+    manager.path("tokens").write_bytes(bytes(data))
+
+    assert manager.restore("tokens") is False
+    assert len(cache) == 0 and manager.stats.rejected == 1
+
+    (tmp_path / "bad.snap").write_bytes(b"TLMSNAP\x00" + b"\x09\x00\x00\x00" + b"\x00" * 8)
+    with pytest.raises(SnapshotError, match="format version"):
+        Snapshot(tmp_path / "bad.snap")
+    other = SnapshotManager(tmp_path)
+    other.register_cache("tokens", LRUCache(), schema=3)
+    write_snapshot(
+        other.path("tokens"), "tokens", {"keys": [], "ttls": np.ones(0), "values": []}, 2
+    )
+    assert other.restore("tokens") is False
+
+
+async def test_cache_snapshot_keeps_order_and_remaining_ttl(tmp_path: Path):
+    """Test LRU caches with JSON, bytes and array values across a clock change."""
+    old = Clock(1000.0)
+    texts: LRUCache[str, str] = LRUCache(maxsize=10, clock=old)
+    blobs: LRUCache[str, bytes] = LRUCache(clock=old)
+    vectors: LRUCache[str, np.ndarray] = LRUCache()
+    texts.set("a", "первый", ttl=60)
+    texts.set("b", "второй")
+    texts.set("gone", "x", ttl=1)
+    blobs.set("k", b"\xff\x00")
+    vectors.set("v", np.ones(4, dtype=np.float32))
+    old.now += 10
+    manager = SnapshotManager(tmp_path)
+    manager.register_cache("texts", texts)
+    manager.register_cache("blobs", blobs, values="bytes")
+    manager.register_cache("vectors", vectors, values="array")
+    manager.restore_all()
+    written = await manager.snapshot()
+    assert set(written) == {"texts", "blobs", "vectors"}
+
+    new = Clock(5.0)
+    texts2: LRUCache[str, str] = LRUCache(maxsize=10, clock=new)
+    blobs2: LRUCache[str, bytes] = LRUCache(clock=new)
+    vectors2: LRUCache[str, np.ndarray] = LRUCache()
+    restarted = SnapshotManager(tmp_path)
+    restarted.register_cache("texts", texts2)
+    restarted.register_cache("blobs", blobs2, values="bytes")
+    restarted.register_cache("vectors", vectors2, values="array")
+
+    assert restarted.restore_all() == ["texts", "blobs", "vectors"]
+    assert list(texts2._data) == ["a", "b"]
+    assert texts2.get("a") == "первый" and blobs2.get("k") == b"\xff\x00"
+    np.testing.assert_array_equal(vectors2.get("v"), np.ones(4))
+    new.now += 50.5
+    assert "a" not in texts2 and texts2.get("b") == "второй"
+
+
+async def test_index_restored_memory_mapped(tmp_path: Path):
+    """Test vector index snapshots and rejection after a config change."""
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((50, 16)).astype(np.float32)
+    index = VectorIndex(16)
+    index.add(list(range(50)), vectors)
+    manager = SnapshotManager(tmp_path)
+    manager.register_index("notes", index)
+    manager.restore("notes")
+    await manager.stop()
+
+    restored = VectorIndex(16)
+    restarted = SnapshotManager(tmp_path)
+    restarted.register_index("notes", restored)
+
+    assert restarted.restore("notes") and restarted.restore("notes")
+    assert restarted.stats.restored == 1
+    assert restored.search(vectors[7], k=3) == index.search(vectors[7], k=3)
+    assert restored.nbytes and not restored.codes.flags.owndata
+    restored.add([50], vectors[:1])
+    assert len(restored) == 51
+    changed = SnapshotManager(tmp_path)
+    changed.register_index("notes", VectorIndex(8))
+    assert changed.restore("notes") is False
+
+
+async def test_only_attempted_providers_are_written(tmp_path: Path):
+    """Test that a structure not restored yet never overwrites its snapshot."""
+    cache: LRUCache[str, int] = LRUCache()
+    cache.set("warm", 1)
+    manager = SnapshotManager(tmp_path, interval=0.01)
+    manager.register_cache("warm", cache)
+    manager.register_cache("lazy", LRUCache())
+    manager.restore("warm")
+
+    await manager.start()
+    await asyncio.sleep(0.05)
+    await manager.stop(final=False)
+    written = await manager.snapshot()
+
+    assert list(written) == ["warm"]
+    assert manager.stats.written >= 2
+    assert not manager.path("lazy").exists()
+    with pytest.raises(ValueError):
+        manager.register_cache("warm", cache)
@@ -0,0 +1,123 @@
+"""Unit tests for incremental structured output parsing."""
+
+from typing import AsyncIterator, List
+
+import pytest
+
+from src.llm.schemas.enrichment import NoteCategory, NoteEnrichment
+from src.llm.structured import (
+    FieldEvent,
+    StreamingJSONParser,
+    StructuredOutputError,
+    generate_structured,
+    stream_structured,
+)
+
+VALID = (
+    '{"category": "idea", "tags": ["python", "{async}"], '
+    '"summary": "Идея \\"статьи\\" \\u2014 ок."}'
+)
+
+
+class ChunkedClient:
+    """Fake streaming client replaying scripted completions in small chunks."""
+
+    def __init__(self, *completions: str, chunk_size: int = 3) -> None:
+        self.completions = list(completions)
+        self.chunk_size = chunk_size
+        self.sent: List[int] = []
+        self.closed = 0
+
+    async def stream(self, prompt: str, **kwargs: object) -> AsyncIterator[str]:
+        text = self.completions.pop(0)
+        self.sent.append(0)
+        try:
+            for i in range(0, len(text), self.chunk_size):
+                self.sent[-1] += 1
+                yield text[i : i + self.chunk_size]
+        finally:
+            self.closed += 1
+
+
+def feed_all(parser: StreamingJSONParser[NoteEnrichment], text: str) -> List[FieldEvent]:
+    """Feed text one character at a time."""
+    events: List[FieldEvent] = []
+    for char in text:
+        events.extend(parser.feed(char))
+    return events
+
+
+def test_fields_are_emitted_as_soon_as_complete():
+    """Test that each field is validated when its value closes, not at the end."""
+    parser = StreamingJSONParser(NoteEnrichment)
+    text = "```json\n" + VALID + "\n```"
+    category_end = text.index('"idea"') + len('"idea"')
+
+    early = feed_all(parser, text[:category_end])
+    rest = feed_all(parser, text[category_end:])
+
+    assert [(e.name, e.value) for e in early] == [("category", NoteCategory.IDEA)]
+    assert [e.name for e in rest] == ["tags", "summary"]
+    assert parser.done
+    assert parser.result().tags == ["python", "{async}"]
+    assert parser.result().summary == 'Идея "статьи" — ок.'
+
+
+def test_wrong_value_type_is_rejected_at_first_char():
+    """Test that a value of the wrong JSON type aborts before it is generated."""
+    parser = StreamingJSONParser(NoteEnrichment)
+
+    with pytest.raises(StructuredOutputError) as exc_info:
+        feed_all(parser, '{"category": "idea", "tags": "python, ai", "summary": "x"}')
+
+    assert exc_info.value.field_name == "tags"
+    assert exc_info.value.position == len('{"category": "idea", "tags": ')
+
+
+def test_invalid_value_and_runaway_string_are_rejected():
+    """Test validation failure on completion and the max_length limit while streaming."""
+    with pytest.raises(StructuredOutputError, match="category"):
+        feed_all(StreamingJSONParser(NoteEnrichment), '{"category": "poem",')
+
+    parser = StreamingJSONParser(NoteEnrichment)
+    with pytest.raises(StructuredOutputError) as exc_info:
+        feed_all(parser, '{"summary": "' + "a" * 1000)
+    assert exc_info.value.position == len('{"summary": "') + 600
+
+    with pytest.raises(StructuredOutputError, match="text before"):
+        feed_all(StreamingJSONParser(NoteEnrichment), "Конечно! {")
+
+
+async def test_stream_is_closed_once_object_is_complete():
+    """Test that trailing chatter is not consumed."""
+    client = ChunkedClient(VALID + "\nНадеюсь, это поможет!" * 20)
+
+    events = [event async for event in stream_structured(client, "p", NoteEnrichment)]
+
+    assert [e.name for e in events] == ["category", "tags", "summary"]
+    assert client.closed == 1
+    assert client.sent[0] * client.chunk_size < len(VALID) + client.chunk_size + 1
+
+
+async def test_generate_restarts_early_after_off_schema_output():
+    """Test that an off-schema attempt is cut short and retried."""
+    broken = '{"category": "idea", "tags": 42, "summary": "' + "x" * 300 + '"}'
+    client = ChunkedClient(broken, VALID)
+    seen: List[str] = []
+
+    result = await generate_structured(
+        client, "p", NoteEnrichment, on_field=lambda e: seen.append(e.name)
+    )
+
+    assert result.category is NoteCategory.IDEA
+    assert client.closed == 2
+    assert client.sent[0] * client.chunk_size < len(broken) // 4
+    assert seen == ["category", "category", "tags", "summary"]
+
+
+async def test_generate_raises_after_last_attempt():
+    """Test that exhausting the attempts raises the last error."""
+    client = ChunkedClient('{"category": "idea"', '{"category": "idea"')
+
+    with pytest.raises(StructuredOutputError, match="incomplete"):
+        await generate_structured(client, "p", NoteEnrichment)
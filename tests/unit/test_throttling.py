@@ -0,0 +1,214 @@
+"""Unit tests for rate limiting and flood control middleware."""
+
+import asyncio
+from typing import Any, Dict, List
+
+from aiogram.types import Chat, Message, User
+
+from src.bot.middlewares.throttling import ThrottlingMiddleware, is_forwarded_text
+from src.utils.rate_limit import InMemoryRateLimitBackend, RateLimit, TokenBucket
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _message(message_id: int, text: str, chat_id: int = 1, forwarded: bool = True) -> Message:
+    payload: Dict[str, Any] = {
+        "message_id": message_id,
+        "date": 0,
+        "chat": {"id": chat_id, "type": "private"},
+        "from": {"id": chat_id, "is_bot": False, "first_name": "U"},
+        "text": text,
+    }
+    if forwarded and not text.startswith("/"):
+        payload["forward_origin"] = {"type": "hidden_user", "date": 0, "sender_user_name": "C"}
+    return Message.model_validate(payload)
+
+
+def _data(message: Message) -> Dict[str, Any]:
+    return {"event_from_user": message.from_user, "event_chat": message.chat}
+
+
+def test_token_bucket_refill_and_wait():
+    """Test token consumption, refill and wait estimation."""
+    limit = RateLimit(capacity=2, rate=1.0)
+    bucket = TokenBucket(tokens=2, updated=0.0)
+
+    assert bucket.consume(limit, 0.0) == 0.0
+    assert bucket.consume(limit, 0.0) == 0.0
+    assert bucket.consume(limit, 0.0) == 1.0
+    assert bucket.consume(limit, 0.5) == 0.5
+    assert bucket.consume(limit, 1.0) == 0.0
+
+
+def test_in_memory_backend_evicts_idle_buckets():
+    """Test that idle buckets are dropped as later keys are checked."""
+    clock = _Clock()
+    backend = InMemoryRateLimitBackend(idle_ttl=10, clock=clock)
+    limit = RateLimit(capacity=1, rate=0.01)
+
+    assert backend.try_acquire("a", limit) == 0.0
+    assert backend.try_acquire("a", limit) > 0
+    clock.now = 5
+    backend.try_acquire("b", limit)
+    clock.now = 12
+    backend.try_acquire("c", limit)
+
+    assert len(backend) == 2
+    assert backend.try_acquire("a", limit) == 0.0
+
+
+async def test_commands_over_limit_are_dropped():
+    """Test per-user limit on non-mergeable messages."""
+    handled: List[str] = []
+
+    async def handler(event: Any, data: Dict[str, Any]) -> None:
+        handled.append(event.text)
+
+    middleware = ThrottlingMiddleware(
+        InMemoryRateLimitBackend(),
+        user_limit=RateLimit(capacity=2, rate=0.001),
+        notice=None,
+    )
+    for index in range(4):
+        message = _message(index, f"/cmd{index}")
+        await middleware(handler, message, _data(message))
+
+    assert handled == ["/cmd0", "/cmd1"]
+    assert middleware.stats.throttled == 2
+
+
+async def test_rapid_fire_messages_are_merged():
+    """Test that a burst of text messages is handled once as a batch."""
+    batches: List[List[str]] = []
+    texts: List[str] = []
+
+    async def handler(event: Any, data: Dict[str, Any]) -> None:
+        batches.append([m.text for m in data["batch"]])
+        texts.append(event.text)
+
+    middleware = ThrottlingMiddleware(
+        InMemoryRateLimitBackend(), merge_window=0.02, mergeable=is_forwarded_text, notice=None
+    )
+    for index in range(50):
+        message = _message(index, f"forward {index}")
+        assert await middleware(handler, message, _data(message)) is None
+
+    await asyncio.sleep(0.05)
+
+    assert len(batches) == 1
+    assert batches[0] == [f"forward {i}" for i in range(50)]
+    assert texts == ["\n\n".join(batches[0])]
+    assert middleware.stats.merged == 49
+
+
+async def test_command_flushes_pending_batch_first():
+    """Test that chat order is kept when a command follows a burst."""
+    order: List[str] = []
+
+    async def handler(event: Any, data: Dict[str, Any]) -> None:
+        order.append("batch" if "batch" in data else event.text)
+
+    middleware = ThrottlingMiddleware(
+        InMemoryRateLimitBackend(), merge_window=10, mergeable=is_forwarded_text, notice=None
+    )
+    for index, text in enumerate(["a", "b", "/start"]):
+        message = _message(index, text)
+        await middleware(handler, message, _data(message))
+
+    assert order == ["batch", "/start"]
+
+
+async def test_merging_is_opt_in_and_flushed_batch_takes_a_token():
+    """Test that plain text is not merged by default and flushes are charged."""
+    handled: List[str] = []
+
+    async def handler(event: Any, data: Dict[str, Any]) -> None:
+        handled.append(event.text)
+
+    default = ThrottlingMiddleware(InMemoryRateLimitBackend(), notice=None)
+    for index, text in enumerate(["купить хлеб", "позвонить маме"]):
+        message = _message(index, text, forwarded=False)
+        await default(handler, message, _data(message))
+    assert handled == ["купить хлеб", "позвонить маме"]
+
+    handled.clear()
+    merging = ThrottlingMiddleware(
+        InMemoryRateLimitBackend(),
+        user_limit=RateLimit(capacity=2, rate=0.001),
+        merge_window=10,
+        mergeable=is_forwarded_text,
+        notice=None,
+    )
+    for index, text in enumerate(["a", "b", "own text", "/start"]):
+        message = _message(index, text, forwarded=text != "own text")
+        await merging(handler, message, _data(message))
+
+    assert handled == ["a\n\nb", "own text"]
+    assert merging.stats.throttled == 1
+
+
+async def test_rate_limited_batch_waits_instead_of_rejecting():
+    """Test that a batch over the limit is delayed, not dropped."""
+    batches: List[int] = []
+
+    async def handler(event: Any, data: Dict[str, Any]) -> None:
+        batches.append(len(data["batch"]))
+
+    middleware = ThrottlingMiddleware(
+        InMemoryRateLimitBackend(),
+        chat_limit=RateLimit(capacity=1, rate=20),
+        merge_window=0.01,
+        mergeable=is_forwarded_text,
+        notice=None,
+    )
+    first = _message(1, "x")
+    await middleware(handler, first, _data(first))
+    await asyncio.sleep(0.03)
+    for index in range(2, 5):
+        message = _message(index, "y")
+        await middleware(handler, message, _data(message))
+    await asyncio.sleep(0.1)
+
+    assert batches == [1, 3]
+
+
+async def test_close_flushes_pending_batches():
+    """Test that close() handles open batches immediately."""
+    handled: List[int] = []
+
+    async def handler(event: Any, data: Dict[str, Any]) -> None:
+        handled.append(event.chat.id)
+
+    middleware = ThrottlingMiddleware(
+        InMemoryRateLimitBackend(), merge_window=10, mergeable=is_forwarded_text, notice=None
+    )
+    for chat_id in (1, 2):
+        message = _message(1, "text", chat_id=chat_id)
+        await middleware(handler, message, _data(message))
+    await middleware.close()
+
+    assert sorted(handled) == [1, 2]
+
+
+async def test_events_without_chat_are_rate_limited_by_user():
+    """Test non-message events only pass through the limiter."""
+    calls = 0
+
+    async def handler(event: Any, data: Dict[str, Any]) -> None:
+        nonlocal calls
+        calls += 1
+
+    middleware = ThrottlingMiddleware(
+        InMemoryRateLimitBackend(), user_limit=RateLimit(capacity=1, rate=0.001)
+    )
+    data = {"event_from_user": User(id=5, is_bot=False, first_name="U"), "event_chat": None}
+    await middleware(handler, Chat(id=1, type="private"), data)
+    await middleware(handler, Chat(id=1, type="private"), data)
+
+    assert calls == 1
@@ -0,0 +1,211 @@
+"""Unit tests for the Todoist Sync API client against a local fake server."""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from src.integrations.todoist.api_client import (
+    TodoistClient,
+    TodoistCommandError,
+    TodoistError,
+)
+from src.utils.resilience import CircuitBreaker, CircuitOpenError, Dependency
+
+
+class FakeTodoist:
+    """In-memory Sync API: commands, temp ids, sync tokens and rate limiting."""
+
+    def __init__(self) -> None:
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.changes: List[Tuple[int, Dict[str, Any]]] = []
+        self.version = 0
+        self.requests: List[Dict[str, Any]] = []
+        self.rate_limited = 0
+        self.retry_after = "0"
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        assert request.headers["Authorization"] == "Bearer token"
+        form = {k: v[0] for k, v in parse_qs(request.content.decode()).items()}
+        self.requests.append(form)
+        if self.rate_limited:
+            self.rate_limited -= 1
+            return httpx.Response(429, headers={"Retry-After": self.retry_after})
+        if "commands" in form:
+            return httpx.Response(200, json=self._commands(json.loads(form["commands"])))
+        return httpx.Response(200, json=self._sync(form["sync_token"]))
+
+    def _change(self, item: Dict[str, Any]) -> None:
+        self.version += 1
+        self.changes.append((self.version, dict(item)))
+
+    def _commands(self, commands: List[Dict[str, Any]]) -> Dict[str, Any]:
+        status: Dict[str, Any] = {}
+        mapping: Dict[str, str] = {}
+        for command in commands:
+            args = command["args"]
+            if command["type"] == "item_add":
+                item_id = str(len(self.items) + 1000)
+                self.items[item_id] = {"id": item_id, "is_deleted": False, **args}
+                mapping[command["temp_id"]] = item_id
+                self._change(self.items[item_id])
+            elif args["id"] not in self.items:
+                status[command["uuid"]] = {"error_code": 22, "error": "Item not found"}
+                continue
+            elif command["type"] == "item_update":
+                self.items[args["id"]].update(args)
+                self._change(self.items[args["id"]])
+            elif command["type"] == "item_delete":
+                self.items[args["id"]]["is_deleted"] = True
+                self._change(self.items.pop(args["id"]))
+            status[command["uuid"]] = "ok"
+        return {"sync_status": status, "temp_id_mapping": mapping}
+
+    def _sync(self, token: str) -> Dict[str, Any]:
+        if token == "*":
+            items = list(self.items.values())
+        else:
+            latest: Dict[str, Dict[str, Any]] = {}
+            for version, item in self.changes:
+                if version > int(token):
+                    latest[item["id"]] = item
+            items = list(latest.values())
+        return {
+            "sync_token": str(self.version),
+            "full_sync": token == "*",
+            "items": items,
+            "projects": [],
+        }
+
+
+def _client(server: FakeTodoist, **kwargs: Any) -> TodoistClient:
+    http = httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+    dependency = Dependency("todoist-test", breaker=CircuitBreaker("todoist-test", 10))
+    return TodoistClient("token", client=http, backoff=0.001, dependency=dependency, **kwargs)
+
+
+async def test_commands_are_batched_into_one_request():
+    """Test that concurrent writes share a single commands request."""
+    server = FakeTodoist()
+    client = _client(server)
+
+    results = await asyncio.gather(*(client.add_task(f"task {i}") for i in range(20)))
+
+    assert len(server.requests) == 1
+    assert len(json.loads(server.requests[0]["commands"])) == 20
+    assert sorted(r.id for r in results if r.id) == sorted(server.items)
+
+
+async def test_batch_size_splits_requests():
+    """Test that batches never exceed batch_size commands."""
+    server = FakeTodoist()
+    client = _client(server, batch_size=10)
+
+    await asyncio.gather(*(client.add_task(f"task {i}") for i in range(25)))
+
+    sizes = [len(json.loads(r["commands"])) for r in server.requests]
+    assert sizes == [10, 10, 5]
+
+
+async def test_failed_command_raises_for_that_command_only():
+    """Test per-command error reporting in a mixed batch."""
+    server = FakeTodoist()
+    client = _client(server)
+
+    added, missing = await asyncio.gather(
+        client.add_task("ok"), client.update_task("404", content="x"), return_exceptions=True
+    )
+
+    assert not isinstance(added, Exception)
+    assert isinstance(missing, TodoistCommandError)
+    assert missing.error["error_code"] == 22
+
+
+async def test_incremental_sync_fetches_only_changes():
+    """Test that sync_token is kept and deltas are merged."""
+    server = FakeTodoist()
+    client = _client(server)
+    first = await client.add_task("first")
+    await client.add_task("second")
+
+    full = await client.sync()
+    await client.update_task(first.id or "", content="first, edited")
+    delta = await client.sync()
+
+    assert full["full_sync"] is True
+    assert len(delta["items"]) == 1
+    assert client.state.items[first.id or ""]["content"] == "first, edited"
+    assert len(client.state.items) == 2
+
+    await client.delete_task(first.id or "")
+    await client.sync()
+    assert list(client.state.items) == [i for i in server.items]
+
+
+async def test_rate_limited_requests_are_retried():
+    """Test 429 responses are retried with backoff."""
+    server = FakeTodoist()
+    server.rate_limited = 2
+    client = _client(server)
+
+    await client.sync()
+
+    assert len(server.requests) == 3
+    assert client.state.sync_token == "0"
+
+
+@pytest.mark.parametrize("retry_after", ["Wed, 21 Oct 2015 07:28:00 GMT", "soon"])
+async def test_http_date_and_malformed_retry_after(retry_after: str):
+    """Test that non-numeric Retry-After values do not break the retry loop."""
+    server = FakeTodoist()
+    server.rate_limited = 1
+    server.retry_after = retry_after
+    client = _client(server)
+
+    await client.sync()
+
+    assert len(server.requests) == 2
+
+
+async def test_gives_up_after_max_retries():
+    """Test persistent rate limiting surfaces as an error."""
+    server = FakeTodoist()
+    server.rate_limited = 10
+    client = _client(server, max_retries=2)
+
+    with pytest.raises(TodoistError):
+        await client.sync()
+    with pytest.raises(TodoistError):
+        await client.add_task("never")
+    assert len(server.requests) == 6
+
+
+async def test_open_circuit_fails_fast():
+    """Test that an open circuit stops requests from reaching Todoist."""
+    server = FakeTodoist()
+    server.rate_limited = 10
+    client = _client(server, max_retries=0)
+    client.dependency.breaker = CircuitBreaker("todoist-test", failure_threshold=2)
+
+    for _ in range(2):
+        with pytest.raises(TodoistError):
+            await client.sync()
+    with pytest.raises(TodoistError) as exc_info:
+        await client.sync()
+
+    assert isinstance(exc_info.value.__cause__, CircuitOpenError)
+    assert len(server.requests) == 2
+
+
+async def test_close_flushes_queued_commands():
+    """Test close() sends commands still waiting for their batch."""
+    server = FakeTodoist()
+    client = _client(server, flush_delay=60)
+    future = client.command("item_add", {"content": "late"}, temp_id=True)
+
+    await client.close()
+
+    assert future.done() and future.result().id in server.items
@@ -0,0 +1,193 @@
+"""Unit tests for webhook update ingestion."""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI
+
+from src.api.v1.endpoints.telegram_webhook import router
+from src.bot.ingestion import SubmitResult, UpdateIngestor, chat_key, update_type
+from src.core.config import Settings, get_settings
+
+
+def _message(update_id: int, chat_id: int, text: str = "hi") -> Dict[str, Any]:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "U"},
+            "text": text,
+        },
+    }
+
+
+def _edit(update_id: int, chat_id: int) -> Dict[str, Any]:
+    payload = _message(update_id, chat_id)
+    payload["edited_message"] = payload.pop("message")
+    return payload
+
+
+def test_chat_key_and_type():
+    """Test ordering key extraction for different update types."""
+    callback = {
+        "update_id": 1,
+        "callback_query": {
+            "id": "q",
+            "from": {"id": 5},
+            "message": {"chat": {"id": -100}},
+        },
+    }
+    inline = {"update_id": 2, "inline_query": {"id": "i", "from": {"id": 9}, "query": ""}}
+
+    assert chat_key(_message(1, 42)) == 42
+    assert chat_key(_edit(1, 43)) == 43
+    assert chat_key(callback) == -100
+    assert chat_key(inline) == 9
+    assert update_type(callback) == "callback_query"
+
+
+async def test_per_chat_order_and_cross_chat_parallelism():
+    """Test that one chat is sequential while chats run concurrently."""
+    processed: Dict[int, List[int]] = {}
+    active = 0
+    peak = 0
+
+    async def handler(payload: Dict[str, Any]) -> None:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.005)
+        chat_id = payload["message"]["chat"]["id"]
+        processed.setdefault(chat_id, []).append(payload["update_id"])
+        active -= 1
+
+    ingestor = UpdateIngestor(handler, workers=4, queue_size=50)
+    ingestor.start()
+    for update_id in range(40):
+        assert ingestor.submit(_message(update_id, update_id % 4)) is SubmitResult.ACCEPTED
+    await ingestor.stop()
+
+    for chat_id, ids in processed.items():
+        assert ids == sorted(ids)
+        assert len(ids) == 10
+    assert peak > 1
+    assert ingestor.stats.processed == 40
+
+
+async def test_duplicate_update_ids_are_dropped():
+    """Test deduplication of Telegram retries."""
+    handled: List[int] = []
+
+    async def handler(payload: Dict[str, Any]) -> None:
+        handled.append(payload["update_id"])
+
+    ingestor = UpdateIngestor(handler, workers=2)
+    ingestor.start()
+    assert ingestor.submit(_message(1, 1)) is SubmitResult.ACCEPTED
+    assert ingestor.submit(_message(1, 1)) is SubmitResult.DUPLICATE
+    await ingestor.stop()
+
+    assert handled == [1]
+    assert ingestor.stats.duplicates == 1
+
+
+async def test_overload_defers_messages_and_sheds_edits():
+    """Test explicit overload handling when a shard queue is full."""
+    handled: List[int] = []
+
+    async def handler(payload: Dict[str, Any]) -> None:
+        handled.append(payload["update_id"])
+
+    ingestor = UpdateIngestor(handler, workers=1, queue_size=2, overflow_size=2)
+    results = [
+        ingestor.submit(_message(1, 7)),
+        ingestor.submit(_message(2, 7)),
+        ingestor.submit(_message(3, 7)),
+        ingestor.submit(_edit(4, 7)),
+        ingestor.submit(_message(5, 7)),
+        ingestor.submit(_message(6, 7)),
+    ]
+
+    assert results == [
+        SubmitResult.ACCEPTED,
+        SubmitResult.ACCEPTED,
+        SubmitResult.DEFERRED,
+        SubmitResult.SHED,
+        SubmitResult.DEFERRED,
+        SubmitResult.SHED,
+    ]
+    assert ingestor.queue_depth == 4
+
+    ingestor.start()
+    await ingestor.stop()
+    assert handled == [1, 2, 3, 5]
+
+
+async def test_handler_errors_do_not_stop_worker():
+    """Test that a failing update is logged and the worker continues."""
+    handled: List[int] = []
+
+    async def handler(payload: Dict[str, Any]) -> None:
+        if payload["update_id"] == 1:
+            raise RuntimeError("boom")
+        handled.append(payload["update_id"])
+
+    ingestor = UpdateIngestor(handler, workers=1)
+    ingestor.start()
+    ingestor.submit(_message(1, 1))
+    ingestor.submit(_message(2, 1))
+    await ingestor.stop()
+
+    assert handled == [2]
+    assert ingestor.stats.failed == 1
+
+
+def _app(ingestor: Optional[UpdateIngestor], secret: Optional[str]) -> FastAPI:
+    app = FastAPI()
+    app.include_router(router)
+    app.state.update_ingestor = ingestor
+    settings = Settings.model_construct(telegram_webhook_secret=secret)
+    app.dependency_overrides[get_settings] = lambda: settings
+    return app
+
+
+async def test_webhook_acks_and_checks_secret():
+    """Test the webhook endpoint ACKs immediately and validates the secret."""
+    received: List[int] = []
+
+    async def handler(payload: Dict[str, Any]) -> None:
+        received.append(payload["update_id"])
+
+    ingestor = UpdateIngestor(handler, workers=1)
+    ingestor.start()
+    transport = httpx.ASGITransport(app=_app(ingestor, "s3cret"))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bot") as client:
+        ok = await client.post(
+            "/telegram/webhook",
+            json=_message(1, 1),
+            headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"},
+        )
+        retry = await client.post(
+            "/telegram/webhook",
+            json=_message(1, 1),
+            headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"},
+        )
+        forbidden = await client.post("/telegram/webhook", json=_message(2, 1))
+    await ingestor.stop()
+
+    assert ok.status_code == retry.status_code == 200
+    assert ok.json() == {"ok": True}
+    assert forbidden.status_code == 401
+    assert received == [1]
+
+
+async def test_webhook_without_ingestor_is_unavailable():
+    """Test the endpoint reports 503 when ingestion is not running."""
+    transport = httpx.ASGITransport(app=_app(None, None))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bot") as client:
+        response = await client.post("/telegram/webhook", json=_message(1, 1))
+
+    assert response.status_code == 503
@@ -0,0 +1,111 @@
+"""Unit tests for quantized vector storage."""
+
+import numpy as np
+import pytest
+
+from src.storage.vectors import (
+    QuantizationMode,
+    VectorIndex,
+    dequantize_int8,
+    fit_int8,
+    quantize_int8,
+)
+
+
+def _vectors(n: int, dim: int = 64, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_int8_round_trip_error_is_bounded():
+    """Test per-dimension quantization error stays within half a step."""
+    vectors = _vectors(500)
+    scale, offset = fit_int8(vectors)
+
+    codes = quantize_int8(vectors, scale, offset)
+    restored = dequantize_int8(codes, scale, offset)
+
+    assert codes.dtype == np.int8
+    assert np.all(np.abs(restored - vectors) <= scale / 2 + 1e-6)
+
+
+@pytest.mark.parametrize("mode", list(QuantizationMode))
+def test_search_finds_exact_neighbours_after_rerank(mode):
+    """Test that re-ranked results match exact search."""
+    vectors = _vectors(2000)
+    index = VectorIndex(64, mode)
+    index.add(range(100, 2100), vectors)
+    query = vectors[42] + 0.05 * _vectors(1, seed=1)[0]
+
+    found = index.search(query, k=10)
+
+    expected = np.argsort(-(vectors @ query.astype(np.float32)))[:10] + 100
+    assert [i for i, _ in found] == expected.tolist()
+    assert found[0][0] == 142
+    assert found[0][1] == pytest.approx(float(vectors[42] @ query), abs=1e-5)
+
+
+def test_quantized_scores_approximate_exact_scores():
+    """Test approximate int8 scores without re-ranking."""
+    vectors = _vectors(300)
+    index = VectorIndex(64, QuantizationMode.INT8, keep_full=False)
+    index.add(range(300), vectors)
+    query = vectors[7]
+
+    approx = index.scores(query)
+
+    assert np.max(np.abs(approx - vectors @ query)) < 0.05
+    assert index.search(query, k=1, rerank=True)[0][0] == 7
+
+
+def test_memory_per_mode():
+    """Test in-RAM size of the searched arrays."""
+    vectors = _vectors(1000)
+    sizes = {}
+    for mode in QuantizationMode:
+        index = VectorIndex(64, mode, keep_full=False)
+        index.add(range(1000), vectors)
+        sizes[mode] = index.codes.nbytes
+
+    assert sizes[QuantizationMode.FLOAT16] * 2 == sizes[QuantizationMode.FLOAT32]
+    assert sizes[QuantizationMode.INT8] * 4 == sizes[QuantizationMode.FLOAT32]
+
+
+def test_save_and_load_memory_maps_full_vectors(tmp_path):
+    """Test persistence and that full vectors are not counted as RAM."""
+    vectors = _vectors(400)
+    index = VectorIndex(64, QuantizationMode.INT8)
+    index.add(range(400), vectors)
+    index.save(tmp_path / "index")
+
+    loaded = VectorIndex.load(tmp_path / "index")
+
+    assert isinstance(loaded.full, np.memmap)
+    assert loaded.nbytes < index.nbytes
+    assert loaded.search(vectors[3], k=3) == index.search(vectors[3], k=3)
+
+
+def test_add_validates_shape_and_empty_search():
+    """Test input validation and searching an empty index."""
+    index = VectorIndex(64)
+
+    assert index.search(np.zeros(64)) == []
+    with pytest.raises(ValueError):
+        index.add([1, 2], _vectors(3))
+
+
+def test_int8_range_grows_with_later_batches():
+    """Test that vectors added one by one are not clipped to the first one."""
+    vectors = _vectors(500)
+    index = VectorIndex(64, QuantizationMode.INT8, keep_full=False)
+    for i, vector in enumerate(vectors):
+        index.add([i], vector[None, :])
+    query = vectors[42] + 0.05 * _vectors(1, seed=1)[0]
+
+    found = [i for i, _ in index.search(query, k=10)]
+
+    expected = np.argsort(-(vectors @ query.astype(np.float32)))[:10]
+    assert len(set(found) & set(expected.tolist())) >= 9
+    assert np.max(np.abs(index.scores(vectors[7]) - vectors @ vectors[7])) < 0.05
+    assert len(index) == 500 and index.codes.shape == (500, 64)